@@ -2,25 +2,47 @@ import sys
 import datetime
 import arrow
 import argparse
+import contextlib
 import logging
-import pkg_resources
+import importlib
 import typing
 
+try:
+    import importlib.metadata as importlib_metadata
+except ImportError:
+    # Python 3.7
+    import importlib_metadata
+
 # Required for cryptography lib in python 3.7
 if sys.version_info < (3, 8):
     import typing_extensions
     typing.Protocol = typing_extensions.Protocol
 
 from .api import TConnectApi
-from .process import process_time_range
-from .autoupdate import Autoupdate
-from .sync.tandemsource.autoupdate import TandemSourceAutoupdate
-from .sync.tandemsource.choose_device import ChooseDevice as TandemSourceChooseDevice
-from .sync.tandemsource.process import ProcessTimeRange as TandemSourceProcessTimeRange
-from .check import check_login
 from .nightscout import NightscoutApi
+from .nightscout_outbox import NightscoutOutbox
 from .features import DEFAULT_FEATURES, ALL_FEATURES
 
+# Only what the Tandem Source sync uses is imported at startup; see
+# tests/test_import_time.py for the import-time budget. The legacy t:connect
+# sync functions and all submodules (e.g. tconnectsync.util) remain available
+# as attributes of this package, imported on first access.
+_LAZY_ATTRIBUTES = {
+    'process_time_range': '.process',
+    'Autoupdate': '.autoupdate',
+    'check_login': '.check',
+}
+
+def __getattr__(name):
+    if name in _LAZY_ATTRIBUTES:
+        return getattr(importlib.import_module(_LAZY_ATTRIBUTES[name], __name__), name)
+    try:
+        return importlib.import_module('.' + name, __name__)
+    except ModuleNotFoundError as e:
+        if e.name != '%s.%s' % (__name__, name):
+            raise
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
 try:
     from .secret import (
         TCONNECT_EMAIL,
@@ -29,7 +51,9 @@ try:
         NS_SECRET,
         NS_SKIP_TLS_VERIFY,
         PUMP_SERIAL_NUMBER,
-        NS_IGNORE_CONN_ERRORS
+        NS_IGNORE_CONN_ERRORS,
+        NS_API_VERSION,
+        NS_ACCESS_TOKEN
     )
     from . import secret
 except Exception as e:
@@ -38,7 +62,7 @@ except Exception as e:
 
 
 try:
-    __version__ = pkg_resources.require("tconnectsync")[0].version
+    __version__ = importlib_metadata.version("tconnectsync")
 except Exception:
     __version__ = "UNKNOWN"
 
@@ -52,8 +76,17 @@ def parse_args(*args, **kwargs):
     parser.add_argument('--days', dest='days', type=int, default=1, help='The number of days of t:connect data to read in. Cannot be used with --from-date and --until-date.')
     parser.add_argument('--auto-update', dest='auto_update', action='store_const', const=True, default=False, help='If set, continuously checks for updates from t:connect and syncs with Nightscout.')
     parser.add_argument('--check-login', dest='check_login', action='store_const', const=True, default=False, help='If set, checks that the provided t:connect credentials can be used to log in.')
+    parser.add_argument('--latency', dest='latency', action='store_const', const=True, default=False, help='With --check-login, measures DNS, connection, TLS and response times to Tandem and Nightscout, pump event download throughput and Nightscout upload latency, instead of syncing.')
+    parser.add_argument('--latency-samples', dest='latency_samples', type=int, default=5, help='The number of times each endpoint is probed with --latency.')
+    parser.add_argument('--reconcile', dest='reconcile', nargs=2, metavar=('START', 'END'), default=None, help='Compares all pump data between the START and END dates with the data in Nightscout, and uploads only what is missing.')
+    parser.add_argument('--export', dest='export', type=str, metavar='DIR', default=None, help='Exports all decoded pump events between --start-date and --end-date into one file per event type in DIR, without uploading to Nightscout.')
+    parser.add_argument('--export-format', dest='export_format', default='parquet', choices=['parquet', 'arrow', 'ndjson'], help='File format used by --export. parquet and arrow require pyarrow, and fall back to ndjson if it is not installed.')
+    parser.add_argument('--proxy', dest='proxy', action='store_const', const=True, default=False, help='Runs a local caching proxy for Tandem Source on PROXY_HOST:PROXY_PORT, which other tconnectsync processes use when TANDEM_SOURCE_PROXY_URL is set, instead of syncing.')
     parser.add_argument('--features', dest='features', nargs='+', default=DEFAULT_FEATURES, choices=ALL_FEATURES, help='Specifies what data should be synchronized between tconnect and Nightscout.')
     parser.add_argument('--tandem-source', dest='tandem_source', action='store_const', const=True, default=False, help='FOR TESTING: Use Tandem Source')
+    parser.add_argument('--record', dest='record', type=str, default=None, help='FOR TESTING: Record all HTTP requests and responses (with secrets redacted) into a cassette in the given directory.')
+    parser.add_argument('--replay', dest='replay', type=str, default=None, help='FOR TESTING: Replay a cassette recorded with --record from the given directory, without network access.')
+    parser.add_argument('--replay-time-scale', dest='replay_time_scale', type=float, default=1.0, help='FOR TESTING: Multiplier applied to recorded response times when replaying. 0 replays as fast as possible.')
 
     return parser.parse_args(*args, **kwargs)
 
@@ -75,7 +108,40 @@ def main(*args, **kwargs):
     if args.auto_update and (args.start_date or args.end_date):
         raise Exception('Auto-update cannot be used with start/end date')
 
-    if args.start_date and args.end_date:
+    if args.reconcile and (args.auto_update or args.start_date or args.end_date):
+        raise Exception('Reconcile cannot be used with auto-update or start/end date')
+
+    if args.export and (args.auto_update or args.reconcile):
+        raise Exception('Export cannot be used with auto-update or reconcile')
+
+    if args.proxy and (args.auto_update or args.reconcile or args.export or args.check_login):
+        raise Exception('--proxy cannot be used with auto-update, reconcile, export or check-login')
+
+    if args.latency and not args.check_login:
+        raise Exception('--latency must be used with --check-login')
+
+    if args.record and args.replay:
+        raise Exception('--record cannot be used with --replay')
+
+    cassette = None
+    if args.record or args.replay:
+        from .standin.cassette import Cassette
+        if args.replay:
+            cassette = Cassette.replay(args.replay, time_scale=args.replay_time_scale)
+            # The recorded requests are only valid for the recorded time range
+            if cassette.args.get('reconcile'):
+                args.reconcile = [cassette.args.get('time_start'), cassette.args.get('time_end')]
+                args.start_date = args.end_date = None
+            else:
+                args.start_date = cassette.args.get('time_start')
+                args.end_date = cassette.args.get('time_end')
+            args.features = cassette.args.get('features', args.features)
+            args.auto_update = False
+
+    if args.reconcile:
+        time_start = arrow.get(args.reconcile[0])
+        time_end = arrow.get(args.reconcile[1])
+    elif args.start_date and args.end_date:
         time_start = arrow.get(args.start_date)
         time_end = arrow.get(args.end_date)
     else:
@@ -98,9 +164,41 @@ def main(*args, **kwargs):
         else:
             logging.warn('NO PUMP SERIAL NUMBER WAS PROVIDED. Ensure you have set PUMP_SERIAL_NUMBER appropriately.')
 
+    if args.record:
+        cassette = Cassette.record(args.record, args={
+            'time_start': arrow.get(time_start).isoformat(),
+            'time_end': arrow.get(time_end).isoformat(),
+            'features': args.features,
+            'reconcile': bool(args.reconcile),
+        })
+
+    with cassette or contextlib.nullcontext():
+        run(args, time_start, time_end)
+
+def run(args, time_start, time_end):
+    from .sync.tandemsource.choose_device import ChooseDevice as TandemSourceChooseDevice
+
+    if args.proxy:
+        from .proxy import TandemSourceProxy
+        proxy = TandemSourceProxy(TCONNECT_EMAIL, TCONNECT_PASSWORD, secret.PROXY_CACHE_PATH, address=(secret.PROXY_HOST, secret.PROXY_PORT), token=secret.PROXY_TOKEN)
+        # Log in before accepting requests, so that credential errors are reported immediately
+        proxy.api()
+        logging.info("Serving Tandem Source proxy at %s, caching completed days in %s" % (proxy.url, secret.PROXY_CACHE_PATH))
+        try:
+            proxy.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            proxy.server_close()
+        return
+
     tconnect = TConnectApi(TCONNECT_EMAIL, TCONNECT_PASSWORD)
 
-    nightscout = NightscoutApi(NS_URL, NS_SECRET, skip_verify=NS_SKIP_TLS_VERIFY, ignore_conn_errors=NS_IGNORE_CONN_ERRORS)
+    if NS_API_VERSION == '3':
+        from .nightscout_v3 import NightscoutApiV3
+        nightscout = NightscoutApiV3(NS_URL, NS_SECRET, NS_ACCESS_TOKEN, skip_verify=NS_SKIP_TLS_VERIFY, ignore_conn_errors=NS_IGNORE_CONN_ERRORS, outbox=NightscoutOutbox.from_secret(secret))
+    else:
+        nightscout = NightscoutApi(NS_URL, NS_SECRET, skip_verify=NS_SKIP_TLS_VERIFY, ignore_conn_errors=NS_IGNORE_CONN_ERRORS, outbox=NightscoutOutbox.from_secret(secret))
 
     # NOT YET MIGRATED
     # if args.check_login:
@@ -115,10 +213,27 @@ def main(*args, **kwargs):
     if args.check_login:
         args.pretend = True
 
-    if args.auto_update:
+    if args.check_login and args.latency:
+        from .check import check_latency
+        check_latency(tconnect, nightscout, secret, time_end, samples=args.latency_samples)
+        sys.exit(0)
+
+    if args.export:
+        from .sync.tandemsource.export import Export
+        tconnectDevice = TandemSourceChooseDevice(secret, tconnect).choose()
+        counts = Export(tconnect, tconnectDevice, args.export, format=args.export_format).process(time_start, time_end)
+        sys.exit(0 if counts else 1)
+    elif args.reconcile:
+        from .sync.tandemsource.reconcile import Reconcile as TandemSourceReconcile
+        tconnectDevice = TandemSourceChooseDevice(secret, tconnect).choose()
+        TandemSourceReconcile(tconnect, nightscout, tconnectDevice, pretend=args.pretend, secret=secret, features=args.features).process(time_start, time_end)
+        sys.exit(0)
+    elif args.auto_update:
+        from .sync.tandemsource.autoupdate import TandemSourceAutoupdate
         u = TandemSourceAutoupdate(secret)
         sys.exit(u.process(tconnect, nightscout, time_start, time_end, args.pretend, features=args.features))
     else:
+        from .sync.tandemsource.process import ProcessTimeRange as TandemSourceProcessTimeRange
         tconnectDevice = TandemSourceChooseDevice(secret, tconnect).choose()
         added, last_event_id = TandemSourceProcessTimeRange(tconnect, nightscout, tconnectDevice, pretend=args.pretend, secret=secret, features=args.features).process(time_start, time_end)
 
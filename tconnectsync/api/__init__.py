@@ -1,13 +1,28 @@
 import logging
-
-from .android import AndroidApi
-from .controliq import ControlIQApi
-from .ws2 import WS2Api
-from .webui import WebUIScraper
-from .tandemsource import TandemSourceApi
+import importlib
 
 logger = logging.getLogger(__name__)
 
+# Each API client is imported only when first used, so that a Tandem Source sync
+# does not load the legacy t:connect clients (and BeautifulSoup for WebUIScraper).
+_LAZY_CLIENTS = {
+    'AndroidApi': '.android',
+    'ControlIQApi': '.controliq',
+    'WS2Api': '.ws2',
+    'WebUIScraper': '.webui',
+    'TandemSourceApi': '.tandemsource',
+}
+
+def __getattr__(name):
+    if name in _LAZY_CLIENTS:
+        return getattr(importlib.import_module(_LAZY_CLIENTS[name], __name__), name)
+    try:
+        return importlib.import_module('.' + name, __name__)
+    except ModuleNotFoundError as e:
+        if e.name != '%s.%s' % (__name__, name):
+            raise
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
 """A wrapper for the three different t:connect API types."""
 class TConnectApi:
     email = None
@@ -28,6 +43,7 @@ class TConnectApi:
             return self._tandemsource
 
         logger.debug("Instantiating new TandemSourceApi")
+        from .tandemsource import TandemSourceApi
 
         self._tandemsource = TandemSourceApi(self.email, self.password)
         return self._tandemsource
@@ -39,6 +55,7 @@ class TConnectApi:
             return self._ciq
 
         logger.debug("Instantiating new ControlIQApi")
+        from .controliq import ControlIQApi
 
         self._ciq = ControlIQApi(self.email, self.password)
         return self._ciq
@@ -49,6 +66,7 @@ class TConnectApi:
             return self._ws2
 
         logger.debug("Instantiating new WS2Api")
+        from .ws2 import WS2Api
 
         # Trigger login or re-login via controliq api if necessary
         # so userGuid can be accessed from it
@@ -63,6 +81,7 @@ class TConnectApi:
             return self._android
 
         logger.debug("Instantiating new AndroidApi")
+        from .android import AndroidApi
 
         self._android = AndroidApi(self.email, self.password)
         return self._android
@@ -73,6 +92,7 @@ class TConnectApi:
             return self._webui
         
         logger.debug("Instantiating new WebUIScraper")
+        from .webui import WebUIScraper
 
         self._webui = WebUIScraper(self.controliq)
         return self._webui
@@ -7,11 +7,14 @@ import base64
 import arrow
 import time
 import logging
+import contextlib
 
 from bs4 import BeautifulSoup
 
 from ..util import timeago
 from .common import ApiException, ApiLoginException, parse_date, base_session
+from .session_cache import SessionCache
+from ..secret import CACHE_CREDENTIALS, CACHE_SESSIONS_PATH
 
 logger = logging.getLogger(__name__)
 
@@ -42,20 +45,24 @@ class AndroidApi:
     refreshTokenExpiresAt = None
     userId = None
     patientObjectId = None
+    session_cache = None
 
     def __init__(self, email, password):
         self.session = base_session()
-        self.login(email, password)
+        if CACHE_CREDENTIALS:
+            self.session_cache = SessionCache(CACHE_SESSIONS_PATH)
+        # Only one process logs in at a time; the others then reuse its session
+        with self.session_cache.locked() if self.session_cache else contextlib.nullcontext():
+            if not self.try_load_cached_session(email):
+                self.login(email, password)
         self._email = email
         self._password = password
 
-    def login(self, email, password):
-        r = self.session.post(
+    def _token_request(self, data):
+        return self.session.post(
             self.BASE_URL + self.OAUTH_TOKEN_PATH,
             {
-                'username': email,
-                'password': password,
-                'grant_type': 'password',
+                **data,
                 'scope': self.OAUTH_SCOPES
             },
             headers={
@@ -65,6 +72,23 @@ class AndroidApi:
             auth=requests.auth.HTTPBasicAuth(self.ANDROID_API_USERNAME, self.ANDROID_API_PASSWORD)
         )
 
+    def _set_tokens(self, j):
+        self.accessToken = j["accessToken"]
+        self.accessTokenExpiresAt = j["accessTokenExpiresAt"]
+        if "refreshToken" in j and "refreshTokenExpiresAt" in j:
+            self.refreshToken = j["refreshToken"]
+            self.refreshTokenExpiresAt = j["refreshTokenExpiresAt"]
+        # tconnect web returns a null user
+        if j.get("user"):
+            self.userId = j["user"]["id"]
+
+    def login(self, email, password):
+        r = self._token_request({
+            'username': email,
+            'password': password,
+            'grant_type': 'password',
+        })
+
         if r.status_code != 200:
             raise ApiLoginException(r.status_code, 'Received HTTP %s during login: %s' % (r.status_code, r.text))
 
@@ -73,17 +97,78 @@ class AndroidApi:
         # if "user" not in j or not j["user"]:
         #     raise ApiException(r.status_code, 'No user details present in AndroidApi oauth response: %s' % r.text)
 
-        self.accessToken = j["accessToken"]
-        self.accessTokenExpiresAt = j["accessTokenExpiresAt"]
-        # NOTE: the refresh token is currently unused, instead a new access
-        # token is obtained from scratch by re-logging in when it expires.
-        if "refreshToken" in j and "refreshTokenExpiresAt" in j:
-            self.refreshToken = j["refreshToken"]
-            self.refreshTokenExpiresAt = j["refreshTokenExpiresAt"]
-        self.userId = j["user"]["id"]
+        self._set_tokens(j)
+        self.cache_session(email)
 
         logger.info("Logged in to AndroidApi successfully (expiration: %s, %s)" % (self.accessTokenExpiresAt, timeago(self.accessTokenExpiresAt)))
 
+    def refresh_token_valid(self):
+        if not self.refreshToken or not self.refreshTokenExpiresAt:
+            return False
+        return arrow.get(self.refreshTokenExpiresAt) > arrow.get().shift(minutes=5)
+
+    """
+    Obtains a new access token with the refresh token, without resending the
+    account password. Returns False if there is no usable refresh token or
+    it was rejected, in which case the caller should log in again.
+    """
+    def refresh(self, email):
+        if not self.refresh_token_valid():
+            return False
+
+        r = self._token_request({
+            'grant_type': 'refresh_token',
+            'refresh_token': self.refreshToken,
+        })
+        if r.status_code != 200:
+            logger.warning("Could not refresh AndroidApi access token (HTTP %s), logging in again" % r.status_code)
+            self.refreshToken = None
+            return False
+
+        self._set_tokens(r.json())
+        self.cache_session(email)
+
+        logger.info("Refreshed AndroidApi access token (expiration: %s, %s)" % (self.accessTokenExpiresAt, timeago(self.accessTokenExpiresAt)))
+        return True
+
+    """
+    Restores the tokens of a previous login from the session cache. If the
+    cached access token has expired but the refresh token has not, a new
+    access token is obtained with it. Returns False if neither can be used.
+    """
+    def try_load_cached_session(self, email):
+        if not self.session_cache:
+            return False
+
+        data = self.session_cache.load('AndroidApi', email)
+        if not data:
+            return False
+
+        self.accessToken = data['accessToken']
+        self.accessTokenExpiresAt = data['accessTokenExpiresAt']
+        self.refreshToken = data.get('refreshToken')
+        self.refreshTokenExpiresAt = data.get('refreshTokenExpiresAt')
+        self.userId = data['userId']
+
+        if arrow.get(self.accessTokenExpiresAt) > arrow.get().shift(minutes=5):
+            return True
+        return self.refresh(email)
+
+    def cache_session(self, email):
+        if not self.session_cache:
+            return
+
+        expiry = [self.accessTokenExpiresAt]
+        if self.refresh_token_valid():
+            expiry.append(self.refreshTokenExpiresAt)
+        self.session_cache.save('AndroidApi', email, {
+            'accessToken': self.accessToken,
+            'accessTokenExpiresAt': self.accessTokenExpiresAt,
+            'refreshToken': self.refreshToken,
+            'refreshTokenExpiresAt': self.refreshTokenExpiresAt,
+            'userId': self.userId,
+        }, expires_at=max(expiry, key=lambda t: arrow.get(t)))
+
     def needs_relogin(self):
         diff = (arrow.get(self.accessTokenExpiresAt) - arrow.get())
         return (diff.seconds <= 5 * 60)
@@ -111,10 +196,11 @@ class AndroidApi:
             if tries > 0:
                 raise ApiException(e.status_code, "Android API HTTP %s on retry #%d: %s" % (e.status_code, tries, e))
 
-            # Trigger automatic re-login, and try again once
+            # Trigger automatic token refresh or re-login, and try again once
             if e.status_code == 401:
                 self.accessTokenExpiresAt = time.time()
-                self.login(self._email, self._password)
+                if not self.refresh(self._email):
+                    self.login(self._email, self._password)
 
                 return self.get(endpoint, query, tries=tries+1, **kwargs)
 
@@ -91,8 +91,25 @@ random_ua = random.choice(USER_AGENTS)
 def base_headers():
     return {'user-agent': random_ua}
 
+# Transport adapters, keyed by URL prefix, which are mounted on every
+# session returned by base_session(). This allows Tandem requests to be
+# served by a local stand-in instead of the real service.
+transport_adapters = {}
+
+def mount_transport(prefix, adapter):
+    transport_adapters[prefix] = adapter
+
+def unmount_transport(prefix):
+    transport_adapters.pop(prefix, None)
+
 def base_session():
     s = requests.Session()
+    for prefix, adapter in transport_adapters.items():
+        s.mount(prefix, adapter)
+    if secret.RATE_LIMIT:
+        from .rate_limit import shared_limiter
+        # Requests served by a local stand-in are not limited
+        shared_limiter().install(s, exempt=lambda url: any(url.startswith(prefix) for prefix in transport_adapters))
     if secret.REQUESTS_PROXY:
         def wrapped_request(self, *args, **kwargs):
             if not kwargs:
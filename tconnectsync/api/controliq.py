@@ -2,11 +2,14 @@ import urllib
 import arrow
 import time
 import logging
+import contextlib
 
 from bs4 import BeautifulSoup
 
 from ..util import timeago, cap_length
 from .common import parse_date, base_headers, base_session, ApiException, ApiLoginException
+from .session_cache import SessionCache, cookies_to_list, cookies_from_list
+from ..secret import CACHE_CREDENTIALS, CACHE_SESSIONS_PATH
 
 logger = logging.getLogger(__name__)
 
@@ -20,12 +23,61 @@ class ControlIQApi:
     accessToken = None
     accessTokenExpiresAt = None
     tconnect_software_ver = None
+    session_cache = None
 
     def __init__(self, email, password):
-        self.login(email, password)
+        if CACHE_CREDENTIALS:
+            self.session_cache = SessionCache(CACHE_SESSIONS_PATH)
+        # Only one process logs in at a time; the others then reuse its session
+        with self.session_cache.locked() if self.session_cache else contextlib.nullcontext():
+            if not self.try_load_cached_session(email):
+                self.login(email, password)
         self._email = email
         self._password = password
 
+    """
+    Restores the access token and t:connect cookies of a previous login from
+    the session cache, avoiding the login page scrape. Returns False if there
+    is no unexpired cached session.
+    """
+    def try_load_cached_session(self, email):
+        if not self.session_cache:
+            return False
+
+        data = self.session_cache.load('ControlIQApi', email)
+        if not data:
+            return False
+
+        self.userGuid = data['userGuid']
+        self.accessToken = data['accessToken']
+        self.accessTokenExpiresAt = data['accessTokenExpiresAt']
+        self.tconnect_software_ver = data.get('tconnect_software_ver')
+        self.loginSession = base_session()
+        cookies_from_list(data['cookies'], self.loginSession.cookies)
+        return True
+
+    def cache_session(self, email):
+        if not self.session_cache:
+            return
+
+        self.session_cache.save('ControlIQApi', email, {
+            'userGuid': self.userGuid,
+            'accessToken': self.accessToken,
+            'accessTokenExpiresAt': self.accessTokenExpiresAt,
+            'tconnect_software_ver': self.tconnect_software_ver,
+            'cookies': cookies_to_list(self.loginSession.cookies),
+        }, expires_at=self.accessTokenExpiresAt)
+
+    """
+    Removes cached sessions after they were rejected, including the AndroidApi
+    session whose access token login() may reuse.
+    """
+    def clear_cached_session(self):
+        if not self.session_cache:
+            return
+        self.session_cache.clear('ControlIQApi', self._email)
+        self.session_cache.clear('AndroidApi', self._email)
+
     def login(self, email, password):
         logger.info("Logging in to ControlIQApi...")
         with base_session() as s:
@@ -67,6 +119,7 @@ class ControlIQApi:
 
 
             self.loginSession = s
+            self.cache_session(email)
             return True
 
     def _build_login_data(self, email, password, soup):
@@ -151,6 +204,7 @@ class ControlIQApi:
             if e.status_code == 401:
                 logger.info("Performing automatic re-login after HTTP 401 for ControlIQApi")
                 self.accessTokenExpiresAt = time.time()
+                self.clear_cached_session()
                 self.login(self._email, self._password)
 
                 return self.get(endpoint, query, tries=tries+1)
@@ -178,6 +232,8 @@ class ControlIQApi:
     'cgmInactiveMinutes': <integer>, 'pumpInactiveMinutes': <integer>, 'averageDailySleepMinutes': <integer>,
     'weeklyExerciseEvents': <integer>, 'timeInUsePercent': <integer>, 'controlIqOffPercent': <integer>,
     'cgmInactivePercent': <integer>, 'pumpInactivePercent': <integer>, 'totalDays': <integer>}
+    For Tandem Source pump history, see sync.tandemsource.analytics.Analytics,
+    which computes these and other metrics locally.
     """
     def dashboard_summary(self, start, end):
         startDate = parse_date(start)
@@ -0,0 +1,179 @@
+import json
+import time
+import logging
+import threading
+import contextlib
+import collections
+import urllib.parse
+
+from .common import ApiException
+from ..util.shared_file import lock_file, write_atomic
+
+logger = logging.getLogger(__name__)
+
+"""
+A request rate limit for one host: a token bucket refilled at rate requests
+per second which holds up to burst requests, and an optional number of
+requests allowed per day.
+"""
+Limit = collections.namedtuple('Limit', ['rate', 'burst', 'daily_budget'], defaults=[None])
+
+# Conservative limits for the Tandem hosts used by the API clients. The t:connect
+# login page is behind a web application firewall which blocks aggressive clients.
+DEFAULT_LIMITS = {
+    'tconnect.tandemdiabetes.com': Limit(rate=1, burst=10),
+    'tdcservices.tandemdiabetes.com': Limit(rate=5, burst=20),
+    'sso.tandemdiabetes.com': Limit(rate=2, burst=10),
+    'source.tandemdiabetes.com': Limit(rate=5, burst=20),
+}
+
+class RateLimitExceeded(ApiException):
+    def __init__(self, host, budget):
+        super().__init__(429, 'Daily request budget of %d for %s has been used' % (budget, host))
+
+"""
+Parses RATE_LIMITS, a comma-separated list of host=rate/burst/daily_budget
+entries, e.g. "source.tandemdiabetes.com=2/10/5000". Burst defaults to the
+rate and the daily budget to unlimited. A rate of 0 removes the host's limit.
+Hosts which are not listed keep their default limits.
+"""
+def parse_limits(value, defaults=DEFAULT_LIMITS):
+    limits = dict(defaults)
+    for entry in (value or '').split(','):
+        entry = entry.strip()
+        if not entry:
+            continue
+        try:
+            host, spec = entry.split('=', 1)
+            parts = [p.strip() for p in spec.split('/')]
+            rate = float(parts[0])
+            burst = float(parts[1]) if len(parts) > 1 and parts[1] else max(rate, 1)
+            budget = int(parts[2]) if len(parts) > 2 and parts[2] else None
+        except ValueError:
+            raise ValueError('Invalid RATE_LIMITS entry %r, expected host=rate/burst/daily_budget' % entry)
+        if rate <= 0:
+            limits.pop(host.strip(), None)
+        else:
+            limits[host.strip()] = Limit(rate, burst, budget)
+    return limits
+
+"""
+Token bucket rate limiter for outgoing requests, keyed by host.
+
+Each request reserves the next slot in its host's bucket, possibly taking it
+below zero, and then sleeps until that slot is due. Waiting callers are
+therefore served in order at exactly the configured rate, without polling.
+
+When state_path is set, the buckets and daily request counts are kept in that
+file and updated under a lock file, so every thread and process using the
+same file shares one set of limits. The file is not fsynced, since losing the
+latest update in a crash only loosens the limit briefly. Otherwise they are
+kept in memory and shared by the threads of this process.
+"""
+class RateLimiter:
+    def __init__(self, limits, state_path=None, clock=time.time, sleep=time.sleep):
+        self.limits = limits
+        self.state_path = state_path
+        self.clock = clock
+        self.sleep = sleep
+        self._lock = threading.Lock()
+        self._state = {}
+
+    def _read_state(self):
+        try:
+            with open(self.state_path) as f:
+                state = json.load(f)
+            return state if isinstance(state, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning("Resetting unreadable rate limit state at %s: %s" % (self.state_path, e))
+            return {}
+
+    @contextlib.contextmanager
+    def _locked_state(self):
+        with self._lock:
+            if not self.state_path:
+                yield self._state
+                return
+
+            with lock_file(self.state_path + '.lock'):
+                state = self._read_state()
+                yield state
+                try:
+                    write_atomic(self.state_path, json.dumps(state), fsync=False)
+                except OSError as e:
+                    logger.warning("Could not save rate limit state at %s: %s" % (self.state_path, e))
+
+    """
+    Reserves a request to host in the shared state, returning how long to
+    wait before sending it.
+    """
+    def _reserve(self, state, host, limit, now):
+        day = time.strftime('%Y-%m-%d', time.localtime(now))
+        bucket = state.get(host) or {'tokens': limit.burst, 'updated': now, 'day': day, 'used': 0}
+
+        bucket['tokens'] = min(limit.burst, bucket['tokens'] + max(0, now - bucket['updated']) * limit.rate)
+        bucket['updated'] = now
+        if bucket['day'] != day:
+            bucket['day'] = day
+            bucket['used'] = 0
+
+        if limit.daily_budget and bucket['used'] >= limit.daily_budget:
+            state[host] = bucket
+            raise RateLimitExceeded(host, limit.daily_budget)
+
+        bucket['tokens'] -= 1
+        bucket['used'] += 1
+        state[host] = bucket
+        return max(0, -bucket['tokens']) / limit.rate
+
+    """
+    Blocks until a request to the given URL is allowed by its host's limit.
+    Returns the number of seconds waited. Raises RateLimitExceeded if the
+    host's daily budget has been used.
+    """
+    def acquire(self, url):
+        host = urllib.parse.urlsplit(url).hostname
+        limit = self.limits.get(host)
+        if not limit:
+            return 0
+
+        with self._locked_state() as state:
+            wait = self._reserve(state, host, limit, self.clock())
+        if wait > 0:
+            logger.debug("Rate limiting request to %s for %.2f seconds" % (host, wait))
+            self.sleep(wait)
+        return wait
+
+    """
+    Makes every request sent by a requests session, including redirects, wait
+    for the rate limit. Requests for which exempt(url) is true are sent
+    immediately.
+    """
+    def install(self, session, exempt=None):
+        original_send = session.send
+        def send(request, **kwargs):
+            if not (exempt and exempt(request.url)):
+                self.acquire(request.url)
+            return original_send(request, **kwargs)
+        session.send = send
+        return session
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+"""
+Returns the rate limiter shared by all API clients, configured from the
+RATE_LIMITS setting. Its state is only kept in RATE_LIMIT_STATE_PATH, and
+shared with other processes, when RATE_LIMIT_SHARED is enabled.
+"""
+def shared_limiter():
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            from .. import secret
+            state_path = secret.RATE_LIMIT_STATE_PATH if secret.RATE_LIMIT_SHARED else None
+            _limiter = RateLimiter(parse_limits(secret.RATE_LIMITS), state_path=state_path or None)
+        return _limiter
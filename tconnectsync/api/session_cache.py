@@ -0,0 +1,167 @@
+import os
+import json
+import arrow
+import logging
+import threading
+import contextlib
+
+from ..util.shared_file import lock_file, write_atomic
+
+logger = logging.getLogger(__name__)
+
+SESSION_CACHE_VERSION = 1
+
+# Cached sessions are not reused this close to their expiry, as in needs_relogin()
+EXPIRY_MARGIN_SECONDS = 5 * 60
+
+# How long a session is reused when the server does not say when it expires
+DEFAULT_MAX_AGE_SECONDS = 60 * 60
+
+"""
+Returns the cookies in a requests cookie jar as a list of JSON-serializable dicts.
+"""
+def cookies_to_list(jar):
+    return [{
+        'name': c.name,
+        'value': c.value,
+        'domain': c.domain,
+        'path': c.path,
+        'expires': c.expires,
+        'secure': c.secure,
+    } for c in jar]
+
+"""
+Adds cookies returned by cookies_to_list() to a requests cookie jar,
+skipping those which have expired.
+"""
+def cookies_from_list(cookies, jar):
+    now = arrow.get().int_timestamp
+    for c in cookies:
+        if c.get('expires') and c['expires'] <= now:
+            continue
+        jar.set(c['name'], c['value'], domain=c['domain'], path=c['path'], expires=c.get('expires'), secure=c.get('secure', False))
+    return jar
+
+# Depth of locked() per cache path held by the current thread, so that the
+# lock is reentrant, e.g. when ControlIQApi logs in with AndroidApi
+_held = threading.local()
+
+"""
+On-disk cache of logged-in Tandem API sessions, so that each run of a cron or
+one-shot sync can reuse the previous run's access tokens and cookies instead
+of logging in from scratch. Sessions are stored as JSON, keyed by API client
+and account email, and are only returned until shortly before they expire.
+
+The cache may be shared by several processes. Writes replace the file
+atomically, so readers never see a partial write, and read-modify-writes are
+made under an exclusive lock on a separate lock file. Callers hold the same
+lock with locked() while checking for a cached session and logging in, so
+that only one process logs in while the others wait and reuse its session.
+"""
+class SessionCache:
+    def __init__(self, path):
+        self.path = path
+        self.lock_path = path + '.lock'
+
+    """
+    Holds the cache's exclusive lock, shared with other processes through
+    a lock file beside the cache. Reentrant within a thread.
+    """
+    @contextlib.contextmanager
+    def locked(self):
+        depths = _held.__dict__.setdefault('depths', {})
+        key = os.path.abspath(self.path)
+        if depths.get(key):
+            depths[key] += 1
+            try:
+                yield
+            finally:
+                depths[key] -= 1
+            return
+
+        with lock_file(self.lock_path):
+            depths[key] = 1
+            try:
+                yield
+            finally:
+                depths[key] = 0
+
+    def _read(self):
+        try:
+            with open(self.path, 'rb') as f:
+                raw = f.read()
+        except FileNotFoundError:
+            return {}
+        except OSError as e:
+            logger.warning("Could not read session cache at %s: %s" % (self.path, e))
+            return {}
+
+        # Credential caches were previously pickled
+        if raw[:1] == b'\x80':
+            logger.info("Replacing credential cache in an old format at %s" % self.path)
+            return {}
+
+        try:
+            data = json.loads(raw)
+        except ValueError as e:
+            logger.warning("Could not read session cache at %s: %s" % (self.path, e))
+            return {}
+        if not isinstance(data, dict) or data.get('version') != SESSION_CACHE_VERSION:
+            logger.warning("Ignoring session cache at %s with unexpected version" % self.path)
+            return {}
+        return data
+
+    def _write(self, data):
+        # Sessions hold access tokens, which write_atomic() keeps private
+        write_atomic(self.path, json.dumps(data))
+
+    @staticmethod
+    def key(client, email):
+        return '%s:%s' % (client, email)
+
+    """
+    Returns the session saved for the given client and email, or None if
+    there is none or it has expired.
+    """
+    def load(self, client, email):
+        session = self._read().get('sessions', {}).get(self.key(client, email))
+        if not session:
+            logger.info("No cached %s session" % client)
+            return None
+
+        if arrow.get().int_timestamp >= session['expiresAt'] - EXPIRY_MARGIN_SECONDS:
+            logger.info("Cached %s session has expired (%s)" % (client, arrow.get(session['expiresAt'])))
+            return None
+
+        logger.info("Loaded cached %s session from %s: saved at %s, expires %s" % (client, self.path, arrow.get(session['savedAt']), arrow.get(session['expiresAt'])))
+        return session['data']
+
+    """
+    Saves a session for the given client and email. expires_at is when the
+    session can no longer be used; if unknown, it is reused for
+    DEFAULT_MAX_AGE_SECONDS.
+    """
+    def save(self, client, email, data, expires_at=None):
+        now = arrow.get().int_timestamp
+        try:
+            with self.locked():
+                cache = self._read()
+                cache['version'] = SESSION_CACHE_VERSION
+                cache.setdefault('sessions', {})[self.key(client, email)] = {
+                    'savedAt': now,
+                    'expiresAt': arrow.get(expires_at).int_timestamp if expires_at else now + DEFAULT_MAX_AGE_SECONDS,
+                    'data': data,
+                }
+                self._write(cache)
+            logger.info("Saved %s session to %s" % (client, self.path))
+        except OSError as e:
+            logger.warning("Could not save session cache at %s: %s" % (self.path, e))
+
+    def clear(self, client, email):
+        try:
+            with self.locked():
+                cache = self._read()
+                if cache.get('sessions', {}).pop(self.key(client, email), None) is not None:
+                    self._write(cache)
+        except OSError as e:
+            logger.warning("Could not clear session cache at %s: %s" % (self.path, e))
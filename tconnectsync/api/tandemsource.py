@@ -7,7 +7,7 @@ import base64
 import hashlib
 import os
 import jwt
-import pickle
+import contextlib
 
 from requests_oidc import make_auth_code_session
 from requests_oidc.plugins import OSCachedPlugin
@@ -18,7 +18,8 @@ from jwt.algorithms import RSAAlgorithm
 
 from ..util import timeago, cap_length
 from .common import parse_ymd_date, base_headers, base_session, ApiException, ApiLoginException
-from ..secret import CACHE_CREDENTIALS, CACHE_CREDENTIALS_PATH
+from .session_cache import SessionCache, cookies_to_list, cookies_from_list
+from ..secret import CACHE_CREDENTIALS, CACHE_CREDENTIALS_PATH, TANDEM_SOURCE_PROXY_URL, PROXY_TOKEN
 from ..eventparser.generic import Events, decode_raw_events, EVENT_LEN
 
 logger = logging.getLogger(__name__)
@@ -33,18 +34,61 @@ class TandemSourceApi:
     TDC_OIDC_CLIENT_ID = '0oa27ho9tpZE9Arjy4h7'
     SOURCE_URL = 'https://source.tandemdiabetes.com/'
 
+    # Disabled when replaying recorded sessions, whose id tokens have long expired
+    JWT_VERIFY_EXPIRATION = True
+    # Disabled when replaying recorded sessions, whose id tokens are stored unsigned
+    JWT_VERIFY_SIGNATURE = True
 
-    def __init__(self, email, password):
+    # Served by a Tandem Source caching proxy with the account it is logged in to
+    PROXY_SESSION_PATH = 'proxy/session'
+    # Header carrying the caching proxy's shared secret (PROXY_TOKEN)
+    PROXY_TOKEN_HEADER = 'X-Proxy-Token'
+
+
+    """
+    proxy_url defaults to TANDEM_SOURCE_PROXY_URL. When set, requests are sent
+    to that caching proxy, which logs in to Tandem Source on our behalf.
+    """
+    def __init__(self, email, password, proxy_url=None):
+        self.proxy_url = TANDEM_SOURCE_PROXY_URL if proxy_url is None else proxy_url
+        if self.proxy_url:
+            self.SOURCE_URL = self.proxy_url.rstrip('/') + '/'
         self.login(email, password)
         self._email = email
         self._password = password
 
+    def credential_cache(self):
+        return SessionCache(CACHE_CREDENTIALS_PATH) if CACHE_CREDENTIALS else None
+
+    """
+    Logs in, reusing cached credentials if they have not expired. The
+    credential cache is locked meanwhile, so when several processes start
+    together only one of them logs in, and the others wait and then use the
+    credentials it cached.
+    """
     def login(self, email, password):
+        if self.proxy_url:
+            return self.proxy_login()
+
         logger.info("Logging in to TandemSourceApi...")
-        if self.try_load_cached_creds(email):
-            logger.info("Successfully used cached credentials")
-            return True
+        cache = self.credential_cache()
+        with cache.locked() if cache else contextlib.nullcontext():
+            if self.try_load_cached_creds(email):
+                logger.info("Successfully used cached credentials")
+                return True
+
+            return self._login(email, password)
+
+    """
+    Logs in again without consulting the credential cache (or, through a
+    caching proxy, fetches its session again).
+    """
+    def relogin(self):
+        if self.proxy_url:
+            return self.proxy_login()
+        return self._login(self._email, self._password)
 
+    def _login(self, email, password):
         with base_session() as s:
             initial = s.get(self.LOGIN_PAGE_URL, headers=base_headers())
 
@@ -188,6 +232,7 @@ class TandemSourceApi:
             algorithms=['RS256'],
             audience=audience,
             issuer=issuer,
+            options={'verify_signature': self.JWT_VERIFY_SIGNATURE, 'verify_exp': self.JWT_VERIFY_EXPIRATION},
         )
 
         logger.info("Decoded JWT: %s" % json.dumps(id_token_claims))
@@ -197,105 +242,58 @@ class TandemSourceApi:
         self.accountId = id_token_claims['accountId']
 
     def try_load_cached_creds(self, email):
-        if not CACHE_CREDENTIALS:
-            return False
-
-        if not os.path.exists(CACHE_CREDENTIALS_PATH):
-            logger.info("No cached credentials exist")
+        cache = self.credential_cache()
+        if not cache:
             return False
 
-        _saved_blob = {}
-        try:
-            with open(CACHE_CREDENTIALS_PATH, 'rb') as f:
-                _saved_blob = pickle.load(f)
-        except Exception as e:
-            logger.warning(f"Could not load cached credentials at {CACHE_CREDENTIALS_PATH}: {e}")
+        data = cache.load('TandemSourceApi', email)
+        if not data:
             return False
 
-        if not _saved_blob:
-            logger.warning(f"Could not load cached credentials at {CACHE_CREDENTIALS_PATH}: empty dict")
-            return False
-
-        if _saved_blob.get('cache_creds_version') != 1.0:
-            logger.warning(f"Unexpected cache_creds_version at {CACHE_CREDENTIALS_PATH}: {_saved_blob['cache_creds_version']}, expected 1.0")
-            return False
-
-        if _saved_blob.get('cache_creds_email') != email:
-            logger.warning(f"Cached credentials are for a different email ({_saved_blob['cache_creds_email']} in cache, but using {email}), skipping")
-            return False
-
-        at_expiry = _saved_blob['accessTokenExpiresAt']
-        if arrow.get().int_timestamp >= arrow.get(at_expiry).int_timestamp:
-            logger.info(f"Cached credentials have expired ({_saved_blob['accessTokenExpiresAt']}), skipping")
-            return False
-
-        self.jwtData = _saved_blob['jwtData']
-        self.pumperId = _saved_blob['pumperId']
-        self.accountId = _saved_blob['accountId']
-        self.idToken = _saved_blob['idToken']
-        self.accessToken = _saved_blob['accessToken']
-        self.accessTokenExpiresAt = _saved_blob['accessTokenExpiresAt']
-        self.loginSession = _saved_blob['loginSession']
-
-        def est_time(t):
-            now = arrow.get()
-            if now < t:
-                sec = (t - now).seconds
-            else:
-                sec = (now - t).seconds
-            min = sec//60
-            hr = min//60
-            min = min % 60
-            sec = sec % 60
-            r = ''
-            if hr:
-                r += f'{hr} hr '
-            if min:
-                r += f'{min} min '
-            if sec:
-                r += f'{sec} sec '
-            if not r:
-                return 'now'
-            elif now < t:
-                return 'in '+r.strip()
-            else:
-                return r.strip()+' ago'
-
-
-        sa = _saved_blob['cache_creds_saved_at']
-        ex = _saved_blob['accessTokenExpiresAt']
-        logger.info(f"Loaded cached credentials from {CACHE_CREDENTIALS_PATH}: saved at {sa} ({est_time(sa)}), access token expiry {ex} ({est_time(ex)})")
-
+        self.jwtData = data['jwtData']
+        self.pumperId = data['pumperId']
+        self.accountId = data['accountId']
+        self.idToken = data['idToken']
+        self.accessToken = data['accessToken']
+        self.accessTokenExpiresAt = arrow.get(data['accessTokenExpiresAt'])
+        self.loginSession = base_session()
+        cookies_from_list(data['cookies'], self.loginSession.cookies)
         return True
 
 
     def cache_creds(self, email):
-        if not CACHE_CREDENTIALS:
+        cache = self.credential_cache()
+        if not cache:
             logger.info("Credentials caching is disabled, skipping save")
             return
 
-        _saved_blob = {
-            'cache_creds_version': 1.0,
-            'cache_creds_saved_at': arrow.get(),
-            'cache_creds_email': email,
+        cache.save('TandemSourceApi', email, {
             'jwtData': self.jwtData,
             'pumperId': self.pumperId,
             'accountId': self.accountId,
             'idToken': self.idToken,
             'accessToken': self.accessToken,
-            'accessTokenExpiresAt': self.accessTokenExpiresAt,
-            'loginSession': self.loginSession
-        }
+            'accessTokenExpiresAt': self.accessTokenExpiresAt.isoformat(),
+            'cookies': cookies_to_list(self.loginSession.cookies),
+        }, expires_at=self.accessTokenExpiresAt)
 
-        if not os.path.exists(CACHE_CREDENTIALS_PATH):
-            mkdir = os.path.dirname(CACHE_CREDENTIALS_PATH)
-            logger.debug(f"Running mkdir on {mkdir}")
-            os.makedirs(mkdir, exist_ok=True)
 
-        with open(CACHE_CREDENTIALS_PATH, 'wb') as f:
-            pickle.dump(_saved_blob, f)
-            logger.info(f"Saved cached credentials to {CACHE_CREDENTIALS_PATH}")
+    """
+    Reads the account the caching proxy is logged in to. Requests to the
+    proxy need no Tandem credentials, only the proxy's PROXY_TOKEN if it has one.
+    """
+    def proxy_login(self):
+        logger.info("Using Tandem Source proxy at %s" % self.SOURCE_URL)
+        r = base_session().get(self.SOURCE_URL + self.PROXY_SESSION_PATH, headers=self.proxy_headers())
+        if r.status_code != 200:
+            raise ApiLoginException(r.status_code, 'Error connecting to Tandem Source proxy at %s: %s' % (self.SOURCE_URL, r.text))
 
+        j = r.json()
+        self.pumperId = j['pumperId']
+        self.accountId = j['accountId']
+        self.accessToken = None
+        self.accessTokenExpiresAt = None
+        return True
 
     def needs_relogin(self):
         if not self.accessTokenExpiresAt:
@@ -304,7 +302,14 @@ class TandemSourceApi:
         diff = (arrow.get(self.accessTokenExpiresAt) - arrow.get())
         return (diff.seconds <= 5 * 60)
 
+    def proxy_headers(self):
+        if PROXY_TOKEN:
+            return {self.PROXY_TOKEN_HEADER: PROXY_TOKEN, **base_headers()}
+        return base_headers()
+
     def api_headers(self):
+        if self.proxy_url:
+            return self.proxy_headers()
         if not self.accessToken:
             raise Exception('No access token provided')
         return {
@@ -53,6 +53,7 @@ class WebUIScraper:
             if e.status_code == 401:
                 logger.info("Performing automatic re-login to ControlIQApi after HTTP 401 for ControlIQApi")
                 self.controliq.accessTokenExpiresAt = time.time()
+                self.controliq.clear_cached_session()
                 self.controliq.login(self.controliq._email, self.controliq._password)
 
                 return self.get(endpoint, tries=tries+1)
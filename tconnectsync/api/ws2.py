@@ -4,6 +4,8 @@ import csv
 import logging
 import time
 import json
+import threading
+import concurrent.futures
 
 from .common import base_session, parse_date, parsed_date_to_arrow, base_headers, days_between, split_days_range, ApiException
 
@@ -20,6 +22,7 @@ class WS2Api:
     def __init__(self, userGuid):
         self.userGuid = userGuid
         self.session = base_session()
+        self._local = threading.local()
 
     def get(self, endpoint, **kwargs):
         r = self.session.get(self.BASE_URL + endpoint, headers=base_headers(), **kwargs)
@@ -40,28 +43,89 @@ class WS2Api:
 
         return json.loads(t)
 
-    def _split_empty_sections(self, text):
-        sections = [[]]
-        sectionIndex = 0
-        for line in text.splitlines():
-            if len(line.strip()) > 0:
-                sections[sectionIndex].append(line)
-            else:
-                sections.append([])
-                sectionIndex += 1
+    """
+    Like get(), but streams the response body and returns an iterator over
+    its lines, so that large CSV exports are parsed while they are downloaded.
+    Each thread uses its own session, since requests are made concurrently.
+    """
+    def get_lines(self, endpoint, **kwargs):
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = base_session()
 
-        return sections + [None] * (4 - len(sections))
+        r = session.get(self.BASE_URL + endpoint, headers=base_headers(), stream=True, **kwargs)
+        if r.status_code != 200:
+            raise ApiException(r.status_code, "WS2 API HTTP %s response: %s" % (str(r.status_code), r.text))
+        if r.encoding is None:
+            r.encoding = 'utf-8'
+        return r.iter_lines(decode_unicode=True)
+
+    # Prefixes of the first data row identifying each therapy timeline CSV section
+    THERAPY_TIMELINE_SECTIONS = [
+        ("t:slim X2 Insulin Pump", "readingData"),
+        ("IOB", "iobData"),
+        ("Basal", "basalData"),
+        ("Bolus", "bolusData"),
+    ]
 
-    def _csv_to_dict(self, rawdata):
-        data = []
-        if not rawdata or len(rawdata) == 0:
-            return data
-        headers = rawdata[0].split(",")
-        for row in csv.reader(rawdata[1:]):
-            data.append({headers[i]: row[i] for i in range(len(row)) if i < len(headers)})
+    """
+    Parses the therapy timeline CSV export in a single pass over its lines.
+    The export contains sections separated by blank lines, each with a header
+    row followed by data rows, which are returned as dicts keyed by header.
+    A section's type is identified from its first data row, and, as before,
+    sections with fewer than two data rows are ignored.
+    """
+    def _parse_therapy_timeline(self, lines):
+        data = {key: [] for _, key in self.THERAPY_TIMELINE_SECTIONS}
+
+        headers = None
+        rows = None
+        pending = []
+        for row in csv.reader(lines):
+            if not any(cell.strip() for cell in row):
+                headers = None
+                rows = None
+                pending = []
+                continue
+
+            if headers is None:
+                headers = row
+            elif rows is not None:
+                rows.append(dict(zip(headers, row)))
+            else:
+                pending.append(row)
+                if len(pending) < 2:
+                    continue
+                firstrow = ','.join(pending[0]).strip()
+                rows = []
+                for prefix, key in self.THERAPY_TIMELINE_SECTIONS:
+                    if firstrow.startswith(prefix):
+                        rows = data[key] = []
+                        break
+                else:
+                    logger.debug("Ignoring therapy timeline section with unknown type: %s", headers)
+                rows.extend(dict(zip(headers, r)) for r in pending)
 
         return data
 
+    def _therapy_timeline_chunk(self, start, end):
+        startDate = parse_date(start)
+        endDate = parse_date(end)
+        endpoint = 'therapytimeline2csv/%s/%s/%s?format=csv' % (self.userGuid, startDate, endDate)
+
+        tries = 0
+        while True:
+            try:
+                return self._parse_therapy_timeline(self.get_lines(endpoint, timeout=10))
+            except ApiException as e:
+                # This seems to occur as some kind of soft rate-limit.
+                logger.warning("Received ApiException in therapy_timeline_csv(%s, %s): (retry count %d) %s" % (startDate, endDate, tries, e))
+                if e.status_code != 500 or tries >= self.MAX_RETRIES:
+                    raise e
+                sleep_seconds = self.SLEEP_SECONDS_INCREMENT * 2**tries
+                logger.error("Retrying in %d seconds after HTTP 500 in therapy_timeline_csv(%s, %s) (retry count %d): %s" % (sleep_seconds, startDate, endDate, tries, e))
+                time.sleep(sleep_seconds)
+                tries += 1
 
     """
     Returns information on therapy, displayed in the therapy timeline on the
@@ -72,77 +136,32 @@ class WS2Api:
     The ControlIQ API endpoints must be used for basal data instead.
     However, all other fields are still accessed via this endpoint.
 
-    This has its own built-in retry logic because Tandem's frontend serving
+    Ranges longer than MAX_THERAPY_TIMELINE_DAYS are split into chunks, up to
+    MAX_CONCURRENT_CHUNKS of which are fetched at once. Each chunk has its own
+    retry logic, with exponential backoff, because Tandem's frontend serving
     the API returns 500s when its backend times out.
     """
     MAX_THERAPY_TIMELINE_DAYS = 2
-    def therapy_timeline_csv(self, start=None, end=None, tries=0):
-        startDate = parse_date(start)
-        endDate = parse_date(end)
-
-        pStart = parsed_date_to_arrow(startDate)
-        pEnd = parsed_date_to_arrow(endDate)
-        if days_between(pStart, pEnd) > self.MAX_THERAPY_TIMELINE_DAYS:
-            ranges = split_days_range(pStart, pEnd, self.MAX_THERAPY_TIMELINE_DAYS)
-            logger.debug("Splitting call to therapy_timeline_csv(%s, %s) into: %s", start, end, ranges)
-            outputs = []
-            for rng in ranges:
-                rStart, rEnd = rng
-                logger.debug("split therapy_timeline_csv(%s, %s)", rStart, rEnd)
-                output = self.therapy_timeline_csv(rStart, rEnd, tries=tries)
-                logger.debug("split therapy_timeline_csv(%s, %s) = %s", rStart, rEnd, ["%s: %s items" % (key, len(val)) for key, val in output.items()])
-                outputs.append(output)
-            full = {}
-            for o in outputs:
-                for key, val in o.items():
-                    if key not in full:
-                        full[key] = val
-                    elif val is not None:
-                        full[key] += val
-            
-            logger.debug("therapy_timeline_csv merge: %s", ["%s: %s items" % (key, len(val)) for key, val in full.items()])
-            return full
-
-        try:
-            req_text = self.get('therapytimeline2csv/%s/%s/%s?format=csv' % (self.userGuid, startDate, endDate), timeout=10)
-        except ApiException as e:
-            # This seems to occur as some kind of soft rate-limit.
-            logger.warning("Received ApiException in therapy_timeline_csv: (retry count %d) %s" % (tries, e))
-            if e.status_code == 500:
-                sleep_seconds = (tries+1) * self.SLEEP_SECONDS_INCREMENT
-                logger.error("Retrying in %d seconds after HTTP 500 in therapy_timeline_csv (retry count %d): %s" % (sleep_seconds, tries, e))
-                time.sleep(sleep_seconds)
-                if tries < self.MAX_RETRIES:
-                    return self.therapy_timeline_csv(start, end, tries+1)
-            raise e
-
-        logger.debug('req_text: %s', req_text)
-        sections = self._split_empty_sections(req_text)
-
-        readingData = None
-        iobData = None
-        basalData = None
-        bolusData = None
-
-        for s in sections:
-            if s and len(s) > 2:
-                firstrow = s[1].replace('"', '').strip()
-                if firstrow.startswith("t:slim X2 Insulin Pump"):
-                    readingData = s
-                elif firstrow.startswith("IOB"):
-                    iobData = s
-                elif firstrow.startswith("Basal"):
-                    basalData = s
-                elif firstrow.startswith("Bolus"):
-                    bolusData = s
-
-
-        return {
-            "readingData": self._csv_to_dict(readingData),
-            "iobData": self._csv_to_dict(iobData),
-            "basalData": self._csv_to_dict(basalData),
-            "bolusData": self._csv_to_dict(bolusData)
-        }
+    MAX_CONCURRENT_CHUNKS = 3
+    def therapy_timeline_csv(self, start=None, end=None):
+        pStart = parsed_date_to_arrow(parse_date(start))
+        pEnd = parsed_date_to_arrow(parse_date(end))
+        if days_between(pStart, pEnd) <= self.MAX_THERAPY_TIMELINE_DAYS:
+            return self._therapy_timeline_chunk(pStart, pEnd)
+
+        ranges = split_days_range(pStart, pEnd, self.MAX_THERAPY_TIMELINE_DAYS)
+        logger.debug("Splitting call to therapy_timeline_csv(%s, %s) into: %s", start, end, ranges)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.MAX_CONCURRENT_CHUNKS, thread_name_prefix='WS2Api-therapy-timeline') as executor:
+            outputs = list(executor.map(lambda rng: self._therapy_timeline_chunk(*rng), ranges))
+
+        full = {}
+        for (rStart, rEnd), o in zip(ranges, outputs):
+            logger.debug("split therapy_timeline_csv(%s, %s) = %s", rStart, rEnd, ["%s: %s items" % (key, len(val)) for key, val in o.items()])
+            for key, val in o.items():
+                full.setdefault(key, []).extend(val)
+
+        logger.debug("therapy_timeline_csv merge: %s", ["%s: %s items" % (key, len(val)) for key, val in full.items()])
+        return full
     
     """
     Returns information on basal suspension. The filterbasal option only returns site/cartridge changes.
@@ -1,19 +1,28 @@
 import sys
+import ssl
 import time
 import arrow
+import socket
 import logging
 import traceback
-import pkg_resources
+import collections
+import urllib.parse
+try:
+    import importlib.metadata as importlib_metadata
+except ImportError:
+    # Python 3.7
+    import importlib_metadata
 from datetime import datetime
 from pprint import pformat as pformat_base
 
 from .nightscout import NightscoutApi
+from .eventparser.generic import decode_raw_events, EVENT_LEN
 from .parser.nightscout import BASAL_EVENTTYPE, BOLUS_EVENTTYPE
 from .parser.tconnect import TConnectEntry
 from .sync.basal import process_ciq_basal_events
 
 try:
-    __version__ = pkg_resources.require("tconnectsync")[0].version
+    __version__ = importlib_metadata.version("tconnectsync")
 except Exception:
     __version__ = "UNKNOWN"
 
@@ -227,6 +236,175 @@ def check_login(tconnect, time_start, time_end, verbose=False, sanitize=True):
     print("Please verify and remove any sensitive data, such as your Nightscout URL/secret and pump serial number,")
     print("as necessary.")
 
+"""
+Timings in seconds for one request to an endpoint: DNS resolution, TCP
+connect, TLS handshake (None for plain HTTP) and time to first byte of the
+response once the request was sent.
+"""
+ProbeTiming = collections.namedtuple('ProbeTiming', ['dns', 'connect', 'tls', 'ttfb', 'status'])
+
+PROBE_PHASES = ['dns', 'connect', 'tls', 'ttfb']
+
+"""
+Makes a single GET request to url over a new connection, without going through
+requests, and times each phase of it.
+"""
+def probe_endpoint(url, timeout=10, verify=True, clock=time.perf_counter):
+    parts = urllib.parse.urlsplit(url)
+    https = parts.scheme == 'https'
+    port = parts.port or (443 if https else 80)
+    path = (parts.path or '/') + ('?' + parts.query if parts.query else '')
+
+    start = clock()
+    family, socktype, proto, _, address = socket.getaddrinfo(parts.hostname, port, type=socket.SOCK_STREAM)[0]
+    resolved = clock()
+
+    sock = socket.socket(family, socktype, proto)
+    try:
+        sock.settimeout(timeout)
+        sock.connect(address)
+        connected = clock()
+
+        handshaken = None
+        if https:
+            context = ssl.create_default_context()
+            if not verify:
+                context.check_hostname = False
+                context.verify_mode = ssl.CERT_NONE
+            sock = context.wrap_socket(sock, server_hostname=parts.hostname)
+            handshaken = clock()
+
+        sent = clock()
+        sock.sendall(('GET %s HTTP/1.1\r\nHost: %s\r\nUser-Agent: tconnectsync/%s\r\nAccept: */*\r\nConnection: close\r\n\r\n' % (path, parts.netloc, __version__)).encode())
+        first = sock.recv(1)
+        received = clock()
+
+        status_line = first + sock.recv(64)
+        try:
+            status = int(status_line.split(b' ')[1])
+        except (IndexError, ValueError):
+            status = None
+    finally:
+        sock.close()
+
+    return ProbeTiming(
+        dns=resolved - start,
+        connect=connected - resolved,
+        tls=handshaken - connected if handshaken else None,
+        ttfb=received - sent,
+        status=status)
+
+"""
+Returns the p-th percentile of values, interpolating between the closest ranks.
+"""
+def percentile(values, p):
+    values = sorted(values)
+    if not values:
+        return None
+    k = (len(values) - 1) * p / 100
+    lower = int(k)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (k - lower)
+
+def format_ms(seconds):
+    return 'n/a' if seconds is None else '%.0fms' % (seconds * 1000)
+
+# Window sizes, in days, for the pump event throughput test
+LATENCY_SMALL_WINDOW_DAYS = 1
+LATENCY_LARGE_WINDOW_DAYS = 7
+
+"""
+Diagnoses slow syncs. Times each phase of connecting to the Tandem login
+servers, Tandem Source and Nightscout over samples fresh connections, and
+reports the p50/p95 of each. Then times getting a Tandem Source session (which
+may reuse cached credentials) and a fresh login, the pump metadata request, downloads a small and a large window of pump events ending
+at time_end to measure throughput, and times samples uploads of a placeholder
+Nightscout treatment, which is deleted after each one.
+
+Returns a dict of the measurements, which are also printed.
+"""
+def check_latency(tconnect, nightscout, secret, time_end, samples=5, log=print):
+    from .api.tandemsource import TandemSourceApi
+    from .sync.tandemsource.choose_device import ChooseDevice
+
+    results = {'endpoints': {}}
+    endpoints = [
+        ('Tandem SSO', TandemSourceApi.LOGIN_PAGE_URL, True),
+        ('Tandem tdcservices', TandemSourceApi.TDC_OIDC_JWKS_URL, True),
+        ('Tandem Source', TandemSourceApi.SOURCE_URL, True),
+        ('Nightscout', nightscout.url, nightscout.verify is not False),
+    ]
+
+    log("Probing endpoints with %d connections each..." % samples)
+    for name, url, verify in endpoints:
+        timings = []
+        for _ in range(samples):
+            try:
+                timings.append(probe_endpoint(url, verify=verify))
+            except (OSError, ssl.SSLError) as e:
+                log("%s (%s): error: %s" % (name, url, e))
+                break
+        if not timings:
+            results['endpoints'][name] = None
+            continue
+
+        summary = {}
+        for phase in PROBE_PHASES:
+            values = [getattr(t, phase) for t in timings if getattr(t, phase) is not None]
+            summary[phase] = (percentile(values, 50), percentile(values, 95)) if values else None
+        results['endpoints'][name] = summary
+        log("%s (%s), HTTP %s:" % (name, url, timings[-1].status))
+        for phase in PROBE_PHASES:
+            if summary[phase]:
+                log("  %-8s p50 %8s  p95 %8s" % (phase, format_ms(summary[phase][0]), format_ms(summary[phase][1])))
+
+    log("-----")
+
+    log("Logging in to Tandem Source...")
+    start = time.perf_counter()
+    tandemsource = tconnect.tandemsource
+    results['session'] = time.perf_counter() - start
+    log("Tandem Source session: %s (reuses cached credentials, if any)" % format_ms(results['session']))
+
+    start = time.perf_counter()
+    tandemsource.relogin()
+    results['login'] = time.perf_counter() - start
+    log("Tandem Source fresh login: %s" % format_ms(results['login']))
+
+    start = time.perf_counter()
+    tconnect_device_id = ChooseDevice(secret, tconnect).choose()['tconnectDeviceId']
+    results['metadata'] = time.perf_counter() - start
+    log("Tandem Source pump_event_metadata: %s" % format_ms(results['metadata']))
+
+    results['pump_events'] = {}
+    for days in (LATENCY_SMALL_WINDOW_DAYS, LATENCY_LARGE_WINDOW_DAYS):
+        window_start = arrow.get(time_end).shift(days=-(days - 1))
+        start = time.perf_counter()
+        raw = tandemsource.pump_events_raw(tconnect_device_id, window_start, time_end)
+        elapsed = time.perf_counter() - start
+
+        size = len(decode_raw_events(raw)) if raw else 0
+        events = size // EVENT_LEN
+        results['pump_events'][days] = {'seconds': elapsed, 'bytes': size, 'events': events}
+        log("pump_events_raw for %d day(s): %s, %d events, %.1f KB (%.0f events/s, %.1f KB/s)" % (
+            days, format_ms(elapsed), events, size / 1024, events / elapsed if elapsed else 0, size / 1024 / elapsed if elapsed else 0))
+
+    log("-----")
+
+    log("Timing %d Nightscout treatment uploads (each deleted afterwards)..." % samples)
+    writes = []
+    try:
+        for _ in range(samples):
+            writes.append(nightscout.check_write())
+    except Exception as e:
+        log("Error occurred uploading to Nightscout:")
+        log(''.join(traceback.TracebackException.from_exception(e).format()))
+    results['nightscout_write'] = (percentile(writes, 50), percentile(writes, 95)) if writes else None
+    if writes:
+        log("Nightscout upload: p50 %s  p95 %s" % (format_ms(results['nightscout_write'][0]), format_ms(results['nightscout_write'][1])))
+
+    return results
+
 def run_sanitize(s, sanitizedData):
     ret = str(s)
     for k, v in sanitizedData.items():
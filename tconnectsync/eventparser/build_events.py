@@ -1,9 +1,12 @@
+import struct
+
 header = '''# THIS FILE IS AUTOGENERATED. DO NOT EDIT.
 import struct
 import logging
 from dataclasses import dataclass
 from enum import Enum, IntFlag
 from .raw_event import RawEvent, BaseEvent
+from .utils import bitmask_names
 
 logger = logging.getLogger(__name__)
 
@@ -33,9 +36,13 @@ TYPE_TO_PYOBJ = {
 }
 
 HEADER_SIZE = 10
+EVENT_LEN = 26
 def unpack_command_for(field_def):
     return f'struct.unpack_from({field_def["type"].upper()}, raw[:EVENT_LEN], {HEADER_SIZE + field_def["offset"]})'
 
+def pack_command_for(field_def, value):
+    return f'struct.pack_into({field_def["type"].upper()}, raw, {HEADER_SIZE + field_def["offset"]}, {value})'
+
 TEMPLATE = '''
 @dataclass
 class {name}(BaseEvent):
@@ -43,6 +50,12 @@ class {name}(BaseEvent):
     ID = {id}
     NAME = "{raw_name}"
 
+    # Field names, types and struct format of the whole event, in offset
+    # order, for decoding many events at once (see generic.decode_columns)
+    COLUMNS = ({columns})
+    COLUMN_TYPES = ({column_types})
+    STRUCT = struct.Struct("{struct_format}")
+
     raw: RawEvent
 {fields}
 
@@ -56,6 +69,12 @@ class {name}(BaseEvent):
 {build_p2}
         )
 
+    def encode(self):
+        raw = bytearray(self.raw.encode())
+{encode}
+
+        return bytes(raw)
+
     @property
     def eventTimestamp(self):
         return self.raw.timestamp
@@ -130,6 +149,35 @@ def build_decode(event_def):
 
     return '\n'.join([f'{" "*8}{f}' for f in p1s]), '\n'.join([f'{" "*12}{f}' for f in p2s])
 
+def build_encode(event_def):
+    ret = []
+    for name, field in event_def["data"].items():
+        suffix = 'Raw' if "transform" in field and name[-3:] != 'Raw' else ''
+        ret.append(pack_command_for(field, f'self.{fieldNameFormat(name)}{suffix}'))
+
+    return '\n'.join([f'{" "*8}{f}' for f in ret])
+
+TYPE_TO_FORMAT_CHAR = {k: v[1:] for k, v in TYPE_TO_STRUCT.items()}
+TYPE_TO_SIZE = {k: struct.calcsize(v) for k, v in TYPE_TO_STRUCT.items()}
+
+def build_columns(event_def):
+    names = []
+    types = []
+    # Header: source and id, timestampRaw, seqNum
+    fmt = '>HII'
+    pos = HEADER_SIZE
+    for name, field in sorted(event_def["data"].items(), key=lambda x: x[1]["offset"]):
+        suffix = 'Raw' if "transform" in field and name[-3:] != 'Raw' else ''
+        names.append(f'"{fieldNameFormat(name)}{suffix}"')
+        types.append(f'"{field["type"]}"')
+        offset = HEADER_SIZE + field["offset"]
+        fmt += 'x' * (offset - pos) + TYPE_TO_FORMAT_CHAR[field["type"]]
+        pos = offset + TYPE_TO_SIZE[field["type"]]
+    fmt += 'x' * (EVENT_LEN - pos)
+
+    trailing = ',' if len(names) == 1 else ''
+    return ', '.join(names) + trailing, ', '.join(types) + trailing, fmt
+
 def build_transform_funcs(event_def):
     try:
         from transforms import TRANSFORMS
@@ -154,7 +202,11 @@ def build_event(event_id, event_def):
         fields_dict = build_fields_dict(event_def),
         build_p1 = build_decode(event_def)[0],
         build_p2 = build_decode(event_def)[1],
+        encode = build_encode(event_def),
         transform_funcs = build_transform_funcs(event_def),
+        columns = build_columns(event_def)[0],
+        column_types = build_columns(event_def)[1],
+        struct_format = build_columns(event_def)[2],
         id = event_id,
         raw_name = event_def["name"]
     )
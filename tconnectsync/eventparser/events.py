@@ -4,6 +4,7 @@ import logging
 from dataclasses import dataclass
 from enum import Enum, IntFlag
 from .raw_event import RawEvent, BaseEvent
+from .utils import bitmask_names
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +23,12 @@ class LidBasalRateChange(BaseEvent):
     ID = 3
     NAME = "LID_BASAL_RATE_CHANGE"
 
+    # Field names, types and struct format of the whole event, in offset
+    # order, for decoding many events at once (see generic.decode_columns)
+    COLUMNS = ("commandedbasalrate", "basebasalrate", "maxbasalrate", "changetypeRaw", "IDP")
+    COLUMN_TYPES = ("float32", "float32", "float32", "uint8", "uint16")
+    STRUCT = struct.Struct(">HIIfffxBH")
+
     raw: RawEvent
     commandedbasalrate: float # units/hour
     basebasalrate: float # units/hour
@@ -50,6 +57,18 @@ class LidBasalRateChange(BaseEvent):
         PumpShutDown = 2**6
         BasalLimit = 2**7
 
+    ChangetypeNames = {
+        0: (),
+        1: ("TimedSegment",),
+        2: ("NewProfile",),
+        4: ("TempRateStart",),
+        8: ("TempRateEnd",),
+        16: ("PumpSuspended",),
+        32: ("PumpResumed",),
+        64: ("PumpShutDown",),
+        128: ("BasalLimit",),
+    }
+
     @property
     def changetype(self):
         try:
@@ -59,6 +78,13 @@ class LidBasalRateChange(BaseEvent):
             logger.error(e)
             return None
 
+    @property
+    def changetypeNames(self):
+        names = self.ChangetypeNames.get(self.changetypeRaw)
+        if names is None:
+            names = bitmask_names(self.ChangetypeBitmask, self.changetypeRaw)
+        return names
+
     @staticmethod
     def build(raw):
         commandedbasalrate, = struct.unpack_from(FLOAT32, raw[:EVENT_LEN], 10)
@@ -76,6 +102,16 @@ class LidBasalRateChange(BaseEvent):
             changetypeRaw = changetype,
         )
 
+    def encode(self):
+        raw = bytearray(self.raw.encode())
+        struct.pack_into(FLOAT32, raw, 10, self.commandedbasalrate)
+        struct.pack_into(FLOAT32, raw, 14, self.basebasalrate)
+        struct.pack_into(FLOAT32, raw, 18, self.maxbasalrate)
+        struct.pack_into(UINT16, raw, 24, self.IDP)
+        struct.pack_into(UINT8, raw, 23, self.changetypeRaw)
+
+        return bytes(raw)
+
     @property
     def eventTimestamp(self):
         return self.raw.timestamp
@@ -108,6 +144,12 @@ class LidAlertActivated(BaseEvent):
     ID = 4
     NAME = "LID_ALERT_ACTIVATED"
 
+    # Field names, types and struct format of the whole event, in offset
+    # order, for decoding many events at once (see generic.decode_columns)
+    COLUMNS = ("alertidRaw", "faultlocatordata", "param1", "param2")
+    COLUMN_TYPES = ("uint32", "uint32", "uint32", "float32")
+    STRUCT = struct.Struct(">HIIIIIf")
+
     raw: RawEvent
     alertidRaw: int
     faultlocatordata: int
@@ -245,14 +287,78 @@ class LidAlertActivated(BaseEvent):
         DefaultAlert62 = 62
         DefaultAlert63 = 63
 
+    AlertidMembers = {
+        0: AlertidEnum.LowInsulinAlert,
+        1: AlertidEnum.UsbConnectionAlert,
+        2: AlertidEnum.LowPowerAlert,
+        3: AlertidEnum.LowPowerAlert2,
+        4: AlertidEnum.DataErrorAlert,
+        5: AlertidEnum.AutoOffAlert,
+        6: AlertidEnum.MaxBasalRateAlert,
+        7: AlertidEnum.PowerSourceAlert,
+        8: AlertidEnum.MinBasalAlert,
+        9: AlertidEnum.ConnectionErrorAlert,
+        10: AlertidEnum.ConnectionErrorAlert2,
+        11: AlertidEnum.IncompleteBolusAlert,
+        12: AlertidEnum.IncompleteTempRateAlert,
+        13: AlertidEnum.IncompleteCartridgeChangeAlert,
+        14: AlertidEnum.IncompleteFillTubingAlert,
+        15: AlertidEnum.IncompleteFillCannulaAlert,
+        16: AlertidEnum.IncompleteSettingAlert,
+        17: AlertidEnum.LowInsulinAlert2,
+        18: AlertidEnum.MaxBasalAlert,
+        19: AlertidEnum.LowTransmitterAlert,
+        20: AlertidEnum.TransmitterAlert,
+        21: AlertidEnum.DefaultAlert21,
+        22: AlertidEnum.SensorExpiringAlert,
+        23: AlertidEnum.PumpRebootingAlert,
+        24: AlertidEnum.DeviceConnectionError,
+        25: AlertidEnum.CgmGraphRemoved,
+        26: AlertidEnum.MinBasalAlert2,
+        27: AlertidEnum.IncompleteCalibration,
+        28: AlertidEnum.CalibrationTimeout,
+        29: AlertidEnum.InvalidTransmitterId,
+        30: AlertidEnum.DefaultAlert30,
+        32: AlertidEnum.DefaultAlert32,
+        33: AlertidEnum.ButtonAlert,
+        34: AlertidEnum.QuickBolusAlert,
+        35: AlertidEnum.BasalIqAlert,
+        36: AlertidEnum.DefaultAlert36,
+        37: AlertidEnum.DefaultAlert37,
+        38: AlertidEnum.DefaultAlert38,
+        39: AlertidEnum.TransmitterEndOfLife,
+        40: AlertidEnum.CgmError,
+        41: AlertidEnum.CgmError2,
+        42: AlertidEnum.CgmError3,
+        43: AlertidEnum.DefaultAlert43,
+        44: AlertidEnum.TransmitterExpiringAlert,
+        45: AlertidEnum.TransmitterExpiringAlert2,
+        46: AlertidEnum.TransmitterExpiringAlert3,
+        47: AlertidEnum.DefaultAlert47,
+        48: AlertidEnum.CgmUnavailable,
+        49: AlertidEnum.DefaultAlert49,
+        50: AlertidEnum.DefaultAlert50,
+        51: AlertidEnum.DefaultAlert51,
+        52: AlertidEnum.DefaultAlert52,
+        53: AlertidEnum.DefaultAlert53,
+        54: AlertidEnum.DevicePaired,
+        55: AlertidEnum.DefaultAlert55,
+        56: AlertidEnum.DefaultAlert56,
+        57: AlertidEnum.DefaultAlert57,
+        58: AlertidEnum.DefaultAlert58,
+        59: AlertidEnum.DefaultAlert59,
+        60: AlertidEnum.DefaultAlert60,
+        61: AlertidEnum.DefaultAlert61,
+        62: AlertidEnum.DefaultAlert62,
+        63: AlertidEnum.DefaultAlert63,
+    }
+
     @property
     def alertid(self):
-        try:
-            return self.AlertidEnum(self.alertidRaw)
-        except ValueError as e:
-            logger.error("Invalid alertidRaw in Alertid for "+str(self))
-            logger.error(e)
-            return None
+        member = self.AlertidMembers.get(self.alertidRaw)
+        if member is None:
+            logger.error("Invalid alertidRaw in Alertid for "+str(self)+": "+str(self.alertidRaw))
+        return member
 
     @staticmethod
     def build(raw):
@@ -269,6 +375,15 @@ class LidAlertActivated(BaseEvent):
             param2 = param2,
         )
 
+    def encode(self):
+        raw = bytearray(self.raw.encode())
+        struct.pack_into(UINT32, raw, 10, self.alertidRaw)
+        struct.pack_into(UINT32, raw, 14, self.faultlocatordata)
+        struct.pack_into(UINT32, raw, 18, self.param1)
+        struct.pack_into(FLOAT32, raw, 22, self.param2)
+
+        return bytes(raw)
+
     @property
     def eventTimestamp(self):
         return self.raw.timestamp
@@ -300,6 +415,12 @@ class LidAlarmActivated(BaseEvent):
     ID = 5
     NAME = "LID_ALARM_ACTIVATED"
 
+    # Field names, types and struct format of the whole event, in offset
+    # order, for decoding many events at once (see generic.decode_columns)
+    COLUMNS = ("alarmidRaw", "faultlocatordata", "param1", "param2")
+    COLUMN_TYPES = ("uint32", "uint32", "uint32", "float32")
+    STRUCT = struct.Struct(">HIIIIIf")
+
     raw: RawEvent
     alarmidRaw: int
     faultlocatordata: int
@@ -439,14 +560,79 @@ class LidAlarmActivated(BaseEvent):
         DefaultAlarm62 = 62
         DefaultAlarm63 = 63
 
+    AlarmidMembers = {
+        0: AlarmidEnum.CartridgeAlarm,
+        1: AlarmidEnum.CartridgeAlarm2,
+        2: AlarmidEnum.OcclusionAlarm,
+        3: AlarmidEnum.PumpResetAlarm,
+        4: AlarmidEnum.DefaultAlarm4,
+        5: AlarmidEnum.CartridgeAlarm3,
+        6: AlarmidEnum.CartridgeAlarm4,
+        7: AlarmidEnum.AutoOffAlarm,
+        8: AlarmidEnum.EmptyCartridgeAlarm,
+        9: AlarmidEnum.CartridgeAlarm5,
+        10: AlarmidEnum.TemperatureAlarm,
+        11: AlarmidEnum.TemperatureAlarm2,
+        12: AlarmidEnum.BatteryShutdownAlarm,
+        13: AlarmidEnum.DefaultAlarm13,
+        14: AlarmidEnum.InvalidDateAlarm,
+        15: AlarmidEnum.TemperatureAlarm3,
+        16: AlarmidEnum.CartridgeAlarm6,
+        17: AlarmidEnum.DefaultAlarm17,
+        18: AlarmidEnum.ResumePumpAlarm,
+        19: AlarmidEnum.DefaultAlarm19,
+        20: AlarmidEnum.CartridgeAlarm7,
+        21: AlarmidEnum.AltitudeAlarm,
+        22: AlarmidEnum.StuckButtonAlarm,
+        23: AlarmidEnum.ResumePumpAlarm2,
+        24: AlarmidEnum.AtmosphericPressureOutOfRangeAlarm,
+        25: AlarmidEnum.CartridgeRemovedAlarm,
+        26: AlarmidEnum.OcclusionAlarm2,
+        27: AlarmidEnum.DefaultAlarm27,
+        28: AlarmidEnum.DefaultAlarm28,
+        29: AlarmidEnum.CartridgeAlarm10,
+        30: AlarmidEnum.CartridgeAlarm11,
+        31: AlarmidEnum.CartridgeAlarm12,
+        32: AlarmidEnum.DefaultAlarm32,
+        33: AlarmidEnum.DefaultAlarm33,
+        34: AlarmidEnum.DefaultAlarm34,
+        35: AlarmidEnum.DefaultAlarm35,
+        36: AlarmidEnum.DefaultAlarm36,
+        37: AlarmidEnum.DefaultAlarm37,
+        38: AlarmidEnum.DefaultAlarm38,
+        39: AlarmidEnum.DefaultAlarm39,
+        40: AlarmidEnum.DefaultAlarm40,
+        41: AlarmidEnum.DefaultAlarm41,
+        42: AlarmidEnum.DefaultAlarm42,
+        43: AlarmidEnum.DefaultAlarm43,
+        44: AlarmidEnum.DefaultAlarm44,
+        45: AlarmidEnum.DefaultAlarm45,
+        46: AlarmidEnum.DefaultAlarm46,
+        47: AlarmidEnum.DefaultAlarm47,
+        48: AlarmidEnum.DefaultAlarm48,
+        49: AlarmidEnum.DefaultAlarm49,
+        50: AlarmidEnum.DefaultAlarm50,
+        51: AlarmidEnum.DefaultAlarm51,
+        52: AlarmidEnum.DefaultAlarm52,
+        53: AlarmidEnum.DefaultAlarm53,
+        54: AlarmidEnum.DefaultAlarm54,
+        55: AlarmidEnum.DefaultAlarm55,
+        56: AlarmidEnum.DefaultAlarm56,
+        57: AlarmidEnum.DefaultAlarm57,
+        58: AlarmidEnum.DefaultAlarm58,
+        59: AlarmidEnum.DefaultAlarm59,
+        60: AlarmidEnum.DefaultAlarm60,
+        61: AlarmidEnum.DefaultAlarm61,
+        62: AlarmidEnum.DefaultAlarm62,
+        63: AlarmidEnum.DefaultAlarm63,
+    }
+
     @property
     def alarmid(self):
-        try:
-            return self.AlarmidEnum(self.alarmidRaw)
-        except ValueError as e:
-            logger.error("Invalid alarmidRaw in Alarmid for "+str(self))
-            logger.error(e)
-            return None
+        member = self.AlarmidMembers.get(self.alarmidRaw)
+        if member is None:
+            logger.error("Invalid alarmidRaw in Alarmid for "+str(self)+": "+str(self.alarmidRaw))
+        return member
 
     @staticmethod
     def build(raw):
@@ -463,6 +649,15 @@ class LidAlarmActivated(BaseEvent):
             param2 = param2,
         )
 
+    def encode(self):
+        raw = bytearray(self.raw.encode())
+        struct.pack_into(UINT32, raw, 10, self.alarmidRaw)
+        struct.pack_into(UINT32, raw, 14, self.faultlocatordata)
+        struct.pack_into(UINT32, raw, 18, self.param1)
+        struct.pack_into(FLOAT32, raw, 22, self.param2)
+
+        return bytes(raw)
+
     @property
     def eventTimestamp(self):
         return self.raw.timestamp
@@ -494,6 +689,12 @@ class LidMalfunctionActivated(BaseEvent):
     ID = 6
     NAME = "LID_MALFUNCTION_ACTIVATED"
 
+    # Field names, types and struct format of the whole event, in offset
+    # order, for decoding many events at once (see generic.decode_columns)
+    COLUMNS = ("malfidRaw", "faultlocatordata", "param1", "param2")
+    COLUMN_TYPES = ("uint32", "uint32", "uint32", "float32")
+    STRUCT = struct.Struct(">HIIIIIf")
+
     raw: RawEvent
     malfidRaw: int
     faultlocatordata: int
@@ -516,6 +717,15 @@ class LidMalfunctionActivated(BaseEvent):
             param2 = param2,
         )
 
+    def encode(self):
+        raw = bytearray(self.raw.encode())
+        struct.pack_into(UINT32, raw, 10, self.malfidRaw)
+        struct.pack_into(UINT32, raw, 14, self.faultlocatordata)
+        struct.pack_into(UINT32, raw, 18, self.param1)
+        struct.pack_into(FLOAT32, raw, 22, self.param2)
+
+        return bytes(raw)
+
     @property
     def eventTimestamp(self):
         return self.raw.timestamp
@@ -547,6 +757,12 @@ class LidPumpingSuspended(BaseEvent):
     ID = 11
     NAME = "LID_PUMPING_SUSPENDED"
 
+    # Field names, types and struct format of the whole event, in offset
+    # order, for decoding many events at once (see generic.decode_columns)
+    COLUMNS = ("presuspendstate", "rpatimeout", "suspendreasonRaw", "insulinamount")
+    COLUMN_TYPES = ("uint32", "uint8", "uint8", "uint16")
+    STRUCT = struct.Struct(">HIIIBBHxxxxxxxx")
+
     raw: RawEvent
     presuspendstate: int
     insulinamount: int # units
@@ -566,14 +782,19 @@ class LidPumpingSuspended(BaseEvent):
         TerminatedByMalfunction = 2
         AutoSuspendByPlgs = 6
 
+    SuspendreasonMembers = {
+        0: SuspendreasonEnum.UserAborted,
+        1: SuspendreasonEnum.TerminatedByAlarm,
+        2: SuspendreasonEnum.TerminatedByMalfunction,
+        6: SuspendreasonEnum.AutoSuspendByPlgs,
+    }
+
     @property
     def suspendreason(self):
-        try:
-            return self.SuspendreasonEnum(self.suspendreasonRaw)
-        except ValueError as e:
-            logger.error("Invalid suspendreasonRaw in Suspendreason for "+str(self))
-            logger.error(e)
-            return None
+        member = self.SuspendreasonMembers.get(self.suspendreasonRaw)
+        if member is None:
+            logger.error("Invalid suspendreasonRaw in Suspendreason for "+str(self)+": "+str(self.suspendreasonRaw))
+        return member
 
     @staticmethod
     def build(raw):
@@ -590,6 +811,15 @@ class LidPumpingSuspended(BaseEvent):
             rpatimeout = rpatimeout,
         )
 
+    def encode(self):
+        raw = bytearray(self.raw.encode())
+        struct.pack_into(UINT32, raw, 10, self.presuspendstate)
+        struct.pack_into(UINT16, raw, 16, self.insulinamount)
+        struct.pack_into(UINT8, raw, 15, self.suspendreasonRaw)
+        struct.pack_into(UINT8, raw, 14, self.rpatimeout)
+
+        return bytes(raw)
+
     @property
     def eventTimestamp(self):
         return self.raw.timestamp
@@ -621,6 +851,12 @@ class LidPumpingResumed(BaseEvent):
     ID = 12
     NAME = "LID_PUMPING_RESUMED"
 
+    # Field names, types and struct format of the whole event, in offset
+    # order, for decoding many events at once (see generic.decode_columns)
+    COLUMNS = ("preresumestate", "insulinamount")
+    COLUMN_TYPES = ("uint32", "uint16")
+    STRUCT = struct.Struct(">HIIIxxHxxxxxxxx")
+
     raw: RawEvent
     preresumestate: int
     insulinamount: int # units
@@ -637,6 +873,13 @@ class LidPumpingResumed(BaseEvent):
             insulinamount = insulinamount,
         )
 
+    def encode(self):
+        raw = bytearray(self.raw.encode())
+        struct.pack_into(UINT32, raw, 10, self.preresumestate)
+        struct.pack_into(UINT16, raw, 16, self.insulinamount)
+
+        return bytes(raw)
+
     @property
     def eventTimestamp(self):
         return self.raw.timestamp
@@ -666,6 +909,12 @@ class LidTimeChanged(BaseEvent):
     ID = 13
     NAME = "LID_TIME_CHANGED"
 
+    # Field names, types and struct format of the whole event, in offset
+    # order, for decoding many events at once (see generic.decode_columns)
+    COLUMNS = ("timeprior", "timeafter", "Rawrtctime")
+    COLUMN_TYPES = ("uint32", "uint32", "uint32")
+    STRUCT = struct.Struct(">HIIIIIxxxx")
+
     raw: RawEvent
     timeprior: int # ms
     timeafter: int # ms
@@ -685,6 +934,14 @@ class LidTimeChanged(BaseEvent):
             Rawrtctime = Rawrtctime,
         )
 
+    def encode(self):
+        raw = bytearray(self.raw.encode())
+        struct.pack_into(UINT32, raw, 10, self.timeprior)
+        struct.pack_into(UINT32, raw, 14, self.timeafter)
+        struct.pack_into(UINT32, raw, 18, self.Rawrtctime)
+
+        return bytes(raw)
+
     @property
     def eventTimestamp(self):
         return self.raw.timestamp
@@ -715,6 +972,12 @@ class LidDateChanged(BaseEvent):
     ID = 14
     NAME = "LID_DATE_CHANGED"
 
+    # Field names, types and struct format of the whole event, in offset
+    # order, for decoding many events at once (see generic.decode_columns)
+    COLUMNS = ("dateprior", "dateafter", "Rawrtctime")
+    COLUMN_TYPES = ("uint32", "uint32", "uint32")
+    STRUCT = struct.Struct(">HIIIIIxxxx")
+
     raw: RawEvent
     dateprior: int # day
     dateafter: int # day
@@ -734,6 +997,14 @@ class LidDateChanged(BaseEvent):
             Rawrtctime = Rawrtctime,
         )
 
+    def encode(self):
+        raw = bytearray(self.raw.encode())
+        struct.pack_into(UINT32, raw, 10, self.dateprior)
+        struct.pack_into(UINT32, raw, 14, self.dateafter)
+        struct.pack_into(UINT32, raw, 18, self.Rawrtctime)
+
+        return bytes(raw)
+
     @property
     def eventTimestamp(self):
         return self.raw.timestamp
@@ -764,6 +1035,12 @@ class LidBgReadingTaken(BaseEvent):
     ID = 16
     NAME = "LID_BG_READING_TAKEN"
 
+    # Field names, types and struct format of the whole event, in offset
+    # order, for decoding many events at once (see generic.decode_columns)
+    COLUMNS = ("bgentrytypeRaw", "cgmcalibrationRaw", "BG", "IOB", "ISF", "targetbg", "bgsourcetypeRaw", "selectediobRaw")
+    COLUMN_TYPES = ("uint8", "uint8", "uint16", "float32", "uint16", "uint16", "uint8", "uint8")
+    STRUCT = struct.Struct(">HIIBBHfHHxxBB")
+
     raw: RawEvent
     selectediobRaw: int
     BG: int # mg/dL
@@ -783,14 +1060,17 @@ class LidBgReadingTaken(BaseEvent):
         MudaliarIob = 0
         SwanIobMeal = 1
 
+    SelectediobMembers = {
+        0: SelectediobEnum.MudaliarIob,
+        1: SelectediobEnum.SwanIobMeal,
+    }
+
     @property
     def selectediob(self):
-        try:
-            return self.SelectediobEnum(self.selectediobRaw)
-        except ValueError as e:
-            logger.error("Invalid selectediobRaw in Selectediob for "+str(self))
-            logger.error(e)
-            return None
+        member = self.SelectediobMembers.get(self.selectediobRaw)
+        if member is None:
+            logger.error("Invalid selectediobRaw in Selectediob for "+str(self)+": "+str(self.selectediobRaw))
+        return member
 
     BgentrytypeMap = {
         "0": "Manual Entry by the User via Numpad",
@@ -801,14 +1081,17 @@ class LidBgReadingTaken(BaseEvent):
         ManualEntryByTheUserViaNumpad = 0
         AutoPopulatedBgUsingDexcomEgv = 1
 
+    BgentrytypeMembers = {
+        0: BgentrytypeEnum.ManualEntryByTheUserViaNumpad,
+        1: BgentrytypeEnum.AutoPopulatedBgUsingDexcomEgv,
+    }
+
     @property
     def bgentrytype(self):
-        try:
-            return self.BgentrytypeEnum(self.bgentrytypeRaw)
-        except ValueError as e:
-            logger.error("Invalid bgentrytypeRaw in Bgentrytype for "+str(self))
-            logger.error(e)
-            return None
+        member = self.BgentrytypeMembers.get(self.bgentrytypeRaw)
+        if member is None:
+            logger.error("Invalid bgentrytypeRaw in Bgentrytype for "+str(self)+": "+str(self.bgentrytypeRaw))
+        return member
 
     BgsourcetypeMap = {
         "0": "Local Pump entry",
@@ -819,14 +1102,17 @@ class LidBgReadingTaken(BaseEvent):
         LocalPumpEntry = 0
         RemoteEntry = 1
 
+    BgsourcetypeMembers = {
+        0: BgsourcetypeEnum.LocalPumpEntry,
+        1: BgsourcetypeEnum.RemoteEntry,
+    }
+
     @property
     def bgsourcetype(self):
-        try:
-            return self.BgsourcetypeEnum(self.bgsourcetypeRaw)
-        except ValueError as e:
-            logger.error("Invalid bgsourcetypeRaw in Bgsourcetype for "+str(self))
-            logger.error(e)
-            return None
+        member = self.BgsourcetypeMembers.get(self.bgsourcetypeRaw)
+        if member is None:
+            logger.error("Invalid bgsourcetypeRaw in Bgsourcetype for "+str(self)+": "+str(self.bgsourcetypeRaw))
+        return member
 
     CgmcalibrationMap = {
         "0": "No, it was not used to Calibrate.",
@@ -837,14 +1123,17 @@ class LidBgReadingTaken(BaseEvent):
         No = 0
         Yes = 1
 
+    CgmcalibrationMembers = {
+        0: CgmcalibrationEnum.No,
+        1: CgmcalibrationEnum.Yes,
+    }
+
     @property
     def cgmcalibration(self):
-        try:
-            return self.CgmcalibrationEnum(self.cgmcalibrationRaw)
-        except ValueError as e:
-            logger.error("Invalid cgmcalibrationRaw in Cgmcalibration for "+str(self))
-            logger.error(e)
-            return None
+        member = self.CgmcalibrationMembers.get(self.cgmcalibrationRaw)
+        if member is None:
+            logger.error("Invalid cgmcalibrationRaw in Cgmcalibration for "+str(self)+": "+str(self.cgmcalibrationRaw))
+        return member
 
     @staticmethod
     def build(raw):
@@ -869,6 +1158,19 @@ class LidBgReadingTaken(BaseEvent):
             cgmcalibrationRaw = cgmcalibration,
         )
 
+    def encode(self):
+        raw = bytearray(self.raw.encode())
+        struct.pack_into(UINT8, raw, 25, self.selectediobRaw)
+        struct.pack_into(UINT16, raw, 12, self.BG)
+        struct.pack_into(UINT8, raw, 10, self.bgentrytypeRaw)
+        struct.pack_into(FLOAT32, raw, 14, self.IOB)
+        struct.pack_into(UINT16, raw, 20, self.targetbg)
+        struct.pack_into(UINT16, raw, 18, self.ISF)
+        struct.pack_into(UINT8, raw, 24, self.bgsourcetypeRaw)
+        struct.pack_into(UINT8, raw, 11, self.cgmcalibrationRaw)
+
+        return bytes(raw)
+
     @property
     def eventTimestamp(self):
         return self.raw.timestamp
@@ -904,6 +1206,12 @@ class LidBolusCompleted(BaseEvent):
     ID = 20
     NAME = "LID_BOLUS_COMPLETED"
 
+    # Field names, types and struct format of the whole event, in offset
+    # order, for decoding many events at once (see generic.decode_columns)
+    COLUMNS = ("bolusid", "completionstatusRaw", "IOB", "insulindelivered", "insulinrequested")
+    COLUMN_TYPES = ("uint16", "uint16", "float32", "float32", "float32")
+    STRUCT = struct.Struct(">HIIHHfff")
+
     raw: RawEvent
     completionstatusRaw: int
     bolusid: int
@@ -931,14 +1239,21 @@ class LidBolusCompleted(BaseEvent):
         BolusRejected = 5
         AbortedByPlgs = 6
 
+    CompletionstatusMembers = {
+        0: CompletionstatusEnum.UserAborted,
+        1: CompletionstatusEnum.TerminatedByAlarm,
+        2: CompletionstatusEnum.TerminatedByMalfunction,
+        3: CompletionstatusEnum.Completed,
+        5: CompletionstatusEnum.BolusRejected,
+        6: CompletionstatusEnum.AbortedByPlgs,
+    }
+
     @property
     def completionstatus(self):
-        try:
-            return self.CompletionstatusEnum(self.completionstatusRaw)
-        except ValueError as e:
-            logger.error("Invalid completionstatusRaw in Completionstatus for "+str(self))
-            logger.error(e)
-            return None
+        member = self.CompletionstatusMembers.get(self.completionstatusRaw)
+        if member is None:
+            logger.error("Invalid completionstatusRaw in Completionstatus for "+str(self)+": "+str(self.completionstatusRaw))
+        return member
 
     @staticmethod
     def build(raw):
@@ -957,6 +1272,16 @@ class LidBolusCompleted(BaseEvent):
             IOB = IOB,
         )
 
+    def encode(self):
+        raw = bytearray(self.raw.encode())
+        struct.pack_into(UINT16, raw, 12, self.completionstatusRaw)
+        struct.pack_into(UINT16, raw, 10, self.bolusid)
+        struct.pack_into(FLOAT32, raw, 18, self.insulindelivered)
+        struct.pack_into(FLOAT32, raw, 22, self.insulinrequested)
+        struct.pack_into(FLOAT32, raw, 14, self.IOB)
+
+        return bytes(raw)
+
     @property
     def eventTimestamp(self):
         return self.raw.timestamp
@@ -989,6 +1314,12 @@ class LidBolexCompleted(BaseEvent):
     ID = 21
     NAME = "LID_BOLEX_COMPLETED"
 
+    # Field names, types and struct format of the whole event, in offset
+    # order, for decoding many events at once (see generic.decode_columns)
+    COLUMNS = ("bolusid", "completionstatusRaw", "IOB", "insulindelivered", "insulinrequested")
+    COLUMN_TYPES = ("uint16", "uint16", "float32", "float32", "float32")
+    STRUCT = struct.Struct(">HIIHHfff")
+
     raw: RawEvent
     completionstatusRaw: int
     bolusid: int
@@ -1016,14 +1347,21 @@ class LidBolexCompleted(BaseEvent):
         BolusRejected = 5
         AbortedByPlgs = 6
 
+    CompletionstatusMembers = {
+        0: CompletionstatusEnum.UserAborted,
+        1: CompletionstatusEnum.TerminatedByAlarm,
+        2: CompletionstatusEnum.TerminatedByMalfunction,
+        3: CompletionstatusEnum.Completed,
+        5: CompletionstatusEnum.BolusRejected,
+        6: CompletionstatusEnum.AbortedByPlgs,
+    }
+
     @property
     def completionstatus(self):
-        try:
-            return self.CompletionstatusEnum(self.completionstatusRaw)
-        except ValueError as e:
-            logger.error("Invalid completionstatusRaw in Completionstatus for "+str(self))
-            logger.error(e)
-            return None
+        member = self.CompletionstatusMembers.get(self.completionstatusRaw)
+        if member is None:
+            logger.error("Invalid completionstatusRaw in Completionstatus for "+str(self)+": "+str(self.completionstatusRaw))
+        return member
 
     @staticmethod
     def build(raw):
@@ -1042,6 +1380,16 @@ class LidBolexCompleted(BaseEvent):
             IOB = IOB,
         )
 
+    def encode(self):
+        raw = bytearray(self.raw.encode())
+        struct.pack_into(UINT16, raw, 12, self.completionstatusRaw)
+        struct.pack_into(UINT16, raw, 10, self.bolusid)
+        struct.pack_into(FLOAT32, raw, 18, self.insulindelivered)
+        struct.pack_into(FLOAT32, raw, 22, self.insulinrequested)
+        struct.pack_into(FLOAT32, raw, 14, self.IOB)
+
+        return bytes(raw)
+
     @property
     def eventTimestamp(self):
         return self.raw.timestamp
@@ -1074,6 +1422,12 @@ class LidAlertCleared(BaseEvent):
     ID = 26
     NAME = "LID_ALERT_CLEARED"
 
+    # Field names, types and struct format of the whole event, in offset
+    # order, for decoding many events at once (see generic.decode_columns)
+    COLUMNS = ("alertidRaw", "faultlocatordata")
+    COLUMN_TYPES = ("uint32", "uint32")
+    STRUCT = struct.Struct(">HIIIIxxxxxxxx")
+
     raw: RawEvent
     alertidRaw: int
     faultlocatordata: int
@@ -1209,14 +1563,78 @@ class LidAlertCleared(BaseEvent):
         DefaultAlert62 = 62
         DefaultAlert63 = 63
 
+    AlertidMembers = {
+        0: AlertidEnum.LowInsulinAlert,
+        1: AlertidEnum.UsbConnectionAlert,
+        2: AlertidEnum.LowPowerAlert,
+        3: AlertidEnum.LowPowerAlert2,
+        4: AlertidEnum.DataErrorAlert,
+        5: AlertidEnum.AutoOffAlert,
+        6: AlertidEnum.MaxBasalRateAlert,
+        7: AlertidEnum.PowerSourceAlert,
+        8: AlertidEnum.MinBasalAlert,
+        9: AlertidEnum.ConnectionErrorAlert,
+        10: AlertidEnum.ConnectionErrorAlert2,
+        11: AlertidEnum.IncompleteBolusAlert,
+        12: AlertidEnum.IncompleteTempRateAlert,
+        13: AlertidEnum.IncompleteCartridgeChangeAlert,
+        14: AlertidEnum.IncompleteFillTubingAlert,
+        15: AlertidEnum.IncompleteFillCannulaAlert,
+        16: AlertidEnum.IncompleteSettingAlert,
+        17: AlertidEnum.LowInsulinAlert2,
+        18: AlertidEnum.MaxBasalAlert,
+        19: AlertidEnum.LowTransmitterAlert,
+        20: AlertidEnum.TransmitterAlert,
+        21: AlertidEnum.DefaultAlert21,
+        22: AlertidEnum.SensorExpiringAlert,
+        23: AlertidEnum.PumpRebootingAlert,
+        24: AlertidEnum.DeviceConnectionError,
+        25: AlertidEnum.CgmGraphRemoved,
+        26: AlertidEnum.MinBasalAlert2,
+        27: AlertidEnum.IncompleteCalibration,
+        28: AlertidEnum.CalibrationTimeout,
+        29: AlertidEnum.InvalidTransmitterId,
+        30: AlertidEnum.DefaultAlert30,
+        32: AlertidEnum.DefaultAlert32,
+        33: AlertidEnum.ButtonAlert,
+        34: AlertidEnum.QuickBolusAlert,
+        35: AlertidEnum.BasalIqAlert,
+        36: AlertidEnum.DefaultAlert36,
+        37: AlertidEnum.DefaultAlert37,
+        38: AlertidEnum.DefaultAlert38,
+        39: AlertidEnum.TransmitterEndOfLife,
+        40: AlertidEnum.CgmError,
+        41: AlertidEnum.CgmError2,
+        42: AlertidEnum.CgmError3,
+        43: AlertidEnum.DefaultAlert43,
+        44: AlertidEnum.TransmitterExpiringAlert,
+        45: AlertidEnum.TransmitterExpiringAlert2,
+        46: AlertidEnum.TransmitterExpiringAlert3,
+        47: AlertidEnum.DefaultAlert47,
+        48: AlertidEnum.CgmUnavailable,
+        49: AlertidEnum.DefaultAlert49,
+        50: AlertidEnum.DefaultAlert50,
+        51: AlertidEnum.DefaultAlert51,
+        52: AlertidEnum.DefaultAlert52,
+        53: AlertidEnum.DefaultAlert53,
+        54: AlertidEnum.DevicePaired,
+        55: AlertidEnum.DefaultAlert55,
+        56: AlertidEnum.DefaultAlert56,
+        57: AlertidEnum.DefaultAlert57,
+        58: AlertidEnum.DefaultAlert58,
+        59: AlertidEnum.DefaultAlert59,
+        60: AlertidEnum.DefaultAlert60,
+        61: AlertidEnum.DefaultAlert61,
+        62: AlertidEnum.DefaultAlert62,
+        63: AlertidEnum.DefaultAlert63,
+    }
+
     @property
     def alertid(self):
-        try:
-            return self.AlertidEnum(self.alertidRaw)
-        except ValueError as e:
-            logger.error("Invalid alertidRaw in Alertid for "+str(self))
-            logger.error(e)
-            return None
+        member = self.AlertidMembers.get(self.alertidRaw)
+        if member is None:
+            logger.error("Invalid alertidRaw in Alertid for "+str(self)+": "+str(self.alertidRaw))
+        return member
 
     @staticmethod
     def build(raw):
@@ -1229,6 +1647,13 @@ class LidAlertCleared(BaseEvent):
             faultlocatordata = faultlocatordata,
         )
 
+    def encode(self):
+        raw = bytearray(self.raw.encode())
+        struct.pack_into(UINT32, raw, 10, self.alertidRaw)
+        struct.pack_into(UINT32, raw, 14, self.faultlocatordata)
+
+        return bytes(raw)
+
     @property
     def eventTimestamp(self):
         return self.raw.timestamp
@@ -1258,6 +1683,12 @@ class LidAlarmCleared(BaseEvent):
     ID = 28
     NAME = "LID_ALARM_CLEARED"
 
+    # Field names, types and struct format of the whole event, in offset
+    # order, for decoding many events at once (see generic.decode_columns)
+    COLUMNS = ("alarmidRaw",)
+    COLUMN_TYPES = ("uint32",)
+    STRUCT = struct.Struct(">HIIIxxxxxxxxxxxx")
+
     raw: RawEvent
     alarmidRaw: int
 
@@ -1394,14 +1825,79 @@ class LidAlarmCleared(BaseEvent):
         DefaultAlarm62 = 62
         DefaultAlarm63 = 63
 
+    AlarmidMembers = {
+        0: AlarmidEnum.CartridgeAlarm,
+        1: AlarmidEnum.CartridgeAlarm2,
+        2: AlarmidEnum.OcclusionAlarm,
+        3: AlarmidEnum.PumpResetAlarm,
+        4: AlarmidEnum.DefaultAlarm4,
+        5: AlarmidEnum.CartridgeAlarm3,
+        6: AlarmidEnum.CartridgeAlarm4,
+        7: AlarmidEnum.AutoOffAlarm,
+        8: AlarmidEnum.EmptyCartridgeAlarm,
+        9: AlarmidEnum.CartridgeAlarm5,
+        10: AlarmidEnum.TemperatureAlarm,
+        11: AlarmidEnum.TemperatureAlarm2,
+        12: AlarmidEnum.BatteryShutdownAlarm,
+        13: AlarmidEnum.DefaultAlarm13,
+        14: AlarmidEnum.InvalidDateAlarm,
+        15: AlarmidEnum.TemperatureAlarm3,
+        16: AlarmidEnum.CartridgeAlarm6,
+        17: AlarmidEnum.DefaultAlarm17,
+        18: AlarmidEnum.ResumePumpAlarm,
+        19: AlarmidEnum.DefaultAlarm19,
+        20: AlarmidEnum.CartridgeAlarm7,
+        21: AlarmidEnum.AltitudeAlarm,
+        22: AlarmidEnum.StuckButtonAlarm,
+        23: AlarmidEnum.ResumePumpAlarm2,
+        24: AlarmidEnum.AtmosphericPressureOutOfRangeAlarm,
+        25: AlarmidEnum.CartridgeRemovedAlarm,
+        26: AlarmidEnum.OcclusionAlarm2,
+        27: AlarmidEnum.DefaultAlarm27,
+        28: AlarmidEnum.DefaultAlarm28,
+        29: AlarmidEnum.CartridgeAlarm10,
+        30: AlarmidEnum.CartridgeAlarm11,
+        31: AlarmidEnum.CartridgeAlarm12,
+        32: AlarmidEnum.DefaultAlarm32,
+        33: AlarmidEnum.DefaultAlarm33,
+        34: AlarmidEnum.DefaultAlarm34,
+        35: AlarmidEnum.DefaultAlarm35,
+        36: AlarmidEnum.DefaultAlarm36,
+        37: AlarmidEnum.DefaultAlarm37,
+        38: AlarmidEnum.DefaultAlarm38,
+        39: AlarmidEnum.DefaultAlarm39,
+        40: AlarmidEnum.DefaultAlarm40,
+        41: AlarmidEnum.DefaultAlarm41,
+        42: AlarmidEnum.DefaultAlarm42,
+        43: AlarmidEnum.DefaultAlarm43,
+        44: AlarmidEnum.DefaultAlarm44,
+        45: AlarmidEnum.DefaultAlarm45,
+        46: AlarmidEnum.DefaultAlarm46,
+        47: AlarmidEnum.DefaultAlarm47,
+        48: AlarmidEnum.DefaultAlarm48,
+        49: AlarmidEnum.DefaultAlarm49,
+        50: AlarmidEnum.DefaultAlarm50,
+        51: AlarmidEnum.DefaultAlarm51,
+        52: AlarmidEnum.DefaultAlarm52,
+        53: AlarmidEnum.DefaultAlarm53,
+        54: AlarmidEnum.DefaultAlarm54,
+        55: AlarmidEnum.DefaultAlarm55,
+        56: AlarmidEnum.DefaultAlarm56,
+        57: AlarmidEnum.DefaultAlarm57,
+        58: AlarmidEnum.DefaultAlarm58,
+        59: AlarmidEnum.DefaultAlarm59,
+        60: AlarmidEnum.DefaultAlarm60,
+        61: AlarmidEnum.DefaultAlarm61,
+        62: AlarmidEnum.DefaultAlarm62,
+        63: AlarmidEnum.DefaultAlarm63,
+    }
+
     @property
     def alarmid(self):
-        try:
-            return self.AlarmidEnum(self.alarmidRaw)
-        except ValueError as e:
-            logger.error("Invalid alarmidRaw in Alarmid for "+str(self))
-            logger.error(e)
-            return None
+        member = self.AlarmidMembers.get(self.alarmidRaw)
+        if member is None:
+            logger.error("Invalid alarmidRaw in Alarmid for "+str(self)+": "+str(self.alarmidRaw))
+        return member
 
     @staticmethod
     def build(raw):
@@ -1412,6 +1908,12 @@ class LidAlarmCleared(BaseEvent):
             alarmidRaw = alarmid,
         )
 
+    def encode(self):
+        raw = bytearray(self.raw.encode())
+        struct.pack_into(UINT32, raw, 10, self.alarmidRaw)
+
+        return bytes(raw)
+
     @property
     def eventTimestamp(self):
         return self.raw.timestamp
@@ -1440,6 +1942,12 @@ class LidCartridgeFilled(BaseEvent):
     ID = 33
     NAME = "LID_CARTRIDGE_FILLED"
 
+    # Field names, types and struct format of the whole event, in offset
+    # order, for decoding many events at once (see generic.decode_columns)
+    COLUMNS = ("insulinvolume", "v2Volume")
+    COLUMN_TYPES = ("uint32", "float32")
+    STRUCT = struct.Struct(">HIIIfxxxxxxxx")
+
     raw: RawEvent
     insulinvolume: int # units
     v2Volume: float # units
@@ -1456,6 +1964,13 @@ class LidCartridgeFilled(BaseEvent):
             v2Volume = v2Volume,
         )
 
+    def encode(self):
+        raw = bytearray(self.raw.encode())
+        struct.pack_into(UINT32, raw, 10, self.insulinvolume)
+        struct.pack_into(FLOAT32, raw, 14, self.v2Volume)
+
+        return bytes(raw)
+
     @property
     def eventTimestamp(self):
         return self.raw.timestamp
@@ -1485,6 +2000,12 @@ class LidShelfMode(BaseEvent):
     ID = 53
     NAME = "LID_SHELF_MODE"
 
+    # Field names, types and struct format of the whole event, in offset
+    # order, for decoding many events at once (see generic.decode_columns)
+    COLUMNS = ("msecsincereset", "lipoIbc", "lipoAbc", "lipocurrent", "lipoRemcap", "lipoMv")
+    COLUMN_TYPES = ("uint32", "uint8", "uint8", "int16", "uint32", "uint32")
+    STRUCT = struct.Struct(">HIIIBBhII")
+
     raw: RawEvent
     msecsincereset: int # ms
     lipocurrent: int # mA
@@ -1513,6 +2034,17 @@ class LidShelfMode(BaseEvent):
             lipoMv = lipoMv,
         )
 
+    def encode(self):
+        raw = bytearray(self.raw.encode())
+        struct.pack_into(UINT32, raw, 10, self.msecsincereset)
+        struct.pack_into(INT16, raw, 16, self.lipocurrent)
+        struct.pack_into(UINT8, raw, 15, self.lipoAbc)
+        struct.pack_into(UINT8, raw, 14, self.lipoIbc)
+        struct.pack_into(UINT32, raw, 18, self.lipoRemcap)
+        struct.pack_into(UINT32, raw, 22, self.lipoMv)
+
+        return bytes(raw)
+
     @property
     def eventTimestamp(self):
         return self.raw.timestamp
@@ -1546,6 +2078,12 @@ class LidBolusActivated(BaseEvent):
     ID = 55
     NAME = "LID_BOLUS_ACTIVATED"
 
+    # Field names, types and struct format of the whole event, in offset
+    # order, for decoding many events at once (see generic.decode_columns)
+    COLUMNS = ("selectediobRaw", "bolusid", "IOB", "bolussize")
+    COLUMN_TYPES = ("uint8", "uint16", "float32", "float32")
+    STRUCT = struct.Struct(">HIIxBHffxxxx")
+
     raw: RawEvent
     selectediobRaw: int
     bolusid: int
@@ -1561,14 +2099,17 @@ class LidBolusActivated(BaseEvent):
         MudaliarIob = 0
         SwanIobMeal = 1
 
+    SelectediobMembers = {
+        0: SelectediobEnum.MudaliarIob,
+        1: SelectediobEnum.SwanIobMeal,
+    }
+
     @property
     def selectediob(self):
-        try:
-            return self.SelectediobEnum(self.selectediobRaw)
-        except ValueError as e:
-            logger.error("Invalid selectediobRaw in Selectediob for "+str(self))
-            logger.error(e)
-            return None
+        member = self.SelectediobMembers.get(self.selectediobRaw)
+        if member is None:
+            logger.error("Invalid selectediobRaw in Selectediob for "+str(self)+": "+str(self.selectediobRaw))
+        return member
 
     @staticmethod
     def build(raw):
@@ -1585,6 +2126,15 @@ class LidBolusActivated(BaseEvent):
             bolussize = bolussize,
         )
 
+    def encode(self):
+        raw = bytearray(self.raw.encode())
+        struct.pack_into(UINT8, raw, 11, self.selectediobRaw)
+        struct.pack_into(UINT16, raw, 12, self.bolusid)
+        struct.pack_into(FLOAT32, raw, 14, self.IOB)
+        struct.pack_into(FLOAT32, raw, 18, self.bolussize)
+
+        return bytes(raw)
+
     @property
     def eventTimestamp(self):
         return self.raw.timestamp
@@ -1616,6 +2166,12 @@ class LidBolexActivated(BaseEvent):
     ID = 59
     NAME = "LID_BOLEX_ACTIVATED"
 
+    # Field names, types and struct format of the whole event, in offset
+    # order, for decoding many events at once (see generic.decode_columns)
+    COLUMNS = ("selectediobRaw", "bolusid", "IOB", "bolexsize")
+    COLUMN_TYPES = ("uint8", "uint16", "float32", "float32")
+    STRUCT = struct.Struct(">HIIxBHffxxxx")
+
     raw: RawEvent
     selectediobRaw: int
     bolusid: int
@@ -1631,14 +2187,17 @@ class LidBolexActivated(BaseEvent):
         MudaliarIob = 0
         SwanIobMeal = 1
 
+    SelectediobMembers = {
+        0: SelectediobEnum.MudaliarIob,
+        1: SelectediobEnum.SwanIobMeal,
+    }
+
     @property
     def selectediob(self):
-        try:
-            return self.SelectediobEnum(self.selectediobRaw)
-        except ValueError as e:
-            logger.error("Invalid selectediobRaw in Selectediob for "+str(self))
-            logger.error(e)
-            return None
+        member = self.SelectediobMembers.get(self.selectediobRaw)
+        if member is None:
+            logger.error("Invalid selectediobRaw in Selectediob for "+str(self)+": "+str(self.selectediobRaw))
+        return member
 
     @staticmethod
     def build(raw):
@@ -1655,6 +2214,15 @@ class LidBolexActivated(BaseEvent):
             bolexsize = bolexsize,
         )
 
+    def encode(self):
+        raw = bytearray(self.raw.encode())
+        struct.pack_into(UINT8, raw, 11, self.selectediobRaw)
+        struct.pack_into(UINT16, raw, 12, self.bolusid)
+        struct.pack_into(FLOAT32, raw, 14, self.IOB)
+        struct.pack_into(FLOAT32, raw, 18, self.bolexsize)
+
+        return bytes(raw)
+
     @property
     def eventTimestamp(self):
         return self.raw.timestamp
@@ -1686,6 +2254,12 @@ class LidDataLogCorruption(BaseEvent):
     ID = 60
     NAME = "LID_DATA_LOG_CORRUPTION"
 
+    # Field names, types and struct format of the whole event, in offset
+    # order, for decoding many events at once (see generic.decode_columns)
+    COLUMNS = ("block", "reason")
+    COLUMN_TYPES = ("uint32", "uint8")
+    STRUCT = struct.Struct(">HIIIxxxBxxxxxxxx")
+
     raw: RawEvent
     block: int
     reason: int
@@ -1702,6 +2276,13 @@ class LidDataLogCorruption(BaseEvent):
             reason = reason,
         )
 
+    def encode(self):
+        raw = bytearray(self.raw.encode())
+        struct.pack_into(UINT32, raw, 10, self.block)
+        struct.pack_into(UINT8, raw, 17, self.reason)
+
+        return bytes(raw)
+
     @property
     def eventTimestamp(self):
         return self.raw.timestamp
@@ -1731,6 +2312,12 @@ class LidCannulaFilled(BaseEvent):
     ID = 61
     NAME = "LID_CANNULA_FILLED"
 
+    # Field names, types and struct format of the whole event, in offset
+    # order, for decoding many events at once (see generic.decode_columns)
+    COLUMNS = ("primesize", "completionstatusRaw")
+    COLUMN_TYPES = ("float32", "uint32")
+    STRUCT = struct.Struct(">HIIfIxxxxxxxx")
+
     raw: RawEvent
     primesize: float # units
     completionstatusRaw: int
@@ -1748,14 +2335,19 @@ class LidCannulaFilled(BaseEvent):
         TerminatedByMalfunction = 2
         Completed = 3
 
+    CompletionstatusMembers = {
+        0: CompletionstatusEnum.UserAborted,
+        1: CompletionstatusEnum.TerminatedByAlarm,
+        2: CompletionstatusEnum.TerminatedByMalfunction,
+        3: CompletionstatusEnum.Completed,
+    }
+
     @property
     def completionstatus(self):
-        try:
-            return self.CompletionstatusEnum(self.completionstatusRaw)
-        except ValueError as e:
-            logger.error("Invalid completionstatusRaw in Completionstatus for "+str(self))
-            logger.error(e)
-            return None
+        member = self.CompletionstatusMembers.get(self.completionstatusRaw)
+        if member is None:
+            logger.error("Invalid completionstatusRaw in Completionstatus for "+str(self)+": "+str(self.completionstatusRaw))
+        return member
 
     @staticmethod
     def build(raw):
@@ -1768,6 +2360,13 @@ class LidCannulaFilled(BaseEvent):
             completionstatusRaw = completionstatus,
         )
 
+    def encode(self):
+        raw = bytearray(self.raw.encode())
+        struct.pack_into(FLOAT32, raw, 10, self.primesize)
+        struct.pack_into(UINT32, raw, 14, self.completionstatusRaw)
+
+        return bytes(raw)
+
     @property
     def eventTimestamp(self):
         return self.raw.timestamp
@@ -1797,6 +2396,12 @@ class LidTubingFilled(BaseEvent):
     ID = 63
     NAME = "LID_TUBING_FILLED"
 
+    # Field names, types and struct format of the whole event, in offset
+    # order, for decoding many events at once (see generic.decode_columns)
+    COLUMNS = ("primesize", "completionstatusRaw", "position")
+    COLUMN_TYPES = ("float32", "uint32", "uint32")
+    STRUCT = struct.Struct(">HIIfIIxxxx")
+
     raw: RawEvent
     primesize: float # units
     completionstatusRaw: int
@@ -1815,14 +2420,19 @@ class LidTubingFilled(BaseEvent):
         TerminatedByMalfunction = 2
         Completed = 3
 
+    CompletionstatusMembers = {
+        0: CompletionstatusEnum.UserAborted,
+        1: CompletionstatusEnum.TerminatedByAlarm,
+        2: CompletionstatusEnum.TerminatedByMalfunction,
+        3: CompletionstatusEnum.Completed,
+    }
+
     @property
     def completionstatus(self):
-        try:
-            return self.CompletionstatusEnum(self.completionstatusRaw)
-        except ValueError as e:
-            logger.error("Invalid completionstatusRaw in Completionstatus for "+str(self))
-            logger.error(e)
-            return None
+        member = self.CompletionstatusMembers.get(self.completionstatusRaw)
+        if member is None:
+            logger.error("Invalid completionstatusRaw in Completionstatus for "+str(self)+": "+str(self.completionstatusRaw))
+        return member
 
     @staticmethod
     def build(raw):
@@ -1837,6 +2447,14 @@ class LidTubingFilled(BaseEvent):
             position = position,
         )
 
+    def encode(self):
+        raw = bytearray(self.raw.encode())
+        struct.pack_into(FLOAT32, raw, 10, self.primesize)
+        struct.pack_into(UINT32, raw, 14, self.completionstatusRaw)
+        struct.pack_into(UINT32, raw, 18, self.position)
+
+        return bytes(raw)
+
     @property
     def eventTimestamp(self):
         return self.raw.timestamp
@@ -1867,6 +2485,12 @@ class LidBolusRequestedMsg1(BaseEvent):
     ID = 64
     NAME = "LID_BOLUS_REQUESTED_MSG1"
 
+    # Field names, types and struct format of the whole event, in offset
+    # order, for decoding many events at once (see generic.decode_columns)
+    COLUMNS = ("correctionbolusincludedRaw", "bolustypeRaw", "bolusid", "BG", "carbamount", "IOB", "carbratioRaw")
+    COLUMN_TYPES = ("uint8", "uint8", "uint16", "uint16", "uint16", "float32", "uint32")
+    STRUCT = struct.Struct(">HIIBBHHHfI")
+
     raw: RawEvent
     bolusid: int
     bolustypeRaw: int
@@ -1889,14 +2513,19 @@ class LidBolusRequestedMsg1(BaseEvent):
         AutomaticCorrection = 2
         Remote = 3
 
+    BolustypeMembers = {
+        0: BolustypeEnum.Insulin,
+        1: BolustypeEnum.Carb,
+        2: BolustypeEnum.AutomaticCorrection,
+        3: BolustypeEnum.Remote,
+    }
+
     @property
     def bolustype(self):
-        try:
-            return self.BolustypeEnum(self.bolustypeRaw)
-        except ValueError as e:
-            logger.error("Invalid bolustypeRaw in Bolustype for "+str(self))
-            logger.error(e)
-            return None
+        member = self.BolustypeMembers.get(self.bolustypeRaw)
+        if member is None:
+            logger.error("Invalid bolustypeRaw in Bolustype for "+str(self)+": "+str(self.bolustypeRaw))
+        return member
 
     CorrectionbolusincludedMap = {
         "0": "No",
@@ -1907,14 +2536,17 @@ class LidBolusRequestedMsg1(BaseEvent):
         No = 0
         Yes = 1
 
+    CorrectionbolusincludedMembers = {
+        0: CorrectionbolusincludedEnum.No,
+        1: CorrectionbolusincludedEnum.Yes,
+    }
+
     @property
     def correctionbolusincluded(self):
-        try:
-            return self.CorrectionbolusincludedEnum(self.correctionbolusincludedRaw)
-        except ValueError as e:
-            logger.error("Invalid correctionbolusincludedRaw in Correctionbolusincluded for "+str(self))
-            logger.error(e)
-            return None
+        member = self.CorrectionbolusincludedMembers.get(self.correctionbolusincludedRaw)
+        if member is None:
+            logger.error("Invalid correctionbolusincludedRaw in Correctionbolusincluded for "+str(self)+": "+str(self.correctionbolusincludedRaw))
+        return member
 
     @property
     def carbratio(self):
@@ -1941,6 +2573,18 @@ class LidBolusRequestedMsg1(BaseEvent):
             IOB = IOB,
         )
 
+    def encode(self):
+        raw = bytearray(self.raw.encode())
+        struct.pack_into(UINT16, raw, 12, self.bolusid)
+        struct.pack_into(UINT8, raw, 11, self.bolustypeRaw)
+        struct.pack_into(UINT8, raw, 10, self.correctionbolusincludedRaw)
+        struct.pack_into(UINT16, raw, 16, self.carbamount)
+        struct.pack_into(UINT16, raw, 14, self.BG)
+        struct.pack_into(UINT32, raw, 22, self.carbratioRaw)
+        struct.pack_into(FLOAT32, raw, 18, self.IOB)
+
+        return bytes(raw)
+
     @property
     def eventTimestamp(self):
         return self.raw.timestamp
@@ -1975,6 +2619,12 @@ class LidBolusRequestedMsg2(BaseEvent):
     ID = 65
     NAME = "LID_BOLUS_REQUESTED_MSG2"
 
+    # Field names, types and struct format of the whole event, in offset
+    # order, for decoding many events at once (see generic.decode_columns)
+    COLUMNS = ("standardpercent", "optionsRaw", "bolusid", "duration", "targetbg", "ISF", "selectediobRaw", "declinedcorrectionRaw", "useroverrideRaw")
+    COLUMN_TYPES = ("uint8", "uint8", "uint16", "uint16", "uint16", "uint16", "uint8", "uint8", "uint8")
+    STRUCT = struct.Struct(">HIIBBHxxHHHxBBB")
+
     raw: RawEvent
     selectediobRaw: int
     bolusid: int
@@ -1995,14 +2645,17 @@ class LidBolusRequestedMsg2(BaseEvent):
         MudaliarIob = 0
         SwanIobMeal = 1
 
+    SelectediobMembers = {
+        0: SelectediobEnum.MudaliarIob,
+        1: SelectediobEnum.SwanIobMeal,
+    }
+
     @property
     def selectediob(self):
-        try:
-            return self.SelectediobEnum(self.selectediobRaw)
-        except ValueError as e:
-            logger.error("Invalid selectediobRaw in Selectediob for "+str(self))
-            logger.error(e)
-            return None
+        member = self.SelectediobMembers.get(self.selectediobRaw)
+        if member is None:
+            logger.error("Invalid selectediobRaw in Selectediob for "+str(self)+": "+str(self.selectediobRaw))
+        return member
 
     OptionsMap = {
         "0": "Standard Bolus",
@@ -2025,14 +2678,23 @@ class LidBolusRequestedMsg2(BaseEvent):
         EatingSoonAutomaticBolus = 6
         LateBolus = 7
 
+    OptionsMembers = {
+        0: OptionsEnum.StandardBolus,
+        1: OptionsEnum.ExtendedBolus,
+        2: OptionsEnum.QuickBolus,
+        3: OptionsEnum.AutomaticBolus,
+        4: OptionsEnum.BleStandardBolus,
+        5: OptionsEnum.BleExtendedBolus,
+        6: OptionsEnum.EatingSoonAutomaticBolus,
+        7: OptionsEnum.LateBolus,
+    }
+
     @property
     def options(self):
-        try:
-            return self.OptionsEnum(self.optionsRaw)
-        except ValueError as e:
-            logger.error("Invalid optionsRaw in Options for "+str(self))
-            logger.error(e)
-            return None
+        member = self.OptionsMembers.get(self.optionsRaw)
+        if member is None:
+            logger.error("Invalid optionsRaw in Options for "+str(self)+": "+str(self.optionsRaw))
+        return member
 
     UseroverrideMap = {
         "0": "\"No\", user did not override the bolus size",
@@ -2043,14 +2705,17 @@ class LidBolusRequestedMsg2(BaseEvent):
         No = 0
         Yes = 1
 
+    UseroverrideMembers = {
+        0: UseroverrideEnum.No,
+        1: UseroverrideEnum.Yes,
+    }
+
     @property
     def useroverride(self):
-        try:
-            return self.UseroverrideEnum(self.useroverrideRaw)
-        except ValueError as e:
-            logger.error("Invalid useroverrideRaw in Useroverride for "+str(self))
-            logger.error(e)
-            return None
+        member = self.UseroverrideMembers.get(self.useroverrideRaw)
+        if member is None:
+            logger.error("Invalid useroverrideRaw in Useroverride for "+str(self)+": "+str(self.useroverrideRaw))
+        return member
 
     DeclinedcorrectionMap = {
         "0": "\"No\", user did not decline the recommended correction",
@@ -2061,14 +2726,17 @@ class LidBolusRequestedMsg2(BaseEvent):
         No = 0
         Yes = 1
 
+    DeclinedcorrectionMembers = {
+        0: DeclinedcorrectionEnum.No,
+        1: DeclinedcorrectionEnum.Yes,
+    }
+
     @property
     def declinedcorrection(self):
-        try:
-            return self.DeclinedcorrectionEnum(self.declinedcorrectionRaw)
-        except ValueError as e:
-            logger.error("Invalid declinedcorrectionRaw in Declinedcorrection for "+str(self))
-            logger.error(e)
-            return None
+        member = self.DeclinedcorrectionMembers.get(self.declinedcorrectionRaw)
+        if member is None:
+            logger.error("Invalid declinedcorrectionRaw in Declinedcorrection for "+str(self)+": "+str(self.declinedcorrectionRaw))
+        return member
 
     @staticmethod
     def build(raw):
@@ -2095,6 +2763,20 @@ class LidBolusRequestedMsg2(BaseEvent):
             declinedcorrectionRaw = declinedcorrection,
         )
 
+    def encode(self):
+        raw = bytearray(self.raw.encode())
+        struct.pack_into(UINT8, raw, 23, self.selectediobRaw)
+        struct.pack_into(UINT16, raw, 12, self.bolusid)
+        struct.pack_into(UINT8, raw, 11, self.optionsRaw)
+        struct.pack_into(UINT8, raw, 10, self.standardpercent)
+        struct.pack_into(UINT16, raw, 16, self.duration)
+        struct.pack_into(UINT16, raw, 20, self.ISF)
+        struct.pack_into(UINT16, raw, 18, self.targetbg)
+        struct.pack_into(UINT8, raw, 25, self.useroverrideRaw)
+        struct.pack_into(UINT8, raw, 24, self.declinedcorrectionRaw)
+
+        return bytes(raw)
+
     @property
     def eventTimestamp(self):
         return self.raw.timestamp
@@ -2131,6 +2813,12 @@ class LidBolusRequestedMsg3(BaseEvent):
     ID = 66
     NAME = "LID_BOLUS_REQUESTED_MSG3"
 
+    # Field names, types and struct format of the whole event, in offset
+    # order, for decoding many events at once (see generic.decode_columns)
+    COLUMNS = ("bolusid", "foodbolussize", "correctionbolussize", "totalbolussize")
+    COLUMN_TYPES = ("uint16", "float32", "float32", "float32")
+    STRUCT = struct.Struct(">HIIxxHfff")
+
     raw: RawEvent
     bolusid: int
     foodbolussize: float # units
@@ -2153,6 +2841,15 @@ class LidBolusRequestedMsg3(BaseEvent):
             totalbolussize = totalbolussize,
         )
 
+    def encode(self):
+        raw = bytearray(self.raw.encode())
+        struct.pack_into(UINT16, raw, 12, self.bolusid)
+        struct.pack_into(FLOAT32, raw, 14, self.foodbolussize)
+        struct.pack_into(FLOAT32, raw, 18, self.correctionbolussize)
+        struct.pack_into(FLOAT32, raw, 22, self.totalbolussize)
+
+        return bytes(raw)
+
     @property
     def eventTimestamp(self):
         return self.raw.timestamp
@@ -2184,6 +2881,12 @@ class LidNewDay(BaseEvent):
     ID = 90
     NAME = "LID_NEW_DAY"
 
+    # Field names, types and struct format of the whole event, in offset
+    # order, for decoding many events at once (see generic.decode_columns)
+    COLUMNS = ("commandedbasalrate", "featuresbitmask", "featurebitmaskindex")
+    COLUMN_TYPES = ("float32", "uint32", "uint32")
+    STRUCT = struct.Struct(">HIIfIIxxxx")
+
     raw: RawEvent
     commandedbasalrate: float # units/hour
     featuresbitmask: int
@@ -2203,6 +2906,14 @@ class LidNewDay(BaseEvent):
             featurebitmaskindex = featurebitmaskindex,
         )
 
+    def encode(self):
+        raw = bytearray(self.raw.encode())
+        struct.pack_into(FLOAT32, raw, 10, self.commandedbasalrate)
+        struct.pack_into(UINT32, raw, 14, self.featuresbitmask)
+        struct.pack_into(UINT32, raw, 18, self.featurebitmaskindex)
+
+        return bytes(raw)
+
     @property
     def eventTimestamp(self):
         return self.raw.timestamp
@@ -2233,6 +2944,12 @@ class LidArmInit(BaseEvent):
     ID = 99
     NAME = "LID_ARM_INIT"
 
+    # Field names, types and struct format of the whole event, in offset
+    # order, for decoding many events at once (see generic.decode_columns)
+    COLUMNS = ("version", "configabits", "configbbits", "numlogentries")
+    COLUMN_TYPES = ("uint32", "uint32", "uint32", "uint32")
+    STRUCT = struct.Struct(">HIIIIII")
+
     raw: RawEvent
     version: int
     configabits: int
@@ -2255,6 +2972,15 @@ class LidArmInit(BaseEvent):
             numlogentries = numlogentries,
         )
 
+    def encode(self):
+        raw = bytearray(self.raw.encode())
+        struct.pack_into(UINT32, raw, 10, self.version)
+        struct.pack_into(UINT32, raw, 14, self.configabits)
+        struct.pack_into(UINT32, raw, 18, self.configbbits)
+        struct.pack_into(UINT32, raw, 22, self.numlogentries)
+
+        return bytes(raw)
+
     @property
     def eventTimestamp(self):
         return self.raw.timestamp
@@ -2286,6 +3012,12 @@ class LidPlgsPeriodic(BaseEvent):
     ID = 140
     NAME = "LID_PLGS_PERIODIC"
 
+    # Field names, types and struct format of the whole event, in offset
+    # order, for decoding many events at once (see generic.decode_columns)
+    COLUMNS = ("timestamp", "PGV", "FMR", "hominstateRaw", "rulestateRaw", "pgvvalidRaw", "fmrstatusRaw", "statusRaw")
+    COLUMN_TYPES = ("uint32", "uint16", "uint16", "uint8", "uint8", "uint8", "uint8", "uint32")
+    STRUCT = struct.Struct(">HIIIHHBBBBI")
+
     raw: RawEvent
     timestamp: int # sec
     FMR: int # mg/dL
@@ -2315,14 +3047,22 @@ class LidPlgsPeriodic(BaseEvent):
         CalibrationEnteredNoFmr = 5
         PumpingEventNoFmr = 6
 
+    FmrstatusMembers = {
+        0: FmrstatusEnum.NoFmr,
+        1: FmrstatusEnum.PeriodicGlucoseReading,
+        2: FmrstatusEnum.CalibrationResponseGlucoseReading,
+        3: FmrstatusEnum.SensorSessionStoppedNoFmr,
+        4: FmrstatusEnum.SensorSessionStartedNoFmr,
+        5: FmrstatusEnum.CalibrationEnteredNoFmr,
+        6: FmrstatusEnum.PumpingEventNoFmr,
+    }
+
     @property
     def fmrstatus(self):
-        try:
-            return self.FmrstatusEnum(self.fmrstatusRaw)
-        except ValueError as e:
-            logger.error("Invalid fmrstatusRaw in Fmrstatus for "+str(self))
-            logger.error(e)
-            return None
+        member = self.FmrstatusMembers.get(self.fmrstatusRaw)
+        if member is None:
+            logger.error("Invalid fmrstatusRaw in Fmrstatus for "+str(self)+": "+str(self.fmrstatusRaw))
+        return member
 
     PgvvalidMap = {
         "0": "FALSE",
@@ -2333,14 +3073,17 @@ class LidPlgsPeriodic(BaseEvent):
         FalseVal = 0
         TrueVal = 1
 
+    PgvvalidMembers = {
+        0: PgvvalidEnum.FalseVal,
+        1: PgvvalidEnum.TrueVal,
+    }
+
     @property
     def pgvvalid(self):
-        try:
-            return self.PgvvalidEnum(self.pgvvalidRaw)
-        except ValueError as e:
-            logger.error("Invalid pgvvalidRaw in Pgvvalid for "+str(self))
-            logger.error(e)
-            return None
+        member = self.PgvvalidMembers.get(self.pgvvalidRaw)
+        if member is None:
+            logger.error("Invalid pgvvalidRaw in Pgvvalid for "+str(self)+": "+str(self.pgvvalidRaw))
+        return member
 
     RulestateMap = {
         "0": "HO_SUSPEND_RULE",
@@ -2353,6 +3096,13 @@ class LidPlgsPeriodic(BaseEvent):
         HoRecoveryRule = 2**1
         HoUnavailableRule = 2**2
 
+    RulestateNames = {
+        0: (),
+        1: ("HoSuspendRule",),
+        2: ("HoRecoveryRule",),
+        4: ("HoUnavailableRule",),
+    }
+
     @property
     def rulestate(self):
         try:
@@ -2362,6 +3112,13 @@ class LidPlgsPeriodic(BaseEvent):
             logger.error(e)
             return None
 
+    @property
+    def rulestateNames(self):
+        names = self.RulestateNames.get(self.rulestateRaw)
+        if names is None:
+            names = bitmask_names(self.RulestateBitmask, self.rulestateRaw)
+        return names
+
     HominstateMap = {
         "0": "On and available",
         "1": "On and suspended",
@@ -2375,14 +3132,19 @@ class LidPlgsPeriodic(BaseEvent):
         Off = 2
         OnAndNotAvailable = 3
 
+    HominstateMembers = {
+        0: HominstateEnum.OnAndAvailable,
+        1: HominstateEnum.OnAndSuspended,
+        2: HominstateEnum.Off,
+        3: HominstateEnum.OnAndNotAvailable,
+    }
+
     @property
     def hominstate(self):
-        try:
-            return self.HominstateEnum(self.hominstateRaw)
-        except ValueError as e:
-            logger.error("Invalid hominstateRaw in Hominstate for "+str(self))
-            logger.error(e)
-            return None
+        member = self.HominstateMembers.get(self.hominstateRaw)
+        if member is None:
+            logger.error("Invalid hominstateRaw in Hominstate for "+str(self)+": "+str(self.hominstateRaw))
+        return member
 
     StatusMap = {
         "0": "Suspend Predicted",
@@ -2414,6 +3176,21 @@ class LidPlgsPeriodic(BaseEvent):
         Unavailablebolusactive = 2**12
         Unavailablenocurrent = 2**13
 
+    StatusNames = {
+        0: (),
+        1: ("SuspendPredicted",),
+        2: ("SuspendCurrent",),
+        16: ("ResumeEgvRise",),
+        64: ("ResumeNadirLock",),
+        128: ("Unavailabletimesmall",),
+        256: ("Unavailablesuspendoverride",),
+        512: ("Unavailablecgmoff",),
+        1024: ("Unavailablehighegv",),
+        2048: ("Unavailablenottherapy",),
+        4096: ("Unavailablebolusactive",),
+        8192: ("Unavailablenocurrent",),
+    }
+
     @property
     def status(self):
         try:
@@ -2423,6 +3200,13 @@ class LidPlgsPeriodic(BaseEvent):
             logger.error(e)
             return None
 
+    @property
+    def statusNames(self):
+        names = self.StatusNames.get(self.statusRaw)
+        if names is None:
+            names = bitmask_names(self.StatusBitmask, self.statusRaw)
+        return names
+
     @staticmethod
     def build(raw):
         timestamp, = struct.unpack_from(UINT32, raw[:EVENT_LEN], 10)
@@ -2446,6 +3230,19 @@ class LidPlgsPeriodic(BaseEvent):
             statusRaw = status,
         )
 
+    def encode(self):
+        raw = bytearray(self.raw.encode())
+        struct.pack_into(UINT32, raw, 10, self.timestamp)
+        struct.pack_into(UINT16, raw, 16, self.FMR)
+        struct.pack_into(UINT16, raw, 14, self.PGV)
+        struct.pack_into(UINT8, raw, 21, self.fmrstatusRaw)
+        struct.pack_into(UINT8, raw, 20, self.pgvvalidRaw)
+        struct.pack_into(UINT8, raw, 19, self.rulestateRaw)
+        struct.pack_into(UINT8, raw, 18, self.hominstateRaw)
+        struct.pack_into(UINT32, raw, 22, self.statusRaw)
+
+        return bytes(raw)
+
     @property
     def eventTimestamp(self):
         return self.raw.timestamp
@@ -2481,6 +3278,12 @@ class LidCgmAlertActivated(BaseEvent):
     ID = 171
     NAME = "LID_CGM_ALERT_ACTIVATED"
 
+    # Field names, types and struct format of the whole event, in offset
+    # order, for decoding many events at once (see generic.decode_columns)
+    COLUMNS = ("dalertidRaw", "faultlocatordata", "param1", "param2")
+    COLUMN_TYPES = ("uint32", "uint32", "uint32", "float32")
+    STRUCT = struct.Struct(">HIIIIIf")
+
     raw: RawEvent
     dalertidRaw: int
     faultlocatordata: int
@@ -2508,14 +3311,23 @@ class LidCgmAlertActivated(BaseEvent):
         CgmTransmitterExpired = 39
         PumpBluetoothError = 40
 
+    DalertidMembers = {
+        11: DalertidEnum.CgmSensorFail,
+        13: DalertidEnum.CgmSensorExpired,
+        14: DalertidEnum.CgmOutOfRange,
+        20: DalertidEnum.CgmTransmitterError,
+        26: DalertidEnum.CgmTemperature,
+        27: DalertidEnum.CgmFailedConnection,
+        39: DalertidEnum.CgmTransmitterExpired,
+        40: DalertidEnum.PumpBluetoothError,
+    }
+
     @property
     def dalertid(self):
-        try:
-            return self.DalertidEnum(self.dalertidRaw)
-        except ValueError as e:
-            logger.error("Invalid dalertidRaw in Dalertid for "+str(self))
-            logger.error(e)
-            return None
+        member = self.DalertidMembers.get(self.dalertidRaw)
+        if member is None:
+            logger.error("Invalid dalertidRaw in Dalertid for "+str(self)+": "+str(self.dalertidRaw))
+        return member
 
     @staticmethod
     def build(raw):
@@ -2532,6 +3344,15 @@ class LidCgmAlertActivated(BaseEvent):
             param2 = param2,
         )
 
+    def encode(self):
+        raw = bytearray(self.raw.encode())
+        struct.pack_into(UINT32, raw, 10, self.dalertidRaw)
+        struct.pack_into(UINT32, raw, 14, self.faultlocatordata)
+        struct.pack_into(UINT32, raw, 18, self.param1)
+        struct.pack_into(FLOAT32, raw, 22, self.param2)
+
+        return bytes(raw)
+
     @property
     def eventTimestamp(self):
         return self.raw.timestamp
@@ -2563,6 +3384,12 @@ class LidCgmAlertCleared(BaseEvent):
     ID = 172
     NAME = "LID_CGM_ALERT_CLEARED"
 
+    # Field names, types and struct format of the whole event, in offset
+    # order, for decoding many events at once (see generic.decode_columns)
+    COLUMNS = ("dalertidRaw",)
+    COLUMN_TYPES = ("uint32",)
+    STRUCT = struct.Struct(">HIIIxxxxxxxxxxxx")
+
     raw: RawEvent
     dalertidRaw: int
 
@@ -2587,14 +3414,23 @@ class LidCgmAlertCleared(BaseEvent):
         CgmTransmitterExpired = 39
         PumpBluetoothError = 40
 
+    DalertidMembers = {
+        11: DalertidEnum.CgmSensorFail,
+        13: DalertidEnum.CgmSensorExpired,
+        14: DalertidEnum.CgmOutOfRange,
+        20: DalertidEnum.CgmTransmitterError,
+        26: DalertidEnum.CgmTemperature,
+        27: DalertidEnum.CgmFailedConnection,
+        39: DalertidEnum.CgmTransmitterExpired,
+        40: DalertidEnum.PumpBluetoothError,
+    }
+
     @property
     def dalertid(self):
-        try:
-            return self.DalertidEnum(self.dalertidRaw)
-        except ValueError as e:
-            logger.error("Invalid dalertidRaw in Dalertid for "+str(self))
-            logger.error(e)
-            return None
+        member = self.DalertidMembers.get(self.dalertidRaw)
+        if member is None:
+            logger.error("Invalid dalertidRaw in Dalertid for "+str(self)+": "+str(self.dalertidRaw))
+        return member
 
     @staticmethod
     def build(raw):
@@ -2605,6 +3441,12 @@ class LidCgmAlertCleared(BaseEvent):
             dalertidRaw = dalertid,
         )
 
+    def encode(self):
+        raw = bytearray(self.raw.encode())
+        struct.pack_into(UINT32, raw, 10, self.dalertidRaw)
+
+        return bytes(raw)
+
     @property
     def eventTimestamp(self):
         return self.raw.timestamp
@@ -2633,6 +3475,12 @@ class LidVersionInfo(BaseEvent):
     ID = 191
     NAME = "LID_VERSION_INFO"
 
+    # Field names, types and struct format of the whole event, in offset
+    # order, for decoding many events at once (see generic.decode_columns)
+    COLUMNS = ("version", "configabits", "configbbits", "armcrc")
+    COLUMN_TYPES = ("uint32", "uint32", "uint32", "uint16")
+    STRUCT = struct.Struct(">HIIIIIxxH")
+
     raw: RawEvent
     version: int
     configabits: int
@@ -2655,6 +3503,15 @@ class LidVersionInfo(BaseEvent):
             armcrc = armcrc,
         )
 
+    def encode(self):
+        raw = bytearray(self.raw.encode())
+        struct.pack_into(UINT32, raw, 10, self.version)
+        struct.pack_into(UINT32, raw, 14, self.configabits)
+        struct.pack_into(UINT32, raw, 18, self.configbbits)
+        struct.pack_into(UINT16, raw, 24, self.armcrc)
+
+        return bytes(raw)
+
     @property
     def eventTimestamp(self):
         return self.raw.timestamp
@@ -2686,6 +3543,12 @@ class LidUpdateStatus(BaseEvent):
     ID = 203
     NAME = "LID_UPDATE_STATUS"
 
+    # Field names, types and struct format of the whole event, in offset
+    # order, for decoding many events at once (see generic.decode_columns)
+    COLUMNS = ("metadataandversionstatus", "swupdatestatus", "filedlandsideloadstatus", "fulldlandcrcstatus", "updatesuccessfulRaw", "externalflashstatus", "swpartnum")
+    COLUMN_TYPES = ("uint16", "uint16", "uint16", "uint16", "uint8", "uint16", "uint32")
+    STRUCT = struct.Struct(">HIIHHHHxBHI")
+
     raw: RawEvent
     swupdatestatus: int
     metadataandversionstatus: int
@@ -2704,14 +3567,17 @@ class LidUpdateStatus(BaseEvent):
         UpdateNotSuccessful = 0
         UpdateSuccessful = 1
 
+    UpdatesuccessfulMembers = {
+        0: UpdatesuccessfulEnum.UpdateNotSuccessful,
+        1: UpdatesuccessfulEnum.UpdateSuccessful,
+    }
+
     @property
     def updatesuccessful(self):
-        try:
-            return self.UpdatesuccessfulEnum(self.updatesuccessfulRaw)
-        except ValueError as e:
-            logger.error("Invalid updatesuccessfulRaw in Updatesuccessful for "+str(self))
-            logger.error(e)
-            return None
+        member = self.UpdatesuccessfulMembers.get(self.updatesuccessfulRaw)
+        if member is None:
+            logger.error("Invalid updatesuccessfulRaw in Updatesuccessful for "+str(self)+": "+str(self.updatesuccessfulRaw))
+        return member
 
     @staticmethod
     def build(raw):
@@ -2734,6 +3600,18 @@ class LidUpdateStatus(BaseEvent):
             swpartnum = swpartnum,
         )
 
+    def encode(self):
+        raw = bytearray(self.raw.encode())
+        struct.pack_into(UINT16, raw, 12, self.swupdatestatus)
+        struct.pack_into(UINT16, raw, 10, self.metadataandversionstatus)
+        struct.pack_into(UINT16, raw, 16, self.fulldlandcrcstatus)
+        struct.pack_into(UINT16, raw, 14, self.filedlandsideloadstatus)
+        struct.pack_into(UINT16, raw, 20, self.externalflashstatus)
+        struct.pack_into(UINT8, raw, 19, self.updatesuccessfulRaw)
+        struct.pack_into(UINT32, raw, 22, self.swpartnum)
+
+        return bytes(raw)
+
     @property
     def eventTimestamp(self):
         return self.raw.timestamp
@@ -2768,6 +3646,12 @@ class LidCgmStartSessionGx(BaseEvent):
     ID = 212
     NAME = "LID_CGM_START_SESSION_GX"
 
+    # Field names, types and struct format of the whole event, in offset
+    # order, for decoding many events at once (see generic.decode_columns)
+    COLUMNS = ("currenttransmittertime", "sessionstarttime", "sessionduration")
+    COLUMN_TYPES = ("uint32", "uint32", "uint8")
+    STRUCT = struct.Struct(">HIIIIxxxxxxxB")
+
     raw: RawEvent
     currenttransmittertime: int # sec
     sessionstarttime: int # sec
@@ -2787,6 +3671,14 @@ class LidCgmStartSessionGx(BaseEvent):
             sessionduration = sessionduration,
         )
 
+    def encode(self):
+        raw = bytearray(self.raw.encode())
+        struct.pack_into(UINT32, raw, 10, self.currenttransmittertime)
+        struct.pack_into(UINT32, raw, 14, self.sessionstarttime)
+        struct.pack_into(UINT8, raw, 25, self.sessionduration)
+
+        return bytes(raw)
+
     @property
     def eventTimestamp(self):
         return self.raw.timestamp
@@ -2817,6 +3709,12 @@ class LidCgmJoinSessionGx(BaseEvent):
     ID = 213
     NAME = "LID_CGM_JOIN_SESSION_GX"
 
+    # Field names, types and struct format of the whole event, in offset
+    # order, for decoding many events at once (see generic.decode_columns)
+    COLUMNS = ("currenttransmittertime", "sessionstarttime", "sessionjoinreasonRaw", "sessionduration")
+    COLUMN_TYPES = ("uint32", "uint32", "uint8", "uint8")
+    STRUCT = struct.Struct(">HIIIIxxxxxxBB")
+
     raw: RawEvent
     currenttransmittertime: int # sec
     sessionstarttime: int # sec
@@ -2854,14 +3752,27 @@ class LidCgmJoinSessionGx(BaseEvent):
         DexblesReasonNewAutocalSessionStartedSuccess = 12
         DexblesReasonNoAutocalSessionInProgress = 13
 
+    SessionjoinreasonMembers = {
+        0: SessionjoinreasonEnum.DexblesReasonUser,
+        1: SessionjoinreasonEnum.DexblesReasonUnknown,
+        3: SessionjoinreasonEnum.DexblesReasonTxEndOfLife,
+        4: SessionjoinreasonEnum.DexblesReasonTransmitterError,
+        5: SessionjoinreasonEnum.DexblesReasonSessionStopSuccess,
+        6: SessionjoinreasonEnum.DexblesReasonTransmitterNotInSession,
+        8: SessionjoinreasonEnum.DexblesReasonNewSessionStartedSuccess,
+        9: SessionjoinreasonEnum.DexblesReasonSessionStartedInProgress,
+        10: SessionjoinreasonEnum.DexblesReasonTransmitterInSession,
+        11: SessionjoinreasonEnum.DexblesReasonBlestackInvalid,
+        12: SessionjoinreasonEnum.DexblesReasonNewAutocalSessionStartedSuccess,
+        13: SessionjoinreasonEnum.DexblesReasonNoAutocalSessionInProgress,
+    }
+
     @property
     def sessionjoinreason(self):
-        try:
-            return self.SessionjoinreasonEnum(self.sessionjoinreasonRaw)
-        except ValueError as e:
-            logger.error("Invalid sessionjoinreasonRaw in Sessionjoinreason for "+str(self))
-            logger.error(e)
-            return None
+        member = self.SessionjoinreasonMembers.get(self.sessionjoinreasonRaw)
+        if member is None:
+            logger.error("Invalid sessionjoinreasonRaw in Sessionjoinreason for "+str(self)+": "+str(self.sessionjoinreasonRaw))
+        return member
 
     @staticmethod
     def build(raw):
@@ -2878,6 +3789,15 @@ class LidCgmJoinSessionGx(BaseEvent):
             sessionjoinreasonRaw = sessionjoinreason,
         )
 
+    def encode(self):
+        raw = bytearray(self.raw.encode())
+        struct.pack_into(UINT32, raw, 10, self.currenttransmittertime)
+        struct.pack_into(UINT32, raw, 14, self.sessionstarttime)
+        struct.pack_into(UINT8, raw, 25, self.sessionduration)
+        struct.pack_into(UINT8, raw, 24, self.sessionjoinreasonRaw)
+
+        return bytes(raw)
+
     @property
     def eventTimestamp(self):
         return self.raw.timestamp
@@ -2909,6 +3829,12 @@ class LidCgmStopSessionGx(BaseEvent):
     ID = 214
     NAME = "LID_CGM_STOP_SESSION_GX"
 
+    # Field names, types and struct format of the whole event, in offset
+    # order, for decoding many events at once (see generic.decode_columns)
+    COLUMNS = ("currenttransmittertime", "sessionstarttime", "sessionstoptime", "sessionstopreasonRaw", "sessionduration")
+    COLUMN_TYPES = ("uint32", "uint32", "uint32", "uint8", "uint8")
+    STRUCT = struct.Struct(">HIIIIIxxBB")
+
     raw: RawEvent
     currenttransmittertime: int # sec
     sessionstarttime: int # sec
@@ -2947,14 +3873,27 @@ class LidCgmStopSessionGx(BaseEvent):
         DexblesReasonNewAutocalSessionStartedSuccess = 12
         DexblesReasonNoAutocalSessionInProgress = 13
 
+    SessionstopreasonMembers = {
+        0: SessionstopreasonEnum.DexblesReasonUser,
+        1: SessionstopreasonEnum.DexblesReasonUnknown,
+        3: SessionstopreasonEnum.DexblesReasonTxEndOfLife,
+        4: SessionstopreasonEnum.DexblesReasonTransmitterError,
+        5: SessionstopreasonEnum.DexblesReasonSessionStopSuccess,
+        6: SessionstopreasonEnum.DexblesReasonTransmitterNotInSession,
+        8: SessionstopreasonEnum.DexblesReasonNewSessionStartedSuccess,
+        9: SessionstopreasonEnum.DexblesReasonSessionStartedInProgress,
+        10: SessionstopreasonEnum.DexblesReasonTransmitterInSession,
+        11: SessionstopreasonEnum.DexblesReasonBlestackInvalid,
+        12: SessionstopreasonEnum.DexblesReasonNewAutocalSessionStartedSuccess,
+        13: SessionstopreasonEnum.DexblesReasonNoAutocalSessionInProgress,
+    }
+
     @property
     def sessionstopreason(self):
-        try:
-            return self.SessionstopreasonEnum(self.sessionstopreasonRaw)
-        except ValueError as e:
-            logger.error("Invalid sessionstopreasonRaw in Sessionstopreason for "+str(self))
-            logger.error(e)
-            return None
+        member = self.SessionstopreasonMembers.get(self.sessionstopreasonRaw)
+        if member is None:
+            logger.error("Invalid sessionstopreasonRaw in Sessionstopreason for "+str(self)+": "+str(self.sessionstopreasonRaw))
+        return member
 
     @staticmethod
     def build(raw):
@@ -2973,6 +3912,16 @@ class LidCgmStopSessionGx(BaseEvent):
             sessionstopreasonRaw = sessionstopreason,
         )
 
+    def encode(self):
+        raw = bytearray(self.raw.encode())
+        struct.pack_into(UINT32, raw, 10, self.currenttransmittertime)
+        struct.pack_into(UINT32, raw, 14, self.sessionstarttime)
+        struct.pack_into(UINT32, raw, 18, self.sessionstoptime)
+        struct.pack_into(UINT8, raw, 25, self.sessionduration)
+        struct.pack_into(UINT8, raw, 24, self.sessionstopreasonRaw)
+
+        return bytes(raw)
+
     @property
     def eventTimestamp(self):
         return self.raw.timestamp
@@ -3005,6 +3954,12 @@ class LidAaUserModeChange(BaseEvent):
     ID = 229
     NAME = "LID_AA_USER_MODE_CHANGE"
 
+    # Field names, types and struct format of the whole event, in offset
+    # order, for decoding many events at once (see generic.decode_columns)
+    COLUMNS = ("requestedactionRaw", "previoususermodeRaw", "currentusermodeRaw", "activesleepscheduleRaw", "sleepstartedbyguiRaw", "exercisetime", "exercisechoiceRaw", "exercisestoppedbytimerRaw", "eatingsoonstoppedbytimerRaw")
+    COLUMN_TYPES = ("uint8", "uint8", "uint8", "uint8", "uint8", "uint16", "uint8", "uint8", "uint8")
+    STRUCT = struct.Struct(">HIIxBBBxxBBHBBxxxB")
+
     raw: RawEvent
     exercisechoiceRaw: int
     exercisetime: int # minutes
@@ -3025,14 +3980,17 @@ class LidAaUserModeChange(BaseEvent):
         Continuous = 0
         Timed = 1
 
+    ExercisechoiceMembers = {
+        0: ExercisechoiceEnum.Continuous,
+        1: ExercisechoiceEnum.Timed,
+    }
+
     @property
     def exercisechoice(self):
-        try:
-            return self.ExercisechoiceEnum(self.exercisechoiceRaw)
-        except ValueError as e:
-            logger.error("Invalid exercisechoiceRaw in Exercisechoice for "+str(self))
-            logger.error(e)
-            return None
+        member = self.ExercisechoiceMembers.get(self.exercisechoiceRaw)
+        if member is None:
+            logger.error("Invalid exercisechoiceRaw in Exercisechoice for "+str(self)+": "+str(self.exercisechoiceRaw))
+        return member
 
     CurrentusermodeMap = {
         "0": "Normal",
@@ -3047,14 +4005,19 @@ class LidAaUserModeChange(BaseEvent):
         Exercising = 2
         EatingSoon = 3
 
+    CurrentusermodeMembers = {
+        0: CurrentusermodeEnum.Normal,
+        1: CurrentusermodeEnum.Sleeping,
+        2: CurrentusermodeEnum.Exercising,
+        3: CurrentusermodeEnum.EatingSoon,
+    }
+
     @property
     def currentusermode(self):
-        try:
-            return self.CurrentusermodeEnum(self.currentusermodeRaw)
-        except ValueError as e:
-            logger.error("Invalid currentusermodeRaw in Currentusermode for "+str(self))
-            logger.error(e)
-            return None
+        member = self.CurrentusermodeMembers.get(self.currentusermodeRaw)
+        if member is None:
+            logger.error("Invalid currentusermodeRaw in Currentusermode for "+str(self)+": "+str(self.currentusermodeRaw))
+        return member
 
     PrevioususermodeMap = {
         "0": "Normal",
@@ -3069,14 +4032,19 @@ class LidAaUserModeChange(BaseEvent):
         Exercising = 2
         EatingSoon = 3
 
+    PrevioususermodeMembers = {
+        0: PrevioususermodeEnum.Normal,
+        1: PrevioususermodeEnum.Sleeping,
+        2: PrevioususermodeEnum.Exercising,
+        3: PrevioususermodeEnum.EatingSoon,
+    }
+
     @property
     def previoususermode(self):
-        try:
-            return self.PrevioususermodeEnum(self.previoususermodeRaw)
-        except ValueError as e:
-            logger.error("Invalid previoususermodeRaw in Previoususermode for "+str(self))
-            logger.error(e)
-            return None
+        member = self.PrevioususermodeMembers.get(self.previoususermodeRaw)
+        if member is None:
+            logger.error("Invalid previoususermodeRaw in Previoususermode for "+str(self)+": "+str(self.previoususermodeRaw))
+        return member
 
     RequestedactionMap = {
         "0": "No User Request",
@@ -3099,14 +4067,23 @@ class LidAaUserModeChange(BaseEvent):
         StartEatingSoon = 6
         StopEatingSoon = 7
 
+    RequestedactionMembers = {
+        0: RequestedactionEnum.NoUserRequest,
+        1: RequestedactionEnum.StartSleep,
+        2: RequestedactionEnum.StopSleep,
+        3: RequestedactionEnum.StartExercise,
+        4: RequestedactionEnum.StopExercise,
+        5: RequestedactionEnum.StopAll,
+        6: RequestedactionEnum.StartEatingSoon,
+        7: RequestedactionEnum.StopEatingSoon,
+    }
+
     @property
     def requestedaction(self):
-        try:
-            return self.RequestedactionEnum(self.requestedactionRaw)
-        except ValueError as e:
-            logger.error("Invalid requestedactionRaw in Requestedaction for "+str(self))
-            logger.error(e)
-            return None
+        member = self.RequestedactionMembers.get(self.requestedactionRaw)
+        if member is None:
+            logger.error("Invalid requestedactionRaw in Requestedaction for "+str(self)+": "+str(self.requestedactionRaw))
+        return member
 
     SleepstartedbyguiMap = {
         "0": "FALSE",
@@ -3117,14 +4094,17 @@ class LidAaUserModeChange(BaseEvent):
         FalseVal = 0
         TrueVal = 1
 
+    SleepstartedbyguiMembers = {
+        0: SleepstartedbyguiEnum.FalseVal,
+        1: SleepstartedbyguiEnum.TrueVal,
+    }
+
     @property
     def sleepstartedbygui(self):
-        try:
-            return self.SleepstartedbyguiEnum(self.sleepstartedbyguiRaw)
-        except ValueError as e:
-            logger.error("Invalid sleepstartedbyguiRaw in Sleepstartedbygui for "+str(self))
-            logger.error(e)
-            return None
+        member = self.SleepstartedbyguiMembers.get(self.sleepstartedbyguiRaw)
+        if member is None:
+            logger.error("Invalid sleepstartedbyguiRaw in Sleepstartedbygui for "+str(self)+": "+str(self.sleepstartedbyguiRaw))
+        return member
 
     ExercisestoppedbytimerMap = {
         "0": "False",
@@ -3135,14 +4115,17 @@ class LidAaUserModeChange(BaseEvent):
         FalseVal = 0
         TrueVal = 1
 
+    ExercisestoppedbytimerMembers = {
+        0: ExercisestoppedbytimerEnum.FalseVal,
+        1: ExercisestoppedbytimerEnum.TrueVal,
+    }
+
     @property
     def exercisestoppedbytimer(self):
-        try:
-            return self.ExercisestoppedbytimerEnum(self.exercisestoppedbytimerRaw)
-        except ValueError as e:
-            logger.error("Invalid exercisestoppedbytimerRaw in Exercisestoppedbytimer for "+str(self))
-            logger.error(e)
-            return None
+        member = self.ExercisestoppedbytimerMembers.get(self.exercisestoppedbytimerRaw)
+        if member is None:
+            logger.error("Invalid exercisestoppedbytimerRaw in Exercisestoppedbytimer for "+str(self)+": "+str(self.exercisestoppedbytimerRaw))
+        return member
 
     ActivesleepscheduleMap = {
         "0": "Sleep Schedule 1 is Active",
@@ -3157,6 +4140,14 @@ class LidAaUserModeChange(BaseEvent):
         SleepSchedule3IsActive = 2**2
         SleepSchedule4IsActive = 2**3
 
+    ActivesleepscheduleNames = {
+        0: (),
+        1: ("SleepSchedule1IsActive",),
+        2: ("SleepSchedule2IsActive",),
+        4: ("SleepSchedule3IsActive",),
+        8: ("SleepSchedule4IsActive",),
+    }
+
     @property
     def activesleepschedule(self):
         try:
@@ -3166,6 +4157,13 @@ class LidAaUserModeChange(BaseEvent):
             logger.error(e)
             return None
 
+    @property
+    def activesleepscheduleNames(self):
+        names = self.ActivesleepscheduleNames.get(self.activesleepscheduleRaw)
+        if names is None:
+            names = bitmask_names(self.ActivesleepscheduleBitmask, self.activesleepscheduleRaw)
+        return names
+
     EatingsoonstoppedbytimerMap = {
         "0": "False",
         "1": "True"
@@ -3175,14 +4173,17 @@ class LidAaUserModeChange(BaseEvent):
         FalseVal = 0
         TrueVal = 1
 
+    EatingsoonstoppedbytimerMembers = {
+        0: EatingsoonstoppedbytimerEnum.FalseVal,
+        1: EatingsoonstoppedbytimerEnum.TrueVal,
+    }
+
     @property
     def eatingsoonstoppedbytimer(self):
-        try:
-            return self.EatingsoonstoppedbytimerEnum(self.eatingsoonstoppedbytimerRaw)
-        except ValueError as e:
-            logger.error("Invalid eatingsoonstoppedbytimerRaw in Eatingsoonstoppedbytimer for "+str(self))
-            logger.error(e)
-            return None
+        member = self.EatingsoonstoppedbytimerMembers.get(self.eatingsoonstoppedbytimerRaw)
+        if member is None:
+            logger.error("Invalid eatingsoonstoppedbytimerRaw in Eatingsoonstoppedbytimer for "+str(self)+": "+str(self.eatingsoonstoppedbytimerRaw))
+        return member
 
     @staticmethod
     def build(raw):
@@ -3209,6 +4210,20 @@ class LidAaUserModeChange(BaseEvent):
             eatingsoonstoppedbytimerRaw = eatingsoonstoppedbytimer,
         )
 
+    def encode(self):
+        raw = bytearray(self.raw.encode())
+        struct.pack_into(UINT8, raw, 20, self.exercisechoiceRaw)
+        struct.pack_into(UINT16, raw, 18, self.exercisetime)
+        struct.pack_into(UINT8, raw, 13, self.currentusermodeRaw)
+        struct.pack_into(UINT8, raw, 12, self.previoususermodeRaw)
+        struct.pack_into(UINT8, raw, 11, self.requestedactionRaw)
+        struct.pack_into(UINT8, raw, 17, self.sleepstartedbyguiRaw)
+        struct.pack_into(UINT8, raw, 21, self.exercisestoppedbytimerRaw)
+        struct.pack_into(UINT8, raw, 16, self.activesleepscheduleRaw)
+        struct.pack_into(UINT8, raw, 25, self.eatingsoonstoppedbytimerRaw)
+
+        return bytes(raw)
+
     @property
     def eventTimestamp(self):
         return self.raw.timestamp
@@ -3245,6 +4260,12 @@ class LidAaPcmChange(BaseEvent):
     ID = 230
     NAME = "LID_AA_PCM_CHANGE"
 
+    # Field names, types and struct format of the whole event, in offset
+    # order, for decoding many events at once (see generic.decode_columns)
+    COLUMNS = ("calculationavailableRaw", "pumpsuspendedRaw", "previouspcmRaw", "currentpcmRaw", "sufficientclosedloopparamsRaw", "closedlooppreferredRaw", "cgmavailableRaw")
+    COLUMN_TYPES = ("uint8", "uint8", "uint8", "uint8", "uint8", "uint8", "uint8")
+    STRUCT = struct.Struct(">HIIBBBBxBBBxxxxxxxx")
+
     raw: RawEvent
     currentpcmRaw: int
     previouspcmRaw: int
@@ -3267,14 +4288,19 @@ class LidAaPcmChange(BaseEvent):
         Pining = 2
         ClosedLoop = 3
 
+    CurrentpcmMembers = {
+        0: CurrentpcmEnum.NoControl,
+        1: CurrentpcmEnum.OpenLoop,
+        2: CurrentpcmEnum.Pining,
+        3: CurrentpcmEnum.ClosedLoop,
+    }
+
     @property
     def currentpcm(self):
-        try:
-            return self.CurrentpcmEnum(self.currentpcmRaw)
-        except ValueError as e:
-            logger.error("Invalid currentpcmRaw in Currentpcm for "+str(self))
-            logger.error(e)
-            return None
+        member = self.CurrentpcmMembers.get(self.currentpcmRaw)
+        if member is None:
+            logger.error("Invalid currentpcmRaw in Currentpcm for "+str(self)+": "+str(self.currentpcmRaw))
+        return member
 
     PreviouspcmMap = {
         "0": "No Control",
@@ -3289,14 +4315,19 @@ class LidAaPcmChange(BaseEvent):
         Pining = 2
         ClosedLoop = 3
 
+    PreviouspcmMembers = {
+        0: PreviouspcmEnum.NoControl,
+        1: PreviouspcmEnum.OpenLoop,
+        2: PreviouspcmEnum.Pining,
+        3: PreviouspcmEnum.ClosedLoop,
+    }
+
     @property
     def previouspcm(self):
-        try:
-            return self.PreviouspcmEnum(self.previouspcmRaw)
-        except ValueError as e:
-            logger.error("Invalid previouspcmRaw in Previouspcm for "+str(self))
-            logger.error(e)
-            return None
+        member = self.PreviouspcmMembers.get(self.previouspcmRaw)
+        if member is None:
+            logger.error("Invalid previouspcmRaw in Previouspcm for "+str(self)+": "+str(self.previouspcmRaw))
+        return member
 
     PumpsuspendedMap = {
         "0": "FALSE",
@@ -3307,14 +4338,17 @@ class LidAaPcmChange(BaseEvent):
         FalseVal = 0
         TrueVal = 1
 
+    PumpsuspendedMembers = {
+        0: PumpsuspendedEnum.FalseVal,
+        1: PumpsuspendedEnum.TrueVal,
+    }
+
     @property
     def pumpsuspended(self):
-        try:
-            return self.PumpsuspendedEnum(self.pumpsuspendedRaw)
-        except ValueError as e:
-            logger.error("Invalid pumpsuspendedRaw in Pumpsuspended for "+str(self))
-            logger.error(e)
-            return None
+        member = self.PumpsuspendedMembers.get(self.pumpsuspendedRaw)
+        if member is None:
+            logger.error("Invalid pumpsuspendedRaw in Pumpsuspended for "+str(self)+": "+str(self.pumpsuspendedRaw))
+        return member
 
     CalculationavailableMap = {
         "0": "FALSE",
@@ -3325,14 +4359,17 @@ class LidAaPcmChange(BaseEvent):
         FalseVal = 0
         TrueVal = 1
 
+    CalculationavailableMembers = {
+        0: CalculationavailableEnum.FalseVal,
+        1: CalculationavailableEnum.TrueVal,
+    }
+
     @property
     def calculationavailable(self):
-        try:
-            return self.CalculationavailableEnum(self.calculationavailableRaw)
-        except ValueError as e:
-            logger.error("Invalid calculationavailableRaw in Calculationavailable for "+str(self))
-            logger.error(e)
-            return None
+        member = self.CalculationavailableMembers.get(self.calculationavailableRaw)
+        if member is None:
+            logger.error("Invalid calculationavailableRaw in Calculationavailable for "+str(self)+": "+str(self.calculationavailableRaw))
+        return member
 
     CgmavailableMap = {
         "0": "FALSE",
@@ -3343,14 +4380,17 @@ class LidAaPcmChange(BaseEvent):
         FalseVal = 0
         TrueVal = 1
 
+    CgmavailableMembers = {
+        0: CgmavailableEnum.FalseVal,
+        1: CgmavailableEnum.TrueVal,
+    }
+
     @property
     def cgmavailable(self):
-        try:
-            return self.CgmavailableEnum(self.cgmavailableRaw)
-        except ValueError as e:
-            logger.error("Invalid cgmavailableRaw in Cgmavailable for "+str(self))
-            logger.error(e)
-            return None
+        member = self.CgmavailableMembers.get(self.cgmavailableRaw)
+        if member is None:
+            logger.error("Invalid cgmavailableRaw in Cgmavailable for "+str(self)+": "+str(self.cgmavailableRaw))
+        return member
 
     ClosedlooppreferredMap = {
         "0": "FALSE",
@@ -3361,14 +4401,17 @@ class LidAaPcmChange(BaseEvent):
         FalseVal = 0
         TrueVal = 1
 
+    ClosedlooppreferredMembers = {
+        0: ClosedlooppreferredEnum.FalseVal,
+        1: ClosedlooppreferredEnum.TrueVal,
+    }
+
     @property
     def closedlooppreferred(self):
-        try:
-            return self.ClosedlooppreferredEnum(self.closedlooppreferredRaw)
-        except ValueError as e:
-            logger.error("Invalid closedlooppreferredRaw in Closedlooppreferred for "+str(self))
-            logger.error(e)
-            return None
+        member = self.ClosedlooppreferredMembers.get(self.closedlooppreferredRaw)
+        if member is None:
+            logger.error("Invalid closedlooppreferredRaw in Closedlooppreferred for "+str(self)+": "+str(self.closedlooppreferredRaw))
+        return member
 
     SufficientclosedloopparamsMap = {
         "0": "FALSE",
@@ -3379,14 +4422,17 @@ class LidAaPcmChange(BaseEvent):
         FalseVal = 0
         TrueVal = 1
 
+    SufficientclosedloopparamsMembers = {
+        0: SufficientclosedloopparamsEnum.FalseVal,
+        1: SufficientclosedloopparamsEnum.TrueVal,
+    }
+
     @property
     def sufficientclosedloopparams(self):
-        try:
-            return self.SufficientclosedloopparamsEnum(self.sufficientclosedloopparamsRaw)
-        except ValueError as e:
-            logger.error("Invalid sufficientclosedloopparamsRaw in Sufficientclosedloopparams for "+str(self))
-            logger.error(e)
-            return None
+        member = self.SufficientclosedloopparamsMembers.get(self.sufficientclosedloopparamsRaw)
+        if member is None:
+            logger.error("Invalid sufficientclosedloopparamsRaw in Sufficientclosedloopparams for "+str(self)+": "+str(self.sufficientclosedloopparamsRaw))
+        return member
 
     @staticmethod
     def build(raw):
@@ -3409,6 +4455,18 @@ class LidAaPcmChange(BaseEvent):
             sufficientclosedloopparamsRaw = sufficientclosedloopparams,
         )
 
+    def encode(self):
+        raw = bytearray(self.raw.encode())
+        struct.pack_into(UINT8, raw, 13, self.currentpcmRaw)
+        struct.pack_into(UINT8, raw, 12, self.previouspcmRaw)
+        struct.pack_into(UINT8, raw, 11, self.pumpsuspendedRaw)
+        struct.pack_into(UINT8, raw, 10, self.calculationavailableRaw)
+        struct.pack_into(UINT8, raw, 17, self.cgmavailableRaw)
+        struct.pack_into(UINT8, raw, 16, self.closedlooppreferredRaw)
+        struct.pack_into(UINT8, raw, 15, self.sufficientclosedloopparamsRaw)
+
+        return bytes(raw)
+
     @property
     def eventTimestamp(self):
         return self.raw.timestamp
@@ -3443,6 +4501,12 @@ class LidCgmDataGxb(BaseEvent):
     ID = 256
     NAME = "LID_CGM_DATA_GXB"
 
+    # Field names, types and struct format of the whole event, in offset
+    # order, for decoding many events at once (see generic.decode_columns)
+    COLUMNS = ("rateRaw", "cgmDataTypeRaw", "glucosevaluestatusRaw", "currentglucosedisplayvalue", "RSSI", "algorithmstate", "egvTimestamp", "interval", "egvInfoBitmaskRaw")
+    COLUMN_TYPES = ("int8", "uint8", "uint16", "uint16", "int8", "uint8", "uint32", "uint8", "uint16")
+    STRUCT = struct.Struct(">HIIbBHHbBIxBH")
+
     raw: RawEvent
     glucosevaluestatusRaw: int
     cgmDataTypeRaw: int
@@ -3465,14 +4529,18 @@ class LidCgmDataGxb(BaseEvent):
         TheGlucoseReadingIsHigh = 1
         TheGlucoseReadingIsLow = 2
 
+    GlucosevaluestatusMembers = {
+        0: GlucosevaluestatusEnum.CurrentglucosedisplayvalueContainsTheGlucoseReading,
+        1: GlucosevaluestatusEnum.TheGlucoseReadingIsHigh,
+        2: GlucosevaluestatusEnum.TheGlucoseReadingIsLow,
+    }
+
     @property
     def glucosevaluestatus(self):
-        try:
-            return self.GlucosevaluestatusEnum(self.glucosevaluestatusRaw)
-        except ValueError as e:
-            logger.error("Invalid glucosevaluestatusRaw in Glucosevaluestatus for "+str(self))
-            logger.error(e)
-            return None
+        member = self.GlucosevaluestatusMembers.get(self.glucosevaluestatusRaw)
+        if member is None:
+            logger.error("Invalid glucosevaluestatusRaw in Glucosevaluestatus for "+str(self)+": "+str(self.glucosevaluestatusRaw))
+        return member
 
     CgmdatatypeMap = {
         "0": "Five Minute Reading (FMR)",
@@ -3489,6 +4557,15 @@ class LidCgmDataGxb(BaseEvent):
         Calibration = 2**3
         NoneVal = 2**4
 
+    CgmdatatypeNames = {
+        0: (),
+        1: ("FiveMinuteReadingFmr",),
+        2: ("Backfill",),
+        4: ("ImmediateMatchValue",),
+        8: ("Calibration",),
+        16: ("NoneVal",),
+    }
+
     @property
     def cgmDataType(self):
         try:
@@ -3498,6 +4575,13 @@ class LidCgmDataGxb(BaseEvent):
             logger.error(e)
             return None
 
+    @property
+    def cgmDataTypeNames(self):
+        names = self.CgmdatatypeNames.get(self.cgmDataTypeRaw)
+        if names is None:
+            names = bitmask_names(self.CgmdatatypeBitmask, self.cgmDataTypeRaw)
+        return names
+
     @property
     def rate(self):
         return self.rateRaw * 0.1
@@ -3525,6 +4609,19 @@ class LidCgmDataGxb(BaseEvent):
         ValidAlgstateAlgstateIs6 = 2**7
         EgvWasSuccessfullyAddedToCgmSubsystemArrayE = 2**8
 
+    EgvinfobitmaskNames = {
+        0: (),
+        1: ("FiveMinuteReadingFmr",),
+        2: ("Backfill",),
+        4: ("ImmediateMatchValue",),
+        8: ("CrrEgvIsResultOfCalibration",),
+        16: ("NoEgvMessage",),
+        32: ("ValidTimestamp",),
+        64: ("ValidEgvValidRange",),
+        128: ("ValidAlgstateAlgstateIs6",),
+        256: ("EgvWasSuccessfullyAddedToCgmSubsystemArrayE",),
+    }
+
     @property
     def egvInfoBitmask(self):
         try:
@@ -3534,6 +4631,13 @@ class LidCgmDataGxb(BaseEvent):
             logger.error(e)
             return None
 
+    @property
+    def egvInfoBitmaskNames(self):
+        names = self.EgvinfobitmaskNames.get(self.egvInfoBitmaskRaw)
+        if names is None:
+            names = bitmask_names(self.EgvinfobitmaskBitmask, self.egvInfoBitmaskRaw)
+        return names
+
     @staticmethod
     def build(raw):
         glucosevaluestatus, = struct.unpack_from(UINT16, raw[:EVENT_LEN], 12)
@@ -3559,6 +4663,20 @@ class LidCgmDataGxb(BaseEvent):
             interval = interval,
         )
 
+    def encode(self):
+        raw = bytearray(self.raw.encode())
+        struct.pack_into(UINT16, raw, 12, self.glucosevaluestatusRaw)
+        struct.pack_into(UINT8, raw, 11, self.cgmDataTypeRaw)
+        struct.pack_into(INT8, raw, 10, self.rateRaw)
+        struct.pack_into(UINT8, raw, 17, self.algorithmstate)
+        struct.pack_into(INT8, raw, 16, self.RSSI)
+        struct.pack_into(UINT16, raw, 14, self.currentglucosedisplayvalue)
+        struct.pack_into(UINT32, raw, 18, self.egvTimestamp)
+        struct.pack_into(UINT16, raw, 24, self.egvInfoBitmaskRaw)
+        struct.pack_into(UINT8, raw, 23, self.interval)
+
+        return bytes(raw)
+
     @property
     def eventTimestamp(self):
         return self.raw.timestamp
@@ -3595,6 +4713,12 @@ class LidBasalDelivery(BaseEvent):
     ID = 279
     NAME = "LID_BASAL_DELIVERY"
 
+    # Field names, types and struct format of the whole event, in offset
+    # order, for decoding many events at once (see generic.decode_columns)
+    COLUMNS = ("commandedRateSourceRaw", "profileBasalRate", "commandedRate", "tempRate", "algorithmRate")
+    COLUMN_TYPES = ("uint16", "uint16", "uint16", "uint16", "uint16")
+    STRUCT = struct.Struct(">HIIxxHHHHHxxxx")
+
     raw: RawEvent
     commandedRateSourceRaw: int
     commandedRate: int # milliunits/hr
@@ -3617,14 +4741,20 @@ class LidBasalDelivery(BaseEvent):
         Algorithm = 3
         TempRateAndAlgorithm = 4
 
+    CommandedratesourceMembers = {
+        0: CommandedratesourceEnum.Suspended,
+        1: CommandedratesourceEnum.Profile,
+        2: CommandedratesourceEnum.TempRate,
+        3: CommandedratesourceEnum.Algorithm,
+        4: CommandedratesourceEnum.TempRateAndAlgorithm,
+    }
+
     @property
     def commandedRateSource(self):
-        try:
-            return self.CommandedratesourceEnum(self.commandedRateSourceRaw)
-        except ValueError as e:
-            logger.error("Invalid commandedRateSourceRaw in Commandedratesource for "+str(self))
-            logger.error(e)
-            return None
+        member = self.CommandedratesourceMembers.get(self.commandedRateSourceRaw)
+        if member is None:
+            logger.error("Invalid commandedRateSourceRaw in Commandedratesource for "+str(self)+": "+str(self.commandedRateSourceRaw))
+        return member
 
     @staticmethod
     def build(raw):
@@ -3643,6 +4773,16 @@ class LidBasalDelivery(BaseEvent):
             tempRate = tempRate,
         )
 
+    def encode(self):
+        raw = bytearray(self.raw.encode())
+        struct.pack_into(UINT16, raw, 12, self.commandedRateSourceRaw)
+        struct.pack_into(UINT16, raw, 16, self.commandedRate)
+        struct.pack_into(UINT16, raw, 14, self.profileBasalRate)
+        struct.pack_into(UINT16, raw, 20, self.algorithmRate)
+        struct.pack_into(UINT16, raw, 18, self.tempRate)
+
+        return bytes(raw)
+
     @property
     def eventTimestamp(self):
         return self.raw.timestamp
@@ -3675,6 +4815,12 @@ class LidBolusDelivery(BaseEvent):
     ID = 280
     NAME = "LID_BOLUS_DELIVERY"
 
+    # Field names, types and struct format of the whole event, in offset
+    # order, for decoding many events at once (see generic.decode_columns)
+    COLUMNS = ("bolusTypeRaw", "bolusDeliveryStatusRaw", "bolusid", "requestedNow", "remoteId", "bolusSourceRaw", "correction", "requestedLater", "deliveredTotal", "extendedDurationRequested")
+    COLUMN_TYPES = ("uint8", "uint8", "uint16", "uint16", "uint8", "uint8", "uint16", "uint16", "uint16", "uint16")
+    STRUCT = struct.Struct(">HIIBBHHBBHHHH")
+
     raw: RawEvent
     bolusid: int
     bolusDeliveryStatusRaw: int
@@ -3696,14 +4842,17 @@ class LidBolusDelivery(BaseEvent):
         BolusCompleted = 0
         BolusStarted = 1
 
+    BolusdeliverystatusMembers = {
+        0: BolusdeliverystatusEnum.BolusCompleted,
+        1: BolusdeliverystatusEnum.BolusStarted,
+    }
+
     @property
     def bolusDeliveryStatus(self):
-        try:
-            return self.BolusdeliverystatusEnum(self.bolusDeliveryStatusRaw)
-        except ValueError as e:
-            logger.error("Invalid bolusDeliveryStatusRaw in Bolusdeliverystatus for "+str(self))
-            logger.error(e)
-            return None
+        member = self.BolusdeliverystatusMembers.get(self.bolusDeliveryStatusRaw)
+        if member is None:
+            logger.error("Invalid bolusDeliveryStatusRaw in Bolusdeliverystatus for "+str(self)+": "+str(self.bolusDeliveryStatusRaw))
+        return member
 
     BolustypeMap = {
         "0": "Now",
@@ -3722,6 +4871,16 @@ class LidBolusDelivery(BaseEvent):
         Carb = 2**4
         EatingSoonMode = 2**5
 
+    BolustypeNames = {
+        0: (),
+        1: ("Now",),
+        2: ("Later",),
+        4: ("Override",),
+        8: ("Correction",),
+        16: ("Carb",),
+        32: ("EatingSoonMode",),
+    }
+
     @property
     def bolusType(self):
         try:
@@ -3731,6 +4890,13 @@ class LidBolusDelivery(BaseEvent):
             logger.error(e)
             return None
 
+    @property
+    def bolusTypeNames(self):
+        names = self.BolustypeNames.get(self.bolusTypeRaw)
+        if names is None:
+            names = bitmask_names(self.BolustypeBitmask, self.bolusTypeRaw)
+        return names
+
     BolussourceMap = {
         "0": "Pump Button",
         "1": "Pump GUI",
@@ -3752,14 +4918,21 @@ class LidBolusDelivery(BaseEvent):
         Ble = 8
         EatingSoonBolus = 9
 
+    BolussourceMembers = {
+        0: BolussourceEnum.PumpButton,
+        1: BolussourceEnum.PumpGui,
+        5: BolussourceEnum.Remote,
+        7: BolussourceEnum.Algorithm,
+        8: BolussourceEnum.Ble,
+        9: BolussourceEnum.EatingSoonBolus,
+    }
+
     @property
     def bolusSource(self):
-        try:
-            return self.BolussourceEnum(self.bolusSourceRaw)
-        except ValueError as e:
-            logger.error("Invalid bolusSourceRaw in Bolussource for "+str(self))
-            logger.error(e)
-            return None
+        member = self.BolussourceMembers.get(self.bolusSourceRaw)
+        if member is None:
+            logger.error("Invalid bolusSourceRaw in Bolussource for "+str(self)+": "+str(self.bolusSourceRaw))
+        return member
 
     @staticmethod
     def build(raw):
@@ -3788,6 +4961,21 @@ class LidBolusDelivery(BaseEvent):
             correction = correction,
         )
 
+    def encode(self):
+        raw = bytearray(self.raw.encode())
+        struct.pack_into(UINT16, raw, 12, self.bolusid)
+        struct.pack_into(UINT8, raw, 11, self.bolusDeliveryStatusRaw)
+        struct.pack_into(UINT8, raw, 10, self.bolusTypeRaw)
+        struct.pack_into(UINT8, raw, 17, self.bolusSourceRaw)
+        struct.pack_into(UINT8, raw, 16, self.remoteId)
+        struct.pack_into(UINT16, raw, 14, self.requestedNow)
+        struct.pack_into(UINT16, raw, 20, self.requestedLater)
+        struct.pack_into(UINT16, raw, 24, self.extendedDurationRequested)
+        struct.pack_into(UINT16, raw, 22, self.deliveredTotal)
+        struct.pack_into(UINT16, raw, 18, self.correction)
+
+        return bytes(raw)
+
     @property
     def eventTimestamp(self):
         return self.raw.timestamp
@@ -3825,6 +5013,12 @@ class LidVersionsA(BaseEvent):
     ID = 307
     NAME = "LID_VERSIONS_A"
 
+    # Field names, types and struct format of the whole event, in offset
+    # order, for decoding many events at once (see generic.decode_columns)
+    COLUMNS = ("armpartnumber", "armswversion", "blepartnumber", "bleswversion")
+    COLUMN_TYPES = ("uint32", "uint32", "uint32", "uint32")
+    STRUCT = struct.Struct(">HIIIIII")
+
     raw: RawEvent
     armpartnumber: int
     armswversion: int
@@ -3847,6 +5041,15 @@ class LidVersionsA(BaseEvent):
             bleswversion = bleswversion,
         )
 
+    def encode(self):
+        raw = bytearray(self.raw.encode())
+        struct.pack_into(UINT32, raw, 10, self.armpartnumber)
+        struct.pack_into(UINT32, raw, 14, self.armswversion)
+        struct.pack_into(UINT32, raw, 18, self.blepartnumber)
+        struct.pack_into(UINT32, raw, 22, self.bleswversion)
+
+        return bytes(raw)
+
     @property
     def eventTimestamp(self):
         return self.raw.timestamp
@@ -3878,6 +5081,12 @@ class LidAaDailyStatus(BaseEvent):
     ID = 313
     NAME = "LID_AA_DAILY_STATUS"
 
+    # Field names, types and struct format of the whole event, in offset
+    # order, for decoding many events at once (see generic.decode_columns)
+    COLUMNS = ("sensortypeRaw", "usermodeRaw", "pumpcontrolstateRaw")
+    COLUMN_TYPES = ("uint8", "uint8", "uint8")
+    STRUCT = struct.Struct(">HIIxBBBxxxxxxxxxxxx")
+
     raw: RawEvent
     pumpcontrolstateRaw: int
     usermodeRaw: int
@@ -3896,14 +5105,19 @@ class LidAaDailyStatus(BaseEvent):
         PcmPining = 2
         PcmClosedLoop = 3
 
+    PumpcontrolstateMembers = {
+        0: PumpcontrolstateEnum.PcmNoControlNoCartridgeInstalled,
+        1: PumpcontrolstateEnum.PcmOpenLoop,
+        2: PumpcontrolstateEnum.PcmPining,
+        3: PumpcontrolstateEnum.PcmClosedLoop,
+    }
+
     @property
     def pumpcontrolstate(self):
-        try:
-            return self.PumpcontrolstateEnum(self.pumpcontrolstateRaw)
-        except ValueError as e:
-            logger.error("Invalid pumpcontrolstateRaw in Pumpcontrolstate for "+str(self))
-            logger.error(e)
-            return None
+        member = self.PumpcontrolstateMembers.get(self.pumpcontrolstateRaw)
+        if member is None:
+            logger.error("Invalid pumpcontrolstateRaw in Pumpcontrolstate for "+str(self)+": "+str(self.pumpcontrolstateRaw))
+        return member
 
     UsermodeMap = {
         "0": "Normal",
@@ -3916,14 +5130,18 @@ class LidAaDailyStatus(BaseEvent):
         Sleeping = 1
         Exercising = 2
 
+    UsermodeMembers = {
+        0: UsermodeEnum.Normal,
+        1: UsermodeEnum.Sleeping,
+        2: UsermodeEnum.Exercising,
+    }
+
     @property
     def usermode(self):
-        try:
-            return self.UsermodeEnum(self.usermodeRaw)
-        except ValueError as e:
-            logger.error("Invalid usermodeRaw in Usermode for "+str(self))
-            logger.error(e)
-            return None
+        member = self.UsermodeMembers.get(self.usermodeRaw)
+        if member is None:
+            logger.error("Invalid usermodeRaw in Usermode for "+str(self)+": "+str(self.usermodeRaw))
+        return member
 
     SensortypeMap = {
         "0": "CGM_TYPE_NONE",
@@ -3938,14 +5156,19 @@ class LidAaDailyStatus(BaseEvent):
         CgmTypeLibre2 = 2
         CgmTypeDexcomG7 = 3
 
+    SensortypeMembers = {
+        0: SensortypeEnum.CgmTypeNone,
+        1: SensortypeEnum.CgmTypeDexcomG6,
+        2: SensortypeEnum.CgmTypeLibre2,
+        3: SensortypeEnum.CgmTypeDexcomG7,
+    }
+
     @property
     def sensortype(self):
-        try:
-            return self.SensortypeEnum(self.sensortypeRaw)
-        except ValueError as e:
-            logger.error("Invalid sensortypeRaw in Sensortype for "+str(self))
-            logger.error(e)
-            return None
+        member = self.SensortypeMembers.get(self.sensortypeRaw)
+        if member is None:
+            logger.error("Invalid sensortypeRaw in Sensortype for "+str(self)+": "+str(self.sensortypeRaw))
+        return member
 
     @staticmethod
     def build(raw):
@@ -3960,6 +5183,14 @@ class LidAaDailyStatus(BaseEvent):
             sensortypeRaw = sensortype,
         )
 
+    def encode(self):
+        raw = bytearray(self.raw.encode())
+        struct.pack_into(UINT8, raw, 13, self.pumpcontrolstateRaw)
+        struct.pack_into(UINT8, raw, 12, self.usermodeRaw)
+        struct.pack_into(UINT8, raw, 11, self.sensortypeRaw)
+
+        return bytes(raw)
+
     @property
     def eventTimestamp(self):
         return self.raw.timestamp
@@ -3990,6 +5221,12 @@ class LidCgmAlertActivatedDex(BaseEvent):
     ID = 369
     NAME = "LID_CGM_ALERT_ACTIVATED_DEX"
 
+    # Field names, types and struct format of the whole event, in offset
+    # order, for decoding many events at once (see generic.decode_columns)
+    COLUMNS = ("sensortypeRaw", "dalertidRaw", "faultlocatordata", "param1", "param2")
+    COLUMN_TYPES = ("uint8", "uint8", "uint32", "uint32", "float32")
+    STRUCT = struct.Struct(">HIIxxBBIIf")
+
     raw: RawEvent
     dalertidRaw: int
     sensortypeRaw: int
@@ -4018,14 +5255,23 @@ class LidCgmAlertActivatedDex(BaseEvent):
         CgmTransmitterExpired = 39
         PumpBluetoothError = 40
 
+    DalertidMembers = {
+        11: DalertidEnum.CgmSensorFail,
+        13: DalertidEnum.CgmSensorExpired,
+        14: DalertidEnum.CgmOutOfRange,
+        20: DalertidEnum.CgmTransmitterError,
+        26: DalertidEnum.CgmTemperature,
+        27: DalertidEnum.CgmFailedConnection,
+        39: DalertidEnum.CgmTransmitterExpired,
+        40: DalertidEnum.PumpBluetoothError,
+    }
+
     @property
     def dalertid(self):
-        try:
-            return self.DalertidEnum(self.dalertidRaw)
-        except ValueError as e:
-            logger.error("Invalid dalertidRaw in Dalertid for "+str(self))
-            logger.error(e)
-            return None
+        member = self.DalertidMembers.get(self.dalertidRaw)
+        if member is None:
+            logger.error("Invalid dalertidRaw in Dalertid for "+str(self)+": "+str(self.dalertidRaw))
+        return member
 
     SensortypeMap = {
         "0": "Invalid",
@@ -4038,14 +5284,18 @@ class LidCgmAlertActivatedDex(BaseEvent):
         CgmTypeDexcomG6 = 1
         CgmTypeDexcomG7 = 3
 
+    SensortypeMembers = {
+        0: SensortypeEnum.Invalid,
+        1: SensortypeEnum.CgmTypeDexcomG6,
+        3: SensortypeEnum.CgmTypeDexcomG7,
+    }
+
     @property
     def sensortype(self):
-        try:
-            return self.SensortypeEnum(self.sensortypeRaw)
-        except ValueError as e:
-            logger.error("Invalid sensortypeRaw in Sensortype for "+str(self))
-            logger.error(e)
-            return None
+        member = self.SensortypeMembers.get(self.sensortypeRaw)
+        if member is None:
+            logger.error("Invalid sensortypeRaw in Sensortype for "+str(self)+": "+str(self.sensortypeRaw))
+        return member
 
     @staticmethod
     def build(raw):
@@ -4064,6 +5314,16 @@ class LidCgmAlertActivatedDex(BaseEvent):
             param2 = param2,
         )
 
+    def encode(self):
+        raw = bytearray(self.raw.encode())
+        struct.pack_into(UINT8, raw, 13, self.dalertidRaw)
+        struct.pack_into(UINT8, raw, 12, self.sensortypeRaw)
+        struct.pack_into(UINT32, raw, 14, self.faultlocatordata)
+        struct.pack_into(UINT32, raw, 18, self.param1)
+        struct.pack_into(FLOAT32, raw, 22, self.param2)
+
+        return bytes(raw)
+
     @property
     def eventTimestamp(self):
         return self.raw.timestamp
@@ -4096,6 +5356,12 @@ class LidCgmAlertClearedDex(BaseEvent):
     ID = 370
     NAME = "LID_CGM_ALERT_CLEARED_DEX"
 
+    # Field names, types and struct format of the whole event, in offset
+    # order, for decoding many events at once (see generic.decode_columns)
+    COLUMNS = ("sensortypeRaw", "dalertidRaw")
+    COLUMN_TYPES = ("uint8", "uint8")
+    STRUCT = struct.Struct(">HIIxxBBxxxxxxxxxxxx")
+
     raw: RawEvent
     dalertidRaw: int
     sensortypeRaw: int
@@ -4121,14 +5387,23 @@ class LidCgmAlertClearedDex(BaseEvent):
         CgmTransmitterExpired = 39
         PumpBluetoothError = 40
 
+    DalertidMembers = {
+        11: DalertidEnum.CgmSensorFail,
+        13: DalertidEnum.CgmSensorExpired,
+        14: DalertidEnum.CgmOutOfRange,
+        20: DalertidEnum.CgmTransmitterError,
+        26: DalertidEnum.CgmTemperature,
+        27: DalertidEnum.CgmFailedConnection,
+        39: DalertidEnum.CgmTransmitterExpired,
+        40: DalertidEnum.PumpBluetoothError,
+    }
+
     @property
     def dalertid(self):
-        try:
-            return self.DalertidEnum(self.dalertidRaw)
-        except ValueError as e:
-            logger.error("Invalid dalertidRaw in Dalertid for "+str(self))
-            logger.error(e)
-            return None
+        member = self.DalertidMembers.get(self.dalertidRaw)
+        if member is None:
+            logger.error("Invalid dalertidRaw in Dalertid for "+str(self)+": "+str(self.dalertidRaw))
+        return member
 
     SensortypeMap = {
         "0": "Invalid",
@@ -4141,14 +5416,18 @@ class LidCgmAlertClearedDex(BaseEvent):
         CgmTypeDexcomG6 = 1
         CgmTypeDexcomG7 = 3
 
+    SensortypeMembers = {
+        0: SensortypeEnum.Invalid,
+        1: SensortypeEnum.CgmTypeDexcomG6,
+        3: SensortypeEnum.CgmTypeDexcomG7,
+    }
+
     @property
     def sensortype(self):
-        try:
-            return self.SensortypeEnum(self.sensortypeRaw)
-        except ValueError as e:
-            logger.error("Invalid sensortypeRaw in Sensortype for "+str(self))
-            logger.error(e)
-            return None
+        member = self.SensortypeMembers.get(self.sensortypeRaw)
+        if member is None:
+            logger.error("Invalid sensortypeRaw in Sensortype for "+str(self)+": "+str(self.sensortypeRaw))
+        return member
 
     @staticmethod
     def build(raw):
@@ -4161,6 +5440,13 @@ class LidCgmAlertClearedDex(BaseEvent):
             sensortypeRaw = sensortype,
         )
 
+    def encode(self):
+        raw = bytearray(self.raw.encode())
+        struct.pack_into(UINT8, raw, 13, self.dalertidRaw)
+        struct.pack_into(UINT8, raw, 12, self.sensortypeRaw)
+
+        return bytes(raw)
+
     @property
     def eventTimestamp(self):
         return self.raw.timestamp
@@ -4190,6 +5476,12 @@ class LidCgmAlertAckDex(BaseEvent):
     ID = 371
     NAME = "LID_CGM_ALERT_ACK_DEX"
 
+    # Field names, types and struct format of the whole event, in offset
+    # order, for decoding many events at once (see generic.decode_columns)
+    COLUMNS = ("sensortypeRaw", "dalertidRaw", "acksourceRaw")
+    COLUMN_TYPES = ("uint8", "uint8", "uint32")
+    STRUCT = struct.Struct(">HIIxxBBIxxxxxxxx")
+
     raw: RawEvent
     dalertidRaw: int
     sensortypeRaw: int
@@ -4216,14 +5508,23 @@ class LidCgmAlertAckDex(BaseEvent):
         CgmTransmitterExpired = 39
         PumpBluetoothError = 40
 
+    DalertidMembers = {
+        11: DalertidEnum.CgmSensorFail,
+        13: DalertidEnum.CgmSensorExpired,
+        14: DalertidEnum.CgmOutOfRange,
+        20: DalertidEnum.CgmTransmitterError,
+        26: DalertidEnum.CgmTemperature,
+        27: DalertidEnum.CgmFailedConnection,
+        39: DalertidEnum.CgmTransmitterExpired,
+        40: DalertidEnum.PumpBluetoothError,
+    }
+
     @property
     def dalertid(self):
-        try:
-            return self.DalertidEnum(self.dalertidRaw)
-        except ValueError as e:
-            logger.error("Invalid dalertidRaw in Dalertid for "+str(self))
-            logger.error(e)
-            return None
+        member = self.DalertidMembers.get(self.dalertidRaw)
+        if member is None:
+            logger.error("Invalid dalertidRaw in Dalertid for "+str(self)+": "+str(self.dalertidRaw))
+        return member
 
     SensortypeMap = {
         "0": "Invalid",
@@ -4236,14 +5537,18 @@ class LidCgmAlertAckDex(BaseEvent):
         CgmTypeDexcomG6 = 1
         CgmTypeDexcomG7 = 3
 
+    SensortypeMembers = {
+        0: SensortypeEnum.Invalid,
+        1: SensortypeEnum.CgmTypeDexcomG6,
+        3: SensortypeEnum.CgmTypeDexcomG7,
+    }
+
     @property
     def sensortype(self):
-        try:
-            return self.SensortypeEnum(self.sensortypeRaw)
-        except ValueError as e:
-            logger.error("Invalid sensortypeRaw in Sensortype for "+str(self))
-            logger.error(e)
-            return None
+        member = self.SensortypeMembers.get(self.sensortypeRaw)
+        if member is None:
+            logger.error("Invalid sensortypeRaw in Sensortype for "+str(self)+": "+str(self.sensortypeRaw))
+        return member
 
     AcksourceMap = {
         "0": "Alert Acknowledged by User",
@@ -4254,14 +5559,17 @@ class LidCgmAlertAckDex(BaseEvent):
         AlertAcknowledgedByUser = 0
         AlertAcknowledgedBySoftware = 1
 
+    AcksourceMembers = {
+        0: AcksourceEnum.AlertAcknowledgedByUser,
+        1: AcksourceEnum.AlertAcknowledgedBySoftware,
+    }
+
     @property
     def acksource(self):
-        try:
-            return self.AcksourceEnum(self.acksourceRaw)
-        except ValueError as e:
-            logger.error("Invalid acksourceRaw in Acksource for "+str(self))
-            logger.error(e)
-            return None
+        member = self.AcksourceMembers.get(self.acksourceRaw)
+        if member is None:
+            logger.error("Invalid acksourceRaw in Acksource for "+str(self)+": "+str(self.acksourceRaw))
+        return member
 
     @staticmethod
     def build(raw):
@@ -4276,6 +5584,14 @@ class LidCgmAlertAckDex(BaseEvent):
             acksourceRaw = acksource,
         )
 
+    def encode(self):
+        raw = bytearray(self.raw.encode())
+        struct.pack_into(UINT8, raw, 13, self.dalertidRaw)
+        struct.pack_into(UINT8, raw, 12, self.sensortypeRaw)
+        struct.pack_into(UINT32, raw, 14, self.acksourceRaw)
+
+        return bytes(raw)
+
     @property
     def eventTimestamp(self):
         return self.raw.timestamp
@@ -4306,6 +5622,12 @@ class LidCgmDataFsl2(BaseEvent):
     ID = 372
     NAME = "LID_CGM_DATA_FSL2"
 
+    # Field names, types and struct format of the whole event, in offset
+    # order, for decoding many events at once (see generic.decode_columns)
+    COLUMNS = ("rateRaw", "cgmDataTypeRaw", "glucosevaluestatusRaw", "currentglucosedisplayvalue", "RSSI", "algorithmstateRaw", "egvTimestamp", "interval", "egvInfoBitmaskRaw")
+    COLUMN_TYPES = ("int16", "uint8", "uint8", "uint16", "int8", "uint8", "uint32", "uint8", "uint16")
+    STRUCT = struct.Struct(">HIIhBBHbBIxBH")
+
     raw: RawEvent
     glucosevaluestatusRaw: int
     cgmDataTypeRaw: int
@@ -4328,14 +5650,18 @@ class LidCgmDataFsl2(BaseEvent):
         SpecialHigh = 1
         SpecialLow = 2
 
+    GlucosevaluestatusMembers = {
+        0: GlucosevaluestatusEnum.PreciseValue,
+        1: GlucosevaluestatusEnum.SpecialHigh,
+        2: GlucosevaluestatusEnum.SpecialLow,
+    }
+
     @property
     def glucosevaluestatus(self):
-        try:
-            return self.GlucosevaluestatusEnum(self.glucosevaluestatusRaw)
-        except ValueError as e:
-            logger.error("Invalid glucosevaluestatusRaw in Glucosevaluestatus for "+str(self))
-            logger.error(e)
-            return None
+        member = self.GlucosevaluestatusMembers.get(self.glucosevaluestatusRaw)
+        if member is None:
+            logger.error("Invalid glucosevaluestatusRaw in Glucosevaluestatus for "+str(self)+": "+str(self.glucosevaluestatusRaw))
+        return member
 
     CgmdatatypeMap = {
         "0": "Five Minute Reading (FMR)",
@@ -4352,6 +5678,15 @@ class LidCgmDataFsl2(BaseEvent):
         OneMinuteReadingOmr = 2**5
         RealTimeReading = 2**6
 
+    CgmdatatypeNames = {
+        0: (),
+        1: ("FiveMinuteReadingFmr",),
+        2: ("Backfill",),
+        16: ("NoneVal",),
+        32: ("OneMinuteReadingOmr",),
+        64: ("RealTimeReading",),
+    }
+
     @property
     def cgmDataType(self):
         try:
@@ -4361,6 +5696,13 @@ class LidCgmDataFsl2(BaseEvent):
             logger.error(e)
             return None
 
+    @property
+    def cgmDataTypeNames(self):
+        names = self.CgmdatatypeNames.get(self.cgmDataTypeRaw)
+        if names is None:
+            names = bitmask_names(self.CgmdatatypeBitmask, self.cgmDataTypeRaw)
+        return names
+
     @property
     def rate(self):
         return self.rateRaw * 0.1
@@ -4386,14 +5728,23 @@ class LidCgmDataFsl2(BaseEvent):
         InvalidDataState = 105
         OtherState = 106
 
+    AlgorithmstateMembers = {
+        2: AlgorithmstateEnum.Warmup,
+        100: AlgorithmstateEnum.OkState,
+        101: AlgorithmstateEnum.RfErrorState,
+        102: AlgorithmstateEnum.SensorSignalLowState,
+        103: AlgorithmstateEnum.TempHighState,
+        104: AlgorithmstateEnum.TempLowState,
+        105: AlgorithmstateEnum.InvalidDataState,
+        106: AlgorithmstateEnum.OtherState,
+    }
+
     @property
     def algorithmstate(self):
-        try:
-            return self.AlgorithmstateEnum(self.algorithmstateRaw)
-        except ValueError as e:
-            logger.error("Invalid algorithmstateRaw in Algorithmstate for "+str(self))
-            logger.error(e)
-            return None
+        member = self.AlgorithmstateMembers.get(self.algorithmstateRaw)
+        if member is None:
+            logger.error("Invalid algorithmstateRaw in Algorithmstate for "+str(self)+": "+str(self.algorithmstateRaw))
+        return member
 
     EgvinfobitmaskMap = {
         "0": "Five Minute Reading (FMR)",
@@ -4422,6 +5773,21 @@ class LidCgmDataFsl2(BaseEvent):
         OmrReadingType = 2**9
         RealTimeReadingFromNfcScan = 2**10
 
+    EgvinfobitmaskNames = {
+        0: (),
+        1: ("FiveMinuteReadingFmr",),
+        2: ("Backfill",),
+        4: ("ImmediateMatchValue",),
+        8: ("CrrEgvIsResultOfCalibration",),
+        16: ("NoEgvMessage",),
+        32: ("ValidTimestamp",),
+        64: ("ValidEgvValidRange",),
+        128: ("ValidAlgstateAlgstateIs100",),
+        256: ("EgvWasSuccessfullyAddedToCgmSubsystemArrayE",),
+        512: ("OmrReadingType",),
+        1024: ("RealTimeReadingFromNfcScan",),
+    }
+
     @property
     def egvInfoBitmask(self):
         try:
@@ -4431,6 +5797,13 @@ class LidCgmDataFsl2(BaseEvent):
             logger.error(e)
             return None
 
+    @property
+    def egvInfoBitmaskNames(self):
+        names = self.EgvinfobitmaskNames.get(self.egvInfoBitmaskRaw)
+        if names is None:
+            names = bitmask_names(self.EgvinfobitmaskBitmask, self.egvInfoBitmaskRaw)
+        return names
+
     @staticmethod
     def build(raw):
         glucosevaluestatus, = struct.unpack_from(UINT8, raw[:EVENT_LEN], 13)
@@ -4456,6 +5829,20 @@ class LidCgmDataFsl2(BaseEvent):
             interval = interval,
         )
 
+    def encode(self):
+        raw = bytearray(self.raw.encode())
+        struct.pack_into(UINT8, raw, 13, self.glucosevaluestatusRaw)
+        struct.pack_into(UINT8, raw, 12, self.cgmDataTypeRaw)
+        struct.pack_into(INT16, raw, 10, self.rateRaw)
+        struct.pack_into(UINT8, raw, 17, self.algorithmstateRaw)
+        struct.pack_into(INT8, raw, 16, self.RSSI)
+        struct.pack_into(UINT16, raw, 14, self.currentglucosedisplayvalue)
+        struct.pack_into(UINT32, raw, 18, self.egvTimestamp)
+        struct.pack_into(UINT16, raw, 24, self.egvInfoBitmaskRaw)
+        struct.pack_into(UINT8, raw, 23, self.interval)
+
+        return bytes(raw)
+
     @property
     def eventTimestamp(self):
         return self.raw.timestamp
@@ -4492,6 +5879,12 @@ class LidCgmJoinSessionG7(BaseEvent):
     ID = 394
     NAME = "LID_CGM_JOIN_SESSION_G7"
 
+    # Field names, types and struct format of the whole event, in offset
+    # order, for decoding many events at once (see generic.decode_columns)
+    COLUMNS = ("cgmtimestamp", "sessionsignature")
+    COLUMN_TYPES = ("uint32", "uint32")
+    STRUCT = struct.Struct(">HIIIIxxxxxxxx")
+
     raw: RawEvent
     cgmtimestamp: int # Seconds
     sessionsignature: int # Seconds
@@ -4508,6 +5901,13 @@ class LidCgmJoinSessionG7(BaseEvent):
             sessionsignature = sessionsignature,
         )
 
+    def encode(self):
+        raw = bytearray(self.raw.encode())
+        struct.pack_into(UINT32, raw, 10, self.cgmtimestamp)
+        struct.pack_into(UINT32, raw, 14, self.sessionsignature)
+
+        return bytes(raw)
+
     @property
     def eventTimestamp(self):
         return self.raw.timestamp
@@ -4537,6 +5937,12 @@ class LidCgmDataG7(BaseEvent):
     ID = 399
     NAME = "LID_CGM_DATA_G7"
 
+    # Field names, types and struct format of the whole event, in offset
+    # order, for decoding many events at once (see generic.decode_columns)
+    COLUMNS = ("rateRaw", "cgmDataTypeRaw", "glucosevaluestatusRaw", "currentglucosedisplayvalue", "RSSI", "algorithmstateRaw", "egvTimestamp", "interval", "egvInfoBitmaskRaw")
+    COLUMN_TYPES = ("int8", "uint8", "uint16", "uint16", "int8", "uint8", "uint32", "uint8", "uint16")
+    STRUCT = struct.Struct(">HIIbBHHbBIxBH")
+
     raw: RawEvent
     glucosevaluestatusRaw: int
     cgmDataTypeRaw: int
@@ -4561,14 +5967,19 @@ class LidCgmDataG7(BaseEvent):
         SpecialLow = 2
         DoNotShow = 6
 
+    GlucosevaluestatusMembers = {
+        0: GlucosevaluestatusEnum.PreciseValue,
+        1: GlucosevaluestatusEnum.SpecialHigh,
+        2: GlucosevaluestatusEnum.SpecialLow,
+        6: GlucosevaluestatusEnum.DoNotShow,
+    }
+
     @property
     def glucosevaluestatus(self):
-        try:
-            return self.GlucosevaluestatusEnum(self.glucosevaluestatusRaw)
-        except ValueError as e:
-            logger.error("Invalid glucosevaluestatusRaw in Glucosevaluestatus for "+str(self))
-            logger.error(e)
-            return None
+        member = self.GlucosevaluestatusMembers.get(self.glucosevaluestatusRaw)
+        if member is None:
+            logger.error("Invalid glucosevaluestatusRaw in Glucosevaluestatus for "+str(self)+": "+str(self.glucosevaluestatusRaw))
+        return member
 
     CgmdatatypeMap = {
         "0": "FMR",
@@ -4585,6 +5996,15 @@ class LidCgmDataG7(BaseEvent):
         Calibration = 2**3
         NoneVal = 2**4
 
+    CgmdatatypeNames = {
+        0: (),
+        1: ("Fmr",),
+        2: ("Backfill",),
+        4: ("ImmNoLongerApplies",),
+        8: ("Calibration",),
+        16: ("NoneVal",),
+    }
+
     @property
     def cgmDataType(self):
         try:
@@ -4594,6 +6014,13 @@ class LidCgmDataG7(BaseEvent):
             logger.error(e)
             return None
 
+    @property
+    def cgmDataTypeNames(self):
+        names = self.CgmdatatypeNames.get(self.cgmDataTypeRaw)
+        if names is None:
+            names = bitmask_names(self.CgmdatatypeBitmask, self.cgmDataTypeRaw)
+        return names
+
     @property
     def rate(self):
         return self.rateRaw * 0.1
@@ -4625,14 +6052,26 @@ class LidCgmDataG7(BaseEvent):
         SessionStoppedSivFailure = 38
         SessionStoppedOutOfRangeEnvironmentalConditionsDetected = 39
 
+    AlgorithmstateMembers = {
+        2: AlgorithmstateEnum.Warmup,
+        30: AlgorithmstateEnum.DefaultElectronicsWakeup,
+        31: AlgorithmstateEnum.DetectingDeployment,
+        32: AlgorithmstateEnum.ReportablePeriodValidEgv,
+        33: AlgorithmstateEnum.ReportablePeriodInvalidEgv,
+        34: AlgorithmstateEnum.SessionStoppedEndOfSession,
+        35: AlgorithmstateEnum.SessionStoppedAlgorithmDetectedFailure,
+        36: AlgorithmstateEnum.SessionStoppedManualStop,
+        37: AlgorithmstateEnum.SessionStoppedTransmitterFailure,
+        38: AlgorithmstateEnum.SessionStoppedSivFailure,
+        39: AlgorithmstateEnum.SessionStoppedOutOfRangeEnvironmentalConditionsDetected,
+    }
+
     @property
     def algorithmstate(self):
-        try:
-            return self.AlgorithmstateEnum(self.algorithmstateRaw)
-        except ValueError as e:
-            logger.error("Invalid algorithmstateRaw in Algorithmstate for "+str(self))
-            logger.error(e)
-            return None
+        member = self.AlgorithmstateMembers.get(self.algorithmstateRaw)
+        if member is None:
+            logger.error("Invalid algorithmstateRaw in Algorithmstate for "+str(self)+": "+str(self.algorithmstateRaw))
+        return member
 
     EgvinfobitmaskMap = {
         "0": "Five Minute Reading (FMR)",
@@ -4659,6 +6098,19 @@ class LidCgmDataG7(BaseEvent):
         ValidAlgstateAlgstateIs32 = 2**7
         EgvWasSuccessfullyAddedToCgmSubsystemArrayE = 2**8
 
+    EgvinfobitmaskNames = {
+        0: (),
+        1: ("FiveMinuteReadingFmr",),
+        2: ("Backfill",),
+        4: ("ImmediateMatchValue",),
+        8: ("CrrEgvIsResultOfCalibration",),
+        16: ("NoEgvMessage",),
+        32: ("ValidTimestamp",),
+        64: ("ValidEgvValidRange",),
+        128: ("ValidAlgstateAlgstateIs32",),
+        256: ("EgvWasSuccessfullyAddedToCgmSubsystemArrayE",),
+    }
+
     @property
     def egvInfoBitmask(self):
         try:
@@ -4668,6 +6120,13 @@ class LidCgmDataG7(BaseEvent):
             logger.error(e)
             return None
 
+    @property
+    def egvInfoBitmaskNames(self):
+        names = self.EgvinfobitmaskNames.get(self.egvInfoBitmaskRaw)
+        if names is None:
+            names = bitmask_names(self.EgvinfobitmaskBitmask, self.egvInfoBitmaskRaw)
+        return names
+
     @staticmethod
     def build(raw):
         glucosevaluestatus, = struct.unpack_from(UINT16, raw[:EVENT_LEN], 12)
@@ -4693,6 +6152,20 @@ class LidCgmDataG7(BaseEvent):
             interval = interval,
         )
 
+    def encode(self):
+        raw = bytearray(self.raw.encode())
+        struct.pack_into(UINT16, raw, 12, self.glucosevaluestatusRaw)
+        struct.pack_into(UINT8, raw, 11, self.cgmDataTypeRaw)
+        struct.pack_into(INT8, raw, 10, self.rateRaw)
+        struct.pack_into(UINT8, raw, 17, self.algorithmstateRaw)
+        struct.pack_into(INT8, raw, 16, self.RSSI)
+        struct.pack_into(UINT16, raw, 14, self.currentglucosedisplayvalue)
+        struct.pack_into(UINT32, raw, 18, self.egvTimestamp)
+        struct.pack_into(UINT16, raw, 24, self.egvInfoBitmaskRaw)
+        struct.pack_into(UINT8, raw, 23, self.interval)
+
+        return bytes(raw)
+
     @property
     def eventTimestamp(self):
         return self.raw.timestamp
@@ -4729,6 +6202,12 @@ class LidCgmStartSessionFsl2(BaseEvent):
     ID = 404
     NAME = "LID_CGM_START_SESSION_FSL2"
 
+    # Field names, types and struct format of the whole event, in offset
+    # order, for decoding many events at once (see generic.decode_columns)
+    COLUMNS = ("sessionstarttime", "sessionduration")
+    COLUMN_TYPES = ("uint32", "uint8")
+    STRUCT = struct.Struct(">HIIIxxxBxxxxxxxx")
+
     raw: RawEvent
     sessionstarttime: int # sec
     sessionduration: int # days
@@ -4745,6 +6224,13 @@ class LidCgmStartSessionFsl2(BaseEvent):
             sessionduration = sessionduration,
         )
 
+    def encode(self):
+        raw = bytearray(self.raw.encode())
+        struct.pack_into(UINT32, raw, 10, self.sessionstarttime)
+        struct.pack_into(UINT8, raw, 17, self.sessionduration)
+
+        return bytes(raw)
+
     @property
     def eventTimestamp(self):
         return self.raw.timestamp
@@ -4774,6 +6260,12 @@ class LidCgmStopSessionFsl2(BaseEvent):
     ID = 405
     NAME = "LID_CGM_STOP_SESSION_FSL2"
 
+    # Field names, types and struct format of the whole event, in offset
+    # order, for decoding many events at once (see generic.decode_columns)
+    COLUMNS = ("sessionstarttime", "sessionstoptime", "sessionstopreason", "sessionduration")
+    COLUMN_TYPES = ("uint32", "uint32", "uint8", "uint8")
+    STRUCT = struct.Struct(">HIIIIxxBBxxxx")
+
     raw: RawEvent
     sessionstarttime: int # sec
     sessionstoptime: int # sec
@@ -4796,6 +6288,15 @@ class LidCgmStopSessionFsl2(BaseEvent):
             sessionstopreason = sessionstopreason,
         )
 
+    def encode(self):
+        raw = bytearray(self.raw.encode())
+        struct.pack_into(UINT32, raw, 10, self.sessionstarttime)
+        struct.pack_into(UINT32, raw, 14, self.sessionstoptime)
+        struct.pack_into(UINT8, raw, 21, self.sessionduration)
+        struct.pack_into(UINT8, raw, 20, self.sessionstopreason)
+
+        return bytes(raw)
+
     @property
     def eventTimestamp(self):
         return self.raw.timestamp
@@ -4827,6 +6328,12 @@ class LidCgmJoinSessionFsl2(BaseEvent):
     ID = 406
     NAME = "LID_CGM_JOIN_SESSION_FSL2"
 
+    # Field names, types and struct format of the whole event, in offset
+    # order, for decoding many events at once (see generic.decode_columns)
+    COLUMNS = ("sessionstarttime", "sessionjointime", "sessionjoinreason", "sessionduration")
+    COLUMN_TYPES = ("uint32", "uint32", "uint8", "uint8")
+    STRUCT = struct.Struct(">HIIIIxxBBxxxx")
+
     raw: RawEvent
     sessionstarttime: int # sec
     sessionjointime: int # sec
@@ -4849,6 +6356,15 @@ class LidCgmJoinSessionFsl2(BaseEvent):
             sessionjoinreason = sessionjoinreason,
         )
 
+    def encode(self):
+        raw = bytearray(self.raw.encode())
+        struct.pack_into(UINT32, raw, 10, self.sessionstarttime)
+        struct.pack_into(UINT32, raw, 14, self.sessionjointime)
+        struct.pack_into(UINT8, raw, 21, self.sessionduration)
+        struct.pack_into(UINT8, raw, 20, self.sessionjoinreason)
+
+        return bytes(raw)
+
     @property
     def eventTimestamp(self):
         return self.raw.timestamp
@@ -4880,6 +6396,12 @@ class LidCgmStopSessionG7(BaseEvent):
     ID = 447
     NAME = "LID_CGM_STOP_SESSION_G7"
 
+    # Field names, types and struct format of the whole event, in offset
+    # order, for decoding many events at once (see generic.decode_columns)
+    COLUMNS = ("currenttransmittertime", "sessionstarttime", "sessionstoptime", "stopsessioncode", "sessionstopreason", "sessionduration")
+    COLUMN_TYPES = ("uint32", "uint32", "uint32", "uint8", "uint8", "uint8")
+    STRUCT = struct.Struct(">HIIIIIxBBB")
+
     raw: RawEvent
     currenttransmittertime: int # sec
     sessionstarttime: int # sec
@@ -4908,6 +6430,17 @@ class LidCgmStopSessionG7(BaseEvent):
             stopsessioncode = stopsessioncode,
         )
 
+    def encode(self):
+        raw = bytearray(self.raw.encode())
+        struct.pack_into(UINT32, raw, 10, self.currenttransmittertime)
+        struct.pack_into(UINT32, raw, 14, self.sessionstarttime)
+        struct.pack_into(UINT32, raw, 18, self.sessionstoptime)
+        struct.pack_into(UINT8, raw, 25, self.sessionduration)
+        struct.pack_into(UINT8, raw, 24, self.sessionstopreason)
+        struct.pack_into(UINT8, raw, 23, self.stopsessioncode)
+
+        return bytes(raw)
+
     @property
     def eventTimestamp(self):
         return self.raw.timestamp
@@ -4941,6 +6474,12 @@ class LidCgmAlertActivatedFsl2(BaseEvent):
     ID = 460
     NAME = "LID_CGM_ALERT_ACTIVATED_FSL2"
 
+    # Field names, types and struct format of the whole event, in offset
+    # order, for decoding many events at once (see generic.decode_columns)
+    COLUMNS = ("sensortypeRaw", "dalertidRaw", "faultlocatordata", "param1", "param2")
+    COLUMN_TYPES = ("uint8", "uint8", "uint32", "uint32", "float32")
+    STRUCT = struct.Struct(">HIIxxBBIIf")
+
     raw: RawEvent
     dalertidRaw: int
     sensortypeRaw: int
@@ -4969,14 +6508,23 @@ class LidCgmAlertActivatedFsl2(BaseEvent):
         CgmTransmitterExpired = 39
         PumpBluetoothError = 40
 
+    DalertidMembers = {
+        11: DalertidEnum.CgmSensorFail,
+        13: DalertidEnum.CgmSensorExpired,
+        14: DalertidEnum.CgmOutOfRange,
+        20: DalertidEnum.CgmTransmitterError,
+        26: DalertidEnum.CgmTemperature,
+        27: DalertidEnum.CgmFailedConnection,
+        39: DalertidEnum.CgmTransmitterExpired,
+        40: DalertidEnum.PumpBluetoothError,
+    }
+
     @property
     def dalertid(self):
-        try:
-            return self.DalertidEnum(self.dalertidRaw)
-        except ValueError as e:
-            logger.error("Invalid dalertidRaw in Dalertid for "+str(self))
-            logger.error(e)
-            return None
+        member = self.DalertidMembers.get(self.dalertidRaw)
+        if member is None:
+            logger.error("Invalid dalertidRaw in Dalertid for "+str(self)+": "+str(self.dalertidRaw))
+        return member
 
     SensortypeMap = {
         "0": "Invalid",
@@ -4987,14 +6535,17 @@ class LidCgmAlertActivatedFsl2(BaseEvent):
         Invalid = 0
         CgmTypeLibre2 = 2
 
+    SensortypeMembers = {
+        0: SensortypeEnum.Invalid,
+        2: SensortypeEnum.CgmTypeLibre2,
+    }
+
     @property
     def sensortype(self):
-        try:
-            return self.SensortypeEnum(self.sensortypeRaw)
-        except ValueError as e:
-            logger.error("Invalid sensortypeRaw in Sensortype for "+str(self))
-            logger.error(e)
-            return None
+        member = self.SensortypeMembers.get(self.sensortypeRaw)
+        if member is None:
+            logger.error("Invalid sensortypeRaw in Sensortype for "+str(self)+": "+str(self.sensortypeRaw))
+        return member
 
     @staticmethod
     def build(raw):
@@ -5013,6 +6564,16 @@ class LidCgmAlertActivatedFsl2(BaseEvent):
             param2 = param2,
         )
 
+    def encode(self):
+        raw = bytearray(self.raw.encode())
+        struct.pack_into(UINT8, raw, 13, self.dalertidRaw)
+        struct.pack_into(UINT8, raw, 12, self.sensortypeRaw)
+        struct.pack_into(UINT32, raw, 14, self.faultlocatordata)
+        struct.pack_into(UINT32, raw, 18, self.param1)
+        struct.pack_into(FLOAT32, raw, 22, self.param2)
+
+        return bytes(raw)
+
     @property
     def eventTimestamp(self):
         return self.raw.timestamp
@@ -5045,6 +6606,12 @@ class LidCgmAlertClearedFsl2(BaseEvent):
     ID = 461
     NAME = "LID_CGM_ALERT_CLEARED_FSL2"
 
+    # Field names, types and struct format of the whole event, in offset
+    # order, for decoding many events at once (see generic.decode_columns)
+    COLUMNS = ("sensortypeRaw", "dalertidRaw")
+    COLUMN_TYPES = ("uint8", "uint8")
+    STRUCT = struct.Struct(">HIIxxBBxxxxxxxxxxxx")
+
     raw: RawEvent
     dalertidRaw: int
     sensortypeRaw: int
@@ -5070,14 +6637,23 @@ class LidCgmAlertClearedFsl2(BaseEvent):
         CgmTransmitterExpired = 39
         PumpBluetoothError = 40
 
+    DalertidMembers = {
+        11: DalertidEnum.CgmSensorFail,
+        13: DalertidEnum.CgmSensorExpired,
+        14: DalertidEnum.CgmOutOfRange,
+        20: DalertidEnum.CgmTransmitterError,
+        26: DalertidEnum.CgmTemperature,
+        27: DalertidEnum.CgmFailedConnection,
+        39: DalertidEnum.CgmTransmitterExpired,
+        40: DalertidEnum.PumpBluetoothError,
+    }
+
     @property
     def dalertid(self):
-        try:
-            return self.DalertidEnum(self.dalertidRaw)
-        except ValueError as e:
-            logger.error("Invalid dalertidRaw in Dalertid for "+str(self))
-            logger.error(e)
-            return None
+        member = self.DalertidMembers.get(self.dalertidRaw)
+        if member is None:
+            logger.error("Invalid dalertidRaw in Dalertid for "+str(self)+": "+str(self.dalertidRaw))
+        return member
 
     SensortypeMap = {
         "0": "Invalid",
@@ -5088,14 +6664,17 @@ class LidCgmAlertClearedFsl2(BaseEvent):
         Invalid = 0
         CgmTypeLibre2 = 2
 
+    SensortypeMembers = {
+        0: SensortypeEnum.Invalid,
+        2: SensortypeEnum.CgmTypeLibre2,
+    }
+
     @property
     def sensortype(self):
-        try:
-            return self.SensortypeEnum(self.sensortypeRaw)
-        except ValueError as e:
-            logger.error("Invalid sensortypeRaw in Sensortype for "+str(self))
-            logger.error(e)
-            return None
+        member = self.SensortypeMembers.get(self.sensortypeRaw)
+        if member is None:
+            logger.error("Invalid sensortypeRaw in Sensortype for "+str(self)+": "+str(self.sensortypeRaw))
+        return member
 
     @staticmethod
     def build(raw):
@@ -5108,6 +6687,13 @@ class LidCgmAlertClearedFsl2(BaseEvent):
             sensortypeRaw = sensortype,
         )
 
+    def encode(self):
+        raw = bytearray(self.raw.encode())
+        struct.pack_into(UINT8, raw, 13, self.dalertidRaw)
+        struct.pack_into(UINT8, raw, 12, self.sensortypeRaw)
+
+        return bytes(raw)
+
     @property
     def eventTimestamp(self):
         return self.raw.timestamp
@@ -5137,6 +6723,12 @@ class LidDailyBasal(BaseEvent):
     ID = 81
     NAME = "LID_DAILY_BASAL"
 
+    # Field names, types and struct format of the whole event, in offset
+    # order, for decoding many events at once (see generic.decode_columns)
+    COLUMNS = ("dailytotalbasal", "lastbasalrate", "iob", "batterychargepercentmsbRaw", "batterychargepercentlsbRaw", "batterylipomillivolts")
+    COLUMN_TYPES = ("float32", "float32", "float32", "uint8", "uint8", "uint16")
+    STRUCT = struct.Struct(">HIIfffBBH")
+
     raw: RawEvent
     dailytotalbasal: float # units
     lastbasalrate: float # units/hour
@@ -5168,6 +6760,17 @@ class LidDailyBasal(BaseEvent):
             batterylipomillivolts = batterylipomillivolts,
         )
 
+    def encode(self):
+        raw = bytearray(self.raw.encode())
+        struct.pack_into(FLOAT32, raw, 10, self.dailytotalbasal)
+        struct.pack_into(FLOAT32, raw, 14, self.lastbasalrate)
+        struct.pack_into(FLOAT32, raw, 18, self.iob)
+        struct.pack_into(UINT8, raw, 22, self.batterychargepercentmsbRaw)
+        struct.pack_into(UINT8, raw, 23, self.batterychargepercentlsbRaw)
+        struct.pack_into(UINT16, raw, 24, self.batterylipomillivolts)
+
+        return bytes(raw)
+
     @property
     def eventTimestamp(self):
         return self.raw.timestamp
@@ -5201,6 +6804,12 @@ class LidCarbsEntered(BaseEvent):
     ID = 48
     NAME = "LID_CARBS_ENTERED"
 
+    # Field names, types and struct format of the whole event, in offset
+    # order, for decoding many events at once (see generic.decode_columns)
+    COLUMNS = ("carbs",)
+    COLUMN_TYPES = ("float32",)
+    STRUCT = struct.Struct(">HIIfxxxxxxxxxxxx")
+
     raw: RawEvent
     carbs: float # carbs
 
@@ -5214,6 +6823,12 @@ class LidCarbsEntered(BaseEvent):
             carbs = carbs,
         )
 
+    def encode(self):
+        raw = bytearray(self.raw.encode())
+        struct.pack_into(FLOAT32, raw, 10, self.carbs)
+
+        return bytes(raw)
+
     @property
     def eventTimestamp(self):
         return self.raw.timestamp
@@ -5242,6 +6857,12 @@ class LidUsbConnected(BaseEvent):
     ID = 36
     NAME = "LID_USB_CONNECTED"
 
+    # Field names, types and struct format of the whole event, in offset
+    # order, for decoding many events at once (see generic.decode_columns)
+    COLUMNS = ("negotiatedcurrent",)
+    COLUMN_TYPES = ("float32",)
+    STRUCT = struct.Struct(">HIIfxxxxxxxxxxxx")
+
     raw: RawEvent
     negotiatedcurrent: float # mA
 
@@ -5255,6 +6876,12 @@ class LidUsbConnected(BaseEvent):
             negotiatedcurrent = negotiatedcurrent,
         )
 
+    def encode(self):
+        raw = bytearray(self.raw.encode())
+        struct.pack_into(FLOAT32, raw, 10, self.negotiatedcurrent)
+
+        return bytes(raw)
+
     @property
     def eventTimestamp(self):
         return self.raw.timestamp
@@ -5283,6 +6910,12 @@ class LidUsbDisconnected(BaseEvent):
     ID = 37
     NAME = "LID_USB_DISCONNECTED"
 
+    # Field names, types and struct format of the whole event, in offset
+    # order, for decoding many events at once (see generic.decode_columns)
+    COLUMNS = ("negotiatedcurrent",)
+    COLUMN_TYPES = ("float32",)
+    STRUCT = struct.Struct(">HIIfxxxxxxxxxxxx")
+
     raw: RawEvent
     negotiatedcurrent: float # mA
 
@@ -5296,6 +6929,12 @@ class LidUsbDisconnected(BaseEvent):
             negotiatedcurrent = negotiatedcurrent,
         )
 
+    def encode(self):
+        raw = bytearray(self.raw.encode())
+        struct.pack_into(FLOAT32, raw, 10, self.negotiatedcurrent)
+
+        return bytes(raw)
+
     @property
     def eventTimestamp(self):
         return self.raw.timestamp
@@ -18,4 +18,34 @@ def Event(x):
 Events = lambda x: (Event(bytearray(e)) for e in batched(x, EVENT_LEN))
 
 def decode_raw_events(raw):
-    return base64.b64decode(raw)
\ No newline at end of file
+    return base64.b64decode(raw)
+
+def encode_raw_events(events):
+    return base64.b64encode(b''.join(e.encode() for e in events)).decode('ascii')
+
+HEADER_STRUCT = struct.Struct('>H%dx' % (EVENT_LEN - 2))
+
+"""
+Decodes raw pump events into columns rather than into one event object per
+event: events are grouped by ID, and each group is unpacked in a single
+struct.iter_unpack call using the generated STRUCT of its event class.
+Returns a dict of event class to a dict of column name to tuple of values,
+with the seqNum and timestampRaw header columns first, followed by the
+class's COLUMNS. Events with unknown IDs, or IDs not in event_ids if given,
+are skipped.
+"""
+def decode_columns(raw, event_ids=None):
+    raw = bytes(raw[:len(raw) - len(raw) % EVENT_LEN])
+
+    groups = {}
+    for i, (source_and_id,) in enumerate(HEADER_STRUCT.iter_unpack(raw)):
+        groups.setdefault(source_and_id & 0x0FFF, []).append(raw[i*EVENT_LEN:(i+1)*EVENT_LEN])
+
+    columns = {}
+    for event_id, chunks in groups.items():
+        if event_id not in EVENT_IDS or (event_ids is not None and event_id not in event_ids):
+            continue
+        cls = EVENT_IDS[event_id]
+        values = list(zip(*cls.STRUCT.iter_unpack(b''.join(chunks))))
+        columns[cls] = dict(zip(('seqNum', 'timestampRaw') + cls.COLUMNS, [values[2], values[1]] + values[3:]))
+    return columns
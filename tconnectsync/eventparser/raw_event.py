@@ -17,6 +17,9 @@ class BaseEvent:
     def build(raw):
         raise NotImplemented
 
+    def encode(self):
+        raise NotImplemented
+
     @property
     def eventTimestamp(self):
         raise NotImplemented
@@ -47,6 +50,21 @@ class RawEvent:
             raw = raw
         )
 
+    """
+    Returns the EVENT_LEN bytes for this event. Bytes outside of the header
+    are preserved from the raw buffer, so encode(build(raw)) == raw.
+    """
+    def encode(self):
+        raw = bytearray(EVENT_LEN)
+        if self.raw:
+            body = bytes(self.raw[:EVENT_LEN])
+            raw[:len(body)] = body
+
+        struct.pack_into(UINT16, raw, 0, ((self.source & 0xF) << 12) | (self.id & 0x0FFF))
+        struct.pack_into(UINT32, raw, 2, self.timestampRaw)
+        struct.pack_into(UINT32, raw, 6, self.seqNum)
+        return bytes(raw)
+
     @property
     def timestamp(self):
         # Event timestamps do not have TZ data attached to them when parsed,
@@ -0,0 +1,314 @@
+import datetime
+import random
+import arrow
+
+from .raw_event import RawEvent, EVENT_LEN
+from .generic import Events, encode_raw_events
+from . import events as eventtypes
+
+TANDEM_EPOCH_DATE = datetime.date(2008, 1, 1)
+SECONDS_PER_DAY = 86400
+FIVE_MINUTES = 300
+
+# Each day is given a fixed block of sequence numbers, so that any window
+# of days produces the same seqNums no matter how the range is split up.
+SEQNUMS_PER_DAY = 2000
+BOLUS_IDS_PER_DAY = 16
+
+# Hour of day -> profile basal rate (units/hour)
+DEFAULT_BASAL_PROFILE = {0: 0.8, 6: 1.1, 12: 0.95, 18: 1.0}
+
+# (hour, minute, grams of carbs) for each day's meals
+DEFAULT_MEALS = [(7, 30, 45), (12, 30, 60), (18, 30, 70)]
+
+DEFAULT_CARB_RATIO = 10
+DEFAULT_ISF = 50
+DEFAULT_TARGET_BG = 110
+INSULIN_DURATION_SECONDS = 4 * 3600
+
+
+def to_date(d):
+    if isinstance(d, datetime.datetime):
+        return d.date()
+    if isinstance(d, datetime.date):
+        return d
+    return arrow.get(d).date()
+
+
+"""
+Synthesizes plausible t:slim X2 pump history and encodes it byte-for-byte
+in the format returned by TandemSourceApi.pump_events_raw().
+
+Generation is deterministic per (seed, day), so overlapping or split date
+ranges always contain identical events for the days they share. Each day
+contains:
+ * LidBasalDelivery and LidCgmDataGxb entries every 5 minutes
+ * LidBolusRequestedMsg1/2/3 + LidBolusCompleted for each meal, and
+   automatic correction boluses when glucose runs high
+ * hourly LidDailyBasal entries
+ * nightly sleep mode, and exercise mode on some evenings
+ * a cartridge change (suspend, cartridge/tubing/cannula filled, resume)
+   every cartridge_change_days days
+ * occasional alarms
+"""
+class SyntheticPumpHistory:
+    def __init__(self, seed=0, basal_profile=DEFAULT_BASAL_PROFILE, meals=DEFAULT_MEALS, carb_ratio=DEFAULT_CARB_RATIO, isf=DEFAULT_ISF, target_bg=DEFAULT_TARGET_BG, cgm=True, cartridge_change_days=3, exercise_probability=0.3, alarm_probability=0.05, start_seqnum=0):
+        self.seed = seed
+        self.basal_profile = basal_profile
+        self.meals = meals
+        self.carb_ratio = carb_ratio
+        self.isf = isf
+        self.target_bg = target_bg
+        self.cgm = cgm
+        self.cartridge_change_days = cartridge_change_days
+        self.exercise_probability = exercise_probability
+        self.alarm_probability = alarm_probability
+        self.start_seqnum = start_seqnum
+
+    """
+    Returns a base64 string of the events between min_date and max_date
+    (both inclusive), in the same shape as TandemSourceApi.pump_events_raw().
+    """
+    def pump_events_raw(self, min_date, max_date):
+        return encode_raw_events(self.build_events(min_date, max_date))
+
+    """
+    Returns decoded Lid* events between min_date and max_date (both inclusive),
+    as they would be returned from TandemSourceApi.pump_events().
+    """
+    def pump_events(self, min_date, max_date):
+        return Events(b''.join(e.encode() for e in self.build_events(min_date, max_date)))
+
+    def build_events(self, min_date, max_date):
+        day = to_date(min_date)
+        end = to_date(max_date)
+        while day <= end:
+            for event in self.day_events(day):
+                yield event
+            day += datetime.timedelta(days=1)
+
+    def profile_rate(self, seconds_in_day):
+        hour = seconds_in_day // 3600
+        rate = None
+        for start_hour in sorted(self.basal_profile.keys()):
+            if start_hour <= hour:
+                rate = self.basal_profile[start_hour]
+        return rate if rate is not None else self.basal_profile[min(self.basal_profile.keys())]
+
+    def day_events(self, day):
+        day = to_date(day)
+        day_index = (day - TANDEM_EPOCH_DATE).days
+        day_raw = day_index * SECONDS_PER_DAY
+        rng = random.Random('%s:%s' % (self.seed, day.isoformat()))
+
+        out = []
+        def add(clazz, seconds_in_day, **fields):
+            raw = RawEvent(
+                source = 0,
+                id = clazz.ID,
+                timestampRaw = day_raw + int(seconds_in_day),
+                seqNum = 0,
+                raw = bytearray(EVENT_LEN)
+            )
+            out.append(clazz(raw=raw, **fields))
+
+        # Meal times, jittered by up to 20 minutes
+        meals = []
+        for hour, minute, carbs in self.meals:
+            t = hour * 3600 + minute * 60 + rng.randint(-20, 20) * 60
+            meals.append((t, max(5, int(carbs + rng.gauss(0, carbs * 0.2)))))
+
+        # Cartridge change around 9am every few days
+        cartridge_change = None
+        if self.cartridge_change_days and day_index % self.cartridge_change_days == 0:
+            cartridge_change = 9 * 3600 + rng.randint(0, 90) * 60
+            suspend_end = cartridge_change + 15 * 60
+
+        exercise = None
+        if rng.random() < self.exercise_probability:
+            exercise = (17 * 3600 + rng.randint(0, 60) * 60, rng.choice([30, 45, 60]))
+
+        boluses = []
+        effects = []
+        def iob_at(t):
+            return sum(u * max(0, 1 - (t - t0) / INSULIN_DURATION_SECONDS) for t0, u in boluses if t0 <= t)
+
+        def bolus(t, carbs, bg, bolustype, options):
+            bolus_id = (day_index * BOLUS_IDS_PER_DAY + len(boluses)) & 0xFFFF
+            iob = iob_at(t)
+            food = round(carbs / self.carb_ratio, 2)
+            correction = round(max(0, (bg - self.target_bg) / self.isf - iob), 2)
+            total = round(food + correction, 2)
+            if total <= 0:
+                return
+            add(eventtypes.LidBolusRequestedMsg1, t,
+                bolusid = bolus_id,
+                bolustypeRaw = bolustype,
+                correctionbolusincludedRaw = 1 if correction > 0 else 0,
+                carbamount = carbs,
+                BG = bg,
+                carbratioRaw = self.carb_ratio * 1000,
+                IOB = iob)
+            add(eventtypes.LidBolusRequestedMsg2, t,
+                selectediobRaw = 0,
+                bolusid = bolus_id,
+                optionsRaw = options,
+                standardpercent = 100,
+                duration = 0,
+                ISF = self.isf,
+                targetbg = self.target_bg,
+                useroverrideRaw = 0,
+                declinedcorrectionRaw = 0)
+            add(eventtypes.LidBolusRequestedMsg3, t,
+                bolusid = bolus_id,
+                foodbolussize = food,
+                correctionbolussize = correction,
+                totalbolussize = total)
+            add(eventtypes.LidBolusCompleted, t + 60 + int(total * 30),
+                completionstatusRaw = 3,
+                bolusid = bolus_id,
+                insulindelivered = total,
+                insulinrequested = total,
+                IOB = iob + total)
+            boluses.append((t, total))
+            # insulin lowers glucose over ~3 hours
+            effects.append((t + 15 * 60, 36, -total * self.isf * 0.9))
+
+        bg = 110 + rng.randint(-20, 20)
+        prev_bg = bg
+        total_basal = 0.0
+        last_auto_bolus = None
+        meal_idx = 0
+        for step in range(SECONDS_PER_DAY // FIVE_MINUTES):
+            t = step * FIVE_MINUTES
+
+            while meal_idx < len(meals) and meals[meal_idx][0] <= t:
+                meal_t, carbs = meals[meal_idx]
+                # carbs raise glucose over ~90 minutes
+                effects.append((meal_t + 10 * 60, 18, carbs * self.isf / self.carb_ratio))
+                bolus(meal_t, carbs, int(bg), bolustype=1, options=0)
+                meal_idx += 1
+
+            delta = 0.03 * (120 - bg) + rng.gauss(0, 2)
+            for start, steps, total in effects:
+                if start <= t < start + steps * FIVE_MINUTES:
+                    delta += total / steps
+            if exercise and exercise[0] <= t < exercise[0] + exercise[1] * 60:
+                delta -= 1.5
+            prev_bg, bg = bg, min(400, max(40, bg + delta))
+
+            if bg > 200 and t % 3600 == 0 and (last_auto_bolus is None or t - last_auto_bolus >= 3600):
+                bolus(t, 0, int(bg), bolustype=2, options=3)
+                last_auto_bolus = t
+
+            if self.cgm:
+                add(eventtypes.LidCgmDataGxb, t + 30,
+                    glucosevaluestatusRaw = 0,
+                    cgmDataTypeRaw = 1,
+                    rateRaw = max(-128, min(127, int((bg - prev_bg) / 5 * 10))),
+                    algorithmstate = 6,
+                    RSSI = -60 - rng.randint(0, 20),
+                    currentglucosedisplayvalue = int(bg),
+                    egvTimestamp = day_raw + t + 30,
+                    egvInfoBitmaskRaw = 0b111100001,
+                    interval = 0)
+
+            profile = self.profile_rate(t)
+            if cartridge_change is not None and cartridge_change <= t < suspend_end:
+                source, rate, algorithm = 0, 0, 0
+            else:
+                if bg < 70:
+                    algorithm = 0
+                elif bg < 112:
+                    algorithm = profile * 0.5
+                elif bg > 160:
+                    algorithm = min(profile * 2, 3.0)
+                else:
+                    algorithm = profile
+                source, rate = 3, algorithm
+
+            add(eventtypes.LidBasalDelivery, t + 2,
+                commandedRateSourceRaw = source,
+                commandedRate = int(rate * 1000),
+                profileBasalRate = int(profile * 1000),
+                algorithmRate = int(algorithm * 1000),
+                tempRate = 0)
+            total_basal += rate * FIVE_MINUTES / 3600
+
+            if t % 3600 == 0:
+                battery = max(0.05, 1.0 - 0.035 * (t // 3600))
+                level = int(battery * 768)
+                add(eventtypes.LidDailyBasal, t + 5,
+                    dailytotalbasal = round(total_basal, 2),
+                    lastbasalrate = rate,
+                    iob = round(iob_at(t), 2),
+                    batterychargepercentmsbRaw = 14 + level // 256,
+                    batterychargepercentlsbRaw = level % 256,
+                    batterylipomillivolts = 3600 + int(500 * battery))
+
+        if cartridge_change is not None:
+            add(eventtypes.LidPumpingSuspended, cartridge_change,
+                presuspendstate = 0,
+                insulinamount = 0,
+                suspendreasonRaw = 0,
+                rpatimeout = 0)
+            add(eventtypes.LidCartridgeFilled, cartridge_change + 4 * 60,
+                insulinvolume = 200,
+                v2Volume = 200.0)
+            add(eventtypes.LidTubingFilled, cartridge_change + 7 * 60,
+                primesize = 15.0,
+                completionstatusRaw = 3,
+                position = 0)
+            add(eventtypes.LidCannulaFilled, cartridge_change + 10 * 60,
+                primesize = 0.3,
+                completionstatusRaw = 3)
+            add(eventtypes.LidPumpingResumed, suspend_end,
+                preresumestate = 0,
+                insulinamount = 200)
+
+        if rng.random() < self.alarm_probability:
+            add(eventtypes.LidAlarmActivated, rng.randint(0, SECONDS_PER_DAY - 1),
+                alarmidRaw = eventtypes.LidAlarmActivated.AlarmidEnum.OcclusionAlarm.value,
+                faultlocatordata = 0,
+                param1 = 0,
+                param2 = 0.0)
+
+        def user_mode(t, previous, current, action, exercisechoice=0, exercisetime=0, stoppedbytimer=0):
+            add(eventtypes.LidAaUserModeChange, t,
+                exercisechoiceRaw = exercisechoice,
+                exercisetime = exercisetime,
+                currentusermodeRaw = current,
+                previoususermodeRaw = previous,
+                requestedactionRaw = action,
+                sleepstartedbyguiRaw = 0,
+                exercisestoppedbytimerRaw = stoppedbytimer,
+                activesleepscheduleRaw = 1,
+                eatingsoonstoppedbytimerRaw = 0)
+
+        Mode = eventtypes.LidAaUserModeChange.CurrentusermodeEnum
+        Action = eventtypes.LidAaUserModeChange.RequestedactionEnum
+        user_mode(6 * 3600 + 30 * 60, Mode.Sleeping.value, Mode.Normal.value, Action.StopSleep.value)
+        user_mode(22 * 3600 + 30 * 60, Mode.Normal.value, Mode.Sleeping.value, Action.StartSleep.value)
+        if exercise:
+            user_mode(exercise[0], Mode.Normal.value, Mode.Exercising.value, Action.StartExercise.value, exercisechoice=1, exercisetime=exercise[1])
+            user_mode(exercise[0] + exercise[1] * 60, Mode.Exercising.value, Mode.Normal.value, Action.StopExercise.value, exercisechoice=1, exercisetime=exercise[1], stoppedbytimer=1)
+
+        out.sort(key=lambda e: e.raw.timestampRaw)
+        seqnum_base = self.start_seqnum + day_index * SEQNUMS_PER_DAY
+        for i, event in enumerate(out):
+            event.raw.seqNum = seqnum_base + i
+
+        return out
+
+
+if __name__ == '__main__':
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Outputs synthetic base64-encoded pump history in the format returned by Tandem Source.")
+    parser.add_argument('--start-date', dest='start_date', type=str, required=True)
+    parser.add_argument('--end-date', dest='end_date', type=str, required=True)
+    parser.add_argument('--seed', dest='seed', type=int, default=0)
+    args = parser.parse_args()
+
+    sys.stdout.write(SyntheticPumpHistory(seed=args.seed).pump_events_raw(args.start_date, args.end_date))
@@ -50,15 +50,20 @@ def transform_enum(event_def, name, name_fmt, field, tx):
         f'    {enumNameFormat(v)} = {k}' for k, v in tx.items() if enumNameFormat(v)
     ]
     out += ['']
+    # Raw value to enum member, so decoding is a dict lookup rather than an Enum() call
+    out += [f'{enumNameFormat(name_fmt)}Members = {{']
+    out += [
+        f'    {k}: {enumNameFormat(name_fmt)}Enum.{enumNameFormat(v)},' for k, v in tx.items() if enumNameFormat(v)
+    ]
+    out += ['}']
+    out += ['']
     out += [
         '@property',
         f'def {name_fmt}(self):',
-        f'    try:',
-        f'        return self.{enumNameFormat(name_fmt)}Enum(self.{name_fmt}Raw)',
-        f'    except ValueError as e:',
-        f'        logger.error("Invalid {name_fmt}Raw in {enumNameFormat(name_fmt)} for "+str(self))',
-        f'        logger.error(e)',
-        f'        return None',
+        f'    member = self.{enumNameFormat(name_fmt)}Members.get(self.{name_fmt}Raw)',
+        f'    if member is None:',
+        f'        logger.error("Invalid {name_fmt}Raw in {enumNameFormat(name_fmt)} for "+str(self)+": "+str(self.{name_fmt}Raw))',
+        f'    return member',
         ''
     ]
 
@@ -86,6 +91,15 @@ def transform_bitmask(event_def, name, name_fmt, field, tx):
         f'    {enumNameFormat(v)} = 2**{k}' for k, v in tx.items() if enumNameFormat(v)
     ]
     out += ['']
+    # Raw value to flag names for no flags and each single flag; other
+    # combinations are resolved by the LRU-cached bitmask_names()
+    out += [f'{enumNameFormat(name_fmt)}Names = {{']
+    out += ['    0: (),']
+    out += [
+        f'    {2**int(k)}: ({json.dumps(enumNameFormat(v))},),' for k, v in tx.items() if enumNameFormat(v)
+    ]
+    out += ['}']
+    out += ['']
     out += [
         '@property',
         f'def {name_fmt}(self):',
@@ -95,6 +109,13 @@ def transform_bitmask(event_def, name, name_fmt, field, tx):
         f'        logger.error("Invalid {name_fmt}Raw in {enumNameFormat(name_fmt)}Bitmask for "+str(self))',
         f'        logger.error(e)',
         f'        return None',
+        f'',
+        '@property',
+        f'def {name_fmt}Names(self):',
+        f'    names = self.{enumNameFormat(name_fmt)}Names.get(self.{name_fmt}Raw)',
+        f'    if names is None:',
+        f'        names = bitmask_names(self.{enumNameFormat(name_fmt)}Bitmask, self.{name_fmt}Raw)',
+        f'    return names',
         f''
     ]
 
@@ -1,4 +1,6 @@
 import itertools
+import functools
+from enum import Enum, Flag
 
 def batched(iterable, n):
     """
@@ -16,8 +18,21 @@ def batched(iterable, n):
             return
         yield itertools.chain((first_el,), chunk_it)
 
-def bitmask_to_list(intflag):
-    n = type(intflag).__name__
-    if not str(intflag).startswith(n):
-        return []
-    return str(intflag)[len(n)+1:].split('|')
\ No newline at end of file
+@functools.lru_cache(maxsize=1024)
+def bitmask_names(bitmask_class, value):
+    """
+    Returns a tuple of the names of the flags of the IntFlag class set in value.
+    Generated events look up the common values in a precomputed table, and use
+    this for other combinations of flags.
+    """
+    return tuple(member.name for member in bitmask_class if member.value and value & member.value == member.value)
+
+def bitmask_to_list(value):
+    """
+    Returns a list of the names of the flags set in an IntFlag, or the name of an Enum member.
+    """
+    if isinstance(value, Flag):
+        return list(bitmask_names(type(value), value.value))
+    if isinstance(value, Enum):
+        return [value.name]
+    return []
\ No newline at end of file
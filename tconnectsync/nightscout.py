@@ -3,6 +3,7 @@ import requests
 import hashlib
 import time
 import urllib.parse
+import uuid
 import arrow
 import logging
 
@@ -29,40 +30,113 @@ def time_range(field_name, start_time, end_time, t_to_space=False):
 
 
 logger = logging.getLogger(__name__)
+
+"""
+Returns whether a failed Nightscout write may succeed later, and so can be queued.
+"""
+def is_retryable(e):
+	if isinstance(e, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+		return True
+	if isinstance(e, ApiException):
+		return e.status_code == 429 or e.status_code >= 500
+	return False
+
 class NightscoutApi:
-	def __init__(self, url, secret, skip_verify=False, ignore_conn_errors=False):
+	outbox = None
+
+	def __init__(self, url, secret, skip_verify=False, ignore_conn_errors=False, outbox=None):
 		self.url = url
 		self.secret = secret
 		self.verify = False if skip_verify else None
 		self.ignore_conn_errors = ignore_conn_errors
+		self.outbox = outbox
 
-
-	def upload_entry(self, ns_format, entity='treatments'):
-		r = requests.post(urljoin(self.url, 'api/v1/' + entity + '?api_secret=' + self.secret), json=ns_format, headers={
+	def _send(self, method, entity, payload):
+		r = requests.request(method, urljoin(self.url, 'api/v1/' + entity + '?api_secret=' + self.secret), json=payload, headers={
 			'Accept': 'application/json',
 			'Content-Type': 'application/json',
 			'api-secret': hashlib.sha1(self.secret.encode()).hexdigest()
 		}, verify=self.verify)
 		if r.status_code != 200:
-			raise ApiException(r.status_code, "Nightscout upload %s response: %s" % (r.status_code, r.text))
+			action = {'POST': 'upload', 'PUT': 'put', 'DELETE': 'delete'}[method]
+			raise ApiException(r.status_code, "Nightscout %s %s response: %s" % (action, r.status_code, r.text))
+		return r
+
+	"""
+	Sends a write to Nightscout. If an outbox is configured, the write is queued
+	instead when earlier writes to the same collection are still queued, when
+	the outbox circuit is open, or when Nightscout cannot currently be reached.
+	Returns True if the write was sent, or False if it was queued.
+	"""
+	def _write(self, method, entity, payload):
+		if not self.outbox:
+			self._send(method, entity, payload)
+			return True
+
+		if not self.outbox.should_send(entity):
+			self.outbox.enqueue(method, entity, payload)
+			return False
+
+		try:
+			self._send(method, entity, payload)
+		except Exception as e:
+			if not is_retryable(e):
+				raise
+			logger.warning("Nightscout %s %s failed, queueing in outbox: %s" % (method, entity, e))
+			self.outbox.record_failure()
+			self.outbox.enqueue(method, entity, payload)
+			return False
+		self.outbox.record_success()
+		return True
+
+	"""
+	Sends writes queued in the outbox, if one is configured. Returns the number sent.
+	"""
+	def flush_outbox(self):
+		if not self.outbox:
+			return 0
+		return self.outbox.flush(self._send, is_retryable)
+
+	"""
+	Returns a placeholder Note treatment for check_write(), identified by a
+	random note.
+	"""
+	@staticmethod
+	def check_write_entry():
+		return {
+			'eventType': 'Note',
+			'enteredBy': ENTERED_BY,
+			'notes': 'tconnectsync write check %s' % uuid.uuid4().hex,
+			'created_at': format_datetime(arrow.utcnow()),
+		}
+
+	"""
+	Uploads a placeholder treatment and deletes it again, bypassing the outbox,
+	to exercise the write path with the configured API version and
+	authentication. Returns the number of seconds the upload took.
+	"""
+	def check_write(self):
+		start = time.perf_counter()
+		r = self._send('POST', 'treatments', self.check_write_entry())
+		elapsed = time.perf_counter() - start
+		for doc in r.json():
+			self._send('DELETE', 'treatments/%s' % doc['_id'], {})
+		return elapsed
+
+	def upload_entry(self, ns_format, entity='treatments'):
+		return self._write('POST', entity, ns_format)
+
+	"""
+	Uploads a list of entries to the given collection in a single request.
+	"""
+	def upload_entries(self, ns_formats, entity='treatments'):
+		return self._write('POST', entity, list(ns_formats))
 
 	def delete_entry(self, entity):
-		r = requests.delete(urljoin(self.url, 'api/v1/' + entity + '?api_secret=' + self.secret), json={}, headers={
-			'Accept': 'application/json',
-			'Content-Type': 'application/json',
-			'api-secret': hashlib.sha1(self.secret.encode()).hexdigest()
-		}, verify=self.verify)
-		if r.status_code != 200:
-			raise ApiException(r.status_code, "Nightscout delete %s response: %s" % (r.status_code, r.text))
+		return self._write('DELETE', entity, {})
 
 	def put_entry(self, ns_format, entity):
-		r = requests.put(urljoin(self.url, 'api/v1/' + entity + '?api_secret=' + self.secret), json=ns_format, headers={
-			'Accept': 'application/json',
-			'Content-Type': 'application/json',
-			'api-secret': hashlib.sha1(self.secret.encode()).hexdigest()
-		}, verify=self.verify)
-		if r.status_code != 200:
-			raise ApiException(r.status_code, "Nightscout put %s response: %s" % (r.status_code, r.text))
+		return self._write('PUT', entity, ns_format)
 
 	def last_uploaded_entry(self, eventType, time_start=None, time_end=None):
 		def internal(t_to_space):
@@ -193,6 +267,62 @@ class NightscoutApi:
 			else:
 				raise e
 
+	# Date field used to filter each collection by time, and the field identifying tconnectsync uploads
+	UPLOADED_FIELDS = {
+		'treatments': ('created_at', 'enteredBy'),
+		'entries': ('dateString', 'device'),
+		'devicestatus': ('created_at', 'device'),
+	}
+
+	"""
+	Returns all entries in the given collection uploaded by tconnectsync between
+	time_start and time_end. The range is fetched in windows of at most the given
+	size using bulk find queries, and a window is split in half whenever a query
+	returns a full page, so that no entries are truncated.
+	"""
+	def uploaded_entries_in_range(self, entity, time_start, time_end, window=datetime.timedelta(days=1), count=5000):
+		date_field, source_field = self.UPLOADED_FIELDS[entity]
+
+		def query(start, end, t_to_space):
+			def fmt(date):
+				ret = format_datetime(date)
+				return ret.replace('T', ' ') if t_to_space else ret
+			# Passed as params so that a '+' in a UTC offset is encoded
+			r = requests.get(urljoin(self.url, 'api/v1/' + entity + '.json'), params={
+				'count': count,
+				'find[%s]' % source_field: ENTERED_BY,
+				'find[%s][$gte]' % date_field: fmt(start),
+				'find[%s][$lte]' % date_field: fmt(end),
+				'ts': time.time(),
+			}, headers={
+				'api-secret': hashlib.sha1(self.secret.encode()).hexdigest()
+			}, verify=self.verify)
+			if r.status_code != 200:
+				raise ApiException(r.status_code, "Nightscout %s in range response: %s" % (r.status_code, r.text))
+			return r.json()
+
+		def fetch(start, end):
+			ret = query(start, end, False)
+			if not ret:
+				ret = query(start, end, True)
+			if len(ret) >= count and end - start > datetime.timedelta(minutes=1):
+				mid = start + (end - start) / 2
+				return fetch(start, mid) + fetch(mid, end)
+			return ret
+
+		time_start = arrow.get(time_start)
+		time_end = arrow.get(time_end)
+		found = {}
+		start = time_start
+		while start < time_end:
+			end = min(start + window, time_end)
+			for entry in fetch(start, end):
+				found[entry.get('_id') or id(entry)] = entry
+			start = end
+
+		logger.info("Found %d %s uploaded to Nightscout between %s and %s" % (len(found), entity, time_start, time_end))
+		return list(found.values())
+
 	"""
 	Returns general status information about the Nightscout server.
 	"""
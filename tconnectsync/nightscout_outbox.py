@@ -0,0 +1,251 @@
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = [
+    '''
+    CREATE TABLE IF NOT EXISTS outbox (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        collection TEXT NOT NULL,
+        method TEXT NOT NULL,
+        entity TEXT NOT NULL,
+        payload TEXT NOT NULL,
+        queued_at REAL NOT NULL
+    )
+    ''',
+    'CREATE INDEX IF NOT EXISTS outbox_collection ON outbox (collection, id)',
+    '''
+    CREATE TABLE IF NOT EXISTS dead_letter (
+        id INTEGER PRIMARY KEY,
+        collection TEXT NOT NULL,
+        method TEXT NOT NULL,
+        entity TEXT NOT NULL,
+        payload TEXT NOT NULL,
+        queued_at REAL NOT NULL,
+        failed_at REAL NOT NULL,
+        error TEXT NOT NULL
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS state (
+        key TEXT PRIMARY KEY,
+        value REAL NOT NULL
+    )
+    ''',
+]
+
+# Number of consecutive failed requests after which the circuit opens, and all
+# writes go straight to the outbox until the backoff period has passed
+FAILURE_THRESHOLD = 3
+BACKOFF_BASE_SECONDS = 15
+BACKOFF_MAX_SECONDS = 30 * 60
+
+# Maximum number of queued POSTs to the same collection sent in one request
+FLUSH_BATCH_SIZE = 100
+
+
+def collection_for(entity):
+    return entity.split('/')[0].split('?')[0]
+
+
+"""
+Persistent outbox of Nightscout writes which could not be sent because
+Nightscout was unreachable or returning server errors.
+
+Writes are queued in SQLite in order, and flushed in order per collection, with
+consecutive POSTs to the same collection sent in bulk. While a collection has
+queued writes, new writes to it are queued behind them so ordering is
+preserved. Consecutive failures back off exponentially, and after
+FAILURE_THRESHOLD failures the circuit opens: no requests are attempted, and all
+writes are queued, until the backoff period has passed.
+
+Queued writes which Nightscout rejects with a non-retryable error, such as an
+HTTP 400 for a malformed payload, are moved to the dead_letter table so that
+they do not block the writes queued behind them.
+"""
+class NightscoutOutbox:
+    def __init__(self, path, clock=time.time):
+        self.path = path
+        self.clock = clock
+        self.lock = threading.RLock()
+        if path != ':memory:':
+            dirname = os.path.dirname(path)
+            if dirname:
+                os.makedirs(dirname, exist_ok=True)
+
+        self.conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        if path != ':memory:':
+            self.conn.execute('PRAGMA journal_mode=WAL')
+        for statement in SCHEMA:
+            self.conn.execute(statement)
+
+    @staticmethod
+    def from_secret(secret):
+        if not getattr(secret, 'NS_OUTBOX', False):
+            return None
+        try:
+            return NightscoutOutbox(secret.NS_OUTBOX_PATH)
+        except (sqlite3.Error, OSError) as e:
+            logger.warning("Unable to open Nightscout outbox at %s, continuing without it: %s" % (secret.NS_OUTBOX_PATH, e))
+            return None
+
+    def _get_state(self, key, default=0):
+        row = self.conn.execute('SELECT value FROM state WHERE key=?', (key,)).fetchone()
+        return row[0] if row else default
+
+    def _set_state(self, key, value):
+        self.conn.execute('INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)', (key, value))
+
+    @property
+    def failures(self):
+        with self.lock:
+            return int(self._get_state('failures'))
+
+    @property
+    def retry_at(self):
+        with self.lock:
+            return self._get_state('retry_at')
+
+    def circuit_open(self):
+        with self.lock:
+            return self.failures >= FAILURE_THRESHOLD and self.clock() < self.retry_at
+
+    def record_success(self):
+        with self.lock:
+            if self.failures:
+                logger.info("Nightscout outbox: request succeeded after %d failures, closing circuit" % self.failures)
+            self._set_state('failures', 0)
+            self._set_state('retry_at', 0)
+
+    def record_failure(self):
+        with self.lock:
+            failures = self.failures + 1
+            backoff = min(BACKOFF_BASE_SECONDS * 2 ** (failures - 1), BACKOFF_MAX_SECONDS)
+            self._set_state('failures', failures)
+            self._set_state('retry_at', self.clock() + backoff)
+            if failures >= FAILURE_THRESHOLD:
+                logger.warning("Nightscout outbox: %d consecutive failures, not retrying for %d seconds" % (failures, backoff))
+
+    def pending(self, collection=None):
+        with self.lock:
+            if collection:
+                return self.conn.execute('SELECT COUNT(*) FROM outbox WHERE collection=?', (collection,)).fetchone()[0]
+            return self.conn.execute('SELECT COUNT(*) FROM outbox').fetchone()[0]
+
+    """
+    Returns whether a write to the given entity should be sent immediately
+    rather than queued.
+    """
+    def should_send(self, entity):
+        return not self.circuit_open() and not self.pending(collection_for(entity))
+
+    def enqueue(self, method, entity, payload):
+        with self.lock:
+            self.conn.execute(
+                'INSERT INTO outbox (collection, method, entity, payload, queued_at) VALUES (?, ?, ?, ?, ?)',
+                (collection_for(entity), method, entity, json.dumps(payload), self.clock()))
+        logger.info("Nightscout outbox: queued %s %s (%d pending)" % (method, entity, self.pending()))
+
+    def _items(self, collection):
+        with self.lock:
+            rows = self.conn.execute('SELECT id, method, entity, payload FROM outbox WHERE collection=? ORDER BY id', (collection,)).fetchall()
+        return [(i, method, entity, json.loads(payload)) for i, method, entity, payload in rows]
+
+    def _remove(self, ids):
+        with self.lock:
+            self.conn.executemany('DELETE FROM outbox WHERE id=?', [(i,) for i in ids])
+
+    def _dead_letter(self, item, error):
+        i, method, entity, _ = item
+        logger.error("Nightscout outbox: dropping %s %s, which Nightscout rejected: %s" % (method, entity, error))
+        with self.lock:
+            self.conn.execute('BEGIN')
+            self.conn.execute(
+                'INSERT INTO dead_letter (id, collection, method, entity, payload, queued_at, failed_at, error) '
+                'SELECT id, collection, method, entity, payload, queued_at, ?, ? FROM outbox WHERE id=?',
+                (self.clock(), str(error), i))
+            self.conn.execute('DELETE FROM outbox WHERE id=?', (i,))
+            self.conn.execute('COMMIT')
+
+    def dead_letters(self):
+        with self.lock:
+            return self.conn.execute('SELECT COUNT(*) FROM dead_letter').fetchone()[0]
+
+    """
+    Sends queued writes using send(method, entity, payload), which must raise on
+    failure. Returns the number of queued writes which were sent. Stops at the
+    first retryable failure, leaving it and the writes after it queued. Writes
+    which fail with a non-retryable error are moved to the dead_letter table,
+    and flushing continues.
+    """
+    def flush(self, send, is_retryable):
+        if self.circuit_open():
+            logger.info("Nightscout outbox: circuit open, %d writes pending until %s" % (self.pending(), time.ctime(self.retry_at)))
+            return 0
+
+        with self.lock:
+            collections = [r[0] for r in self.conn.execute('SELECT DISTINCT collection FROM outbox ORDER BY collection').fetchall()]
+
+        sent = 0
+        for collection in collections:
+            items = self._items(collection)
+            i = 0
+            while i < len(items):
+                _, method, entity, payload = items[i]
+                batch = [items[i]]
+                if method == 'POST':
+                    while i + len(batch) < len(items) and len(batch) < FLUSH_BATCH_SIZE:
+                        nxt = items[i + len(batch)]
+                        if nxt[1] != 'POST' or nxt[2] != entity:
+                            break
+                        batch.append(nxt)
+                    payload = []
+                    for item in batch:
+                        payload += item[3] if isinstance(item[3], list) else [item[3]]
+
+                try:
+                    send(method, entity, payload)
+                except Exception as e:
+                    if is_retryable(e):
+                        logger.warning("Nightscout outbox: flush of %s %s failed: %s" % (method, entity, e))
+                        self.record_failure()
+                        return sent
+                    if len(batch) == 1:
+                        self._dead_letter(batch[0], e)
+                        i += 1
+                        continue
+
+                    # Find the rejected writes by sending the batch one at a time
+                    for item in batch:
+                        try:
+                            send(item[1], item[2], item[3])
+                        except Exception as e:
+                            if is_retryable(e):
+                                logger.warning("Nightscout outbox: flush of %s %s failed: %s" % (item[1], item[2], e))
+                                self.record_failure()
+                                return sent
+                            self._dead_letter(item, e)
+                            continue
+                        self._remove([item[0]])
+                        sent += 1
+                    self.record_success()
+                    i += len(batch)
+                    continue
+
+                self._remove([item[0] for item in batch])
+                self.record_success()
+                sent += len(batch)
+                i += len(batch)
+
+        if sent:
+            logger.info("Nightscout outbox: flushed %d queued writes" % sent)
+        return sent
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
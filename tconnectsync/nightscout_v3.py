@@ -0,0 +1,281 @@
+import time
+import datetime
+import logging
+import requests
+import arrow
+
+from urllib.parse import urljoin
+
+from .api.common import ApiException
+from .nightscout import NightscoutApi
+from .parser.nightscout import ENTERED_BY
+
+logger = logging.getLogger(__name__)
+
+APP_NAME = 'tconnectsync'
+
+# Field identifying documents uploaded by tconnectsync in each collection
+SOURCE_FIELDS = {
+    'treatments': 'enteredBy',
+    'entries': 'device',
+    'devicestatus': 'device',
+}
+
+# Fields a document's time may be stored in, in order of preference
+DATE_FIELDS = ['date', 'created_at', 'dateString', 'mills']
+
+# Server-managed fields which may not be sent in an update
+SERVER_FIELDS = ['_id', 'srvModified', 'srvCreated', 'isValid']
+
+
+def doc_time(doc):
+    for field in DATE_FIELDS:
+        value = doc.get(field)
+        if value is None:
+            continue
+        try:
+            if isinstance(value, (int, float)):
+                return arrow.get(value / 1000 if value > 1e11 else value)
+            return arrow.get(value)
+        except (ValueError, TypeError, arrow.parser.ParserError):
+            continue
+    return None
+
+
+def epoch_millis(date):
+    return int(arrow.get(date).float_timestamp * 1000)
+
+
+"""
+Returns a copy of the document with the fields required by api/v3 set: the
+date in epoch milliseconds, taken from created_at or dateString, and the app.
+"""
+def v3_document(doc):
+    doc = dict(doc)
+    if 'date' not in doc:
+        t = doc_time(doc)
+        doc['date'] = epoch_millis(t) if t else int(time.time() * 1000)
+    doc.setdefault('app', APP_NAME)
+    return doc
+
+
+"""
+Nightscout client which uses api/v3 with JWT authorization.
+
+An access token (created in Nightscout's Admin Tools) is exchanged through
+api/v2/authorization for a JWT, which is refreshed before it expires.
+
+Rather than issuing a count=1 query for every last-uploaded lookup, documents
+modified recently are fetched incrementally through the api/v3 history
+endpoint, keyed on srvModified, and kept in memory. Each later call only
+requests what changed since the previous one, and last-uploaded lookups are
+answered from these documents, falling back to a single api/v3 search when
+none match. Dates are filtered on the numeric date field, so there are no
+ISO-8601 formatting retries.
+
+The activity collection is not part of api/v3, so activity is still read and
+written through api/v1 using the API secret.
+"""
+class NightscoutApiV3(NightscoutApi):
+    # How far back, by server modification time, the first history request reaches
+    HISTORY_LOOKBACK = datetime.timedelta(days=7)
+    HISTORY_PAGE_SIZE = 1000
+    SEARCH_PAGE_SIZE = 1000
+    # Refresh the JWT this long before it expires
+    JWT_REFRESH_MARGIN_SECONDS = 60
+
+    def __init__(self, url, secret, access_token, skip_verify=False, ignore_conn_errors=False, outbox=None):
+        super().__init__(url, secret, skip_verify=skip_verify, ignore_conn_errors=ignore_conn_errors, outbox=outbox)
+        self.access_token = access_token
+        self.jwt = None
+        self.jwt_expires = 0
+        # collection -> (last srvModified seen, {identifier: document})
+        self.history_state = {}
+
+    def _authorize(self, force=False):
+        if self.jwt and not force and time.time() < self.jwt_expires - self.JWT_REFRESH_MARGIN_SECONDS:
+            return self.jwt
+        if not self.access_token:
+            raise ApiException(401, "Nightscout api/v3 requires NS_ACCESS_TOKEN to be set")
+
+        r = requests.get(urljoin(self.url, 'api/v2/authorization/request/' + self.access_token), verify=self.verify)
+        if r.status_code != 200:
+            raise ApiException(r.status_code, "Nightscout authorization %s response: %s" % (r.status_code, r.text))
+        j = r.json()
+        self.jwt = j['token']
+        self.jwt_expires = j.get('exp') or time.time() + 60 * 60
+        return self.jwt
+
+    def _request(self, method, path, params=None, json=None):
+        def internal(force):
+            return requests.request(method, urljoin(self.url, 'api/v3/' + path), params=params, json=json, headers={
+                'Accept': 'application/json',
+                'Authorization': 'Bearer ' + self._authorize(force=force),
+            }, verify=self.verify)
+
+        r = internal(False)
+        if r.status_code == 401:
+            # The JWT may have been invalidated server-side before its expiry
+            r = internal(True)
+        if r.status_code not in (200, 201):
+            raise ApiException(r.status_code, "Nightscout api/v3 %s %s %s response: %s" % (method, path, r.status_code, r.text))
+
+        j = r.json() if r.text else {}
+        # Nightscout 15 wraps responses in {status, result}; earlier api/v3 versions did not
+        if isinstance(j, dict) and 'status' in j:
+            return j.get('result', j)
+        return j
+
+    def _send(self, method, entity, payload):
+        if entity.split('/')[0] == 'activity':
+            return super()._send(method, entity, payload)
+
+        if method == 'POST':
+            # api/v3 creates one document per request
+            for doc in payload if isinstance(payload, list) else [payload]:
+                self._request('POST', entity, json=v3_document(doc))
+        elif method == 'PUT':
+            identifier = payload.get('identifier') or payload.get('_id')
+            if not identifier:
+                raise ApiException(400, "Nightscout api/v3 update requires an identifier: %s" % payload)
+            doc = {k: v for k, v in v3_document(payload).items() if k not in SERVER_FIELDS}
+            self._request('PUT', '%s/%s' % (entity, identifier), json=doc)
+        elif method == 'DELETE':
+            self._request('DELETE', entity)
+        else:
+            raise ValueError('Unsupported method: %s' % method)
+
+    def check_write(self):
+        start = time.perf_counter()
+        created = self._request('POST', 'treatments', json=v3_document(self.check_write_entry()))
+        elapsed = time.perf_counter() - start
+        self._request('DELETE', 'treatments/%s' % created['identifier'])
+        return elapsed
+
+    """
+    Returns documents in the collection modified after the given srvModified
+    epoch milliseconds, in modification order, following pagination.
+    """
+    def history(self, collection, last_modified):
+        ret = []
+        while True:
+            page = self._request('GET', '%s/history/%d' % (collection, last_modified), params={'limit': self.HISTORY_PAGE_SIZE})
+            ret += page
+            if len(page) < self.HISTORY_PAGE_SIZE:
+                break
+            newest = max(d.get('srvModified', 0) for d in page)
+            if newest <= last_modified:
+                break
+            last_modified = newest
+        return ret
+
+    """
+    Brings the in-memory copy of recently modified documents in the collection
+    up to date with one incremental history request, and returns it.
+    """
+    def sync_history(self, collection):
+        last_modified, docs = self.history_state.get(collection, (None, {}))
+        if last_modified is None:
+            last_modified = epoch_millis(arrow.utcnow() - self.HISTORY_LOOKBACK)
+
+        changed = self.history(collection, last_modified)
+        for doc in changed:
+            identifier = doc.get('identifier') or doc.get('_id')
+            if doc.get('isValid') is False:
+                docs.pop(identifier, None)
+            else:
+                doc.setdefault('_id', identifier)
+                docs[identifier] = doc
+            last_modified = max(last_modified, doc.get('srvModified', 0))
+
+        logger.debug("Nightscout api/v3 %s history: %d changed, %d known" % (collection, len(changed), len(docs)))
+        self.history_state[collection] = (last_modified, docs)
+        return docs
+
+    """
+    Returns the search query parameters matching the given field values within a time range.
+    """
+    def search_params(self, fields, time_start=None, time_end=None):
+        params = {'%s$eq' % k: v for k, v in fields.items()}
+        if time_start:
+            params['date$gte'] = epoch_millis(time_start)
+        if time_end:
+            params['date$lte'] = epoch_millis(time_end)
+        return params
+
+    def search(self, collection, params, limit, skip=0, sort_desc='date'):
+        params = dict(params, limit=limit, skip=skip)
+        params['sort$desc'] = sort_desc
+        return self._request('GET', collection, params=params)
+
+    def _last_uploaded(self, collection, fields, time_start=None, time_end=None):
+        try:
+            time_start = arrow.get(time_start) if time_start else None
+            time_end = arrow.get(time_end) if time_end else None
+
+            latest = None
+            latest_time = None
+            for doc in self.sync_history(collection).values():
+                if any(doc.get(k) != v for k, v in fields.items()):
+                    continue
+                t = doc_time(doc)
+                if not t or (time_start and t < time_start) or (time_end and t > time_end):
+                    continue
+                if latest is None or t > latest_time:
+                    latest, latest_time = doc, t
+            if latest:
+                return latest
+
+            # Nothing matching was modified recently, so search all documents
+            found = self.search(collection, self.search_params(fields, time_start, time_end), limit=1)
+            if found:
+                found[0].setdefault('_id', found[0].get('identifier'))
+                return found[0]
+            return None
+        except requests.exceptions.ConnectionError as e:
+            if self.ignore_conn_errors:
+                logger.warning('Ignoring ConnectionError because ignore_conn_errors=true: %s' % e)
+            else:
+                raise e
+
+    def last_uploaded_entry(self, eventType, time_start=None, time_end=None):
+        return self._last_uploaded('treatments', {'enteredBy': ENTERED_BY, 'eventType': eventType}, time_start, time_end)
+
+    def last_uploaded_bg_entry(self, time_start=None, time_end=None):
+        return self._last_uploaded('entries', {'device': ENTERED_BY}, time_start, time_end)
+
+    def last_uploaded_devicestatus(self, time_start=None, time_end=None):
+        return self._last_uploaded('devicestatus', {'device': ENTERED_BY}, time_start, time_end)
+
+    """
+    Returns all entries in the given collection uploaded by tconnectsync between
+    time_start and time_end, paging through api/v3 search results.
+    """
+    def uploaded_entries_in_range(self, entity, time_start, time_end, window=None, count=None):
+        count = count or self.SEARCH_PAGE_SIZE
+        params = self.search_params({SOURCE_FIELDS[entity]: ENTERED_BY}, time_start, time_end)
+
+        found = {}
+        skip = 0
+        while True:
+            page = self.search(entity, params, limit=count, skip=skip)
+            for doc in page:
+                identifier = doc.get('identifier') or doc.get('_id')
+                doc.setdefault('_id', identifier)
+                found[identifier] = doc
+            if len(page) < count:
+                break
+            skip += count
+
+        logger.info("Found %d %s uploaded to Nightscout between %s and %s" % (len(found), entity, time_start, time_end))
+        return list(found.values())
+
+    def api_status(self):
+        return self._request('GET', 'status')
+
+    def current_profile(self, time_start=None, time_end=None):
+        found = self.search('profile', {}, limit=1)
+        if not found:
+            return {}
+        found[0].setdefault('_id', found[0].get('identifier'))
+        return found[0]
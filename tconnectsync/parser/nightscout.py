@@ -74,13 +74,16 @@ class NightscoutEntry:
         return data
 
     @staticmethod
-    def iob(iob, created_at):
-        return {
+    def iob(iob, created_at, basaliob=None):
+        data = {
             "activityType": IOB_ACTIVITYTYPE,
             "iob": float(iob),
             "created_at": created_at,
             "enteredBy": ENTERED_BY
         }
+        if basaliob is not None:
+            data["basaliob"] = float(basaliob)
+        return data
 
     @staticmethod
     def entry(sgv, created_at, pump_event_id=""):
@@ -21,6 +21,7 @@ from .sync.iob import (
     ns_write_iob_events
 )
 from .sync.cgm import (
+    CgmIndex,
     process_cgm_events,
     ns_write_cgm_events
 )
@@ -121,6 +122,7 @@ def process_time_range(tconnect, nightscout, time_start, time_end, pretend, feat
 
     added = 0
 
+    cgmIndex = None
     if csvReadingData:
         cgmData = None
         if CGM in features or BOLUS_BG in features:
@@ -132,6 +134,10 @@ def process_time_range(tconnect, nightscout, time_start, time_end, pretend, feat
             added += ns_write_cgm_events(nightscout, cgmData, pretend, time_start=time_start, time_end=time_end)
             logger.debug("Finished writing CGM events")
 
+        if BOLUS_BG in features:
+            # Built once and shared by every bolus BG type lookup
+            cgmIndex = CgmIndex.from_events(cgmData)
+
     if BASAL in features:
         basalEvents = process_ciq_basal_events(ciqTherapyTimelineData)
         if csvBasalData:
@@ -171,11 +177,11 @@ def process_time_range(tconnect, nightscout, time_start, time_end, pretend, feat
         bolusEvents = []
         if ciqBolusData:
             logger.info("Processing ciqBolusData (%d entries)" % len(ciqBolusData))
-            bolusEvents = process_bolus_events(ciqBolusData, source="ciq")
+            bolusEvents = process_bolus_events(ciqBolusData, cgmEvents=cgmIndex, source="ciq")
 
         if csvBolusData and not bolusEvents:
             logger.warning("Falling back on non-CIQ csvBolusData")
-            bolusEvents = process_bolus_events(csvBolusData, source="csv")
+            bolusEvents = process_bolus_events(csvBolusData, cgmEvents=cgmIndex, source="csv")
             logger.debug("ciq bolusEvents: %s" % bolusEvents)
         
         logger.info("finalized bolusEvents: %s" % bolusEvents)
@@ -0,0 +1,367 @@
+import os
+import hmac
+import json
+import time
+import base64
+import hashlib
+import logging
+import ipaddress
+import datetime
+import threading
+import collections
+import urllib.parse
+import concurrent.futures
+import arrow
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .api.common import ApiException
+from .api.tandemsource import TandemSourceApi
+from .eventparser.raw_event import RawEvent, EVENT_LEN, TANDEM_EPOCH
+from .util.shared_file import write_atomic
+
+logger = logging.getLogger(__name__)
+
+# Pump event timestamps count seconds in the pump's local time from this date
+TANDEM_EPOCH_DATE = datetime.datetime.fromtimestamp(TANDEM_EPOCH, datetime.timezone.utc).date()
+
+# How long pump event metadata is reused before it is fetched again
+METADATA_MAX_AGE_SECONDS = 60
+
+"""
+Returns the pump-local date of a raw pump event.
+"""
+def event_day(chunk):
+    return TANDEM_EPOCH_DATE + datetime.timedelta(days=RawEvent.build(chunk).timestampRaw // (24 * 60 * 60))
+
+def is_loopback(host):
+    if host == 'localhost':
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+def each_day(start, end):
+    day = start
+    while day <= end:
+        yield day
+        day += datetime.timedelta(days=1)
+
+"""
+On-disk cache of the raw pump events for completed days, as one base64 file
+per day under directory/<tconnectDeviceId>/<event IDs>/<YYYY-MM-DD>.b64.
+An empty file records a day without events.
+"""
+class EventDayCache:
+    def __init__(self, directory):
+        self.directory = directory
+
+    @staticmethod
+    def event_ids_key(event_ids):
+        if not event_ids:
+            return 'all'
+        normalized = ','.join(str(i) for i in sorted(event_ids))
+        return hashlib.sha1(normalized.encode()).hexdigest()[:16]
+
+    def path(self, tconnect_device_id, event_ids, day):
+        return os.path.join(self.directory, str(tconnect_device_id), self.event_ids_key(event_ids), '%s.b64' % day.isoformat())
+
+    """
+    Returns the cached raw events for the day, or None if it is not cached.
+    """
+    def read(self, tconnect_device_id, event_ids, day):
+        try:
+            with open(self.path(tconnect_device_id, event_ids, day), 'r') as f:
+                return base64.b64decode(f.read())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable cached pump events for %s: %s" % (day, e))
+            return None
+
+    def write(self, tconnect_device_id, event_ids, day, raw):
+        try:
+            write_atomic(self.path(tconnect_device_id, event_ids, day), base64.b64encode(raw).decode('ascii'))
+        except OSError as e:
+            logger.warning("Could not cache pump events for %s: %s" % (day, e))
+
+"""
+Runs at most one call of a function per key at a time. Callers which ask for
+a key while it is already running wait for and share that call's result
+(or exception) instead of running it again.
+"""
+class Coalescer:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.running = {}
+
+    def run(self, key, fn):
+        with self.lock:
+            future = self.running.get(key)
+            owner = future is None
+            if owner:
+                future = self.running[key] = concurrent.futures.Future()
+
+        if not owner:
+            return future.result()
+
+        try:
+            result = fn()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self.lock:
+                del self.running[key]
+
+"""
+A local caching proxy for Tandem Source, so that several tools reading the
+same pump history share one login and one consumer's worth of upstream
+requests. It serves the same paths as source.tandemdiabetes.com, and
+TandemSourceApi uses it in place of Tandem Source when TANDEM_SOURCE_PROXY_URL
+is set.
+
+Pump events for completed days are stored on disk and never fetched again.
+A day is complete once the pump has uploaded events from a later day,
+according to pumpeventmetadata, which is itself reused for
+METADATA_MAX_AGE_SECONDS. Missing days are fetched in as few upstream
+requests as possible, and identical upstream requests made at the same time
+by different clients are sent only once. Pumper info for the account is
+passed through; no other Tandem Source path is served.
+
+GET /proxy/session returns the pumperId and accountId the proxy is logged in
+as, and per-request counts are available from GET /proxy/stats.
+
+When token is set, every request must carry it in the X-Proxy-Token header.
+Without a token, the proxy only listens on loopback addresses, since anyone
+who can reach it reads the account's data.
+"""
+class TandemSourceProxy(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, email, password, cache_path, address=('127.0.0.1', 0), clock=time.monotonic, token=''):
+        if not token and not is_loopback(address[0]):
+            raise ValueError('PROXY_TOKEN must be set to serve the Tandem Source proxy on %s, which is not a loopback address' % address[0])
+        super().__init__(address, TandemSourceProxyHandler)
+        self.email = email
+        self.password = password
+        self.token = token
+        self.cache = EventDayCache(cache_path)
+        self.clock = clock
+        self.coalescer = Coalescer()
+        self.lock = threading.Lock()
+        self._api = None
+        self._metadata = None
+        self._metadata_fetched = None
+        self.stats_lock = threading.Lock()
+        self.stats = collections.Counter()
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return 'http://%s:%d/' % (host, port)
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def authorized(self, headers):
+        if not self.token:
+            return True
+        provided = headers.get(TandemSourceApi.PROXY_TOKEN_HEADER) or ''
+        return hmac.compare_digest(provided.encode(), self.token.encode())
+
+    def record(self, key, count=1):
+        with self.stats_lock:
+            self.stats[key] += count
+
+    """
+    Returns the upstream Tandem Source client, logging in only when there is
+    no session yet or it is about to expire.
+    """
+    def api(self):
+        with self.lock:
+            if self._api is None or self._api.needs_relogin():
+                self.record('upstream login')
+                # An empty proxy_url connects to Tandem Source even if this
+                # config also points clients at the proxy
+                self._api = TandemSourceApi(self.email, self.password, proxy_url='')
+            return self._api
+
+    def upstream(self, key, fn):
+        def internal():
+            self.record('upstream %s' % key[0])
+            return fn(self.api())
+        return self.coalescer.run(key, internal)
+
+    def pump_event_metadata(self):
+        with self.lock:
+            if self._metadata is not None and self.clock() - self._metadata_fetched < METADATA_MAX_AGE_SECONDS:
+                return self._metadata
+
+        metadata = self.upstream(('pumpeventmetadata',), lambda api: api.pump_event_metadata())
+        with self.lock:
+            self._metadata = metadata
+            self._metadata_fetched = self.clock()
+        return metadata
+
+    """
+    Returns the first day for which events may still be uploaded for the pump,
+    or None if the pump is unknown, in which case nothing is cached.
+    """
+    def incomplete_from(self, tconnect_device_id):
+        for pump in self.pump_event_metadata():
+            if str(pump['tconnectDeviceId']) == str(tconnect_device_id) and pump.get('maxDateWithEvents'):
+                return arrow.get(pump['maxDateWithEvents']).date()
+        return None
+
+    """
+    Returns the raw pump events between min_date and max_date (both inclusive)
+    as bytes, in the same order as Tandem Source.
+
+    Tandem Source's date filtering need not match the pump-local day of each
+    event at the edges of a request. So each run of missing days is fetched
+    together with the requested days next to it, events for requested days are
+    only taken from their own day's run or the cache, events for days outside
+    the request are returned at its start or end, as a direct request would
+    return them, and only days strictly inside a fetched range, whose events
+    are known to be complete, are cached.
+    """
+    def pump_events_raw(self, tconnect_device_id, min_date, max_date, event_ids=None):
+        incomplete_from = self.incomplete_from(tconnect_device_id)
+        days = list(each_day(min_date, max_date))
+
+        by_day = {}
+        for day in days:
+            if incomplete_from and day < incomplete_from:
+                raw = self.cache.read(tconnect_device_id, event_ids, day)
+                if raw is not None:
+                    by_day[day] = raw
+        self.record('cached days', len(by_day))
+
+        # Fetch each run of consecutive missing days with one upstream request
+        runs = []
+        for day in days:
+            if day in by_day:
+                continue
+            if runs and runs[-1][-1] == day - datetime.timedelta(days=1):
+                runs[-1].append(day)
+            else:
+                runs.append([day])
+
+        # Events Tandem Source returns for days just outside the request
+        before, after = [], []
+        for run in runs:
+            fetch_start, fetch_end = run[0], run[-1]
+            if fetch_start - datetime.timedelta(days=1) in by_day:
+                fetch_start -= datetime.timedelta(days=1)
+            if fetch_end + datetime.timedelta(days=1) in by_day:
+                fetch_end += datetime.timedelta(days=1)
+
+            key = ('pumpevents', str(tconnect_device_id), EventDayCache.event_ids_key(event_ids), fetch_start, fetch_end)
+            raw = self.upstream(key, lambda api: api.pump_events_raw(tconnect_device_id, fetch_start, fetch_end, event_ids_filter=event_ids))
+            raw = base64.b64decode(raw) if raw else b''
+
+            fetched = collections.defaultdict(list)
+            for i in range(0, len(raw), EVENT_LEN):
+                chunk = raw[i:i+EVENT_LEN]
+                day = event_day(chunk)
+                if run[0] <= day <= run[-1]:
+                    fetched[day].append(chunk)
+                elif day < days[0]:
+                    before.append(chunk)
+                elif day > days[-1]:
+                    after.append(chunk)
+                # Events of the other requested days come from the cache or their own run
+
+            for day in run:
+                by_day[day] = b''.join(fetched.get(day, []))
+                if incomplete_from and day < incomplete_from and fetch_start < day < fetch_end:
+                    self.cache.write(tconnect_device_id, event_ids, day, by_day[day])
+
+        return b''.join(before) + b''.join(by_day[day] for day in days) + b''.join(after)
+
+    """
+    Handles a GET request for a Tandem Source path, returning (status_code, body).
+    """
+    def handle_get(self, path, query):
+        parts = path.split('/')
+        self.record('GET %s' % '/'.join(parts[:4]))
+
+        if path == TandemSourceApi.PROXY_SESSION_PATH:
+            api = self.api()
+            return 200, {'pumperId': api.pumperId, 'accountId': api.accountId}
+
+        if path == 'proxy/stats':
+            with self.stats_lock:
+                return 200, dict(self.stats)
+
+        if not path.startswith('api/'):
+            return 404, 'Not found: %s' % path
+
+        pumper_id = self.api().pumperId
+        if path == 'api/pumpers/pumpers/%s' % pumper_id:
+            return 200, self.upstream(('pumperinfo',), lambda api: api.pumper_info())
+        if path.startswith('api/reports/reportsfacade/') and path.endswith('/pumpeventmetadata'):
+            if parts[3] != str(pumper_id):
+                return 404, 'Unknown pumper: %s' % parts[3]
+            return 200, self.pump_event_metadata()
+
+        if path.startswith('api/reports/reportsfacade/pumpevents/') and len(parts) == 6:
+            if parts[4] != str(pumper_id):
+                return 404, 'Unknown pumper: %s' % parts[4]
+            if 'minDate' not in query or 'maxDate' not in query:
+                return 400, 'minDate and maxDate are required'
+            event_ids = [int(i) for i in query['eventIds'].split(',')] if query.get('eventIds') else None
+            raw = self.pump_events_raw(parts[5], arrow.get(query['minDate']).date(), arrow.get(query['maxDate']).date(), event_ids)
+            return 200, base64.b64encode(raw).decode('ascii')
+
+        return 404, 'Not served by the proxy: %s' % path
+
+
+class TandemSourceProxyHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s" % (self.address_string(), format % args))
+
+    def send(self, status, body):
+        if status == 200:
+            data = json.dumps(body).encode()
+            content_type = 'application/json'
+        else:
+            data = str(body).encode()
+            content_type = 'text/plain'
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        parsed = urllib.parse.urlparse(self.path)
+        path = parsed.path.strip('/')
+        query = dict(urllib.parse.parse_qsl(parsed.query))
+        if not self.server.authorized(self.headers):
+            self.server.record('unauthorized')
+            return self.send(401, 'Unauthorized')
+        try:
+            status, body = self.server.handle_get(path, query)
+        except ApiException as e:
+            logger.warning("Tandem Source error for %s: %s" % (self.path, e))
+            status, body = e.status_code or 502, str(e)
+        except Exception as e:
+            logger.exception("Error handling %s" % self.path)
+            status, body = 502, str(e)
+        self.send(status, body)
@@ -7,6 +7,21 @@ global_path = os.path.join(pathlib.Path.home(), '.config/tconnectsync/.env')
 cwd_creds_path = os.path.join(os.getcwd(), '.creds_cache')
 global_creds_path = os.path.join(pathlib.Path.home(), '.config/tconnectsync/.creds_cache')
 
+cwd_sessions_path = os.path.join(os.getcwd(), '.sessions_cache')
+global_sessions_path = os.path.join(pathlib.Path.home(), '.config/tconnectsync/.sessions_cache')
+
+cwd_rate_limit_path = os.path.join(os.getcwd(), '.rate_limit')
+global_rate_limit_path = os.path.join(pathlib.Path.home(), '.config/tconnectsync/.rate_limit')
+
+cwd_proxy_cache_path = os.path.join(os.getcwd(), '.proxy_cache')
+global_proxy_cache_path = os.path.join(pathlib.Path.home(), '.config/tconnectsync/.proxy_cache')
+
+cwd_outbox_path = os.path.join(os.getcwd(), '.nightscout_outbox.db')
+global_outbox_path = os.path.join(pathlib.Path.home(), '.config/tconnectsync/.nightscout_outbox.db')
+
+cwd_uploaded_index_path = os.path.join(os.getcwd(), '.uploaded_index.db')
+global_uploaded_index_path = os.path.join(pathlib.Path.home(), '.config/tconnectsync/.uploaded_index.db')
+
 values = {}
 
 if os.path.exists(cwd_path):
@@ -52,6 +67,10 @@ if not get('NS_SECRET') and get('API_SECRET'):
     NS_SECRET = get('API_SECRET')
 
 NS_SKIP_TLS_VERIFY = get_bool('NS_SKIP_TLS_VERIFY', 'false')
+# Nightscout API version to use. Version 3 authenticates with an access token
+# created in Nightscout's Admin Tools instead of the API secret.
+NS_API_VERSION = get_one_of('NS_API_VERSION', '1', ['1', '3'])
+NS_ACCESS_TOKEN = get('NS_ACCESS_TOKEN', '')
 NS_IGNORE_CONN_ERRORS = get_bool('NS_IGNORE_CONN_ERRORS', 'false')
 
 # This should be the timezone your pump is set to.
@@ -63,8 +82,44 @@ if not get('TIMEZONE_NAME') and get('TZ'):
 
 # Optional configuration
 
+# Cached Tandem Source credentials, shared by processes using the same config directory
 CACHE_CREDENTIALS = get_bool('CACHE_CREDENTIALS', 'true')
-CACHE_CREDENTIALS_PATH = get('CACHE_CREDENTIALS', cwd_creds_path if os.path.exists(cwd_creds_path) else global_creds_path)
+CACHE_CREDENTIALS_PATH = get('CACHE_CREDENTIALS_PATH', cwd_creds_path if os.path.exists(cwd_creds_path) else global_creds_path)
+# Cached legacy t:connect (ControlIQApi and AndroidApi) sessions, used when CACHE_CREDENTIALS is enabled
+CACHE_SESSIONS_PATH = get('CACHE_SESSIONS_PATH', cwd_sessions_path if os.path.exists(cwd_sessions_path) else global_sessions_path)
+# Client-side rate limits for requests to Tandem hosts, as comma-separated
+# host=rate/burst/daily_budget entries in requests per second, e.g.
+# source.tandemdiabetes.com=2/10/5000 (see api/rate_limit.py for defaults)
+RATE_LIMIT = get_bool('RATE_LIMIT', 'true')
+RATE_LIMITS = get('RATE_LIMITS', '')
+# When enabled, rate limits are shared by all processes using the same state
+# file, which is locked and rewritten on every request. Otherwise each process
+# limits its own requests.
+RATE_LIMIT_SHARED = get_bool('RATE_LIMIT_SHARED', 'false')
+RATE_LIMIT_STATE_PATH = get('RATE_LIMIT_STATE_PATH', cwd_rate_limit_path if os.path.exists(cwd_rate_limit_path) else global_rate_limit_path)
+# URL of a Tandem Source caching proxy (tconnectsync --proxy) to read pump data
+# through, instead of logging in to Tandem Source directly
+TANDEM_SOURCE_PROXY_URL = get('TANDEM_SOURCE_PROXY_URL', '')
+# Address the caching proxy listens on, and the directory it caches completed days of pump events in
+PROXY_HOST = get('PROXY_HOST', '127.0.0.1')
+PROXY_PORT = int(get_number('PROXY_PORT', '8093'))
+PROXY_CACHE_PATH = get('PROXY_CACHE_PATH', cwd_proxy_cache_path if os.path.exists(cwd_proxy_cache_path) else global_proxy_cache_path)
+# Shared secret which clients of the caching proxy must send with every request,
+# required when PROXY_HOST is not a loopback address. Clients send it when set.
+PROXY_TOKEN = get('PROXY_TOKEN', '')
+# Persistent queue of Nightscout writes which failed while Nightscout was unavailable
+NS_OUTBOX = get_bool('NS_OUTBOX', 'true')
+NS_OUTBOX_PATH = get('NS_OUTBOX_PATH', cwd_outbox_path if os.path.exists(cwd_outbox_path) else global_outbox_path)
+# Local index of uploaded entries, used to skip entries already in Nightscout.
+# Entries deleted from Nightscout are not uploaded again while it is enabled,
+# except by --reconcile, which checks Nightscout itself.
+UPLOADED_INDEX = get_bool('UPLOADED_INDEX', 'false')
+UPLOADED_INDEX_PATH = get('UPLOADED_INDEX_PATH', cwd_uploaded_index_path if os.path.exists(cwd_uploaded_index_path) else global_uploaded_index_path)
+# Find previously uploaded treatments with one query per sync, instead of one per event type
+DISCOVER_LAST_UPLOADS = get_bool('DISCOVER_LAST_UPLOADS', 'true')
+# Comma-separated event classes (e.g. BOLUS,CGM_READING) to upload first within each
+# seven-day batch of pump events; batches are still uploaded oldest first
+UPLOAD_PRIORITY = get('UPLOAD_PRIORITY', '')
 AUTOUPDATE_DEFAULT_SLEEP_SECONDS = get_number('AUTOUPDATE_DEFAULT_SLEEP_SECONDS', '300') # 5 minutes
 AUTOUPDATE_MAX_SLEEP_SECONDS = get_number('AUTOUPDATE_MAX_SLEEP_SECONDS', '1500') # 25 minutes
 AUTOUPDATE_UNEXPECTED_NO_INDEX_SLEEP_SECONDS = get_number('AUTOUPDATE_UNEXPECTED_NO_INDEX_SLEEP_SECONDS', '60') # 1 minute
@@ -83,6 +138,9 @@ FETCH_ALL_EVENT_TYPES = get_bool('FETCH_ALL_EVENT_TYPES', 'false')
 NIGHTSCOUT_PROFILE_CARBS_HR_VALUE = get('NIGHTSCOUT_PROFILE_CARBS_HR_VALUE', '20')
 NIGHTSCOUT_PROFILE_DELAY_VALUE = get('NIGHTSCOUT_PROFILE_DELAY_VALUE', '20')
 IGNORE_ZERO_UNIT_BASAL = get_bool('IGNORE_ZERO_UNIT_BASAL', 'false')
+# Merge consecutive basal entries at the same rate into a single Nightscout entry,
+# extending (updating in place) the last basal entry uploaded by a previous sync
+COALESCE_BASAL = get_bool('COALESCE_BASAL', 'false')
 
 ENABLE_TESTING_MODES = get_bool('ENABLE_TESTING_MODES', 'false')
 SKIP_NS_LAST_UPLOADED_CHECK = get_bool('SKIP_NS_LAST_UPLOADED_CHECK', 'false')
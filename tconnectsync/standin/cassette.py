@@ -0,0 +1,302 @@
+import os
+import json
+import time
+import base64
+import logging
+import threading
+import collections
+import urllib.parse
+import jwt
+import arrow
+import requests
+
+from requests.adapters import BaseAdapter
+
+from .. import secret
+from ..api import tandemsource
+from .transport import build_response, request_body_text
+
+logger = logging.getLogger(__name__)
+
+CASSETTE_FILE = 'cassette.json'
+CASSETTE_VERSION = 1
+
+# Query parameters which change on every run (cache busters, PKCE and OIDC
+# values, secrets), and so are ignored when matching requests on replay.
+VOLATILE_PARAMS = {'ts', 'api_secret', 'code', 'code_challenge', 'state', 'nonce'}
+
+# Query parameters, JSON keys and form fields whose values are never written to disk.
+REDACTED_KEYS = {'api_secret', 'password', 'username', 'email', 'access_token', 'refresh_token', 'id_token', 'accessToken', 'refreshToken', 'code_verifier', 'client_secret', 'token'}
+REDACTED = 'REDACTED'
+
+# JSON keys holding an OIDC id token, which is replaced by an unsigned token
+# carrying only the claims tconnectsync reads, so that a recorded login replays.
+ID_TOKEN_KEYS = {'id_token'}
+ID_TOKEN_CLAIMS = ('iss', 'aud', 'pumperId', 'accountId')
+
+# URL paths whose next segment is a secret, such as the Nightscout access token
+# exchanged for an api/v3 JWT. Redacted both on disk and when matching on replay.
+REDACTED_PATH_PREFIXES = ('api/v2/authorization/request/',)
+
+# Response headers worth keeping; cookies and auth headers are dropped.
+KEPT_HEADERS = {'content-type', 'location'}
+
+
+def redact_path(path):
+    for prefix in REDACTED_PATH_PREFIXES:
+        start = path.find(prefix)
+        if start < 0:
+            continue
+        start += len(prefix)
+        end = path.find('/', start)
+        path = path[:start] + REDACTED + (path[end:] if end >= 0 else '')
+    return path
+
+
+def normalize_url(url):
+    parsed = urllib.parse.urlparse(url)
+    query = sorted((k, v) for k, v in urllib.parse.parse_qsl(parsed.query, keep_blank_values=True) if k not in VOLATILE_PARAMS)
+    return urllib.parse.urlunparse(parsed._replace(path=redact_path(parsed.path), query=urllib.parse.urlencode(query), fragment=''))
+
+
+def redact_url(url):
+    parsed = urllib.parse.urlparse(url)
+    query = [(k, REDACTED if k in REDACTED_KEYS else v) for k, v in urllib.parse.parse_qsl(parsed.query, keep_blank_values=True)]
+    return urllib.parse.urlunparse(parsed._replace(path=redact_path(parsed.path), query=urllib.parse.urlencode(query)))
+
+
+def redact_id_token(token):
+    try:
+        header = jwt.get_unverified_header(token)
+        claims = jwt.decode(token, options={'verify_signature': False})
+    except jwt.PyJWTError:
+        return REDACTED
+    return jwt.encode({k: claims[k] for k in ID_TOKEN_CLAIMS if k in claims}, None, algorithm='none', headers={'kid': header.get('kid')})
+
+
+"""
+Redacts REDACTED_KEYS at any depth of parsed JSON.
+"""
+def redact_json(obj):
+    if isinstance(obj, list):
+        return [redact_json(v) for v in obj]
+    if not isinstance(obj, dict):
+        return obj
+    redacted = {}
+    for k, v in obj.items():
+        if k in ID_TOKEN_KEYS and isinstance(v, str):
+            redacted[k] = redact_id_token(v)
+        elif k in REDACTED_KEYS:
+            redacted[k] = REDACTED
+        else:
+            redacted[k] = redact_json(v)
+    return redacted
+
+
+def redact_text(text):
+    if not text:
+        return text
+    try:
+        obj = json.loads(text)
+        if isinstance(obj, (dict, list)):
+            return json.dumps(redact_json(obj))
+        return text
+    except ValueError:
+        pass
+    if '=' in text and ' ' not in text:
+        fields = urllib.parse.parse_qsl(text, keep_blank_values=True)
+        if fields:
+            return urllib.parse.urlencode([(k, REDACTED if k in REDACTED_KEYS else v) for k, v in fields])
+    return text
+
+
+def encode_body(content):
+    try:
+        return {'body': redact_text(content.decode('utf-8'))}
+    except UnicodeDecodeError:
+        return {'body_b64': base64.b64encode(content).decode('ascii')}
+
+
+def decode_body(response):
+    if 'body_b64' in response:
+        return base64.b64decode(response['body_b64'])
+    return (response.get('body') or '').encode('utf-8')
+
+
+class RecordingAdapter(BaseAdapter):
+    def __init__(self, inner, cassette):
+        super().__init__()
+        self.inner = inner
+        self.cassette = cassette
+
+    def send(self, request, **kwargs):
+        started = time.time()
+        response = self.inner.send(request, **kwargs)
+        content = response.content
+        elapsed = time.time() - started
+
+        self.cassette.add({
+            'started': started - self.cassette.started,
+            'request': {
+                'method': request.method,
+                'url': redact_url(request.url),
+                'body': redact_text(request_body_text(request)),
+            },
+            'response': {
+                'status_code': response.status_code,
+                'url': redact_url(response.url or request.url),
+                'headers': {k: v for k, v in response.headers.items() if k.lower() in KEPT_HEADERS},
+                'elapsed': elapsed,
+                **encode_body(content),
+            },
+        })
+        return response
+
+    def close(self):
+        self.inner.close()
+
+
+class ReplayAdapter(BaseAdapter):
+    def __init__(self, cassette):
+        super().__init__()
+        self.cassette = cassette
+
+    def send(self, request, **kwargs):
+        interaction = self.cassette.next_for(request.method, request.url)
+        if not interaction:
+            raise requests.exceptions.ConnectionError('No recorded response in cassette for %s %s' % (request.method, request.url))
+
+        response = interaction['response']
+        if self.cassette.time_scale:
+            time.sleep(response.get('elapsed', 0) * self.cassette.time_scale)
+
+        return build_response(self, request, response['status_code'], response.get('headers', {}), decode_body(response))
+
+    def close(self):
+        pass
+
+
+"""
+Records or replays every HTTP request made through the requests library
+(Tandem Source, Nightscout, and the login flows of all clients) while the
+cassette is active.
+
+When recording, each request and response is written to
+directory/cassette.json on exit, with secrets, passwords and access tokens
+redacted, together with the cycle arguments (such as the time range).
+When replaying, requests are answered in recorded order per method and URL,
+after sleeping for the recorded response time multiplied by time_scale
+(0 replays as fast as possible).
+
+Credential caching is disabled while a cassette is active so that the login
+is always recorded and never read from the replaying machine's cache. The
+recorded id token keeps only the claims tconnectsync reads and is unsigned,
+so neither its signature nor its expiry is verified on replay. Replayed
+requests are not rate limited, since they never reach Tandem.
+"""
+class Cassette:
+    def __init__(self, directory, mode, args=None, time_scale=1.0):
+        if mode not in ('record', 'replay'):
+            raise ValueError('Invalid cassette mode: %s' % mode)
+        self.directory = directory
+        self.mode = mode
+        self.args = args or {}
+        self.time_scale = time_scale
+        self.interactions = []
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self._queues = None
+        self._patched = {}
+
+    @staticmethod
+    def record(directory, args=None):
+        return Cassette(directory, 'record', args=args)
+
+    @staticmethod
+    def replay(directory, time_scale=1.0):
+        cassette = Cassette(directory, 'replay', time_scale=time_scale)
+        cassette.load()
+        return cassette
+
+    @property
+    def path(self):
+        return os.path.join(self.directory, CASSETTE_FILE)
+
+    def load(self):
+        with open(self.path, 'r') as f:
+            data = json.load(f)
+        if data.get('version') != CASSETTE_VERSION:
+            raise ValueError('Unsupported cassette version in %s: %s' % (self.path, data.get('version')))
+
+        self.args = data.get('args', {})
+        self.interactions = data.get('interactions', [])
+        self._queues = collections.defaultdict(collections.deque)
+        for interaction in self.interactions:
+            request = interaction['request']
+            self._queues[(request['method'], normalize_url(request['url']))].append(interaction)
+        logger.info("Loaded %d recorded HTTP interactions from %s" % (len(self.interactions), self.path))
+
+    def save(self):
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self.path, 'w') as f:
+            json.dump({
+                'version': CASSETTE_VERSION,
+                'recorded_at': arrow.get(self.started).isoformat(),
+                'args': self.args,
+                'interactions': self.interactions,
+            }, f, indent=1)
+        logger.info("Saved %d recorded HTTP interactions to %s" % (len(self.interactions), self.path))
+
+    def add(self, interaction):
+        with self.lock:
+            self.interactions.append(interaction)
+
+    def next_for(self, method, url):
+        with self.lock:
+            queue = self._queues.get((method, normalize_url(url)))
+            if not queue:
+                return None
+            return queue.popleft()
+
+    def remaining(self):
+        with self.lock:
+            return sum(len(q) for q in self._queues.values()) if self._queues is not None else 0
+
+    def __enter__(self):
+        original_get_adapter = requests.Session.get_adapter
+        self._patched = {
+            'get_adapter': original_get_adapter,
+            'CACHE_CREDENTIALS': tandemsource.CACHE_CREDENTIALS,
+            'JWT_VERIFY_EXPIRATION': tandemsource.TandemSourceApi.JWT_VERIFY_EXPIRATION,
+            'JWT_VERIFY_SIGNATURE': tandemsource.TandemSourceApi.JWT_VERIFY_SIGNATURE,
+            'RATE_LIMIT': secret.RATE_LIMIT,
+        }
+
+        if self.mode == 'record':
+            cassette = self
+            def get_adapter(session, url):
+                return RecordingAdapter(original_get_adapter(session, url), cassette)
+        else:
+            replay_adapter = ReplayAdapter(self)
+            def get_adapter(session, url):
+                return replay_adapter
+            tandemsource.TandemSourceApi.JWT_VERIFY_EXPIRATION = False
+            tandemsource.TandemSourceApi.JWT_VERIFY_SIGNATURE = False
+            secret.RATE_LIMIT = False
+
+        requests.Session.get_adapter = get_adapter
+        tandemsource.CACHE_CREDENTIALS = False
+        self.started = time.time()
+        return self
+
+    def __exit__(self, *args):
+        requests.Session.get_adapter = self._patched['get_adapter']
+        tandemsource.CACHE_CREDENTIALS = self._patched['CACHE_CREDENTIALS']
+        tandemsource.TandemSourceApi.JWT_VERIFY_EXPIRATION = self._patched['JWT_VERIFY_EXPIRATION']
+        tandemsource.TandemSourceApi.JWT_VERIFY_SIGNATURE = self._patched['JWT_VERIFY_SIGNATURE']
+        secret.RATE_LIMIT = self._patched['RATE_LIMIT']
+
+        if self.mode == 'record':
+            self.save()
+        else:
+            logger.info("Replay finished in %0.2f sec with %d unused recorded interactions" % (time.time() - self.started, self.remaining()))
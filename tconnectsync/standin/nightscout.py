@@ -0,0 +1,556 @@
+import re
+import copy
+import json
+import time
+import uuid
+import random
+import hashlib
+import logging
+import threading
+import collections
+import urllib.parse
+import arrow
+import jwt
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+COLLECTIONS = ['treatments', 'entries', 'devicestatus', 'activity', 'profile']
+
+# Field used to order results (newest first) for each collection
+SORT_FIELDS = {
+    'treatments': 'created_at',
+    'entries': 'date',
+    'devicestatus': 'created_at',
+    'activity': 'created_at',
+    'profile': 'startDate',
+}
+
+# Fields which are compared as points in time rather than as strings,
+# regardless of whether the query uses a 'T' or a space separator.
+DATE_FIELDS = {'created_at', 'dateString', 'startDate', 'date', 'mills', 'srvModified', 'srvCreated'}
+
+DEFAULT_COUNT = 10
+
+FIND_RE = re.compile(r'^find\[([^\]]+)\](?:\[(\$[a-z]+)\])?$')
+
+# api/v3 search filters are of the form field$op=value
+V3_FILTER_RE = re.compile(r'^([^$]+)\$(eq|ne|gt|gte|lt|lte|re|in|nin)$')
+V3_RESERVED = {'limit', 'skip', 'sort', 'sort$desc', 'fields', 'now', 'token'}
+V3_COLLECTIONS = ['treatments', 'entries', 'devicestatus', 'profile']
+
+JWT_LIFETIME_SECONDS = 8 * 60 * 60
+
+
+def to_time(value):
+    if isinstance(value, (int, float)) or (isinstance(value, str) and re.match(r'^\d+(\.\d+)?$', value)):
+        value = float(value)
+        # Nightscout stores 'date' and 'mills' as epoch milliseconds
+        return value / 1000 if value > 1e11 else value
+    return arrow.get(value).float_timestamp
+
+
+def comparable(field, actual, expected):
+    if field in DATE_FIELDS:
+        try:
+            return to_time(actual), to_time(expected)
+        except (ValueError, TypeError, arrow.parser.ParserError):
+            pass
+    if isinstance(actual, bool):
+        return actual, str(expected).lower() == 'true'
+    if isinstance(actual, (int, float)):
+        try:
+            return actual, float(expected)
+        except ValueError:
+            pass
+    return str(actual), str(expected)
+
+
+def matches(doc, filters):
+    for field, op, expected in filters:
+        if field not in doc or doc[field] is None:
+            if op == '$ne':
+                continue
+            if op == '$exists':
+                if str(expected).lower() in ('false', '0'):
+                    continue
+            return False
+
+        if op == '$exists':
+            if str(expected).lower() in ('false', '0'):
+                return False
+            continue
+
+        actual, expected_value = comparable(field, doc[field], expected)
+        if op is None or op == '$eq':
+            ok = actual == expected_value
+        elif op == '$ne':
+            ok = actual != expected_value
+        elif op == '$gte':
+            ok = actual >= expected_value
+        elif op == '$gt':
+            ok = actual > expected_value
+        elif op == '$lte':
+            ok = actual <= expected_value
+        elif op == '$lt':
+            ok = actual < expected_value
+        else:
+            raise ValueError('Unsupported find operator: %s' % op)
+
+        if not ok:
+            return False
+    return True
+
+
+def sort_key(collection):
+    field = SORT_FIELDS[collection]
+    def key(doc):
+        try:
+            return to_time(doc.get(field))
+        except Exception:
+            return 0
+    return key
+
+
+"""
+Thread-safe in-memory document store holding the Nightscout collections.
+"""
+class NightscoutStandinStore:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.collections = {c: [] for c in COLLECTIONS}
+            # Deleted documents, reported by the api/v3 history endpoint
+            self.tombstones = {c: [] for c in COLLECTIONS}
+            self.last_modified = 0
+
+    def _modified(self):
+        # Strictly increasing, so api/v3 history paging never skips a document
+        self.last_modified = max(int(time.time() * 1000), self.last_modified + 1)
+        return self.last_modified
+
+    def insert(self, collection, docs):
+        inserted = []
+        with self.lock:
+            for doc in docs:
+                doc = copy.deepcopy(doc)
+                doc.setdefault('_id', doc.get('identifier') or uuid.uuid4().hex[:24])
+                doc['srvCreated'] = doc['srvModified'] = self._modified()
+                if collection != 'entries' and 'created_at' not in doc:
+                    doc['created_at'] = arrow.utcnow().isoformat()
+                self.collections[collection].append(doc)
+                inserted.append(doc)
+        return inserted
+
+    def replace(self, collection, doc):
+        with self.lock:
+            docs = self.collections[collection]
+            for i, existing in enumerate(docs):
+                if existing.get('_id') == doc.get('_id'):
+                    docs[i] = {**copy.deepcopy(doc), 'srvCreated': existing.get('srvCreated'), 'srvModified': self._modified()}
+                    return docs[i]
+        return self.insert(collection, [doc])[0]
+
+    def delete(self, collection, _id=None, filters=None):
+        with self.lock:
+            before = self.collections[collection]
+            if _id is not None:
+                after = [d for d in before if d.get('_id') != _id]
+            else:
+                after = [d for d in before if not matches(d, filters or [])]
+            self.collections[collection] = after
+            remaining = set(d['_id'] for d in after)
+            for doc in before:
+                if doc['_id'] not in remaining:
+                    self.tombstones[collection].append({'_id': doc['_id'], 'identifier': doc.get('identifier', doc['_id']), 'isValid': False, 'srvModified': self._modified()})
+            return len(before) - len(after)
+
+    """
+    Returns documents, including deleted ones, modified after the given epoch
+    milliseconds in ascending srvModified order.
+    """
+    def history(self, collection, last_modified, limit):
+        with self.lock:
+            found = [d for d in self.collections[collection] + self.tombstones[collection] if d['srvModified'] > last_modified]
+        found.sort(key=lambda d: d['srvModified'])
+        return copy.deepcopy(found[:limit])
+
+    def find(self, collection, filters, count=DEFAULT_COUNT, sort_field=None, descending=True, skip=0):
+        with self.lock:
+            found = [d for d in self.collections[collection] if matches(d, filters)]
+        if sort_field:
+            found.sort(key=lambda d: comparable(sort_field, d.get(sort_field, 0), 0)[0], reverse=descending)
+        else:
+            found.sort(key=sort_key(collection), reverse=descending)
+        found = found[skip:]
+        if count is not None:
+            found = found[:count]
+        return copy.deepcopy(found)
+
+
+"""
+A local stand-in for the Nightscout api/v1 endpoints used by NightscoutApi:
+treatments, entries, devicestatus, activity, profile and status, and the
+api/v3 endpoints used by NightscoutApiV3 with api/v2 JWT authorization.
+
+Supports find[field]=value and find[field][$op]=value filters, count,
+and single-object or array POSTs. Latency, HTTP 500 errors and HTTP 429
+rate limiting can be injected to measure upload behavior under load.
+Per-endpoint request counts are available from GET /standin/stats.
+"""
+class NightscoutStandinServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address=('127.0.0.1', 0), secret=None, latency=0, latency_jitter=0, error_rate=0, rate_limit_rate=0, seed=None, access_token=None):
+        super().__init__(address, NightscoutStandinHandler)
+        self.store = NightscoutStandinStore()
+        self.secret = secret
+        self.access_token = access_token
+        self.jwt_key = uuid.uuid4().hex
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.random = random.Random(seed)
+        self.stats_lock = threading.Lock()
+        self.stats = collections.Counter()
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return 'http://%s:%d/' % (host, port)
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def record(self, key):
+        with self.stats_lock:
+            self.stats[key] += 1
+
+    def authorized(self, headers, query):
+        if not self.secret:
+            return True
+        hashed = hashlib.sha1(self.secret.encode()).hexdigest()
+        provided = [headers.get('api-secret'), query.get('api_secret')]
+        return hashed in provided or self.secret in provided
+
+    def issue_jwt(self, access_token):
+        if self.access_token and access_token != self.access_token:
+            return None
+        iat = int(time.time())
+        return {
+            'token': jwt.encode({'accessToken': access_token, 'iat': iat, 'exp': iat + JWT_LIFETIME_SECONDS}, self.jwt_key, algorithm='HS256'),
+            'iat': iat,
+            'exp': iat + JWT_LIFETIME_SECONDS,
+        }
+
+    def authorized_v3(self, headers):
+        if not self.access_token:
+            return True
+        auth = headers.get('Authorization') or ''
+        if not auth.startswith('Bearer '):
+            return False
+        try:
+            jwt.decode(auth[len('Bearer '):], self.jwt_key, algorithms=['HS256'])
+        except jwt.exceptions.InvalidTokenError:
+            return False
+        return True
+
+
+class NightscoutStandinHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s" % (self.address_string(), format % args))
+
+    def send_json(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def send_text(self, status, text, headers={}):
+        data = text.encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/plain')
+        self.send_header('Content-Length', str(len(data)))
+        for k, v in headers.items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def read_body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if not length:
+            return None
+        return json.loads(self.rfile.read(length).decode())
+
+    def parse(self):
+        parsed = urllib.parse.urlparse(self.path)
+        query = dict(urllib.parse.parse_qsl(parsed.query, keep_blank_values=True))
+        path = parsed.path.strip('/')
+        return path, query
+
+    def v3_filters_for(self, query):
+        filters = []
+        for k, v in query.items():
+            if k in V3_RESERVED:
+                continue
+            m = V3_FILTER_RE.match(k)
+            if m:
+                filters.append((m.group(1), '$' + m.group(2), v))
+            else:
+                filters.append((k, None, v))
+        return filters
+
+    def send_v3(self, status, result=None, **kwargs):
+        body = {'status': status, **kwargs}
+        if result is not None:
+            body['result'] = result
+        return self.send_json(status, body)
+
+    def route_v3(self, method, parts, query, body):
+        server = self.server
+        collection = parts[0]
+        server.record('v3 %s %s' % (method, collection))
+
+        if not server.authorized_v3(self.headers):
+            return self.send_v3(401, message='Unauthorized')
+
+        if collection == 'status':
+            return self.send_v3(200, {
+                'version': 'standin',
+                'apiVersion': '3.0.0',
+                'srvDate': int(time.time() * 1000),
+                'storage': {'storage': 'memory'},
+            })
+
+        if collection not in V3_COLLECTIONS:
+            return self.send_v3(404, message='Unknown collection: %s' % collection)
+
+        def v3_doc(doc):
+            doc.setdefault('identifier', doc.get('_id'))
+            return doc
+
+        try:
+            if method == 'GET' and len(parts) >= 2 and parts[1] == 'history':
+                last_modified = int(parts[2]) if len(parts) > 2 and parts[2] else 0
+                limit = int(query.get('limit', 1000))
+                return self.send_v3(200, [v3_doc(d) for d in server.store.history(collection, last_modified, limit)])
+
+            if method == 'GET' and len(parts) == 1:
+                sort_field = query.get('sort$desc') or query.get('sort')
+                found = server.store.find(collection, self.v3_filters_for(query),
+                    count=int(query.get('limit', DEFAULT_COUNT)),
+                    sort_field=sort_field,
+                    descending='sort$desc' in query or not sort_field,
+                    skip=int(query.get('skip', 0)))
+                return self.send_v3(200, [v3_doc(d) for d in found])
+        except ValueError as e:
+            return self.send_v3(400, message=str(e))
+
+        identifier = parts[1] if len(parts) > 1 else None
+
+        if method == 'GET':
+            found = server.store.find(collection, [('_id', None, identifier)], count=1)
+            if not found:
+                return self.send_v3(404, message='Not found')
+            return self.send_v3(200, v3_doc(found[0]))
+
+        if method == 'POST':
+            if not isinstance(body, dict):
+                return self.send_v3(400, message='Missing body')
+            if 'date' not in body or 'app' not in body:
+                return self.send_v3(400, message='Missing required field date or app')
+            with server.stats_lock:
+                server.stats['documents %s' % collection] += 1
+            doc = server.store.insert(collection, [body])[0]
+            return self.send_v3(201, identifier=v3_doc(doc)['identifier'], lastModified=doc['srvModified'])
+
+        if method == 'PUT':
+            if not isinstance(body, dict) or not identifier:
+                return self.send_v3(400, message='Missing body or identifier')
+            doc = server.store.replace(collection, {**body, '_id': identifier, 'identifier': identifier})
+            return self.send_v3(200, identifier=identifier, lastModified=doc['srvModified'])
+
+        if method == 'DELETE':
+            if not server.store.delete(collection, _id=identifier):
+                return self.send_v3(404, message='Not found')
+            return self.send_v3(200)
+
+        return self.send_v3(405, message='Method not allowed')
+
+    def filters_for(self, query):
+        filters = []
+        for k, v in query.items():
+            m = FIND_RE.match(k)
+            if m:
+                filters.append((m.group(1), m.group(2), v))
+        return filters
+
+    def route(self, method):
+        server = self.server
+        path, query = self.parse()
+
+        # Consume the body before any injected failure so the connection stays usable
+        body = self.read_body() if method in ('POST', 'PUT', 'DELETE') else None
+
+        if path == 'standin/stats':
+            with server.stats_lock:
+                return self.send_json(200, dict(server.stats))
+        if path == 'standin/reset':
+            server.store.reset()
+            with server.stats_lock:
+                server.stats.clear()
+            return self.send_json(200, {})
+
+        if path.startswith('api/v2/authorization/request/'):
+            server.record('%s authorization' % method)
+            issued = server.issue_jwt(path[len('api/v2/authorization/request/'):])
+            if not issued:
+                return self.send_text(401, 'Unauthorized')
+            return self.send_json(200, issued)
+
+        if path.startswith('api/v3/'):
+            if server.latency or server.latency_jitter:
+                time.sleep(server.latency + server.random.uniform(0, server.latency_jitter))
+            if server.rate_limit_rate and server.random.random() < server.rate_limit_rate:
+                server.record('429')
+                return self.send_text(429, 'Too Many Requests', headers={'Retry-After': '1'})
+            if server.error_rate and server.random.random() < server.error_rate:
+                server.record('500')
+                return self.send_text(500, 'Injected error')
+            return self.route_v3(method, path[len('api/v3/'):].split('/'), query, body)
+
+        if not path.startswith('api/v1/'):
+            return self.send_text(404, 'Not found: %s' % path)
+
+        parts = path[len('api/v1/'):].split('/')
+        collection = parts[0]
+        if collection.endswith('.json'):
+            collection = collection[:-len('.json')]
+        server.record('%s %s' % (method, collection))
+
+        if server.latency or server.latency_jitter:
+            time.sleep(server.latency + server.random.uniform(0, server.latency_jitter))
+
+        if server.rate_limit_rate and server.random.random() < server.rate_limit_rate:
+            server.record('429')
+            return self.send_text(429, 'Too Many Requests', headers={'Retry-After': '1'})
+        if server.error_rate and server.random.random() < server.error_rate:
+            server.record('500')
+            return self.send_text(500, 'Injected error')
+
+        if not server.authorized(self.headers, query):
+            return self.send_text(401, 'Unauthorized')
+
+        if collection == 'status':
+            return self.send_json(200, {
+                'status': 'ok',
+                'name': 'nightscout',
+                'version': 'standin',
+                'serverTime': arrow.utcnow().isoformat(),
+                'serverTimeEpoch': int(time.time() * 1000),
+                'apiEnabled': True,
+                'careportalEnabled': True,
+                'settings': {},
+            })
+
+        if collection not in COLLECTIONS:
+            return self.send_text(404, 'Unknown collection: %s' % collection)
+
+        _id = parts[1] if len(parts) > 1 and parts[1] else None
+
+        if method == 'GET':
+            if collection == 'profile' and _id == 'current':
+                found = server.store.find('profile', [], count=1)
+                return self.send_json(200, found[0] if found else {})
+            filters = self.filters_for(query)
+            if _id is not None:
+                filters.append(('_id', None, _id))
+            try:
+                count = int(query['count']) if 'count' in query else DEFAULT_COUNT
+            except ValueError:
+                return self.send_text(400, 'Invalid count: %s' % query['count'])
+            try:
+                return self.send_json(200, server.store.find(collection, filters, count=count))
+            except ValueError as e:
+                return self.send_text(400, str(e))
+
+        if method == 'POST':
+            if body is None:
+                return self.send_text(400, 'Missing body')
+            docs = body if isinstance(body, list) else [body]
+            with server.stats_lock:
+                server.stats['documents %s' % collection] += len(docs)
+            return self.send_json(200, server.store.insert(collection, docs))
+
+        if method == 'PUT':
+            if not isinstance(body, dict):
+                return self.send_text(400, 'Missing body')
+            return self.send_json(200, server.store.replace(collection, body))
+
+        if method == 'DELETE':
+            removed = server.store.delete(collection, _id=_id, filters=self.filters_for(query))
+            return self.send_json(200, {'n': removed, 'ok': 1})
+
+        return self.send_text(405, 'Method not allowed')
+
+    def do_GET(self):
+        self.route('GET')
+
+    def do_POST(self):
+        self.route('POST')
+
+    def do_PUT(self):
+        self.route('PUT')
+
+    def do_DELETE(self):
+        self.route('DELETE')
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Runs a local Nightscout stand-in server for testing and benchmarking tconnectsync.")
+    parser.add_argument('--host', dest='host', type=str, default='127.0.0.1')
+    parser.add_argument('--port', dest='port', type=int, default=1337)
+    parser.add_argument('--secret', dest='secret', type=str, default=None, help='If set, requests must provide this API_SECRET')
+    parser.add_argument('--access-token', dest='access_token', type=str, default=None, help='If set, api/v3 requests must use a JWT obtained with this access token')
+    parser.add_argument('--latency', dest='latency', type=float, default=0, help='Seconds of latency added to each request')
+    parser.add_argument('--latency-jitter', dest='latency_jitter', type=float, default=0, help='Maximum random seconds of latency added on top of --latency')
+    parser.add_argument('--error-rate', dest='error_rate', type=float, default=0, help='Fraction of requests which return HTTP 500')
+    parser.add_argument('--rate-limit-rate', dest='rate_limit_rate', type=float, default=0, help='Fraction of requests which return HTTP 429')
+    parser.add_argument('--seed', dest='seed', type=int, default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.DEBUG, format='%(asctime)s %(levelname)-8s %(message)s')
+    server = NightscoutStandinServer(
+        (args.host, args.port),
+        secret=args.secret,
+        access_token=args.access_token,
+        latency=args.latency,
+        latency_jitter=args.latency_jitter,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        seed=args.seed)
+    logger.info("Nightscout stand-in listening on %s" % server.url)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
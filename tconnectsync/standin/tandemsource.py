@@ -0,0 +1,319 @@
+import os
+import json
+import time
+import uuid
+import base64
+import random
+import logging
+import datetime
+import collections
+import urllib.parse
+import arrow
+import jwt
+
+from requests.adapters import BaseAdapter
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.hazmat.primitives import serialization
+from jwt.algorithms import RSAAlgorithm
+
+from ..api.common import mount_transport, unmount_transport
+from .transport import build_response, request_body_text
+from ..api.tandemsource import TandemSourceApi
+from ..eventparser.raw_event import RawEvent, EVENT_LEN
+from ..eventparser.synthetic import TANDEM_EPOCH_DATE, SECONDS_PER_DAY
+from ..eventparser.utils import batched
+from ..secret import TIMEZONE_NAME
+
+logger = logging.getLogger(__name__)
+
+PUMPER_ID = 'standin-pumper'
+ACCOUNT_ID = 'standin-account'
+SYNTHETIC_DEVICE_ID = 'standin-device'
+SYNTHETIC_SERIAL_NUMBER = '90000001'
+
+METADATA_FILE = 'pumpeventmetadata.json'
+PUMPERS_FILE = 'pumpers.json'
+
+URL_PREFIXES = [
+    TandemSourceApi.LOGIN_PAGE_URL,
+    'https://tdcservices.tandemdiabetes.com/',
+    TandemSourceApi.SOURCE_URL,
+]
+
+
+def event_day(raw_event):
+    return TANDEM_EPOCH_DATE + datetime.timedelta(days=raw_event.timestampRaw // SECONDS_PER_DAY)
+
+
+def day_file(directory, tconnect_device_id, day):
+    return os.path.join(directory, str(tconnect_device_id), '%s.b64' % day.isoformat())
+
+
+def split_events(raw):
+    return [bytes(chunk) for chunk in batched(raw, EVENT_LEN)]
+
+
+"""
+Splits a pump_events_raw() base64 response into per-day fixture files
+under directory/<tconnect_device_id>/<YYYY-MM-DD>.b64, merging with any
+events already recorded for those days.
+"""
+def write_fixture_events(directory, tconnect_device_id, raw_b64):
+    by_day = collections.defaultdict(dict)
+    for chunk in split_events(base64.b64decode(raw_b64)):
+        raw_event = RawEvent.build(chunk)
+        by_day[event_day(raw_event)][raw_event.seqNum] = chunk
+
+    os.makedirs(os.path.join(directory, str(tconnect_device_id)), exist_ok=True)
+    for day, events in by_day.items():
+        path = day_file(directory, tconnect_device_id, day)
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                for chunk in split_events(base64.b64decode(f.read())):
+                    events.setdefault(RawEvent.build(chunk).seqNum, chunk)
+
+        with open(path, 'w') as f:
+            f.write(base64.b64encode(b''.join(events[k] for k in sorted(events.keys()))).decode('ascii'))
+
+    return sorted(by_day.keys())
+
+
+"""
+Writes SyntheticPumpHistory output for min_date through max_date as a fixture directory.
+"""
+def write_synthetic_fixtures(directory, history, min_date, max_date, tconnect_device_id=SYNTHETIC_DEVICE_ID, serial_number=SYNTHETIC_SERIAL_NUMBER):
+    days = write_fixture_events(directory, tconnect_device_id, history.pump_events_raw(min_date, max_date))
+    metadata = [device_metadata(tconnect_device_id, serial_number, days[0], days[-1])] if days else []
+    with open(os.path.join(directory, METADATA_FILE), 'w') as f:
+        json.dump(metadata, f, indent=4)
+    return metadata
+
+
+def device_metadata(tconnect_device_id, serial_number, min_date, max_date, max_time=None):
+    max_time = max_time or '%sT23:59:59' % max_date.isoformat()
+    return {
+        'tconnectDeviceId': tconnect_device_id,
+        'serialNumber': serial_number,
+        'modelNumber': '1002717',
+        'minDateWithEvents': '%sT00:00:00' % min_date.isoformat(),
+        'maxDateWithEvents': max_time,
+        'lastUpload': max_time,
+        'patientName': 'Stand-in Patient',
+        'patientDateOfBirth': '1990-01-01',
+        'patientCareGiver': None,
+        'softwareVersion': '7.7.1',
+        'partNumber': '1000354',
+    }
+
+
+"""
+Serves Tandem Source pump metadata and event blobs, plus the SSO/OIDC
+login flow used by TandemSourceApi.login(), without network access.
+
+Event data is read either from a fixture directory (see write_fixture_events
+and write_synthetic_fixtures) or generated on the fly from a
+SyntheticPumpHistory. When generating, events after now() in the pump's
+timezone are withheld, so repeated polling behaves like a pump which is
+continuously uploading.
+
+minDate, maxDate and eventIds are honored. Latency and HTTP 500 responses
+can be injected per request on the Tandem Source endpoints.
+"""
+class TandemSourceStandin:
+    def __init__(self, directory=None, synthetic=None, synthetic_start=None, now=None, latency=0, latency_jitter=0, error_rate=0, seed=None, expires_in=3600):
+        if not directory and not synthetic:
+            raise ValueError('Either a fixture directory or a synthetic history is required')
+
+        self.directory = directory
+        self.synthetic = synthetic
+        self.synthetic_start = arrow.get(synthetic_start).date() if synthetic_start else None
+        self.now = now or (lambda: arrow.now(TIMEZONE_NAME))
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.expires_in = expires_in
+        self.stats = collections.Counter()
+        self.codes = {}
+
+        self._key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        self._kid = uuid.uuid4().hex
+
+    def jwks(self):
+        jwk = json.loads(RSAAlgorithm.to_jwk(self._key.public_key()))
+        jwk.update({'kid': self._kid, 'alg': 'RS256', 'use': 'sig'})
+        return {'keys': [jwk]}
+
+    def id_token(self):
+        now = int(time.time())
+        return jwt.encode({
+            'iss': TandemSourceApi.TDC_OIDC_ISSUER,
+            'aud': TandemSourceApi.TDC_OIDC_CLIENT_ID,
+            'iat': now,
+            'exp': now + self.expires_in,
+            'pumperId': PUMPER_ID,
+            'accountId': ACCOUNT_ID,
+        }, self._key.private_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PrivateFormat.PKCS8,
+            encryption_algorithm=serialization.NoEncryption()
+        ), algorithm='RS256', headers={'kid': self._kid})
+
+    def now_raw(self):
+        now = self.now().naive
+        return (now.date() - TANDEM_EPOCH_DATE).days * SECONDS_PER_DAY + now.hour * 3600 + now.minute * 60 + now.second
+
+    def pump_event_metadata(self):
+        if self.directory:
+            path = os.path.join(self.directory, METADATA_FILE)
+            if os.path.exists(path):
+                with open(path, 'r') as f:
+                    return json.load(f)
+
+            metadata = []
+            for device_id in sorted(os.listdir(self.directory)):
+                device_dir = os.path.join(self.directory, device_id)
+                if not os.path.isdir(device_dir):
+                    continue
+                days = sorted(arrow.get(f[:-len('.b64')]).date() for f in os.listdir(device_dir) if f.endswith('.b64'))
+                if days:
+                    metadata.append(device_metadata(device_id, device_id, days[0], days[-1]))
+            return metadata
+
+        now = self.now()
+        start = self.synthetic_start or (now.date() - datetime.timedelta(days=90))
+        return [device_metadata(SYNTHETIC_DEVICE_ID, SYNTHETIC_SERIAL_NUMBER, start, now.date(), max_time=now.naive.isoformat(timespec='seconds'))]
+
+    def pumper_info(self):
+        if self.directory and os.path.exists(os.path.join(self.directory, PUMPERS_FILE)):
+            with open(os.path.join(self.directory, PUMPERS_FILE), 'r') as f:
+                return json.load(f)
+        return {'pumperId': PUMPER_ID, 'accountId': ACCOUNT_ID, 'firstName': 'Stand-in', 'lastName': 'Patient'}
+
+    def day_events(self, tconnect_device_id, day):
+        if self.directory:
+            path = day_file(self.directory, tconnect_device_id, day)
+            if not os.path.exists(path):
+                return []
+            with open(path, 'r') as f:
+                return split_events(base64.b64decode(f.read()))
+
+        if tconnect_device_id != SYNTHETIC_DEVICE_ID:
+            return []
+        if self.synthetic_start and day < self.synthetic_start:
+            return []
+        now_raw = self.now_raw()
+        return [e.encode() for e in self.synthetic.day_events(day) if e.raw.timestampRaw <= now_raw]
+
+    def pump_events_raw(self, tconnect_device_id, min_date, max_date, event_ids=None):
+        day = arrow.get(min_date).date()
+        end = arrow.get(max_date).date()
+        out = []
+        while day <= end:
+            for chunk in self.day_events(tconnect_device_id, day):
+                if event_ids is None or RawEvent.build(chunk).id in event_ids:
+                    out.append(chunk)
+            day += datetime.timedelta(days=1)
+        return base64.b64encode(b''.join(out)).decode('ascii')
+
+    def inject_failure(self):
+        if self.latency or self.latency_jitter:
+            time.sleep(self.latency + self.random.uniform(0, self.latency_jitter))
+
+        if self.error_rate and self.random.random() < self.error_rate:
+            self.stats['500'] += 1
+            return True
+        return False
+
+    """
+    Handles a single request, returning (status_code, headers, body).
+    """
+    def handle(self, method, url, body=None):
+        parsed = urllib.parse.urlparse(url)
+        base = '%s://%s/' % (parsed.scheme, parsed.netloc)
+        path = parsed.path.strip('/')
+        query = dict(urllib.parse.parse_qsl(parsed.query))
+        self.stats['%s %s' % (method, path)] += 1
+
+        if url.startswith(TandemSourceApi.SOURCE_URL):
+            if self.inject_failure():
+                return 500, {}, 'Injected error'
+            return self.handle_source(path, query)
+
+        if url.startswith(TandemSourceApi.LOGIN_API_URL):
+            return 200, {'Content-Type': 'application/json'}, json.dumps({'redirectUrl': '/', 'status': 'SUCCESS'})
+
+        if path.endswith('connect/authorize'):
+            code = uuid.uuid4().hex
+            self.codes[code] = True
+            return 302, {'Location': '%s?%s' % (query['redirect_uri'], urllib.parse.urlencode({'code': code}))}, ''
+
+        if path.endswith('connect/token'):
+            form = dict(urllib.parse.parse_qsl(body or ''))
+            if not self.codes.pop(form.get('code'), None):
+                return 400, {'Content-Type': 'application/json'}, json.dumps({'error': 'invalid_grant'})
+            return 200, {'Content-Type': 'application/json'}, json.dumps({
+                'access_token': uuid.uuid4().hex,
+                'id_token': self.id_token(),
+                'expires_in': self.expires_in,
+                'token_type': 'Bearer',
+            })
+
+        if url.startswith(TandemSourceApi.TDC_OIDC_JWKS_URL):
+            return 200, {'Content-Type': 'application/json'}, json.dumps(self.jwks())
+
+        if base == TandemSourceApi.LOGIN_PAGE_URL:
+            return 200, {'Content-Type': 'text/html'}, '<html></html>'
+
+        return 404, {}, 'Not found: %s' % url
+
+    def handle_source(self, path, query):
+        parts = path.split('/')
+        if path.startswith('api/pumpers/pumpers/'):
+            return 200, {'Content-Type': 'application/json'}, json.dumps(self.pumper_info())
+
+        if path.startswith('api/reports/reportsfacade/') and path.endswith('/pumpeventmetadata'):
+            return 200, {'Content-Type': 'application/json'}, json.dumps(self.pump_event_metadata())
+
+        if path.startswith('api/reports/reportsfacade/pumpevents/') and len(parts) == 6:
+            tconnect_device_id = parts[5]
+            if 'minDate' not in query or 'maxDate' not in query:
+                return 400, {}, 'minDate and maxDate are required'
+            event_ids = set(int(i) for i in query['eventIds'].split(',')) if query.get('eventIds') else None
+            raw = self.pump_events_raw(tconnect_device_id, query['minDate'], query['maxDate'], event_ids)
+            return 200, {'Content-Type': 'application/json'}, json.dumps(raw)
+
+        return 404, {}, 'Not found: %s' % path
+
+    """
+    Mounts this stand-in on all sessions created via base_session(), so that
+    TandemSourceApi (and TConnectApi.tandemsource) talk to it instead of Tandem.
+    """
+    def install(self):
+        adapter = TandemSourceStandinAdapter(self)
+        for prefix in URL_PREFIXES:
+            mount_transport(prefix, adapter)
+        return self
+
+    def uninstall(self):
+        for prefix in URL_PREFIXES:
+            unmount_transport(prefix)
+
+    def __enter__(self):
+        return self.install()
+
+    def __exit__(self, *args):
+        self.uninstall()
+
+
+class TandemSourceStandinAdapter(BaseAdapter):
+    def __init__(self, standin):
+        super().__init__()
+        self.standin = standin
+
+    def send(self, request, **kwargs):
+        status, headers, content = self.standin.handle(request.method, request.url, request_body_text(request))
+        return build_response(self, request, status, headers, content)
+
+    def close(self):
+        pass
@@ -0,0 +1,28 @@
+import io
+import requests
+
+from requests.structures import CaseInsensitiveDict
+
+"""
+Builds a requests.Response for a transport adapter which does not talk to the network.
+"""
+def build_response(adapter, request, status, headers, content):
+    content = content.encode() if isinstance(content, str) else content
+    response = requests.Response()
+    response.status_code = status
+    response.reason = requests.status_codes._codes.get(status, [''])[0].upper()
+    response.headers = CaseInsensitiveDict({'Content-Length': str(len(content)), **headers})
+    response.raw = io.BytesIO(content)
+    response._content = content
+    response.encoding = 'utf-8'
+    response.url = request.url
+    response.request = request
+    response.connection = adapter
+    return response
+
+
+def request_body_text(request):
+    body = request.body
+    if isinstance(body, bytes):
+        body = body.decode('utf-8', errors='replace')
+    return body
@@ -1,4 +1,6 @@
 import arrow
+import datetime
+import heapq
 import logging
 
 from ..parser.nightscout import (
@@ -10,9 +12,24 @@ from ..secret import SKIP_NS_LAST_UPLOADED_CHECK
 
 logger = logging.getLogger(__name__)
 
+SECONDS_PER_DAY = 24 * 60 * 60
+
+"""
+Returns the POSIX timestamp of a time string from TConnectEntry, which is
+much faster to parse with fromisoformat() than with arrow.get().
+"""
+def _timestamp(time):
+    try:
+        return datetime.datetime.fromisoformat(time).timestamp()
+    except ValueError:
+        return arrow.get(time).timestamp()
+
 """
 Merges together input from the therapy timeline API
 into a digestable format of basal data.
+
+Timestamps are parsed once per event, and basal and suspension events are
+merged in a single pass over both lists sorted by timestamp.
 """
 def process_ciq_basal_events(data):
     if data is None:
@@ -40,48 +57,43 @@ def process_ciq_basal_events(data):
             i["delivery_type"] += " (" + suspensionEvents[i["time"]]["suspendReason"] + " suspension)"
 
             del suspensionEvents[i["time"]]
-    
+
     # Suspensions with suspendReason 'manual' do not have an associated basal event,
     # and require extra processing.
 
-    basalEvents.sort(key=lambda x: arrow.get(x["time"]))
-
-    unprocessedSuspensions = list(suspensionEvents.values())
-    unprocessedSuspensions.sort(key=lambda x: arrow.get(x["time"]))
+    basalEvents = sorted(((_timestamp(e["time"]), e) for e in basalEvents), key=lambda x: x[0])
+    unprocessedSuspensions = sorted(((_timestamp(e["time"]), e) for e in suspensionEvents.values()), key=lambda x: x[0])
 
     # For the remaining suspensions which did not match with an existing basal event,
     # add a new event manually. This means we need to calculate the duration of the
-    # suspension.
+    # suspension. Each basal event after the first ends at most one suspension.
     newEvents = []
-    for i in range(len(basalEvents)):
-        if len(unprocessedSuspensions) == 0:
+    nextSuspension = 0
+    for i, (existingTime, _) in enumerate(basalEvents):
+        if nextSuspension == len(unprocessedSuspensions):
             break
 
-        existingTime = arrow.get(basalEvents[i]["time"])
-        unprocessedTime = arrow.get(unprocessedSuspensions[0]["time"])
-        
+        unprocessedTime, suspension = unprocessedSuspensions[nextSuspension]
+
         # If we've found an event which occurs after the suspension, then the
         # difference in their timestamps is the duration of the suspension.
         if i > 0 and existingTime > unprocessedTime:
-            suspension = unprocessedSuspensions.pop(0)
+            nextSuspension += 1
 
-            # TConnect's internal duration object tracks the duration in seconds
-            seconds = (existingTime - unprocessedTime).seconds
+            # TConnect's internal duration object tracks the duration in seconds,
+            # modulo whole days like timedelta.seconds
+            seconds = int(existingTime - unprocessedTime) % SECONDS_PER_DAY
 
             newEvent = TConnectEntry.manual_suspension_to_basal_entry(suspension, seconds)
             logger.debug("Adding basal event for unprocessed suspension: %s" % newEvent)
-            newEvents.append(newEvent)
+            newEvents.append((unprocessedTime, newEvent))
 
     # Any remaining suspensions which have not been processed have not ended,
     # which means we do not know their duration; so we will skip them (for now)
 
-    # Add any new events and re-sort
-    if newEvents:
-        basalEvents += newEvents
-        basalEvents.sort(key=lambda x: arrow.get(x["time"]))
-
-
-    return basalEvents
+    # Both lists are sorted, so merge in the new events. On equal timestamps,
+    # existing basal events come first.
+    return [e for _, e in heapq.merge(basalEvents, newEvents, key=lambda x: x[0])]
 
 """
 Processes basal data input from the therapy timeline CSV (which only
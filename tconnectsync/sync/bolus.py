@@ -2,7 +2,7 @@ import arrow
 import logging
 from tconnectsync.domain.bolus import Bolus
 
-from tconnectsync.sync.cgm import find_event_at
+from tconnectsync.sync.cgm import CgmIndex, find_event_at
 
 from ..parser.nightscout import (
     BOLUS_EVENTTYPE,
@@ -19,6 +19,10 @@ Given bolus data input from the therapy timeline CSV, converts it into a digesta
 def process_bolus_events(bolusdata, cgmEvents=None, source=""):
     bolusEvents = []
 
+    # Index the CGM readings once, rather than for every bolus with a BG
+    if cgmEvents and not isinstance(cgmEvents, CgmIndex):
+        cgmEvents = CgmIndex.from_events(cgmEvents)
+
     for b in bolusdata:
         parsed = None
         if source == "ciq":
@@ -57,7 +61,7 @@ def process_bolus_events(bolusdata, cgmEvents=None, source=""):
 """
 Determine whether the given BG specified in the bolus is identical to the
 most recent CGM reading at that time. If it is, return SENSOR.
-Otherwise, return FINGER.
+Otherwise, return FINGER. cgmEvents may be a list of readings or a CgmIndex.
 """
 def guess_bolus_bg_type(bg, created_at, cgmEvents):
     if not cgmEvents:
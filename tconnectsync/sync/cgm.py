@@ -1,9 +1,11 @@
 import json
+import bisect
 import arrow
 import logging
 
 from ..parser.tconnect import TConnectEntry
 from ..parser.nightscout import NightscoutEntry
+from ..eventparser.raw_event import TANDEM_EPOCH
 
 logger = logging.getLogger(__name__)
 
@@ -14,26 +16,114 @@ def process_cgm_events(readingData):
     
     return data
 
+"""
+A sorted index of CGM readings by integer timestamp, for repeatedly finding
+the reading which was current at a given time. It is built once per sync
+and queried with bisect, rather than re-parsing and re-sorting every reading
+for each lookup.
+
+Readings may be added in any order; the index is re-sorted lazily on the next
+lookup, which is cheap for readings added roughly in time order.
+"""
+class CgmIndex:
+    def __init__(self):
+        self.times = []
+        self.readings = []
+        self.sorted = True
+
+    def add(self, timestamp, reading):
+        if self.times and timestamp < self.times[-1]:
+            self.sorted = False
+        self.times.append(timestamp)
+        self.readings.append(reading)
+
+    def __len__(self):
+        return len(self.times)
+
+    def _sort(self):
+        if self.sorted:
+            return
+        # Stable, so the reading added last wins among readings at the same time
+        order = sorted(range(len(self.times)), key=self.times.__getitem__)
+        self.times = [self.times[i] for i in order]
+        self.readings = [self.readings[i] for i in order]
+        self.sorted = True
+
+    """
+    Returns the latest reading at or before the given integer timestamp,
+    or None if there is none.
+    """
+    def at(self, timestamp):
+        self._sort()
+        i = bisect.bisect_right(self.times, timestamp)
+        if i == 0:
+            return None
+        return self.readings[i - 1]
+
+    """
+    Drops the readings before the given integer timestamp, except the one
+    which was current at that time, so lookups at or after it are unchanged.
+    """
+    def trim(self, timestamp):
+        self._sort()
+        i = bisect.bisect_right(self.times, timestamp)
+        if i > 1:
+            del self.times[:i - 1]
+            del self.readings[:i - 1]
+
+    """
+    Builds an index from processed CGM data, as returned by process_cgm_events,
+    keyed by Unix timestamp.
+    """
+    @staticmethod
+    def from_events(cgmEvents):
+        index = CgmIndex()
+        for r in cgmEvents:
+            index.add(arrow.get(r["time"]).int_timestamp, r)
+        return index
+
+    """
+    Returns the latest processed CGM reading at or before find_time.
+    """
+    def event_at(self, find_time):
+        return self.at(arrow.get(find_time).int_timestamp)
+
+    """
+    Adds Tandem Source CGM reading events (LidCgmDataGxb, LidCgmDataG7 and
+    LidCgmDataFsl2), keyed by the pump's local time in seconds since the Unix
+    epoch. Backfilled readings are keyed by the time they were taken
+    (egvTimestamp) rather than the time they were added to the pump.
+    """
+    def add_pump_events(self, events):
+        for event in events:
+            self.add(TANDEM_EPOCH + event.egvTimestamp, event)
+
+    """
+    Returns the latest Tandem Source CGM reading event at or before the time
+    of the given pump event.
+    """
+    def pump_event_at(self, event):
+        return self.at(TANDEM_EPOCH + event.raw.timestampRaw)
+
+    """
+    Like trim(), given a pump-local time such as an event's eventTimestamp.
+    """
+    def trim_pump_time(self, time):
+        self.trim(arrow.get(time).replace(tzinfo='UTC').int_timestamp)
+
+
 """
 Given reading data and a time, finds the BG reading event which would have
 been the current one at that time. e.g., it looks before the given time,
 not after.
 This is a heuristic for checking whether the BG component of a bolus was
 manually entered or inferred based on the pump's CGM.
+cgmEvents may be a CgmIndex, which should be used when looking up many times.
 """
 def find_event_at(cgmEvents, find_time):
-    find_t = arrow.get(find_time)
-    events = list(map(lambda x: (arrow.get(x["time"]), x), cgmEvents))
-    events.sort()
-
-    closestReading = None
-    for t, r in events:
-        if t > find_t:
-            break
-        closestReading = r
-        
-    
-    return closestReading
+    if not isinstance(cgmEvents, CgmIndex):
+        cgmEvents = CgmIndex.from_events(cgmEvents)
+    return cgmEvents.event_at(find_time)
     
 
 """
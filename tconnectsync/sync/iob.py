@@ -43,7 +43,8 @@ def ns_write_iob_events(nightscout, iobEvents, pretend=False, time_start=None, t
 
     entry = NightscoutEntry.iob(
         iob=event["iob"],
-        created_at=event["time"]
+        created_at=event["time"],
+        basaliob=event.get("basaliob")
     )
 
     logger.info("  Processing iob: %s entry: %s" % (event, entry))
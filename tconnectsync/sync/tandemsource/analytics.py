@@ -0,0 +1,248 @@
+import logging
+import datetime
+import arrow
+import numpy as np
+
+from ...eventparser.generic import decode_raw_events, decode_columns
+from ...eventparser.raw_event import TANDEM_EPOCH
+from ...eventparser import events as eventtypes
+from ...domain.tandemsource.event_class import EventClass
+
+logger = logging.getLogger(__name__)
+
+DAY_SECONDS = 24 * 60 * 60
+
+# CGM readings are expected every 5 minutes
+CGM_INTERVAL_SECONDS = 5 * 60
+
+# Time in range buckets, as (name, lowest mg/dL, highest mg/dL) inclusive
+RANGE_BUCKETS = [
+    ('veryLow', 0, 53),
+    ('low', 54, 69),
+    ('inRange', 70, 180),
+    ('high', 181, 250),
+    ('veryHigh', 251, 10000),
+]
+
+SLEEPING_MODE = eventtypes.LidAaUserModeChange.CurrentusermodeEnum.Sleeping.value
+EXERCISING_MODE = eventtypes.LidAaUserModeChange.CurrentusermodeEnum.Exercising.value
+CLOSED_LOOP_PCM = eventtypes.LidAaPcmChange.CurrentpcmEnum.ClosedLoop.value
+
+ANALYTICS_EVENTS = [
+    *sorted(EventClass.CGM_READING.value, key=lambda cls: cls.ID),
+    eventtypes.LidBasalDelivery,
+    eventtypes.LidBolusCompleted,
+    eventtypes.LidPumpingSuspended,
+    eventtypes.LidPumpingResumed,
+    eventtypes.LidAaUserModeChange,
+    eventtypes.LidAaPcmChange,
+]
+
+
+"""
+Returns pump event times as seconds since the Unix epoch in the pump's local
+time, which is how Tandem timestamps are stored, without a time zone.
+"""
+def local_seconds(t):
+    return int((arrow.get(t).naive - datetime.datetime(1970, 1, 1)).total_seconds())
+
+
+"""
+Splits a piecewise-constant signal, which takes each of values from its time
+until the next time, into segments between start and end which are also split
+at each of breaks. times must be sorted. Time before the first event is not
+covered. Returns the start time, duration in seconds and value of each segment.
+"""
+def segments(times, values, start, end, breaks=()):
+    if not len(times):
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), values[:0]
+
+    edges = np.unique(np.concatenate([times, np.asarray(breaks, dtype=np.int64), [start, end]]))
+    edges = edges[(edges >= max(start, times[0])) & (edges <= end)]
+    if len(edges) < 2:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), values[:0]
+
+    seg_start = edges[:-1]
+    idx = np.searchsorted(times, seg_start, side='right') - 1
+    return seg_start, np.diff(edges), values[idx]
+
+
+"""
+Computes summary statistics over decoded Tandem Source pump history, like
+those returned by the legacy ControlIQApi.dashboard_summary() and more, using
+vectorized NumPy operations over the columns returned by decode_columns().
+Once the events for a range have been fetched, reports for any time range
+within it are computed locally.
+
+Times are in the pump's local time. Ranges are half-open, from time_start up
+to but not including time_end.
+"""
+class Analytics:
+    def __init__(self, columns):
+        self.columns = columns
+
+        cgm = [columns[cls] for cls in EventClass.CGM_READING.value if cls in columns]
+        self.cgm_times = self._concat([TANDEM_EPOCH + np.asarray(c['egvTimestamp'], dtype=np.int64) for c in cgm])
+        self.cgm_values = self._concat([np.asarray(c['currentglucosedisplayvalue'], dtype=np.int64) for c in cgm])
+        # Backfilled readings can be repeated, so keep one reading per time
+        self.cgm_times, first = np.unique(self.cgm_times, return_index=True)
+        self.cgm_values = self.cgm_values[first]
+        valid = self.cgm_values > 0
+        self.cgm_times, self.cgm_values = self.cgm_times[valid], self.cgm_values[valid]
+
+        self.basal_times, self.basal_rates = self._signal(
+            [(eventtypes.LidBasalDelivery, 'commandedRate')])
+        self.suspended_times, self.suspended = self._signal(
+            [(eventtypes.LidPumpingSuspended, 1), (eventtypes.LidPumpingResumed, 0)])
+        self.user_mode_times, self.user_modes = self._signal(
+            [(eventtypes.LidAaUserModeChange, 'currentusermodeRaw')])
+        self.pcm_times, self.pcms = self._signal(
+            [(eventtypes.LidAaPcmChange, 'currentpcmRaw')])
+
+        bolus = columns.get(eventtypes.LidBolusCompleted, {})
+        self.bolus_times = TANDEM_EPOCH + np.asarray(bolus.get('timestampRaw', ()), dtype=np.int64)
+        self.bolus_units = np.asarray(bolus.get('insulindelivered', ()), dtype=np.float64)
+
+    """
+    Fetches the events needed for analytics between time_start and time_end
+    in a single request. The day before time_start is also fetched, so that
+    the basal rate and modes in effect at time_start are known.
+    """
+    @staticmethod
+    def fetch(tconnect, tconnect_device_id, time_start, time_end):
+        raw = tconnect.tandemsource.pump_events_raw(
+            tconnect_device_id,
+            arrow.get(time_start).shift(days=-1),
+            arrow.get(time_end),
+            event_ids_filter=[cls.ID for cls in ANALYTICS_EVENTS]
+        )
+        return Analytics(decode_columns(decode_raw_events(raw)))
+
+    @staticmethod
+    def _concat(arrays):
+        if not arrays:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate(arrays)
+
+    """
+    Merges the given (event class, column name or constant value) pairs into
+    one signal, ordered by event time and then sequence number.
+    """
+    def _signal(self, sources):
+        times, seqnums, values = [], [], []
+        for cls, value in sources:
+            cols = self.columns.get(cls)
+            if not cols:
+                continue
+            times.append(TANDEM_EPOCH + np.asarray(cols['timestampRaw'], dtype=np.int64))
+            seqnums.append(np.asarray(cols['seqNum'], dtype=np.int64))
+            if isinstance(value, str):
+                values.append(np.asarray(cols[value], dtype=np.int64))
+            else:
+                values.append(np.full(len(cols['seqNum']), value, dtype=np.int64))
+
+        times, seqnums, values = self._concat(times), self._concat(seqnums), self._concat(values)
+        order = np.lexsort((seqnums, times))
+        return times[order], values[order]
+
+    """
+    Returns per-day statistics between time_start and time_end, as a dict of
+    metric name to a NumPy array with one entry per day, plus 'date'.
+    """
+    def daily(self, time_start, time_end):
+        start, end = local_seconds(time_start), local_seconds(time_end)
+        first_day = start - start % DAY_SECONDS
+        breaks = np.arange(first_day, end, DAY_SECONDS, dtype=np.int64)
+        n_days = len(breaks)
+
+        def day_of(times):
+            return (times - first_day) // DAY_SECONDS
+
+        def day_sums(times, weights):
+            return np.bincount(day_of(times), weights=weights, minlength=n_days)[:n_days].astype(np.float64)
+
+        def day_seconds(times, values, match):
+            seg_start, duration, value = segments(times, values, start, end, breaks)
+            return day_sums(seg_start, np.where(match(value), duration, 0))
+
+        in_range = (self.cgm_times >= start) & (self.cgm_times < end)
+        cgm_times, cgm_values = self.cgm_times[in_range], self.cgm_values[in_range]
+        cgm_readings = day_sums(cgm_times, None)
+        buckets = {
+            name: day_sums(cgm_times, ((cgm_values >= low) & (cgm_values <= high)).astype(np.float64))
+            for name, low, high in RANGE_BUCKETS
+        }
+
+        seg_start, duration, rate = segments(self.basal_times, self.basal_rates, start, end, breaks)
+        basal_units = day_sums(seg_start, rate / 1000 * duration / 3600)
+
+        in_range = (self.bolus_times >= start) & (self.bolus_times < end)
+        bolus_units = day_sums(self.bolus_times[in_range], self.bolus_units[in_range])
+
+        modes = self.user_modes
+        entered_exercise = (modes == EXERCISING_MODE) & (np.concatenate([[-1], modes])[:-1] != EXERCISING_MODE)
+        exercise_times = self.user_mode_times[entered_exercise]
+        exercise_times = exercise_times[(exercise_times >= start) & (exercise_times < end)]
+
+        day_start = np.maximum(breaks, start)
+        day_end = np.minimum(breaks + DAY_SECONDS, end)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return dict(
+                date=[datetime.date(1970, 1, 1) + datetime.timedelta(days=int(d) // DAY_SECONDS) for d in breaks],
+                minutes=(day_end - day_start) / 60,
+                averageReading=day_sums(cgm_times, cgm_values.astype(np.float64)) / cgm_readings,
+                cgmReadings=cgm_readings,
+                timeInRange={name: counts / cgm_readings * 100 for name, counts in buckets.items()},
+                basalUnits=basal_units,
+                bolusUnits=bolus_units,
+                suspensionMinutes=day_seconds(self.suspended_times, self.suspended, lambda v: v == 1) / 60,
+                sleepMinutes=day_seconds(self.user_mode_times, self.user_modes, lambda v: v == SLEEPING_MODE) / 60,
+                exerciseEvents=day_sums(exercise_times, None),
+                controlIqOffMinutes=day_seconds(self.pcm_times, self.pcms, lambda v: v != CLOSED_LOOP_PCM) / 60,
+            )
+
+    """
+    Returns summary statistics between time_start and time_end. The keys
+    shared with ControlIQApi.dashboard_summary() have the same meaning.
+    """
+    def summary(self, time_start, time_end):
+        daily = self.daily(time_start, time_end)
+
+        minutes = float(daily['minutes'].sum())
+        days = minutes / (24 * 60)
+        readings = int(daily['cgmReadings'].sum())
+        basal = float(daily['basalUnits'].sum())
+        bolus = float(daily['bolusUnits'].sum())
+        cgm_minutes = min(minutes, readings * CGM_INTERVAL_SECONDS / 60)
+        ciq_off_minutes = float(daily['controlIqOffMinutes'].sum())
+
+        def percent(part, whole):
+            return round(100 * float(part) / whole, 1) if whole else None
+
+        def per_day(total, ndigits=2):
+            return round(total / days, ndigits) if days else None
+
+        in_range = (self.cgm_times >= local_seconds(time_start)) & (self.cgm_times < local_seconds(time_end))
+        cgm_values = self.cgm_values[in_range]
+
+        return {
+            'totalDays': round(days, 2),
+            'averageReading': round(float(cgm_values.mean())) if readings else None,
+            'cgmReadings': readings,
+            'cgmCoveragePercent': percent(cgm_minutes, minutes),
+            'cgmInactiveMinutes': round(minutes - cgm_minutes),
+            'cgmInactivePercent': percent(minutes - cgm_minutes, minutes),
+            'timeInRange': {name: percent(((cgm_values >= low) & (cgm_values <= high)).sum(), readings) for name, low, high in RANGE_BUCKETS},
+            'basalUnits': round(basal, 2),
+            'bolusUnits': round(bolus, 2),
+            'averageDailyBasal': per_day(basal),
+            'averageDailyBolus': per_day(bolus),
+            'averageTotalDailyDose': per_day(basal + bolus),
+            'basalPercent': percent(basal, basal + bolus),
+            'suspensionMinutes': round(float(daily['suspensionMinutes'].sum())),
+            'averageDailySleepMinutes': per_day(float(daily['sleepMinutes'].sum()), 0),
+            'weeklyExerciseEvents': per_day(float(daily['exerciseEvents'].sum()) * 7, 1),
+            'controlIqSetToOffMinutes': round(ciq_off_minutes),
+            'controlIqOffPercent': percent(ciq_off_minutes, minutes),
+        }
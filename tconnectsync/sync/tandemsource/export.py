@@ -0,0 +1,164 @@
+import os
+import json
+import logging
+import datetime
+import arrow
+
+from ...eventparser.generic import decode_raw_events, decode_columns
+from ...eventparser.raw_event import TANDEM_EPOCH
+from ...secret import TIMEZONE_NAME
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ['parquet', 'arrow', 'ndjson']
+
+EXTENSIONS = {
+    'parquet': '.parquet',
+    'arrow': '.arrow',
+    'ndjson': '.ndjson',
+}
+
+
+def pyarrow_available():
+    try:
+        import pyarrow
+        return True
+    except ImportError:
+        return False
+
+
+"""
+Writes the columns of one event type to newline-delimited JSON, one object
+per event in the same form as the event's todict().
+"""
+class NdjsonWriter:
+    def __init__(self, path, cls):
+        self.cls = cls
+        self.f = open(path, 'w')
+
+    def write(self, columns):
+        names = list(columns.keys())
+        for row in zip(*columns.values()):
+            values = dict(zip(names, row))
+            event = dict(
+                id=self.cls.ID,
+                name=self.cls.NAME,
+                seqNum=values['seqNum'],
+                eventTimestamp=str(arrow.get(TANDEM_EPOCH + values['timestampRaw'], tzinfo='UTC').replace(tzinfo=TIMEZONE_NAME)),
+            )
+            event.update((k, values[k]) for k in self.cls.COLUMNS)
+            self.f.write(json.dumps(event) + '\n')
+
+    def close(self):
+        self.f.close()
+
+
+"""
+Writes the columns of one event type to a Parquet or Arrow IPC file, one
+record batch per write(). Columns are typed from the generated field
+definitions. eventTimestamp is the pump's local time, which has no time zone
+attached, so it is stored as a time zone-naive timestamp.
+"""
+class ArrowWriter:
+    def __init__(self, path, cls, format):
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        self.pa = pa
+        self.pc = pc
+        types = {
+            'uint8': pa.uint8(),
+            'int8': pa.int8(),
+            'uint16': pa.uint16(),
+            'int16': pa.int16(),
+            'uint32': pa.uint32(),
+            'float32': pa.float32(),
+        }
+        self.schema = pa.schema(
+            [('seqNum', pa.uint32()), ('eventTimestamp', pa.timestamp('s'))] +
+            [(name, types[t]) for name, t in zip(cls.COLUMNS, cls.COLUMN_TYPES)],
+            metadata={'id': str(cls.ID), 'name': cls.NAME, 'timezone': TIMEZONE_NAME or ''}
+        )
+
+        if format == 'parquet':
+            import pyarrow.parquet as pq
+            self.writer = pq.ParquetWriter(path, self.schema)
+        else:
+            import pyarrow.ipc as ipc
+            self.writer = ipc.new_file(path, self.schema)
+
+    def write(self, columns):
+        pa, pc = self.pa, self.pc
+        timestamps = pa.array(columns['timestampRaw'], type=pa.int64())
+        arrays = [
+            pa.array(columns['seqNum'], type=pa.uint32()),
+            pc.add(timestamps, TANDEM_EPOCH).cast(pa.timestamp('s')),
+        ] + [pa.array(columns[field.name], type=field.type) for field in list(self.schema)[2:]]
+        self.writer.write_batch(pa.record_batch(arrays, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+"""
+Exports decoded Lid* pump events for a device and date range into one file
+per event type in the given directory, without uploading anything to
+Nightscout. Pump events are fetched one day at a time, decoded into columns
+with decode_columns() and appended to each event type's file, so the whole
+range is never held in memory.
+
+Parquet and Arrow IPC output require pyarrow; if it is not installed, the
+export falls back to NDJSON.
+"""
+class Export:
+    def __init__(self, tconnect, tconnectDevice, directory, format='parquet', fetch_all_event_types=True):
+        self.tconnect = tconnect
+        self.tconnect_device_id = tconnectDevice['tconnectDeviceId']
+        self.directory = directory
+        self.fetch_all_event_types = fetch_all_event_types
+
+        if format not in FORMATS:
+            raise ValueError('Unknown export format %s, expected one of %s' % (format, FORMATS))
+        if format != 'ndjson' and not pyarrow_available():
+            logger.warning("pyarrow is not installed, so exporting to NDJSON instead of %s. Install it with: pip install tconnectsync[export]" % format)
+            format = 'ndjson'
+        self.format = format
+
+    def writer_for(self, cls):
+        path = os.path.join(self.directory, cls.__name__ + EXTENSIONS[self.format])
+        logger.info("Exporting %s to %s" % (cls.__name__, path))
+        if self.format == 'ndjson':
+            return NdjsonWriter(path, cls)
+        return ArrowWriter(path, cls, self.format)
+
+    def process(self, time_start, time_end):
+        os.makedirs(self.directory, exist_ok=True)
+
+        writers = {}
+        counts = {}
+        try:
+            day = arrow.get(time_start).date()
+            last_day = arrow.get(time_end).date()
+            while day <= last_day:
+                raw = self.tconnect.tandemsource.pump_events_raw(
+                    self.tconnect_device_id,
+                    day,
+                    day,
+                    event_ids_filter=None if self.fetch_all_event_types else self.tconnect.tandemsource.DEFAULT_EVENT_IDS
+                )
+                columns = decode_columns(decode_raw_events(raw))
+                logger.debug("Decoded %d event types for %s" % (len(columns), day))
+
+                for cls, cols in sorted(columns.items(), key=lambda x: x[0].ID):
+                    if cls not in writers:
+                        writers[cls] = self.writer_for(cls)
+                    writers[cls].write(cols)
+                    counts[cls.__name__] = counts.get(cls.__name__, 0) + len(cols['seqNum'])
+
+                day += datetime.timedelta(days=1)
+        finally:
+            for writer in writers.values():
+                writer.close()
+
+        logger.info("Exported %d events to %s: %s" % (sum(counts.values()), self.directory, counts))
+        return counts
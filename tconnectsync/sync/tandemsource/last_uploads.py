@@ -0,0 +1,91 @@
+import logging
+import collections
+import arrow
+
+from ...parser.nightscout import ENTERED_BY
+
+logger = logging.getLogger(__name__)
+
+
+def created_at(entry):
+    try:
+        return arrow.get(entry['created_at'])
+    except (KeyError, ValueError, TypeError, arrow.parser.ParserError):
+        return None
+
+
+"""
+Wraps a NightscoutApi so that the last uploaded treatment of each eventType is
+found from a single discovery query, rather than by every processor issuing
+its own last_uploaded_entry queries.
+
+discover() fetches all treatments uploaded by tconnectsync within the sync
+window once, and groups them by eventType. last_uploaded_entry() is then
+answered locally for any time range inside that window. Once an eventType has
+been written to Nightscout, its latest upload is no longer known locally (e.g.
+its _id, which is needed to extend a basal entry), so later lookups for it
+fall through to Nightscout, as do lookups outside the window and all other
+methods.
+"""
+class LastUploads:
+    def __init__(self, nightscout):
+        self.nightscout = nightscout
+        self.window = None
+        self.by_event_type = collections.defaultdict(list)
+        self.written_event_types = set()
+
+    def discover(self, time_start, time_end):
+        time_start = arrow.get(time_start)
+        time_end = arrow.get(time_end)
+        found = self.nightscout.uploaded_entries_in_range('treatments', time_start, time_end, window=time_end - time_start)
+
+        self.by_event_type = collections.defaultdict(list)
+        for entry in found:
+            t = created_at(entry)
+            if t and entry.get('enteredBy') == ENTERED_BY:
+                self.by_event_type[entry.get('eventType')].append((t, entry))
+        for entries in self.by_event_type.values():
+            entries.sort(key=lambda x: x[0])
+
+        self.window = (time_start, time_end)
+        self.written_event_types = set()
+        logger.info("Discovered last uploads between %s and %s: %s" % (time_start, time_end, {k: str(v[-1][0]) for k, v in self.by_event_type.items()}))
+        return self
+
+    def covers(self, time_start, time_end):
+        if not self.window or not time_start or not time_end:
+            return False
+        return self.window[0] <= arrow.get(time_start) and arrow.get(time_end) <= self.window[1]
+
+    def last_uploaded_entry(self, eventType, time_start=None, time_end=None):
+        if eventType in self.written_event_types or not self.covers(time_start, time_end):
+            return self.nightscout.last_uploaded_entry(eventType, time_start=time_start, time_end=time_end)
+
+        time_start = arrow.get(time_start)
+        time_end = arrow.get(time_end)
+        for t, entry in reversed(self.by_event_type.get(eventType, [])):
+            if time_start <= t <= time_end:
+                return entry
+        return None
+
+    def _written(self, entries, entity):
+        if entity != 'treatments':
+            return
+        for entry in entries:
+            self.written_event_types.add(entry.get('eventType'))
+
+    def upload_entry(self, ns_format, entity='treatments'):
+        self._written([ns_format], entity)
+        return self.nightscout.upload_entry(ns_format, entity=entity)
+
+    def upload_entries(self, ns_formats, entity='treatments'):
+        ns_formats = list(ns_formats)
+        self._written(ns_formats, entity)
+        return self.nightscout.upload_entries(ns_formats, entity=entity)
+
+    def put_entry(self, ns_format, entity):
+        self._written([ns_format], entity)
+        return self.nightscout.put_entry(ns_format, entity=entity)
+
+    def __getattr__(self, name):
+        return getattr(self.nightscout, name)
@@ -1,8 +1,13 @@
 import logging
+import datetime
+import threading
 import collections
+import queue
+import arrow
 
-from ...features import DEVICE_STATUS, DEFAULT_FEATURES
+from ...features import DEVICE_STATUS, BOLUS_BG, DEFAULT_FEATURES
 from ...eventparser import events as eventtypes
+from ...eventparser.generic import Events, decode_raw_events, EVENT_LEN
 from ...domain.tandemsource.event_class import EventClass
 from .process_basal import ProcessBasal
 from .process_basal_suspension import ProcessBasalSuspension
@@ -15,7 +20,11 @@ from .process_cgm_start_join_stop import ProcessCGMStartJoinStop
 from .process_cgm_reading import ProcessCGMReading
 from .process_device_status import ProcessDeviceStatus
 from .process_user_mode import ProcessUserMode
+from .process_iob import ProcessIOB, insulin_duration_for
 from .update_profiles import UpdateProfiles
+from .uploaded_index import UploadedIndex
+from ..cgm import CgmIndex
+from .last_uploads import LastUploads
 
 logger = logging.getLogger(__name__)
 
@@ -25,9 +34,12 @@ class ProcessTimeRange:
         self.nightscout = nightscout
         self.tconnect_device_id = tconnectDevice['tconnectDeviceId']
         self.max_date_with_events = tconnectDevice['maxDateWithEvents']
+        self.insulin_duration = insulin_duration_for(tconnectDevice)
         self.pretend = pretend
         self.secret = secret
         self.features = features
+        self.uploaded_index = UploadedIndex.from_secret(secret)
+        self.upload_priority = self.parse_upload_priority(getattr(secret, 'UPLOAD_PRIORITY', None))
 
     event_classes = {
         EventClass.BASAL.name: ProcessBasal,
@@ -47,46 +59,221 @@ class ProcessTimeRange:
         UpdateProfiles
     ]
 
+    # Order in which event classes are processed and uploaded within each shard, so
+    # that entries caregivers are waiting on are visible in Nightscout before bulk
+    # ones. Shards are still uploaded oldest first, so in a sync spanning several
+    # shards the newest boluses and readings wait for all of the earlier shards.
+    # Profile updaters always run last.
+    UPLOAD_PRIORITY = [
+        EventClass.BOLUS.name,
+        EventClass.CGM_READING.name,
+        EventClass.ALARM.name,
+        EventClass.CGM_ALERT.name,
+        EventClass.BASAL_SUSPENSION.name,
+        EventClass.BASAL_RESUME.name,
+        EventClass.CGM_START_JOIN_STOP.name,
+        EventClass.CARTRIDGE.name,
+        EventClass.USER_MODE.name,
+        EventClass.BASAL.name,
+        EventClass.DEVICE_STATUS.name,
+    ]
+
+    """
+    Returns the event class upload order given a comma-separated list of event
+    classes to upload first. Classes which are not listed follow in the default order.
+    """
+    def parse_upload_priority(self, value):
+        first = []
+        for name in (value or '').split(','):
+            name = name.strip().upper()
+            if not name:
+                continue
+            if name not in self.event_classes:
+                logger.warning("Ignoring unknown event class in UPLOAD_PRIORITY: %s" % name)
+                continue
+            if name not in first:
+                first.append(name)
+        return first + [c for c in self.UPLOAD_PRIORITY if c not in first]
+
+    def upload_order(self, classes):
+        def key(clazz):
+            if clazz in self.upload_priority:
+                return self.upload_priority.index(clazz)
+            return len(self.upload_priority)
+        return sorted(classes, key=key)
+
+    # Number of days of pump events fetched per request
+    SHARD_DAYS = 7
+    # Number of fetched shards which may be waiting to be processed
+    QUEUE_SIZE = 2
+
+    def shards(self, time_start, time_end):
+        day = arrow.get(time_start).date()
+        last_day = arrow.get(time_end).date()
+        while day <= last_day:
+            shard_end = min(day + datetime.timedelta(days=self.SHARD_DAYS - 1), last_day)
+            yield day, shard_end
+            day = shard_end + datetime.timedelta(days=1)
+
+    """
+    Fetches raw pump events for each shard of the time range in order, putting
+    them on the bounded queue so that later shards are downloaded while earlier
+    ones are being processed and uploaded.
+    """
+    def fetch(self, shards, out, fetch_all_event_types, stop):
+        try:
+            for min_date, max_date in shards:
+                if stop.is_set():
+                    return
+                raw = self.tconnect.tandemsource.pump_events_raw(
+                    self.tconnect_device_id,
+                    min_date.isoformat(),
+                    max_date.isoformat(),
+                    event_ids_filter=None if fetch_all_event_types else self.tconnect.tandemsource.DEFAULT_EVENT_IDS
+                )
+                out.put((min_date, max_date, raw, None))
+        except Exception as e:
+            out.put((None, None, None, e))
+            return
+        out.put(None)
+
+    """
+    Returns the Nightscout client used by the processors. Unless disabled, the
+    treatments already uploaded within the time range (widened by a day on each
+    side, since events are fetched by whole pump-local days) are discovered in
+    one query, so each processor's last upload lookup is answered locally.
+    """
+    def processor_nightscout(self, time_start, time_end):
+        if not getattr(self.secret, 'DISCOVER_LAST_UPLOADS', True):
+            return self.nightscout
+        try:
+            return LastUploads(self.nightscout).discover(
+                arrow.get(time_start).floor('day').shift(days=-1),
+                arrow.get(time_end).ceil('day').shift(days=1))
+        except Exception as e:
+            logger.warning("Unable to discover last uploads, each processor will query Nightscout: %s" % e)
+            return self.nightscout
+
     def process(self, time_start, time_end):
         fetch_all_event_types = self.secret.FETCH_ALL_EVENT_TYPES or DEVICE_STATUS in self.features
 
         logger.info(f"ProcessTimeRange time_start={time_start} time_end={time_end} tconnect_device_id={self.tconnect_device_id} features={self.features} fetch_all_event_types={fetch_all_event_types}")
-        events = self.tconnect.tandemsource.pump_events(self.tconnect_device_id, time_start, time_end, fetch_all_event_types=fetch_all_event_types)
 
+        if self.nightscout.outbox and not self.pretend:
+            self.nightscout.flush_outbox()
+
+        nightscout = self.processor_nightscout(time_start, time_end)
+
+        shards = list(self.shards(time_start, time_end))
+        fetched = queue.Queue(maxsize=self.QUEUE_SIZE)
+        stop = threading.Event()
+        fetcher = threading.Thread(name='ProcessTimeRange-fetch', target=self.fetch, args=(shards, fetched, fetch_all_event_types, stop), daemon=True)
+        fetcher.start()
+
+        processors = {}
+        carried = collections.defaultdict(list)
+        iob = ProcessIOB(self.tconnect, nightscout, self.tconnect_device_id, self.pretend, self.features, insulin_duration=self.insulin_duration)
+        # CGM readings for bolus BG type lookups, trimmed after each shard to
+        # those the boluses still to be processed may need
+        cgm_index = CgmIndex() if BOLUS_BG in self.features else None
         events_first_time = None
         events_last_time = None
         last_event_seqnum = None
-        for_eventclass = collections.defaultdict(list)
-        for event in events:
-            if not events_first_time:
-                events_first_time = event.eventTimestamp
-            if not events_last_time:
-                events_last_time = event.eventTimestamp
-            if not last_event_seqnum:
-                last_event_seqnum = event.seqNum
-            events_first_time = min(events_first_time, event.eventTimestamp)
-            events_last_time = max(events_last_time, event.eventTimestamp)
-            last_event_seqnum = max(event.seqNum, last_event_seqnum)
-
-            clazz = EventClass.for_event(event)
-            if clazz:
-                for_eventclass[clazz.name].append(event)
-
-        count_by_eventclass = {k: len(v) for k,v in for_eventclass.items()}
-        logger.info(f"Found events: {count_by_eventclass}")
-
         processed_count = 0
-        for clazz, events in for_eventclass.items():
-            if clazz in self.event_classes.keys():
-                c = self.event_classes[clazz](self.tconnect, self.nightscout, self.tconnect_device_id, self.pretend, self.features)
-                if c.enabled():
-                    logger.info("%s is enabled from features %s" % (clazz, self.features))
-                    ns_entries = c.process(events, events_first_time, events_last_time)
+        try:
+            while True:
+                item = fetched.get()
+                if item is None:
+                    break
+                min_date, max_date, raw, error = item
+                if error:
+                    raise error
+
+                decoded = decode_raw_events(raw)
+                logger.info(f"Read {len(decoded)} bytes (est. {len(decoded)/EVENT_LEN} events) for {min_date} - {max_date}")
+
+                shard_last_time = None
+                for_eventclass = collections.defaultdict(list)
+                for event in Events(decoded):
+                    if not events_first_time or event.eventTimestamp < events_first_time:
+                        events_first_time = event.eventTimestamp
+                    if not shard_last_time or event.eventTimestamp > shard_last_time:
+                        shard_last_time = event.eventTimestamp
+                    if not last_event_seqnum or event.seqNum > last_event_seqnum:
+                        last_event_seqnum = event.seqNum
+
+                    clazz = EventClass.for_event(event)
+                    if clazz:
+                        for_eventclass[clazz.name].append(event)
+
+                count_by_eventclass = {k: len(v) for k,v in for_eventclass.items()}
+                logger.info(f"Found events for {min_date} - {max_date}: {count_by_eventclass}")
+                if not shard_last_time:
+                    continue
+                if not events_last_time or shard_last_time > events_last_time:
+                    events_last_time = shard_last_time
+
+                # Only keeps the events within the insulin duration of the latest one
+                if iob.enabled():
+                    iob.add(for_eventclass.get(EventClass.BOLUS.name, []) + for_eventclass.get(EventClass.BASAL.name, []))
+
+                if cgm_index is not None:
+                    cgm_index.add_pump_events(for_eventclass.get(EventClass.CGM_READING.name, []))
+
+                for clazz in self.upload_order(set(for_eventclass.keys()) | set(carried.keys())):
+                    if clazz not in self.event_classes.keys():
+                        continue
+                    if clazz not in processors:
+                        processors[clazz] = self.event_classes[clazz](self.tconnect, nightscout, self.tconnect_device_id, self.pretend, self.features, uploaded_index=self.uploaded_index)
+                        if hasattr(processors[clazz], 'cgm_index'):
+                            processors[clazz].cgm_index = cgm_index
+                        if processors[clazz].enabled():
+                            logger.info("%s is enabled from features %s" % (clazz, self.features))
+                        else:
+                            logger.info("Skipping %s, is not enabled from features %s" % (clazz, self.features))
+                    c = processors[clazz]
+                    if not c.enabled():
+                        continue
+
+                    events = carried.pop(clazz, []) + for_eventclass[clazz]
+                    # Events which can only be processed together with events in
+                    # a later shard, which the processor holds back until then
+                    if hasattr(c, 'carry_over') and max_date < shards[-1][1]:
+                        carried[clazz] = c.carry_over(events, shard_last_time)
+                    ns_entries = c.process(events, events_first_time, shard_last_time)
                     w = c.write(ns_entries)
                     if w:
                         processed_count += w
-                else:
-                    logger.info("Skipping %s, is not enabled from features %s" % (clazz, self.features))
+
+                # Later shards only look up readings for their own boluses and
+                # those carried over from this one
+                if cgm_index is not None:
+                    cgm_index.trim_pump_time(shard_last_time - ProcessBolus.CARRY_OVER_WINDOW)
+
+            # Events still held back when the last shard had none of their class are
+            # processed on their own, as they would have been at the end of a single fetch
+            for clazz in self.upload_order(carried.keys()):
+                if carried[clazz]:
+                    c = processors[clazz]
+                    w = c.write(c.process(carried[clazz], events_first_time, events_last_time))
+                    if w:
+                        processed_count += w
+        finally:
+            stop.set()
+            # Unblock the fetcher if it is waiting on a full queue
+            while fetcher.is_alive():
+                try:
+                    fetched.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+
+        # IOB is computed once, at the latest event, from the bolus and basal
+        # events of all shards
+        if iob.enabled():
+            processed_count += iob.write(iob.process(events_first_time, events_last_time), events_first_time, events_last_time)
+
+        if self.nightscout.outbox and not self.pretend:
+            self.nightscout.flush_outbox()
 
         for updater_class in self.updater_classes:
             c = updater_class(self.tconnect, self.nightscout, self.tconnect_device_id, self.pretend, self.features)
@@ -1,11 +1,10 @@
 import logging
 import arrow
 
-from ...secret import IGNORE_ZERO_UNIT_BASAL
+from ...secret import IGNORE_ZERO_UNIT_BASAL, COALESCE_BASAL
 from ...features import DEFAULT_FEATURES
 from ... import features
 from ...eventparser.generic import Events, decode_raw_events, EVENT_LEN
-from ...eventparser.utils import bitmask_to_list
 from ...eventparser import events as eventtypes
 from .helpers import insulin_float_round, insulin_milliunits_to_real
 from ...domain.tandemsource.event_class import EventClass
@@ -13,21 +12,85 @@ from ...parser.nightscout import (
     BASAL_EVENTTYPE,
     NightscoutEntry
 )
+from .uploaded_index import write_entries
 
 logger = logging.getLogger(__name__)
 
+# Tolerance when deciding whether two basal entries are contiguous or have the same rate
+CONTIGUOUS_SECONDS = 1
+RATE_EPSILON = 0.0001
+
+def same_basal(a, b):
+    return abs(float(a.get("absolute") or 0) - float(b.get("absolute") or 0)) < RATE_EPSILON and a.get("reason") == b.get("reason")
+
+def basal_end(entry):
+    return arrow.get(entry["created_at"]).shift(minutes=float(entry.get("duration") or 0))
+
+"""
+Merges runs of contiguous basal entries with the same rate and reason into a
+single entry spanning their combined duration, identified by the
+pump_event_id of the first entry in the run.
+"""
+def coalesce_basal_entries(ns_entries):
+    coalesced = []
+    for entry in ns_entries:
+        if coalesced and same_basal(coalesced[-1], entry):
+            prev = coalesced[-1]
+            gap = (arrow.get(entry["created_at"]) - basal_end(prev)).total_seconds()
+            if abs(gap) <= CONTIGUOUS_SECONDS:
+                prev["duration"] = (basal_end(entry) - arrow.get(prev["created_at"])).total_seconds() / 60
+                continue
+        coalesced.append(dict(entry))
+    return coalesced
+
+"""
+The last basal entry uploaded in a previous run is open-ended: its duration
+only extends until the end of the events available at that time. If the first
+new entry continues the same rate without a gap, returns a copy of the
+uploaded entry extended to cover it (to be updated in place) in place of the
+new entry. The first new entry may start before the uploaded entry ends, since
+events within its span after its first one are processed again.
+"""
+def extend_last_upload(last_upload, ns_entries):
+    if not last_upload or not ns_entries or "_id" not in last_upload:
+        return ns_entries
+    first = ns_entries[0]
+    if not same_basal(last_upload, first):
+        return ns_entries
+    gap = (arrow.get(first["created_at"]) - basal_end(last_upload)).total_seconds()
+    if gap > CONTIGUOUS_SECONDS:
+        return ns_entries
+
+    extended = dict(last_upload)
+    extended["duration"] = (basal_end(first) - arrow.get(last_upload["created_at"])).total_seconds() / 60
+    return [extended] + ns_entries[1:]
+
 class ProcessBasal:
-    def __init__(self, tconnect, nightscout, tconnect_device_id, pretend, features=DEFAULT_FEATURES):
+    def __init__(self, tconnect, nightscout, tconnect_device_id, pretend, features=DEFAULT_FEATURES, uploaded_index=None):
         self.tconnect = tconnect
         self.nightscout = nightscout
         self.tconnect_device_id = tconnect_device_id
         self.pretend = pretend
         self.features = features
+        self.uploaded_index = uploaded_index
+        # The last basal event, held back by carry_over() until the next shard
+        self.held = []
 
     def enabled(self):
         return features.BASAL in self.features
 
+    """
+    A basal rate lasts until the next rate change, which may be hours later in a
+    later shard. Holds back the last basal event so that its entry is created
+    when the next shard is processed, with the events that end it, rather than
+    being cut off at the end of this shard.
+    """
+    def carry_over(self, events, time_end):
+        self.held = sorted(events, key=lambda x: x.eventTimestamp)[-1:]
+        return list(self.held)
+
     def process(self, events, time_start, time_end):
+        held, self.held = self.held, []
         logger.debug("ProcessBasal: querying for last uploaded entry")
         last_upload = self.nightscout.last_uploaded_entry(BASAL_EVENTTYPE, time_start=time_start, time_end=time_end)
         last_upload_time = None
@@ -55,21 +118,32 @@ class ProcessBasal:
 
         ns_entries = []
         for item in with_duration:
+            if any(item[2] is e for e in held):
+                continue
             ns = self.basal_to_nsentry(*item)
             if ns:
                 ns_entries.append(ns)
 
+        if COALESCE_BASAL:
+            before = len(ns_entries)
+            ns_entries = extend_last_upload(last_upload, coalesce_basal_entries(ns_entries))
+            logger.info("Coalesced %d basal entries into %d" % (before, len(ns_entries)))
+
         return ns_entries
 
     def write(self, ns_entries):
         count = 0
         for entry in ns_entries:
-            if self.pretend:
-                logger.info("Would upload to Nightscout: %s" % entry)
-            else:
-                logger.info("Uploading to Nightscout: %s" % entry)
-                self.nightscout.upload_entry(entry)
-            count += 1
+            if "_id" in entry:
+                # An extended open-ended entry from a previous run
+                if self.pretend:
+                    logger.info("Would update in Nightscout: %s" % entry)
+                else:
+                    logger.info("Updating in Nightscout: %s" % entry)
+                    self.nightscout.put_entry(entry, entity='treatments')
+                count += 1
+                continue
+            count += write_entries(self.nightscout, [entry], self.tconnect_device_id, uploaded_index=self.uploaded_index, pretend=self.pretend)
 
         return count
 
@@ -84,7 +158,7 @@ class ProcessBasal:
                 value = value,
                 duration_mins = duration.seconds / 60,
                 created_at = start.format(),
-                reason = ', '.join(bitmask_to_list(event.changetype)),
+                reason = ', '.join(event.changetypeNames),
                 pump_event_id = "%s" % event.seqNum
             )
         if type(event) == eventtypes.LidBasalDelivery:
@@ -96,6 +170,6 @@ class ProcessBasal:
                 value = value,
                 duration_mins = duration.seconds / 60,
                 created_at = start.format(),
-                reason = ', '.join(bitmask_to_list(event.commandedRateSource)),
+                reason = event.commandedRateSource.name if event.commandedRateSource else '',
                 pump_event_id = "%s" % event.seqNum
             )
@@ -1,4 +1,5 @@
 import logging
+import datetime
 import arrow
 
 from ...features import DEFAULT_FEATURES
@@ -12,16 +13,21 @@ from ...parser.nightscout import (
     BOLUS_EVENTTYPE,
     NightscoutEntry
 )
+from .uploaded_index import write_entries
 
 logger = logging.getLogger(__name__)
 
 class ProcessBolus:
-    def __init__(self, tconnect, nightscout, tconnect_device_id, pretend, features=DEFAULT_FEATURES):
+    def __init__(self, tconnect, nightscout, tconnect_device_id, pretend, features=DEFAULT_FEATURES, uploaded_index=None):
         self.tconnect = tconnect
         self.nightscout = nightscout
         self.tconnect_device_id = tconnect_device_id
         self.pretend = pretend
         self.features = features
+        self.uploaded_index = uploaded_index
+        # CgmIndex of the sync's CGM readings, set by ProcessTimeRange when
+        # BOLUS_BG is enabled, used to tell sensor BGs from fingersticks
+        self.cgm_index = None
 
     def enabled(self):
         return features.BOLUS in self.features
@@ -68,18 +74,34 @@ class ProcessBolus:
 
         return ns_entries
 
-    def write(self, ns_entries):
-        count = 0
-        for entry in ns_entries:
-            if self.pretend:
-                logger.info("Would upload to Nightscout: %s" % entry)
-            else:
-                logger.info("Uploading to Nightscout: %s" % entry)
-                self.nightscout.upload_entry(entry)
-            count += 1
+    # How long after its request events a bolus may still complete in a later batch of events
+    CARRY_OVER_WINDOW = datetime.timedelta(hours=1)
 
-        return count
+    """
+    Returns the events for recent boluses which have not yet completed, so that
+    they can be processed together with their LidBolusCompleted event when the
+    next batch of events is fetched.
+    """
+    def carry_over(self, events, time_end):
+        completed = set(e.bolusid for e in events if type(e) == eventtypes.LidBolusCompleted)
+        return [e for e in events if e.bolusid not in completed and time_end - e.eventTimestamp <= self.CARRY_OVER_WINDOW]
 
+    def write(self, ns_entries):
+        return write_entries(self.nightscout, ns_entries, self.tconnect_device_id, uploaded_index=self.uploaded_index, pretend=self.pretend)
+
+
+    """
+    Returns SENSOR if the bolus BG is the CGM reading which was current when
+    the bolus was requested, and otherwise FINGER, like guess_bolus_bg_type()
+    in the legacy sync. Returns None unless BOLUS_BG is enabled.
+    """
+    def bg_type_for(self, bolusRequested1):
+        if features.BOLUS_BG not in self.features or self.cgm_index is None:
+            return None
+        reading = self.cgm_index.pump_event_at(bolusRequested1)
+        if reading and reading.currentglucosedisplayvalue == bolusRequested1.BG:
+            return NightscoutEntry.SENSOR
+        return NightscoutEntry.FINGER
 
     def bolus_to_nsentry(self, bolusCompleted, bolusRequested1, bolusRequested2, bolusRequested3):
         suffixes = []
@@ -100,13 +122,15 @@ class ProcessBolus:
         if bolusRequested2 and str(bolusRequested2.optionsRaw) in eventtypes.LidBolusRequestedMsg2.OptionsMap:
             notes = eventtypes.LidBolusRequestedMsg2.OptionsMap['%d' % bolusRequested2.optionsRaw]
 
+        bg = bolusRequested1.BG if bolusRequested1 and bolusRequested1.BG > 0 else None
 
         return NightscoutEntry.bolus(
             bolus = insulin_float_round(bolusCompleted.insulindelivered),
             carbs = bolusRequested1.carbamount if bolusRequested1 and bolusRequested1.carbamount>0 else None,
             created_at = bolusCompleted.eventTimestamp.format(),
             notes = notes + suffix,
-            bg = bolusRequested1.BG if bolusRequested1 and bolusRequested1.BG > 0 else None,
+            bg = bg,
+            bg_type = self.bg_type_for(bolusRequested1) if bg else None,
             pump_event_id = ",".join(seq_nums)
         )
 
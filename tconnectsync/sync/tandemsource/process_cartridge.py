@@ -11,16 +11,18 @@ from ...parser.nightscout import (
     SITECHANGE_EVENTTYPE,
     NightscoutEntry
 )
+from .uploaded_index import write_entries
 
 logger = logging.getLogger(__name__)
 
 class ProcessCartridge:
-    def __init__(self, tconnect, nightscout, tconnect_device_id, pretend, features=DEFAULT_FEATURES):
+    def __init__(self, tconnect, nightscout, tconnect_device_id, pretend, features=DEFAULT_FEATURES, uploaded_index=None):
         self.tconnect = tconnect
         self.nightscout = nightscout
         self.tconnect_device_id = tconnect_device_id
         self.pretend = pretend
         self.features = features
+        self.uploaded_index = uploaded_index
 
     def enabled(self):
         return features.PUMP_EVENTS in self.features
@@ -67,16 +69,7 @@ class ProcessCartridge:
         return ns_entries
 
     def write(self, ns_entries):
-        count = 0
-        for entry in ns_entries:
-            if self.pretend:
-                logger.info("Would upload to Nightscout: %s" % entry)
-            else:
-                logger.info("Uploading to Nightscout: %s" % entry)
-                self.nightscout.upload_entry(entry)
-            count += 1
-
-        return count
+        return write_entries(self.nightscout, ns_entries, self.tconnect_device_id, uploaded_index=self.uploaded_index, pretend=self.pretend)
 
     def cart_to_nsentry(self, cartFilled):
         return NightscoutEntry.sitechange(
@@ -0,0 +1,141 @@
+import math
+import logging
+
+from ...features import DEFAULT_FEATURES
+from ... import features
+from ...eventparser import events as eventtypes
+from ...domain.tandemsource.pump_settings import PumpSettings
+from ..iob import ns_write_iob_events
+
+logger = logging.getLogger(__name__)
+
+# Used when the pump settings do not include the active profile's insulin duration
+DEFAULT_INSULIN_DURATION = 5 * 60 # minutes
+
+# Time of peak activity of rapid-acting insulin
+INSULIN_PEAK = 75 # minutes
+
+# Net basal insulin is treated as a series of small doses of this length
+BASAL_CHUNK_MINUTES = 5
+
+"""
+Returns the insulin duration of the active profile in the pump settings of a
+device from pump_event_metadata(), or DEFAULT_INSULIN_DURATION if unavailable.
+"""
+def insulin_duration_for(tconnectDevice):
+    try:
+        settings = PumpSettings.from_dict(tconnectDevice['lastUpload']['settings'])
+        for profile in settings.profiles.profile:
+            if profile.idp == settings.profiles.activeIdp and profile.insulinDuration:
+                return profile.insulinDuration
+    except (KeyError, TypeError, AttributeError) as e:
+        logger.debug("No insulin duration in pump settings: %s" % e)
+    return DEFAULT_INSULIN_DURATION
+
+"""
+Returns the fraction of an insulin dose which remains on board the given
+number of minutes after it was delivered, using the exponential insulin
+action curve for the given insulin duration, as used by Loop and OpenAPS.
+"""
+def insulin_remaining(minutes, insulin_duration, peak=INSULIN_PEAK):
+    if minutes <= 0:
+        return 1.0
+    if minutes >= insulin_duration:
+        return 0.0
+
+    # The curve requires the peak to be before half of the insulin duration
+    peak = min(peak, 0.4 * insulin_duration)
+    tau = peak * (1 - peak / insulin_duration) / (1 - 2 * peak / insulin_duration)
+    a = 2 * tau / insulin_duration
+    s = 1 / (1 - a + (1 + a) * math.exp(-insulin_duration / tau))
+    return 1 - s * (1 - a) * ((minutes ** 2 / (tau * insulin_duration * (1 - a)) - minutes / tau - 1) * math.exp(-minutes / tau) + 1)
+
+def minutes_between(start, end):
+    return (end - start).total_seconds() / 60
+
+"""
+Computes insulin on board locally from Tandem Source pump events, rather than
+from the WS2 therapy timeline CSV used by the legacy t:connect sync.
+
+Bolus IOB, which is what the pump displays, is the remaining insulin of each
+LidBolusCompleted within the insulin duration. Basal IOB is the remaining net
+basal insulin, from the difference between the commanded and profile basal
+rates of each LidBasalDelivery, and may be negative when Control-IQ has
+reduced basal delivery. Both are computed at the time of the latest event and
+written as a single tconnect_iob activity, replacing the previous one.
+
+Events are added shard by shard with add(); only those within the insulin
+duration of the latest event are kept.
+"""
+class ProcessIOB:
+    def __init__(self, tconnect, nightscout, tconnect_device_id, pretend, features=DEFAULT_FEATURES, insulin_duration=DEFAULT_INSULIN_DURATION):
+        self.tconnect = tconnect
+        self.nightscout = nightscout
+        self.tconnect_device_id = tconnect_device_id
+        self.pretend = pretend
+        self.features = features
+        self.insulin_duration = insulin_duration
+        self.boluses = []
+        self.basals = []
+        self.latest = None
+
+    def enabled(self):
+        return features.IOB in self.features
+
+    def add(self, events):
+        for event in events:
+            if type(event) == eventtypes.LidBolusCompleted:
+                self.boluses.append(event)
+            elif type(event) == eventtypes.LidBasalDelivery:
+                self.basals.append(event)
+            else:
+                continue
+            if not self.latest or event.eventTimestamp > self.latest:
+                self.latest = event.eventTimestamp
+
+        if not self.latest:
+            return
+        cutoff = self.latest.shift(minutes=-self.insulin_duration)
+        self.boluses = [e for e in self.boluses if e.eventTimestamp >= cutoff]
+        self.basals.sort(key=lambda e: (e.eventTimestamp, e.seqNum))
+        # Keep the basal delivery in effect at the cutoff
+        before = [i for i, e in enumerate(self.basals) if e.eventTimestamp <= cutoff]
+        if before:
+            self.basals = self.basals[before[-1]:]
+
+    def bolus_iob(self, at):
+        return sum(
+            e.insulindelivered * insulin_remaining(minutes_between(e.eventTimestamp, at), self.insulin_duration)
+            for e in self.boluses if e.eventTimestamp <= at)
+
+    def basal_iob(self, at):
+        cutoff = at.shift(minutes=-self.insulin_duration)
+        iob = 0
+        for event, next_event in zip(self.basals, self.basals[1:] + [None]):
+            start = max(event.eventTimestamp, cutoff)
+            end = min(next_event.eventTimestamp, at) if next_event else at
+            net_rate = (event.commandedRate - event.profileBasalRate) / 1000 # units/hr
+            while start < end:
+                chunk = min(BASAL_CHUNK_MINUTES, minutes_between(start, end))
+                midpoint = start.shift(minutes=chunk / 2)
+                iob += net_rate * chunk / 60 * insulin_remaining(minutes_between(midpoint, at), self.insulin_duration)
+                start = start.shift(minutes=chunk)
+        return iob
+
+    def process(self, time_start, time_end):
+        if not self.latest:
+            logger.info("ProcessIOB: no bolus or basal events")
+            return []
+
+        at = self.latest
+        iob = self.bolus_iob(at)
+        basal_iob = self.basal_iob(at)
+        logger.info("ProcessIOB: IOB at %s: %.2f bolus, %.2f basal (insulin duration %d minutes)" % (at, iob, basal_iob, self.insulin_duration))
+        return [{
+            "time": at.format(),
+            "iob": round(iob, 2),
+            "basaliob": round(basal_iob, 2),
+        }]
+
+    def write(self, iob_events, time_start=None, time_end=None):
+        return ns_write_iob_events(self.nightscout, iob_events, pretend=self.pretend, time_start=time_start, time_end=time_end)
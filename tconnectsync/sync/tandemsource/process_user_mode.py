@@ -12,23 +12,52 @@ from ...parser.nightscout import (
     SLEEP_EVENTTYPE,
     NightscoutEntry
 )
+from .uploaded_index import write_entries
 
 NOT_ENDED = "Not Ended"
 
 logger = logging.getLogger(__name__)
 
 class ProcessUserMode:
-    def __init__(self, tconnect, nightscout, tconnect_device_id, pretend, features=DEFAULT_FEATURES):
+    def __init__(self, tconnect, nightscout, tconnect_device_id, pretend, features=DEFAULT_FEATURES, uploaded_index=None):
         self.tconnect = tconnect
         self.nightscout = nightscout
         self.tconnect_device_id = tconnect_device_id
         self.pretend = pretend
         self.features = features
+        self.uploaded_index = uploaded_index
+        # Sleep and exercise start events held back by carry_over() until the next
+        # shard, and those held back from the previous one
+        self.held = []
+        self.carried_in = []
 
     def enabled(self):
         return features.PUMP_EVENTS in self.features
 
+    """
+    Holds back the start events of sleep and exercise periods which have not
+    ended by the end of this shard, so that they are paired with their stop
+    events in the next shard instead of being uploaded as not ended.
+    """
+    def carry_over(self, events, time_end):
+        start_sleep = None
+        start_exercise = None
+        # Pairs start and stop events in the same way as process()
+        for event in sorted(events, key=lambda x: x.eventTimestamp):
+            if self.is_start_sleep(event):
+                start_sleep = event
+            elif self.is_stop_sleep(event):
+                start_sleep = None
+            elif self.is_start_exercise(event):
+                start_exercise = event
+            elif self.is_stop_exercise(event):
+                start_exercise = None
+        self.held = [e for e in (start_sleep, start_exercise) if e]
+        return list(self.held)
+
     def process(self, events, time_start, time_end):
+        held, self.held = self.held, []
+        carried_in, self.carried_in = self.carried_in, held
         logger.debug("ProcessUserMode: querying for last uploaded exercise entry")
         exercise_last_upload = self.nightscout.last_uploaded_entry(EXERCISE_EVENTTYPE, time_start=time_start, time_end=time_end)
         exercise_last_upload_time = None
@@ -72,7 +101,12 @@ class ProcessUserMode:
         start_sleep = None
         start_exercise = None
         for event in sorted(events, key=lambda x: x.eventTimestamp):
-            if last_upload_time and arrow.get(event.eventTimestamp) <= last_upload_time:
+            skip_before = last_upload_time
+            # Starts carried over from the previous shard may precede other entries
+            # uploaded from it, so are only compared against their own kind
+            if any(event is e for e in carried_in):
+                skip_before = sleep_last_upload_time if self.is_start_sleep(event) else exercise_last_upload_time
+            if skip_before and arrow.get(event.eventTimestamp) <= skip_before:
                 if self.pretend:
                     logger.info("ProcessUserMode: Skipping usermode event not after last upload time: %s (time range: %s - %s)" % (event, time_start, time_end))
                 continue
@@ -104,10 +138,10 @@ class ProcessUserMode:
             else:
                 logger.warning("ProcessUserMode: not sure how to process event: %s" % event)
 
-        if start_sleep:
+        if start_sleep and not any(start_sleep is e for e in held):
             processed_sleep.append((start_sleep, None))
             logger.info("ProcessUserMode: sleep is active")
-        if start_exercise:
+        if start_exercise and not any(start_exercise is e for e in held):
             processed_exercise.append((start_exercise, None))
             logger.info("ProcessUserMode: exercise is active")
 
@@ -120,16 +154,7 @@ class ProcessUserMode:
         return ns_entries
 
     def write(self, ns_entries):
-        count = 0
-        for entry in ns_entries:
-            if self.pretend:
-                logger.info("Would upload to Nightscout: %s" % entry)
-            else:
-                logger.info("Uploading to Nightscout: %s" % entry)
-                self.nightscout.upload_entry(entry)
-            count += 1
-
-        return count
+        return write_entries(self.nightscout, ns_entries, self.tconnect_device_id, uploaded_index=self.uploaded_index, pretend=self.pretend)
 
     def is_start_sleep(self, event):
         return event.requestedaction == eventtypes.LidAaUserModeChange.RequestedactionEnum.StartSleep
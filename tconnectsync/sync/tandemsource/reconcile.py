@@ -0,0 +1,163 @@
+import logging
+import collections
+import arrow
+
+from ...features import DEVICE_STATUS, DEFAULT_FEATURES
+from ...domain.tandemsource.event_class import EventClass
+from .process import ProcessTimeRange
+from .uploaded_index import UploadedIndex
+
+logger = logging.getLogger(__name__)
+
+# Nightscout collection written to by each event class's processor
+ENTITY_FOR_EVENT_CLASS = {
+    EventClass.CGM_READING.name: 'entries',
+    EventClass.DEVICE_STATUS.name: 'devicestatus',
+}
+
+BATCH_SIZE = 100
+
+
+"""
+Wraps a NightscoutApi so that processors see no previously uploaded entries,
+and therefore return every Nightscout entry for the events they are given.
+"""
+class NoLastUploadNightscout:
+    def __init__(self, nightscout):
+        self.nightscout = nightscout
+
+    def last_uploaded_entry(self, *args, **kwargs):
+        return None
+
+    def last_uploaded_bg_entry(self, *args, **kwargs):
+        return None
+
+    def last_uploaded_activity(self, *args, **kwargs):
+        return None
+
+    def last_uploaded_devicestatus(self, *args, **kwargs):
+        return None
+
+    def __getattr__(self, name):
+        return getattr(self.nightscout, name)
+
+
+def entry_time(entry):
+    return entry.get('created_at') or entry.get('dateString')
+
+
+def existing_keys(ns_entries):
+    keys = set()
+    for entry in ns_entries:
+        event_type = entry.get('eventType') or entry.get('type') or ''
+        if entry.get('pump_event_id'):
+            keys.add((event_type, str(entry['pump_event_id'])))
+            continue
+        # Entries uploaded without a pump_event_id are matched on their timestamp
+        created_at = entry_time(entry)
+        if created_at:
+            try:
+                keys.add((event_type, arrow.get(created_at).int_timestamp))
+            except (ValueError, TypeError, arrow.parser.ParserError):
+                pass
+    return keys
+
+
+def is_missing(entry, keys):
+    event_type = entry.get('eventType') or entry.get('type') or ''
+    if entry.get('pump_event_id') and (event_type, str(entry['pump_event_id'])) in keys:
+        return False
+    created_at = entry_time(entry)
+    if created_at and (event_type, arrow.get(created_at).int_timestamp) in keys:
+        return False
+    return True
+
+
+"""
+Repairs holes in Nightscout data for a time range. Rather than skipping every
+event before the most recent upload, the treatments, entries and devicestatus
+uploaded by tconnectsync in the range are fetched in bulk and indexed by
+pump_event_id, and only the Nightscout entries for pump events which are
+missing from that index are uploaded, in batches.
+
+The local uploaded index (UPLOADED_INDEX) is not consulted, since entries
+deleted from Nightscout may still be in it, but the entries uploaded are
+added to it.
+"""
+class Reconcile:
+    def __init__(self, tconnect, nightscout, tconnectDevice, pretend, secret, features=DEFAULT_FEATURES, batch_size=BATCH_SIZE):
+        self.tconnect = tconnect
+        self.nightscout = nightscout
+        self.tconnect_device_id = tconnectDevice['tconnectDeviceId']
+        self.pretend = pretend
+        self.secret = secret
+        self.features = features
+        self.batch_size = batch_size
+        self.uploaded_index = UploadedIndex.from_secret(secret)
+
+    def process(self, time_start, time_end):
+        fetch_all_event_types = self.secret.FETCH_ALL_EVENT_TYPES or DEVICE_STATUS in self.features
+
+        logger.info(f"Reconcile time_start={time_start} time_end={time_end} tconnect_device_id={self.tconnect_device_id} features={self.features}")
+        events = self.tconnect.tandemsource.pump_events(self.tconnect_device_id, time_start, time_end, fetch_all_event_types=fetch_all_event_types)
+
+        events_first_time = None
+        events_last_time = None
+        for_eventclass = collections.defaultdict(list)
+        for event in events:
+            if not events_first_time or event.eventTimestamp < events_first_time:
+                events_first_time = event.eventTimestamp
+            if not events_last_time or event.eventTimestamp > events_last_time:
+                events_last_time = event.eventTimestamp
+
+            clazz = EventClass.for_event(event)
+            if clazz:
+                for_eventclass[clazz.name].append(event)
+
+        if not for_eventclass:
+            logger.info("No pump events found to reconcile")
+            return 0
+
+        nightscout = NoLastUploadNightscout(self.nightscout)
+        expected = collections.defaultdict(list)
+        for clazz, events in for_eventclass.items():
+            if clazz not in ProcessTimeRange.event_classes.keys():
+                continue
+            c = ProcessTimeRange.event_classes[clazz](self.tconnect, nightscout, self.tconnect_device_id, self.pretend, self.features)
+            if not c.enabled():
+                logger.info("Skipping %s, is not enabled from features %s" % (clazz, self.features))
+                continue
+            entity = ENTITY_FOR_EVENT_CLASS.get(clazz, 'treatments')
+            expected[entity] += c.process(events, events_first_time, events_last_time)
+
+        uploaded = 0
+        for entity, ns_entries in expected.items():
+            if not ns_entries:
+                continue
+            # Entries can be timestamped differently from their pump event (e.g. CGM readings), so
+            # the range queried in Nightscout is taken from the entries themselves
+            times = [arrow.get(entry_time(e)) for e in ns_entries if entry_time(e)]
+            keys = existing_keys(self.nightscout.uploaded_entries_in_range(entity, min(times), max(times))) if times else set()
+            missing = [e for e in ns_entries if is_missing(e, keys)]
+            logger.info("Reconcile %s: %d expected, %d already in Nightscout, %d missing" % (entity, len(ns_entries), len(ns_entries) - len(missing), len(missing)))
+            uploaded += self.write(entity, missing)
+
+        logger.info("Reconciled %d missing entries between %s and %s" % (uploaded, time_start, time_end))
+        return uploaded
+
+    def write(self, entity, ns_entries):
+        count = 0
+        for i in range(0, len(ns_entries), self.batch_size):
+            batch = ns_entries[i:i+self.batch_size]
+            if self.pretend:
+                for entry in batch:
+                    logger.info("Would upload %s to Nightscout: %s" % (entity, entry))
+            else:
+                logger.info("Uploading %d %s to Nightscout" % (len(batch), entity))
+                sent = self.nightscout.upload_entries(batch, entity=entity)
+                if sent and self.uploaded_index:
+                    for entry in batch:
+                        self.uploaded_index.add(self.tconnect_device_id, entry, entity=entity)
+            count += len(batch)
+
+        return count
@@ -0,0 +1,120 @@
+import os
+import logging
+import sqlite3
+import threading
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS uploaded (
+    tconnect_device_id TEXT NOT NULL,
+    entity TEXT NOT NULL,
+    event_type TEXT NOT NULL,
+    pump_event_id TEXT NOT NULL,
+    created_at TEXT,
+    PRIMARY KEY (tconnect_device_id, entity, event_type, pump_event_id)
+) WITHOUT ROWID
+'''
+
+# Indexes are reused across ProcessTimeRange invocations in autoupdate mode
+_open_indexes = {}
+_open_indexes_lock = threading.Lock()
+
+"""
+Persistent local index of the Nightscout entries which have been uploaded,
+keyed by (tconnect device ID, entity, eventType, pump_event_id).
+
+Processors consult the index through write_entries() before uploading each
+entry, so that overlapping time ranges and re-runs over the same period do
+not create duplicate Nightscout records. Entries without a pump_event_id are never
+indexed and are always uploaded.
+"""
+class UploadedIndex:
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        if path != ':memory:':
+            dirname = os.path.dirname(path)
+            if dirname:
+                os.makedirs(dirname, exist_ok=True)
+
+        self.conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        if path != ':memory:':
+            self.conn.execute('PRAGMA journal_mode=WAL')
+            self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute(SCHEMA)
+
+    @staticmethod
+    def from_secret(secret):
+        if not getattr(secret, 'UPLOADED_INDEX', False):
+            return None
+        path = secret.UPLOADED_INDEX_PATH
+        with _open_indexes_lock:
+            if path not in _open_indexes:
+                try:
+                    _open_indexes[path] = UploadedIndex(path)
+                except (sqlite3.Error, OSError) as e:
+                    logger.warning("Unable to open uploaded entry index at %s, continuing without it: %s" % (path, e))
+                    return None
+                logger.info("Using uploaded entry index at %s" % path)
+            return _open_indexes[path]
+
+    @staticmethod
+    def key(tconnect_device_id, entry, entity='treatments'):
+        pump_event_id = entry.get('pump_event_id')
+        if not pump_event_id:
+            return None
+        event_type = entry.get('eventType') or entry.get('type') or ''
+        return (str(tconnect_device_id), entity, event_type, str(pump_event_id))
+
+    def contains(self, tconnect_device_id, entry, entity='treatments'):
+        key = self.key(tconnect_device_id, entry, entity)
+        if not key:
+            return False
+        with self.lock:
+            row = self.conn.execute(
+                'SELECT 1 FROM uploaded WHERE tconnect_device_id=? AND entity=? AND event_type=? AND pump_event_id=?',
+                key).fetchone()
+        return row is not None
+
+    def add(self, tconnect_device_id, entry, entity='treatments'):
+        key = self.key(tconnect_device_id, entry, entity)
+        if not key:
+            return
+        with self.lock:
+            self.conn.execute(
+                'INSERT OR IGNORE INTO uploaded (tconnect_device_id, entity, event_type, pump_event_id, created_at) VALUES (?, ?, ?, ?, ?)',
+                key + (entry.get('created_at') or entry.get('dateString'),))
+
+    def count(self):
+        with self.lock:
+            return self.conn.execute('SELECT COUNT(*) FROM uploaded').fetchone()[0]
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+"""
+Uploads ns_entries to a Nightscout collection for a processor's write(),
+skipping any already in the uploaded index. Entries are only added to the
+index once Nightscout has accepted them, not when they are queued in the
+outbox, since a queued write may still be rejected. Returns the number of
+entries uploaded or queued (or which would be, in pretend mode).
+"""
+def write_entries(nightscout, ns_entries, tconnect_device_id, uploaded_index=None, pretend=False, entity='treatments'):
+    count = 0
+    for entry in ns_entries:
+        if uploaded_index and uploaded_index.contains(tconnect_device_id, entry, entity=entity):
+            logger.info("Skipping entry in the uploaded index (UPLOADED_INDEX): %s" % entry)
+            continue
+        if pretend:
+            logger.info("Would upload %s to Nightscout: %s" % (entity, entry))
+        else:
+            logger.info("Uploading %s to Nightscout: %s" % (entity, entry))
+            sent = nightscout.upload_entry(entry, entity=entity)
+            if sent and uploaded_index:
+                uploaded_index.add(tconnect_device_id, entry, entity=entity)
+        count += 1
+
+    return count
@@ -0,0 +1,74 @@
+import os
+import logging
+import tempfile
+import contextlib
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+logger = logging.getLogger(__name__)
+
+"""
+Holds an exclusive lock on the given lock file, which is created if needed,
+to coordinate with other threads and processes using the same file. If the
+lock file cannot be created, e.g. in a read-only directory, a warning is
+logged and the caller continues without the lock.
+"""
+@contextlib.contextmanager
+def lock_file(path):
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+    except OSError as e:
+        logger.warning("Could not open lock file %s, continuing without locking: %s" % (path, e))
+        fd = None
+    if fd is None:
+        yield
+        return
+
+    try:
+        if fcntl:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        elif msvcrt:
+            msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            elif msvcrt:
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+    finally:
+        os.close(fd)
+
+"""
+Replaces the contents of path with text by writing a temporary file beside
+it and renaming it into place, so that readers in other processes never see
+a partial write. The file is only readable by the current user. Unless fsync
+is false, the new contents are flushed to disk before the rename, so that
+they also survive a crash.
+"""
+def write_atomic(path, text, fsync=True):
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    # mkstemp creates the file with mode 0600
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(text)
+            f.flush()
+            if fsync:
+                os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp)
+        raise
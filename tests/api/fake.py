@@ -24,6 +24,9 @@ class WS2Api(tconnectsync.api.ws2.WS2Api):
     def get(self, endpoint):
         raise NotImplementedError
 
+    def get_lines(self, endpoint, **kwargs):
+        return self.get(endpoint, **kwargs).splitlines()
+
     def get_jsonp(self, endpoint):
         raise NotImplementedError
 
@@ -6,6 +6,8 @@ import datetime
 import json
 import requests_mock
 
+from unittest.mock import patch
+
 from bs4 import BeautifulSoup
 
 from .fake import ControlIQApi
@@ -13,6 +15,7 @@ from .fake import ControlIQApi
 from tconnectsync.api.controliq import ControlIQApi as RealControlIQApi
 from tconnectsync.api.common import ApiException, ApiLoginException, base_headers
 
+@patch('tconnectsync.secret.RATE_LIMIT', False)
 class TestControlIQApi(unittest.TestCase):
     LOGIN_HTML = """
 <html>
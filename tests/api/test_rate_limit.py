@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+
+import os
+import time
+import tempfile
+import unittest
+import multiprocessing
+import requests
+import requests_mock
+
+from unittest.mock import patch
+
+from tconnectsync.api import rate_limit
+from tconnectsync.api.rate_limit import RateLimiter, RateLimitExceeded, Limit, DEFAULT_LIMITS, parse_limits, shared_limiter
+
+URL = 'https://source.tandemdiabetes.com/api/reports/reportsfacade/pumpevents'
+
+
+class FakeClock:
+    def __init__(self, t=1700000000.0):
+        self.t = t
+        self.slept = []
+
+    def __call__(self):
+        return self.t
+
+    def sleep(self, seconds):
+        self.slept.append(round(seconds, 6))
+        self.t += seconds
+
+
+def acquire_many(path, count, out):
+    limiter = RateLimiter({'source.tandemdiabetes.com': Limit(rate=20, burst=1)}, state_path=path)
+    for _ in range(count):
+        limiter.acquire(URL)
+        with open(out, 'a') as f:
+            f.write('%f\n' % time.time())
+
+
+class TestParseLimits(unittest.TestCase):
+    def test_defaults(self):
+        self.assertEqual(parse_limits(''), DEFAULT_LIMITS)
+
+    def test_override(self):
+        limits = parse_limits('source.tandemdiabetes.com=2/10/5000, example.com=0.5, tdcservices.tandemdiabetes.com=0')
+        self.assertEqual(limits['source.tandemdiabetes.com'], Limit(2, 10, 5000))
+        self.assertEqual(limits['example.com'], Limit(0.5, 1, None))
+        self.assertNotIn('tdcservices.tandemdiabetes.com', limits)
+        self.assertEqual(limits['sso.tandemdiabetes.com'], DEFAULT_LIMITS['sso.tandemdiabetes.com'])
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            parse_limits('source.tandemdiabetes.com')
+        with self.assertRaises(ValueError):
+            parse_limits('source.tandemdiabetes.com=fast')
+
+
+class TestRateLimiter(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, '.rate_limit')
+        self.clock = FakeClock()
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def limiter(self, limit, state_path=None):
+        return RateLimiter({'source.tandemdiabetes.com': limit}, state_path=state_path, clock=self.clock, sleep=self.clock.sleep)
+
+    def test_burst_then_rate(self):
+        limiter = self.limiter(Limit(rate=2, burst=3))
+        waits = [limiter.acquire(URL) for _ in range(6)]
+        self.assertEqual(waits, [0, 0, 0, 0.5, 0.5, 0.5])
+
+        # The bucket refills up to the burst size while idle
+        self.clock.t += 60
+        self.assertEqual([limiter.acquire(URL) for _ in range(4)], [0, 0, 0, 0.5])
+
+    def test_reservations_queue_in_order(self):
+        limiter = self.limiter(Limit(rate=4, burst=1))
+        limiter.acquire(URL)
+        # Callers which reserve before earlier ones have finished waiting
+        # are scheduled after them
+        state = limiter._state
+        self.assertEqual(limiter._reserve(state, 'source.tandemdiabetes.com', Limit(4, 1), self.clock()), 0.25)
+        self.assertEqual(limiter._reserve(state, 'source.tandemdiabetes.com', Limit(4, 1), self.clock()), 0.5)
+
+    def test_unlimited_host(self):
+        limiter = self.limiter(Limit(rate=1, burst=1))
+        for _ in range(5):
+            self.assertEqual(limiter.acquire('https://nightscout.example.com/api/v1/entries'), 0)
+        self.assertEqual(self.clock.slept, [])
+
+    def test_daily_budget(self):
+        limiter = self.limiter(Limit(rate=100, burst=100, daily_budget=3))
+        for _ in range(3):
+            limiter.acquire(URL)
+        with self.assertRaises(RateLimitExceeded) as e:
+            limiter.acquire(URL)
+        self.assertEqual(e.exception.status_code, 429)
+
+        self.clock.t += 24 * 60 * 60
+        limiter.acquire(URL)
+
+    def test_shared_state_file(self):
+        first = self.limiter(Limit(rate=1, burst=2), state_path=self.path)
+        second = self.limiter(Limit(rate=1, burst=2), state_path=self.path)
+        self.assertEqual(first.acquire(URL), 0)
+        self.assertEqual(second.acquire(URL), 0)
+        self.assertEqual(first.acquire(URL), 1)
+        self.assertEqual(second.acquire(URL), 1)
+
+    def test_unreadable_state_file(self):
+        with open(self.path, 'w') as f:
+            f.write('{')
+        limiter = self.limiter(Limit(rate=1, burst=1), state_path=self.path)
+        self.assertEqual(limiter.acquire(URL), 0)
+        self.assertEqual(limiter.acquire(URL), 1)
+
+    def test_install(self):
+        limiter = self.limiter(Limit(rate=1, burst=1))
+        with requests_mock.Mocker() as m:
+            m.get(requests_mock.ANY, text='ok')
+            session = limiter.install(requests.Session(), exempt=lambda url: url.startswith('https://source.tandemdiabetes.com/exempt'))
+            session.get(URL)
+            session.get(URL)
+            session.get('https://source.tandemdiabetes.com/exempt')
+        self.assertEqual(self.clock.slept, [1])
+
+    @patch('tconnectsync.api.rate_limit._limiter', None)
+    def test_shared_limiter_state_is_opt_in(self):
+        with patch('tconnectsync.secret.RATE_LIMIT_SHARED', False), patch('tconnectsync.secret.RATE_LIMIT_STATE_PATH', self.path):
+            limiter = shared_limiter()
+            self.assertIsNone(limiter.state_path)
+            limiter.acquire(URL)
+        self.assertFalse(os.path.exists(self.path))
+
+        rate_limit._limiter = None
+        with patch('tconnectsync.secret.RATE_LIMIT_SHARED', True), patch('tconnectsync.secret.RATE_LIMIT_STATE_PATH', self.path):
+            self.assertEqual(shared_limiter().state_path, self.path)
+
+    @unittest.skipUnless('fork' in multiprocessing.get_all_start_methods(), 'requires fork')
+    def test_shared_between_processes(self):
+        out = os.path.join(self.dir.name, 'times')
+        ctx = multiprocessing.get_context('fork')
+        start = time.time()
+        workers = [ctx.Process(target=acquire_many, args=(self.path, 4, out)) for _ in range(3)]
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join(timeout=30)
+            self.assertEqual(w.exitcode, 0)
+
+        with open(out) as f:
+            times = sorted(float(t) for t in f.read().split())
+        self.assertEqual(len(times), 12)
+        # 20 requests per second with no burst, across all processes
+        self.assertGreaterEqual(times[-1] - start, 11 / 20 - 0.05)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+
+import os
+import json
+import stat
+import time
+import pickle
+import tempfile
+import multiprocessing
+import unittest
+import arrow
+import requests
+import requests_mock
+
+from unittest.mock import patch
+
+from tconnectsync.api import TConnectApi
+from tconnectsync.api.android import AndroidApi
+from tconnectsync.api.controliq import ControlIQApi
+from tconnectsync.api.session_cache import SessionCache, cookies_to_list, cookies_from_list
+from tconnectsync.eventparser.synthetic import SyntheticPumpHistory
+from tconnectsync.standin.tandemsource import TandemSourceStandin
+
+
+def login_once(path, log_path):
+    cache = SessionCache(path)
+    with cache.locked():
+        if cache.load('TandemSourceApi', 'email@email.com') is None:
+            time.sleep(0.2)
+            with open(log_path, 'a') as f:
+                f.write('login\n')
+            cache.save('TandemSourceApi', 'email@email.com', {'accessToken': 'tok'}, expires_at=arrow.get().shift(hours=1))
+
+
+class TestSessionCache(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, 'config', '.sessions_cache')
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_save_load(self):
+        cache = SessionCache(self.path)
+        self.assertIsNone(cache.load('ControlIQApi', 'email@email.com'))
+
+        cache.save('ControlIQApi', 'email@email.com', {'accessToken': 'tok'}, expires_at=arrow.get().shift(hours=1))
+        cache.save('AndroidApi', 'email@email.com', {'accessToken': 'android'}, expires_at=arrow.get().shift(hours=1))
+
+        self.assertEqual(SessionCache(self.path).load('ControlIQApi', 'email@email.com'), {'accessToken': 'tok'})
+        self.assertEqual(SessionCache(self.path).load('AndroidApi', 'email@email.com'), {'accessToken': 'android'})
+        self.assertIsNone(SessionCache(self.path).load('ControlIQApi', 'other@email.com'))
+        self.assertEqual(stat.S_IMODE(os.stat(self.path).st_mode), 0o600)
+
+    def test_expired(self):
+        cache = SessionCache(self.path)
+        cache.save('ControlIQApi', 'email@email.com', {}, expires_at=arrow.get().shift(minutes=2))
+        self.assertIsNone(cache.load('ControlIQApi', 'email@email.com'))
+
+    def test_clear(self):
+        cache = SessionCache(self.path)
+        cache.save('ControlIQApi', 'email@email.com', {'a': 1}, expires_at=arrow.get().shift(hours=1))
+        cache.clear('ControlIQApi', 'email@email.com')
+        self.assertIsNone(cache.load('ControlIQApi', 'email@email.com'))
+
+    def test_unreadable(self):
+        os.makedirs(os.path.dirname(self.path))
+        with open(self.path, 'w') as f:
+            f.write('not json')
+        cache = SessionCache(self.path)
+        self.assertIsNone(cache.load('ControlIQApi', 'email@email.com'))
+        cache.save('ControlIQApi', 'email@email.com', {'a': 1}, expires_at=arrow.get().shift(hours=1))
+        self.assertEqual(cache.load('ControlIQApi', 'email@email.com'), {'a': 1})
+
+    def test_write_is_atomic(self):
+        cache = SessionCache(self.path)
+        for i in range(3):
+            cache.save('ControlIQApi', 'email@email.com', {'i': i}, expires_at=arrow.get().shift(hours=1))
+        self.assertEqual(sorted(os.listdir(os.path.dirname(self.path))), ['.sessions_cache', '.sessions_cache.lock'])
+        with open(self.path) as f:
+            self.assertEqual(json.load(f)['sessions']['ControlIQApi:email@email.com']['data'], {'i': 2})
+
+    def test_replaces_pickled_cache(self):
+        os.makedirs(os.path.dirname(self.path))
+        with open(self.path, 'wb') as f:
+            pickle.dump({'cache_creds_version': 1.0, 'accessToken': 'old'}, f)
+
+        cache = SessionCache(self.path)
+        self.assertIsNone(cache.load('TandemSourceApi', 'email@email.com'))
+        cache.save('TandemSourceApi', 'email@email.com', {'accessToken': 'new'}, expires_at=arrow.get().shift(hours=1))
+        self.assertEqual(cache.load('TandemSourceApi', 'email@email.com'), {'accessToken': 'new'})
+
+    def test_locked_is_reentrant(self):
+        with SessionCache(self.path).locked():
+            with SessionCache(self.path).locked():
+                SessionCache(self.path).save('AndroidApi', 'email@email.com', {}, expires_at=arrow.get().shift(hours=1))
+        self.assertEqual(SessionCache(self.path).load('AndroidApi', 'email@email.com'), {})
+
+    @unittest.skipUnless('fork' in multiprocessing.get_all_start_methods(), 'requires fork')
+    def test_only_one_process_logs_in(self):
+        log_path = os.path.join(self.dir.name, 'logins')
+        ctx = multiprocessing.get_context('fork')
+        workers = [ctx.Process(target=login_once, args=(self.path, log_path)) for _ in range(4)]
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join(timeout=30)
+            self.assertEqual(w.exitcode, 0)
+
+        with open(log_path) as f:
+            self.assertEqual(f.read(), 'login\n')
+
+    def test_cookies(self):
+        jar = requests.cookies.RequestsCookieJar()
+        jar.set('UserGUID', 'guid', domain='tconnect.tandemdiabetes.com', path='/')
+        jar.set('expired', 'x', domain='tconnect.tandemdiabetes.com', path='/', expires=arrow.get().shift(days=-1).int_timestamp)
+
+        restored = cookies_from_list(json.loads(json.dumps(cookies_to_list(jar))), requests.cookies.RequestsCookieJar())
+        self.assertEqual(restored.get_dict(), {'UserGUID': 'guid'})
+
+
+@patch('tconnectsync.secret.RATE_LIMIT', False)
+class TestCachedLogin(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, '.sessions_cache')
+        for module in ('android', 'controliq'):
+            for name, value in (('CACHE_CREDENTIALS', True), ('CACHE_SESSIONS_PATH', self.path)):
+                p = patch('tconnectsync.api.%s.%s' % (module, name), value)
+                p.start()
+                self.addCleanup(p.stop)
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def token_json(self, access, refresh, minutes=60):
+        return {
+            'accessToken': access,
+            'accessTokenExpiresAt': arrow.get().shift(minutes=minutes).isoformat(),
+            'refreshToken': refresh,
+            'refreshTokenExpiresAt': arrow.get().shift(days=30).isoformat(),
+            'user': {'id': 'user_id'},
+        }
+
+    def test_android_reuses_cached_session(self):
+        with requests_mock.Mocker() as m:
+            m.post(AndroidApi.BASE_URL + AndroidApi.OAUTH_TOKEN_PATH, json=self.token_json('tok1', 'ref1'))
+            AndroidApi('email@email.com', 'password')
+            self.assertEqual(m.call_count, 1)
+
+            android = AndroidApi('email@email.com', 'password')
+            self.assertEqual(m.call_count, 1)
+            self.assertEqual(android.accessToken, 'tok1')
+            self.assertEqual(android.userId, 'user_id')
+
+    def test_android_refreshes_expired_access_token(self):
+        with requests_mock.Mocker() as m:
+            m.post(AndroidApi.BASE_URL + AndroidApi.OAUTH_TOKEN_PATH, json=self.token_json('tok1', 'ref1', minutes=1))
+            AndroidApi('email@email.com', 'password')
+
+            m.post(AndroidApi.BASE_URL + AndroidApi.OAUTH_TOKEN_PATH, json=self.token_json('tok2', 'ref2'))
+            android = AndroidApi('email@email.com', 'password')
+            self.assertIn('grant_type=refresh_token', m.last_request.text)
+            self.assertIn('refresh_token=ref1', m.last_request.text)
+            self.assertNotIn('password', m.last_request.text.replace('cloud.password', ''))
+            self.assertEqual(android.accessToken, 'tok2')
+            self.assertEqual(SessionCache(self.path).load('AndroidApi', 'email@email.com')['refreshToken'], 'ref2')
+
+    def test_android_rejected_refresh_logs_in(self):
+        with requests_mock.Mocker() as m:
+            m.post(AndroidApi.BASE_URL + AndroidApi.OAUTH_TOKEN_PATH, json=self.token_json('tok1', 'ref1', minutes=1))
+            AndroidApi('email@email.com', 'password')
+
+            m.post(AndroidApi.BASE_URL + AndroidApi.OAUTH_TOKEN_PATH, [
+                {'status_code': 400, 'json': {}},
+                {'json': self.token_json('tok3', 'ref3')},
+            ])
+            android = AndroidApi('email@email.com', 'password')
+            self.assertIn('grant_type=password', m.last_request.text)
+            self.assertEqual(android.accessToken, 'tok3')
+
+    def test_tandemsource_reuses_cached_credentials(self):
+        path = os.path.join(self.dir.name, '.creds_cache')
+        with patch('tconnectsync.api.tandemsource.CACHE_CREDENTIALS', True), \
+                patch('tconnectsync.api.tandemsource.CACHE_CREDENTIALS_PATH', path), \
+                TandemSourceStandin(synthetic=SyntheticPumpHistory(seed=1), synthetic_start='2024-01-01') as standin:
+            first = TConnectApi('email@email.com', 'password').tandemsource
+            second = TConnectApi('email@email.com', 'password').tandemsource
+            self.assertEqual(standin.stats['POST accounts/api/login'], 1)
+
+            self.assertEqual(second.accessToken, first.accessToken)
+            self.assertEqual(second.pumperId, first.pumperId)
+            self.assertEqual(second.accessTokenExpiresAt, first.accessTokenExpiresAt)
+            self.assertTrue(second.pump_event_metadata())
+
+        with open(path) as f:
+            self.assertIn('TandemSourceApi:email@email.com', json.load(f)['sessions'])
+
+    def test_controliq_reuses_cached_session(self):
+        expires = arrow.get().shift(hours=1).isoformat()
+        SessionCache(self.path).save('ControlIQApi', 'email@email.com', {
+            'userGuid': 'guid',
+            'accessToken': 'tok',
+            'accessTokenExpiresAt': expires,
+            'cookies': [{'name': 'UserGUID', 'value': 'guid', 'domain': 'tconnect.tandemdiabetes.com', 'path': '/', 'expires': None, 'secure': True}],
+        }, expires_at=expires)
+
+        # Any request, such as scraping the login page, would fail
+        with requests_mock.Mocker() as m:
+            ciq = ControlIQApi('email@email.com', 'password')
+            self.assertEqual(m.call_count, 0)
+
+        self.assertEqual(ciq.userGuid, 'guid')
+        self.assertEqual(ciq.accessToken, 'tok')
+        self.assertEqual(ciq.loginSession.cookies.get('UserGUID'), 'guid')
+
+        ciq.clear_cached_session()
+        self.assertIsNone(SessionCache(self.path).load('ControlIQApi', 'email@email.com'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,11 +2,15 @@
 
 import unittest
 import itertools
+import threading
+import time
 import copy
+import requests_mock
 
 from .fake import WS2Api
 
 from tconnectsync.api.common import ApiException
+from tconnectsync.api.ws2 import WS2Api as RealWS2Api
 
 class TestWS2Api(unittest.TestCase):
     def fake_get_with_http_500(self, num_times):
@@ -152,7 +156,7 @@ Report Generated On, 4/24/2021 7:50:04 PM
         parsedData3 = replace_parsed('04-05-2021', '04-06-2021')
         parsedData4 = replace_parsed('04-07-2021', '04-07-2021')
 
-        fullParsedData = parsedData1
+        fullParsedData = copy.deepcopy(parsedData1)
         for d in [parsedData2, parsedData3, parsedData4]:
             for typ in d.keys():
                 fullParsedData[typ] += d[typ]
@@ -175,5 +179,54 @@ Report Generated On, 4/24/2021 7:50:04 PM
 
         self.assertDictEqual(tt, fullParsedData)
 
+    def test_therapy_timeline_csv_concurrent_chunks(self):
+        ws2 = WS2Api()
+        ws2.userGuid = 'aaaaaaaa-bbbb-cccc-dddd-eeeeeeeeeeee'
+
+        lock = threading.Lock()
+        active = 0
+        max_active = 0
+        failed = set()
+        def fake_get(endpoint, **kwargs):
+            nonlocal active, max_active
+            with lock:
+                active += 1
+                max_active = max(max_active, active)
+            try:
+                time.sleep(0.02)
+                # Each chunk fails once, and is retried on its own
+                if endpoint not in failed:
+                    failed.add(endpoint)
+                    raise ApiException(500, "fake HTTP 500")
+                start = endpoint.split('/')[2]
+                return self.RAW_DATA_HEADER + "\n" + self.RAW_DATA_IOB.replace('2021-04-01', start)
+            finally:
+                with lock:
+                    active -= 1
+
+        ws2.get = fake_get
+
+        tt = ws2.therapy_timeline_csv('04-01-2021', '04-12-2021')
+
+        self.assertEqual(len(failed), 6)
+        self.assertLessEqual(max_active, ws2.MAX_CONCURRENT_CHUNKS)
+        self.assertGreater(max_active, 1)
+        # Chunks are merged in order
+        self.assertEqual([d["EventDateTime"][:10] for d in tt["iobData"]][::3], ['04-01-2021', '04-03-2021', '04-05-2021', '04-07-2021', '04-09-2021', '04-11-2021'])
+        self.assertEqual(tt["readingData"], [])
+
+    def test_therapy_timeline_csv_streams_response(self):
+        ws2 = RealWS2Api('aaaaaaaa-bbbb-cccc-dddd-eeeeeeeeeeee')
+
+        with requests_mock.Mocker() as m:
+            m.get(ws2.BASE_URL + 'therapytimeline2csv/aaaaaaaa-bbbb-cccc-dddd-eeeeeeeeeeee/04-01-2021/04-02-2021?format=csv', text=self.RAW_DATA_FULL.replace('\n', '\r\n'))
+            self.assertDictEqual(ws2.therapy_timeline_csv('04-01-2021', '04-02-2021'), self.PARSED_DATA)
+
+            m.get(ws2.BASE_URL + 'therapytimeline2csv/aaaaaaaa-bbbb-cccc-dddd-eeeeeeeeeeee/04-03-2021/04-03-2021?format=csv', status_code=404, text='Not Found')
+            with self.assertRaises(ApiException) as e:
+                ws2.therapy_timeline_csv('04-03-2021', '04-03-2021')
+            self.assertEqual(e.exception.status_code, 404)
+            self.assertEqual(m.call_count, 2)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+
+import unittest
+
+from tconnectsync.eventparser import events as eventtypes
+from tconnectsync.eventparser.generic import Events, decode_columns, decode_raw_events, EVENT_LEN
+from tconnectsync.eventparser.synthetic import SyntheticPumpHistory
+
+class TestDecodeColumns(unittest.TestCase):
+    def setUp(self):
+        self.raw = decode_raw_events(SyntheticPumpHistory(seed=3).pump_events_raw('2024-01-01', '2024-01-02'))
+
+    def test_matches_events(self):
+        columns = decode_columns(self.raw)
+        events = list(Events(self.raw))
+
+        self.assertEqual(sum(len(c['seqNum']) for c in columns.values()), len(events))
+        for cls, cols in columns.items():
+            of_type = [e for e in events if type(e) is cls]
+            self.assertEqual(list(cols['seqNum']), [e.seqNum for e in of_type])
+            self.assertEqual(list(cols['timestampRaw']), [e.raw.timestampRaw for e in of_type])
+            for name in cls.COLUMNS:
+                self.assertEqual(list(cols[name]), [getattr(e, name) for e in of_type], '%s.%s' % (cls.__name__, name))
+
+    def test_event_ids_and_truncated(self):
+        columns = decode_columns(self.raw[:-1], event_ids={eventtypes.LidBolusCompleted.ID})
+        self.assertEqual(list(columns.keys()), [eventtypes.LidBolusCompleted])
+
+    def test_structs_cover_event(self):
+        for cls in eventtypes.EVENT_IDS.values():
+            self.assertEqual(cls.STRUCT.size, EVENT_LEN, cls.__name__)
+            self.assertEqual(len(cls.COLUMNS), len(cls.COLUMN_TYPES), cls.__name__)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+
+import unittest
+import collections
+
+from tconnectsync.eventparser import events as eventtypes
+from tconnectsync.eventparser.generic import Event, Events, decode_raw_events
+from tconnectsync.eventparser.synthetic import SyntheticPumpHistory
+from tconnectsync.sync.tandemsource.process_bolus import ProcessBolus
+from tconnectsync.sync.tandemsource.process_user_mode import ProcessUserMode
+
+from ..api.fake import TConnectApi
+from ..nightscout_fake import NightscoutApi
+
+class TestEncode(unittest.TestCase):
+    RAW_EVENTS = [
+        # LidAlarmActivated
+        b'\x00\x05\x1f\xc0*a\x00\x0e\xf5\x90\x00\x00\x00\x08\x00\x00 1\x00\x00\x00gA\x1a\x1e\x84',
+        # LidAaUserModeChange
+        b'\x00\xe5\x1f\xd7\\\x87\x00\x10\t\xaa\x00\x01\x00\x01\x00\x00\x01\x00\x00\xf0\x01\x01\x00\x00\x00\x00',
+        # LidDailyBasal
+        b'\x00Q\x1f\xd6\x14g\x00\x0f\xf7\xa4A\xb2\xd3\xe2?L\xcc\xcd@~\xdeb\x0e\xf67\x00',
+    ]
+
+    def test_encode_is_inverse_of_build(self):
+        for raw in self.RAW_EVENTS:
+            event = Event(bytearray(raw))
+            self.assertNotEqual(type(event).__name__, 'RawEvent')
+            self.assertEqual(event.encode(), raw)
+
+    def test_encode_modified_field(self):
+        event = Event(bytearray(self.RAW_EVENTS[0]))
+        event.alarmidRaw = eventtypes.LidAlarmActivated.AlarmidEnum.OcclusionAlarm.value
+        event.raw.seqNum = 12345
+
+        decoded = Event(bytearray(event.encode()))
+        self.assertEqual(decoded.alarmid, eventtypes.LidAlarmActivated.AlarmidEnum.OcclusionAlarm)
+        self.assertEqual(decoded.seqNum, 12345)
+        self.assertEqual(decoded.eventTimestamp, event.eventTimestamp)
+
+
+class TestSyntheticPumpHistory(unittest.TestCase):
+    def setUp(self):
+        self.history = SyntheticPumpHistory(seed=1)
+
+    def test_pump_events_raw_decodes(self):
+        raw = self.history.pump_events_raw('2024-01-01', '2024-01-03')
+        events = list(Events(decode_raw_events(raw)))
+
+        counts = collections.Counter(type(e) for e in events)
+        self.assertEqual(counts[eventtypes.LidBasalDelivery], 3 * 288)
+        self.assertEqual(counts[eventtypes.LidCgmDataGxb], 3 * 288)
+        self.assertGreater(counts[eventtypes.LidBolusCompleted], 0)
+        self.assertEqual(counts[eventtypes.LidBolusCompleted], counts[eventtypes.LidBolusRequestedMsg1])
+        self.assertGreater(counts[eventtypes.LidAaUserModeChange], 0)
+        self.assertGreater(counts[eventtypes.LidCartridgeFilled], 0)
+
+        seqnums = [e.seqNum for e in events]
+        self.assertEqual(seqnums, sorted(seqnums))
+        self.assertEqual(len(set(seqnums)), len(seqnums))
+
+        self.assertEqual(str(events[0].eventTimestamp.date()), '2024-01-01')
+        self.assertEqual(str(events[-1].eventTimestamp.date()), '2024-01-03')
+
+    def test_deterministic_across_ranges(self):
+        full = self.history.pump_events_raw('2024-01-01', '2024-01-03')
+        split = decode_raw_events(self.history.pump_events_raw('2024-01-01', '2024-01-01')) + \
+            decode_raw_events(self.history.pump_events_raw('2024-01-02', '2024-01-03'))
+
+        self.assertEqual(decode_raw_events(full), split)
+
+    def test_processors_accept_events(self):
+        nightscout = NightscoutApi()
+        nightscout.last_uploaded_entry = lambda *args, **kwargs: None
+        events = list(self.history.pump_events('2024-01-01', '2024-01-01'))
+
+        bolus = ProcessBolus(TConnectApi(), nightscout, 'abcdef', pretend=False)
+        bolus_events = [e for e in events if type(e) in (eventtypes.LidBolusRequestedMsg1, eventtypes.LidBolusRequestedMsg2, eventtypes.LidBolusRequestedMsg3, eventtypes.LidBolusCompleted)]
+        entries = bolus.process(bolus_events, None, None)
+        self.assertEqual(len(entries), len([e for e in bolus_events if type(e) == eventtypes.LidBolusCompleted]))
+        self.assertEqual(len(entries[0]['pump_event_id'].split(',')), 4)
+
+        user_mode = ProcessUserMode(TConnectApi(), nightscout, 'abcdef', pretend=False)
+        entries = user_mode.process([e for e in events if type(e) == eventtypes.LidAaUserModeChange], None, events[-1].eventTimestamp)
+        self.assertIn('Sleep', [e['eventType'] for e in entries])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+
+import unittest
+
+from tconnectsync.eventparser import events as eventtypes
+from tconnectsync.eventparser.utils import bitmask_names, bitmask_to_list
+from tconnectsync.eventparser.generic import EVENT_LEN
+from tconnectsync.eventparser.raw_event import RawEvent
+
+Changetype = eventtypes.LidBasalRateChange.ChangetypeBitmask
+Source = eventtypes.LidBasalDelivery.CommandedratesourceEnum
+
+def basal_rate_change(changetype):
+    raw = RawEvent(source=0, id=eventtypes.LidBasalRateChange.ID, timestampRaw=504921600, seqNum=1, raw=bytearray(EVENT_LEN))
+    return eventtypes.LidBasalRateChange(raw=raw, commandedbasalrate=1.0, basebasalrate=1.0, maxbasalrate=3.0, IDP=1, changetypeRaw=changetype)
+
+def basal_delivery(source):
+    raw = RawEvent(source=0, id=eventtypes.LidBasalDelivery.ID, timestampRaw=504921600, seqNum=1, raw=bytearray(EVENT_LEN))
+    return eventtypes.LidBasalDelivery(raw=raw, commandedRateSourceRaw=source, commandedRate=800, profileBasalRate=800, algorithmRate=800, tempRate=0)
+
+
+class TestBitmaskToList(unittest.TestCase):
+    def test_single_flag(self):
+        self.assertEqual(bitmask_to_list(Changetype(4)), ['TempRateStart'])
+
+    def test_multiple_flags(self):
+        self.assertEqual(bitmask_to_list(Changetype.TimedSegment | Changetype.TempRateStart), ['TimedSegment', 'TempRateStart'])
+
+    def test_no_flags(self):
+        self.assertEqual(bitmask_to_list(Changetype(0)), [])
+
+    def test_enum(self):
+        self.assertEqual(bitmask_to_list(Source.Algorithm), ['Algorithm'])
+
+    def test_none(self):
+        self.assertEqual(bitmask_to_list(None), [])
+
+
+class TestGeneratedLookupTables(unittest.TestCase):
+    def test_enum_members(self):
+        self.assertIs(basal_delivery(3).commandedRateSource, Source.Algorithm)
+        self.assertEqual(eventtypes.LidBasalDelivery.CommandedratesourceMembers, {m.value: m for m in Source})
+
+    def test_invalid_enum_value(self):
+        with self.assertLogs('tconnectsync.eventparser.events', level='ERROR'):
+            self.assertIsNone(basal_delivery(99).commandedRateSource)
+
+    def test_bitmask_names(self):
+        self.assertEqual(basal_rate_change(4).changetypeNames, ('TempRateStart',))
+        self.assertEqual(basal_rate_change(0).changetypeNames, ())
+
+    def test_uncommon_combination_cached(self):
+        bitmask_names.cache_clear()
+        self.assertEqual(basal_rate_change(5).changetypeNames, ('TimedSegment', 'TempRateStart'))
+        self.assertEqual(basal_rate_change(5).changetypeNames, ('TimedSegment', 'TempRateStart'))
+        self.assertEqual(bitmask_names.cache_info().hits, 1)
+
+    def test_tables_match_classes(self):
+        for event_class in eventtypes.EVENT_IDS.values():
+            for attr, table in vars(event_class).items():
+                if attr.endswith('Members'):
+                    enum_class = getattr(event_class, attr[:-len('Members')] + 'Enum')
+                    self.assertEqual(table, {m.value: m for m in enum_class}, event_class.__name__)
+                elif attr.endswith('Names') and isinstance(table, dict):
+                    bitmask_class = getattr(event_class, attr[:-len('Names')] + 'Bitmask')
+                    for value, names in table.items():
+                        self.assertEqual(list(names), bitmask_to_list(bitmask_class(value)), event_class.__name__)
+
+
+if __name__ == '__main__':
+    unittest.main()
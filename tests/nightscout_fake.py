@@ -13,12 +13,19 @@ class NightscoutApi(tconnectsync.nightscout.NightscoutApi):
 
     def upload_entry(self, ns_format, entity='treatments'):
         self.uploaded_entries[entity].append(ns_format)
+        return True
+
+    def upload_entries(self, ns_formats, entity='treatments'):
+        self.uploaded_entries[entity].extend(ns_formats)
+        return True
 
     def delete_entry(self, ns_path):
         self.deleted_entries.append(ns_path)
+        return True
 
     def put_entry(self, ns_format, entity):
         self.put_entries[entity].append(ns_format)
+        return True
 
     def last_uploaded_entry(self, eventType, time_start=None, time_end=None):
         raise NotImplementedError
@@ -29,6 +36,9 @@ class NightscoutApi(tconnectsync.nightscout.NightscoutApi):
     def last_uploaded_devicestatus(self, time_start=None, time_end=None):
         raise NotImplementedError
 
+    def uploaded_entries_in_range(self, entity, time_start, time_end):
+        raise NotImplementedError
+
     def api_status(self):
         raise NotImplementedError
 
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+
+import os
+import json
+import time
+import unittest
+import tempfile
+import requests
+import arrow
+
+from tconnectsync.api import TConnectApi
+from tconnectsync.api import tandemsource
+from tconnectsync.nightscout import NightscoutApi
+from tconnectsync.nightscout_v3 import NightscoutApiV3
+from tconnectsync.parser.nightscout import ENTERED_BY
+from tconnectsync.eventparser.synthetic import SyntheticPumpHistory
+from tconnectsync.standin.cassette import Cassette, normalize_url, redact_url, redact_text, CASSETTE_FILE
+from tconnectsync.standin.nightscout import NightscoutStandinServer
+from tconnectsync.standin.tandemsource import TandemSourceStandin, SYNTHETIC_DEVICE_ID, PUMPER_ID
+
+
+class TestCassette(unittest.TestCase):
+    def setUp(self):
+        self.server = NightscoutStandinServer(secret='secret').start()
+        self.url = self.server.url
+        self.stopped = False
+        self.now = arrow.get('2024-02-01T12:00:00', tzinfo='America/New_York')
+
+    def tearDown(self):
+        if not self.stopped:
+            self.server.stop()
+
+    def cycle(self):
+        api = TConnectApi('email@email.com', 'password').tandemsource
+        metadata = api.pump_event_metadata()
+        events = list(api.pump_events(SYNTHETIC_DEVICE_ID, '2024-02-01', '2024-02-01'))
+
+        nightscout = NightscoutApi(self.url, 'secret')
+        nightscout.upload_entry({'eventType': 'Note', 'enteredBy': ENTERED_BY, 'notes': 'cassette', 'created_at': '2024-02-01 10:00:00-05:00'})
+        last = nightscout.last_uploaded_entry('Note')
+        return metadata, [e.seqNum for e in events], last['notes']
+
+    def test_record_then_replay_offline(self):
+        with tempfile.TemporaryDirectory() as d:
+            standin = TandemSourceStandin(synthetic=SyntheticPumpHistory(seed=1), synthetic_start='2024-01-01', now=lambda: self.now)
+            with standin, Cassette.record(d, args={'time_start': '2024-02-01'}):
+                recorded = self.cycle()
+
+            with open(os.path.join(d, CASSETTE_FILE)) as f:
+                contents = f.read()
+            self.assertNotIn('email@email.com', contents)
+            self.assertNotIn('api_secret=secret', contents)
+
+            # Neither the Tandem Source stand-in nor the Nightscout server is reachable on replay
+            self.server.stop()
+            self.stopped = True
+
+            cassette = Cassette.replay(d, time_scale=0)
+            self.assertEqual(cassette.args, {'time_start': '2024-02-01'})
+            with cassette:
+                replayed = self.cycle()
+                self.assertEqual(cassette.remaining(), 0)
+
+            self.assertEqual(recorded, replayed)
+
+    def test_record_redacts_nightscout_access_token(self):
+        self.server.access_token = 'tconnectsync-abc123'
+        with tempfile.TemporaryDirectory() as d:
+            with Cassette.record(d):
+                nightscout = NightscoutApiV3(self.url, 'secret', 'tconnectsync-abc123')
+                nightscout.upload_entry({'eventType': 'Note', 'enteredBy': ENTERED_BY, 'notes': 'v3', 'created_at': '2024-02-01 10:00:00-05:00'})
+                self.assertEqual(nightscout.last_uploaded_entry('Note')['notes'], 'v3')
+
+            with open(os.path.join(d, CASSETTE_FILE)) as f:
+                contents = f.read()
+            self.assertNotIn('tconnectsync-abc123', contents)
+            self.assertNotIn(nightscout.jwt, contents)
+            self.assertIn('api/v2/authorization/request/REDACTED', contents)
+
+    def test_record_redacts_login_tokens(self):
+        standin = TandemSourceStandin(synthetic=SyntheticPumpHistory(seed=1), synthetic_start='2024-01-01', now=lambda: self.now)
+        handle = standin.handle
+        id_tokens = []
+        def handle_with_tokens(method, url, body=None):
+            status, headers, content = handle(method, url, body)
+            if url.startswith(tandemsource.TandemSourceApi.LOGIN_API_URL):
+                content = json.dumps({**json.loads(content), 'session': {'accessToken': 'access-secret', 'tokens': [{'refreshToken': 'refresh-secret'}]}})
+            if url.endswith('connect/token') and status == 200:
+                id_tokens.append(json.loads(content)['id_token'])
+            return status, headers, content
+        standin.handle = handle_with_tokens
+
+        with tempfile.TemporaryDirectory() as d:
+            with standin, Cassette.record(d):
+                recorded = TConnectApi('email@email.com', 'password').tandemsource.pump_event_metadata()
+
+            with open(os.path.join(d, CASSETTE_FILE)) as f:
+                contents = f.read()
+            self.assertEqual(len(id_tokens), 1)
+            for value in ('access-secret', 'refresh-secret', id_tokens[0]):
+                self.assertNotIn(value, contents)
+            self.assertIn('\\"accessToken\\": \\"REDACTED\\"', contents)
+
+            # The unsigned id token still identifies the pumper on replay
+            with Cassette.replay(d, time_scale=0):
+                api = TConnectApi('email@email.com', 'password').tandemsource
+                self.assertEqual(api.pumperId, PUMPER_ID)
+                self.assertEqual(api.pump_event_metadata(), recorded)
+            self.assertTrue(tandemsource.TandemSourceApi.JWT_VERIFY_SIGNATURE)
+
+    def test_replay_restores_state(self):
+        with tempfile.TemporaryDirectory() as d:
+            with Cassette.record(d):
+                pass
+            get_adapter = requests.Session.get_adapter
+            with Cassette.replay(d, time_scale=0):
+                self.assertFalse(tandemsource.TandemSourceApi.JWT_VERIFY_EXPIRATION)
+                with self.assertRaises(requests.exceptions.ConnectionError):
+                    requests.get('https://example.com/unrecorded')
+            self.assertTrue(tandemsource.TandemSourceApi.JWT_VERIFY_EXPIRATION)
+            self.assertEqual(requests.Session.get_adapter, get_adapter)
+
+    def test_replay_time_scale(self):
+        with tempfile.TemporaryDirectory() as d:
+            with open(os.path.join(d, CASSETTE_FILE), 'w') as f:
+                json.dump({'version': 1, 'interactions': [{
+                    'request': {'method': 'GET', 'url': 'https://example.com/a?ts=1'},
+                    'response': {'status_code': 200, 'headers': {'Content-Type': 'application/json'}, 'elapsed': 0.2, 'body': '[1]'},
+                }]}, f)
+
+            with Cassette.replay(d, time_scale=0.5):
+                started = time.time()
+                self.assertEqual(requests.get('https://example.com/a?ts=2').json(), [1])
+                self.assertGreaterEqual(time.time() - started, 0.1)
+
+    def test_redaction_and_normalization(self):
+        self.assertEqual(normalize_url('https://x/api?b=1&ts=5&a=2&api_secret=s'), 'https://x/api?a=2&b=1')
+        self.assertEqual(redact_url('https://x/api?api_secret=s&a=1'), 'https://x/api?api_secret=REDACTED&a=1')
+        self.assertEqual(redact_url('https://x/ns/api/v2/authorization/request/t-1'), 'https://x/ns/api/v2/authorization/request/REDACTED')
+        self.assertEqual(normalize_url('https://x/api/v2/authorization/request/t-2'), 'https://x/api/v2/authorization/request/REDACTED')
+        self.assertEqual(json.loads(redact_text('{"username": "u", "password": "p", "x": 1}')), {'username': 'REDACTED', 'password': 'REDACTED', 'x': 1})
+        self.assertEqual(json.loads(redact_text('[{"a": {"accessToken": "t", "b": [{"refreshToken": "r"}]}}]')), [{'a': {'accessToken': 'REDACTED', 'b': [{'refreshToken': 'REDACTED'}]}}])
+        self.assertEqual(json.loads(redact_text('{"id_token": "not a jwt"}')), {'id_token': 'REDACTED'})
+        self.assertEqual(redact_text('grant_type=authorization_code&code_verifier=abc'), 'grant_type=authorization_code&code_verifier=REDACTED')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+
+import unittest
+import requests
+
+from tconnectsync.nightscout import NightscoutApi
+from tconnectsync.api.common import ApiException
+from tconnectsync.parser.nightscout import NightscoutEntry, BASAL_EVENTTYPE, BOLUS_EVENTTYPE
+from tconnectsync.standin.nightscout import NightscoutStandinServer
+
+class TestNightscoutStandinServer(unittest.TestCase):
+    def setUp(self):
+        self.server = NightscoutStandinServer(secret='secret').start()
+        self.nightscout = NightscoutApi(self.server.url, 'secret')
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_last_uploaded_entry(self):
+        self.assertIsNone(self.nightscout.last_uploaded_entry(BASAL_EVENTTYPE))
+
+        for created_at in ['2024-11-17 08:00:00-05:00', '2024-11-17 08:10:00-05:00', '2024-11-18 08:00:00-05:00']:
+            self.nightscout.upload_entry(NightscoutEntry.basal(1.0, 5, created_at, pump_event_id='1'))
+        self.nightscout.upload_entry(NightscoutEntry.bolus(2.0, 10, '2024-11-17 09:00:00-05:00'))
+
+        latest = self.nightscout.last_uploaded_entry(BASAL_EVENTTYPE)
+        self.assertEqual(latest['created_at'], '2024-11-18 08:00:00-05:00')
+        self.assertIn('_id', latest)
+
+        latest = self.nightscout.last_uploaded_entry(BASAL_EVENTTYPE, time_start='2024-11-17T00:00:00-05:00', time_end='2024-11-17T23:59:59-05:00')
+        self.assertEqual(latest['created_at'], '2024-11-17 08:10:00-05:00')
+
+        latest = self.nightscout.last_uploaded_entry(BOLUS_EVENTTYPE)
+        self.assertEqual(latest['insulin'], 2.0)
+
+    def test_entries_devicestatus_activity(self):
+        self.nightscout.upload_entry(NightscoutEntry.entry(120, '2024-11-17 08:00:00-05:00'), entity='entries')
+        self.nightscout.upload_entry(NightscoutEntry.entry(130, '2024-11-17 08:05:00-05:00'), entity='entries')
+        self.assertEqual(self.nightscout.last_uploaded_bg_entry()['sgv'], 130)
+        self.assertEqual(self.nightscout.last_uploaded_bg_entry(time_end='2024-11-17T08:01:00-05:00')['sgv'], 120)
+
+        self.nightscout.upload_entry(NightscoutEntry.devicestatus('2024-11-17 08:00:00-05:00', 4.1, 80), entity='devicestatus')
+        self.assertEqual(self.nightscout.last_uploaded_devicestatus()['pump']['battery']['percent'], 80)
+
+        self.nightscout.upload_entry(NightscoutEntry.iob(1.5, '2024-11-17 08:00:00-05:00'), entity='activity')
+        activity = self.nightscout.last_uploaded_activity('tconnect_iob')
+        self.assertEqual(activity['iob'], 1.5)
+
+        self.nightscout.delete_entry('activity/%s' % activity['_id'])
+        self.assertIsNone(self.nightscout.last_uploaded_activity('tconnect_iob'))
+
+    def test_array_post_and_count(self):
+        docs = [NightscoutEntry.entry(100 + i, '2024-11-17 08:%02d:00-05:00' % i) for i in range(20)]
+        self.nightscout.upload_entry(docs, entity='entries')
+
+        r = requests.get(self.server.url + 'api/v1/entries.json?count=15&api_secret=secret')
+        self.assertEqual(len(r.json()), 15)
+        self.assertEqual(r.json()[0]['sgv'], 119)
+        self.assertEqual(self.server.stats['documents entries'], 20)
+
+    def test_profile(self):
+        self.assertEqual(self.nightscout.current_profile(), {})
+        self.nightscout.upload_entry({'defaultProfile': 'A', 'startDate': '2024-11-17T00:00:00Z', 'store': {}}, entity='profile')
+
+        profile = self.nightscout.current_profile()
+        self.assertEqual(profile['defaultProfile'], 'A')
+
+        profile['defaultProfile'] = 'B'
+        self.nightscout.put_entry(profile, entity='profile')
+        self.assertEqual(self.nightscout.current_profile()['defaultProfile'], 'B')
+
+    def test_status(self):
+        self.assertEqual(self.nightscout.api_status()['status'], 'ok')
+
+    def test_unauthorized(self):
+        with self.assertRaises(ApiException) as e:
+            NightscoutApi(self.server.url, 'wrong').upload_entry({'eventType': 'Note'})
+        self.assertEqual(e.exception.status_code, 401)
+
+    def test_failure_injection(self):
+        self.server.rate_limit_rate = 1
+        with self.assertRaises(ApiException) as e:
+            self.nightscout.upload_entry({'eventType': 'Note'})
+        self.assertEqual(e.exception.status_code, 429)
+
+        self.server.rate_limit_rate = 0
+        self.server.error_rate = 1
+        with self.assertRaises(ApiException) as e:
+            self.nightscout.upload_entry({'eventType': 'Note'})
+        self.assertEqual(e.exception.status_code, 500)
+        self.assertEqual(self.server.stats['500'], 1)
+        self.assertEqual(self.server.stats['429'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+
+import unittest
+import tempfile
+import collections
+import arrow
+
+from unittest.mock import patch
+
+from tconnectsync.api import TConnectApi
+from tconnectsync.api.common import ApiException
+from tconnectsync.eventparser import events as eventtypes
+from tconnectsync.eventparser.synthetic import SyntheticPumpHistory
+from tconnectsync.standin.tandemsource import TandemSourceStandin, write_synthetic_fixtures, SYNTHETIC_DEVICE_ID
+
+@patch('tconnectsync.api.tandemsource.CACHE_CREDENTIALS', False)
+class TestTandemSourceStandin(unittest.TestCase):
+    def setUp(self):
+        self.history = SyntheticPumpHistory(seed=1)
+
+    def test_login_and_metadata_from_synthetic(self):
+        now = arrow.get('2024-02-01T12:00:00', tzinfo='America/New_York')
+        with TandemSourceStandin(synthetic=self.history, synthetic_start='2024-01-01', now=lambda: now):
+            api = TConnectApi('email@email.com', 'password').tandemsource
+            self.assertEqual(api.pumperId, 'standin-pumper')
+
+            metadata = api.pump_event_metadata()
+            self.assertEqual(len(metadata), 1)
+            self.assertEqual(metadata[0]['tconnectDeviceId'], SYNTHETIC_DEVICE_ID)
+            self.assertEqual(metadata[0]['maxDateWithEvents'], '2024-02-01T12:00:00')
+
+            events = list(api.pump_events(SYNTHETIC_DEVICE_ID, '2024-02-01', '2024-02-01'))
+            self.assertTrue(events)
+            self.assertLessEqual(max(e.eventTimestamp for e in events), now)
+
+            self.assertEqual(list(api.pump_events(SYNTHETIC_DEVICE_ID, '2023-12-01', '2023-12-31')), [])
+
+    def test_event_ids_and_dates_from_fixtures(self):
+        with tempfile.TemporaryDirectory() as d:
+            write_synthetic_fixtures(d, self.history, '2024-01-01', '2024-01-05')
+
+            with TandemSourceStandin(directory=d) as standin:
+                api = TConnectApi('email@email.com', 'password').tandemsource
+                self.assertEqual(api.pump_event_metadata()[0]['minDateWithEvents'], '2024-01-01T00:00:00')
+
+                events = list(api.pump_events(SYNTHETIC_DEVICE_ID, '2024-01-02', '2024-01-03'))
+                days = set(str(e.eventTimestamp.date()) for e in events)
+                self.assertEqual(days, {'2024-01-02', '2024-01-03'})
+
+                raw = api.pump_events_raw(SYNTHETIC_DEVICE_ID, '2024-01-02', '2024-01-03', event_ids_filter=[eventtypes.LidBolusCompleted.ID])
+                from tconnectsync.eventparser.generic import Events, decode_raw_events
+                types = collections.Counter(type(e) for e in Events(decode_raw_events(raw)))
+                self.assertEqual(list(types.keys()), [eventtypes.LidBolusCompleted])
+
+    def test_error_injection(self):
+        with TandemSourceStandin(synthetic=self.history, error_rate=1) as standin:
+            api = TConnectApi('email@email.com', 'password').tandemsource
+            with self.assertRaises(ApiException) as e:
+                api.pump_event_metadata()
+            self.assertEqual(e.exception.status_code, 500)
+            # TandemSourceApi retries once on HTTP 500
+            self.assertEqual(standin.stats['500'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+
+import unittest
+import arrow
+
+from unittest.mock import patch
+
+from tconnectsync.api import TConnectApi
+from tconnectsync.eventparser import events as eventtypes
+from tconnectsync.eventparser.generic import decode_columns, decode_raw_events
+from tconnectsync.eventparser.raw_event import TANDEM_EPOCH
+from tconnectsync.eventparser.synthetic import SyntheticPumpHistory
+from tconnectsync.standin.tandemsource import TandemSourceStandin, SYNTHETIC_DEVICE_ID
+
+try:
+    import numpy
+    from tconnectsync.sync.tandemsource.analytics import Analytics, local_seconds
+except ImportError:
+    numpy = None
+
+START = '2024-01-02T06:00:00'
+END = '2024-01-05T00:00:00'
+
+def event_seconds(event):
+    return TANDEM_EPOCH + event.raw.timestampRaw
+
+def state_seconds(events, start, end):
+    # Seconds spent in each state, given (time, state) changes sorted by time
+    seconds = {}
+    for (t, state), (t_next, _) in zip(events, events[1:] + [(end, None)]):
+        t, t_next = max(t, start), min(t_next, end)
+        if t_next > t:
+            seconds[state] = seconds.get(state, 0) + t_next - t
+    return seconds
+
+@unittest.skipIf(numpy is None, 'numpy is not installed')
+class TestAnalytics(unittest.TestCase):
+    def setUp(self):
+        history = SyntheticPumpHistory(seed=7)
+        raw = decode_raw_events(history.pump_events_raw('2024-01-01', '2024-01-05'))
+        self.events = sorted(history.pump_events('2024-01-01', '2024-01-05'), key=lambda e: (event_seconds(e), e.seqNum))
+        self.analytics = Analytics(decode_columns(raw))
+        self.start, self.end = local_seconds(START), local_seconds(END)
+
+    def of_type(self, *types):
+        return [e for e in self.events if type(e) in types]
+
+    def test_summary_matches_events(self):
+        summary = self.analytics.summary(START, END)
+
+        readings = [e.currentglucosedisplayvalue for e in self.of_type(eventtypes.LidCgmDataGxb) if self.start <= TANDEM_EPOCH + e.egvTimestamp < self.end]
+        self.assertEqual(summary['cgmReadings'], len(readings))
+        self.assertEqual(summary['averageReading'], round(sum(readings) / len(readings)))
+        self.assertEqual(summary['timeInRange']['inRange'], round(100 * len([r for r in readings if 70 <= r <= 180]) / len(readings), 1))
+        self.assertEqual(summary['totalDays'], 2.75)
+
+        basal = state_seconds([(event_seconds(e), e.commandedRate) for e in self.of_type(eventtypes.LidBasalDelivery)], self.start, self.end)
+        self.assertAlmostEqual(summary['basalUnits'], sum(rate / 1000 * s / 3600 for rate, s in basal.items()), places=2)
+
+        bolus = sum(e.insulindelivered for e in self.of_type(eventtypes.LidBolusCompleted) if self.start <= event_seconds(e) < self.end)
+        self.assertAlmostEqual(summary['bolusUnits'], bolus, places=2)
+        self.assertAlmostEqual(summary['averageTotalDailyDose'], (summary['basalUnits'] + summary['bolusUnits']) / 2.75, places=1)
+
+        suspended = state_seconds([(event_seconds(e), type(e) == eventtypes.LidPumpingSuspended) for e in self.of_type(eventtypes.LidPumpingSuspended, eventtypes.LidPumpingResumed)], self.start, self.end)
+        self.assertEqual(summary['suspensionMinutes'], round(suspended.get(True, 0) / 60))
+
+        modes = state_seconds([(event_seconds(e), e.currentusermodeRaw) for e in self.of_type(eventtypes.LidAaUserModeChange)], self.start, self.end)
+        self.assertEqual(summary['averageDailySleepMinutes'], round(modes.get(1, 0) / 60 / 2.75))
+
+    def test_daily_sums_to_summary(self):
+        daily = self.analytics.daily(START, END)
+        summary = self.analytics.summary(START, END)
+
+        self.assertEqual([str(d) for d in daily['date']], ['2024-01-02', '2024-01-03', '2024-01-04'])
+        self.assertEqual(list(daily['minutes']), [18 * 60, 24 * 60, 24 * 60])
+        self.assertAlmostEqual(daily['basalUnits'].sum(), summary['basalUnits'], places=2)
+        self.assertEqual(daily['cgmReadings'].sum(), summary['cgmReadings'])
+
+        # A later range is answered from the same decoded events
+        self.assertEqual(self.analytics.summary('2024-01-04', '2024-01-05')['basalUnits'], round(daily['basalUnits'][2], 2))
+
+    def test_empty(self):
+        summary = Analytics({}).summary(START, END)
+        self.assertIsNone(summary['averageReading'])
+        self.assertEqual(summary['cgmInactivePercent'], 100.0)
+        self.assertEqual(summary['basalUnits'], 0)
+
+    @patch('tconnectsync.api.tandemsource.CACHE_CREDENTIALS', False)
+    def test_fetch(self):
+        standin = TandemSourceStandin(synthetic=SyntheticPumpHistory(seed=7), synthetic_start='2024-01-01').install()
+        try:
+            analytics = Analytics.fetch(TConnectApi('email@email.com', 'password'), SYNTHETIC_DEVICE_ID, START, END)
+        finally:
+            standin.uninstall()
+        self.assertEqual(analytics.summary(START, END), self.analytics.summary(START, END))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+
+import os
+import json
+import shutil
+import tempfile
+import unittest
+
+from unittest.mock import patch
+
+from tconnectsync.api import TConnectApi
+from tconnectsync.eventparser.synthetic import SyntheticPumpHistory
+from tconnectsync.standin.tandemsource import TandemSourceStandin, SYNTHETIC_DEVICE_ID
+from tconnectsync.sync.tandemsource.export import Export, pyarrow_available
+
+@patch('tconnectsync.api.tandemsource.CACHE_CREDENTIALS', False)
+class TestExport(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.standin = TandemSourceStandin(synthetic=SyntheticPumpHistory(seed=5), synthetic_start='2024-01-01').install()
+        self.tconnect = TConnectApi('email@email.com', 'password')
+        self.device = {'tconnectDeviceId': SYNTHETIC_DEVICE_ID, 'maxDateWithEvents': None}
+
+    def tearDown(self):
+        self.standin.uninstall()
+        shutil.rmtree(self.directory)
+
+    def expected(self):
+        events = self.tconnect.tandemsource.pump_events(SYNTHETIC_DEVICE_ID, '2024-01-02', '2024-01-03', fetch_all_event_types=True)
+        by_type = {}
+        for e in events:
+            by_type.setdefault(type(e).__name__, []).append(e)
+        return by_type
+
+    def test_ndjson(self):
+        counts = Export(self.tconnect, self.device, self.directory, format='ndjson').process('2024-01-02', '2024-01-03')
+        expected = self.expected()
+
+        self.assertEqual(counts, {k: len(v) for k, v in expected.items()})
+        self.assertEqual(sorted(os.listdir(self.directory)), sorted(k + '.ndjson' for k in expected))
+        with open(os.path.join(self.directory, 'LidBolusCompleted.ndjson')) as f:
+            rows = [json.loads(line) for line in f]
+        self.assertEqual(rows, [e.todict() for e in expected['LidBolusCompleted']])
+
+    @unittest.skipIf(pyarrow_available(), 'pyarrow is installed')
+    def test_falls_back_to_ndjson(self):
+        self.assertEqual(Export(self.tconnect, self.device, self.directory, format='parquet').format, 'ndjson')
+
+    @unittest.skipUnless(pyarrow_available(), 'pyarrow is not installed')
+    def test_parquet(self):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        Export(self.tconnect, self.device, self.directory, format='parquet').process('2024-01-02', '2024-01-03')
+        expected = self.expected()['LidBolusCompleted']
+
+        table = pq.read_table(os.path.join(self.directory, 'LidBolusCompleted.parquet'))
+        self.assertEqual(table.schema.field('bolusid').type, pa.uint16())
+        self.assertEqual(table.schema.field('insulindelivered').type, pa.float32())
+        self.assertEqual(table.column('seqNum').to_pylist(), [e.seqNum for e in expected])
+        self.assertEqual(table.column('eventTimestamp').to_pylist(), [e.eventTimestamp.naive for e in expected])
+
+
+if __name__ == '__main__':
+    unittest.main()
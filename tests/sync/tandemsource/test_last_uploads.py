@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+
+import unittest
+
+from tconnectsync.nightscout import NightscoutApi
+from tconnectsync.parser.nightscout import NightscoutEntry, BASAL_EVENTTYPE, BOLUS_EVENTTYPE, ALARM_EVENTTYPE
+from tconnectsync.standin.nightscout import NightscoutStandinServer
+from tconnectsync.sync.tandemsource.last_uploads import LastUploads
+
+class TestLastUploads(unittest.TestCase):
+    def setUp(self):
+        self.server = NightscoutStandinServer().start()
+        self.nightscout = NightscoutApi(self.server.url, 'secret')
+
+        for created_at in ['2024-11-17 08:00:00-05:00', '2024-11-17 08:10:00-05:00', '2024-11-18 08:00:00-05:00']:
+            self.nightscout.upload_entry(NightscoutEntry.basal(1.0, 5, created_at, pump_event_id='1'))
+        self.nightscout.upload_entry(NightscoutEntry.bolus(2.0, 10, '2024-11-17 09:00:00-05:00'))
+        self.nightscout.upload_entry(dict(NightscoutEntry.bolus(5.0, 10, '2024-11-17 10:00:00-05:00'), enteredBy='someone else'))
+
+        self.last_uploads = LastUploads(self.nightscout).discover('2024-11-16T00:00:00-05:00', '2024-11-19T00:00:00-05:00')
+        self.server.stats.clear()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_answered_locally(self):
+        latest = self.last_uploads.last_uploaded_entry(BASAL_EVENTTYPE, time_start='2024-11-16T00:00:00-05:00', time_end='2024-11-18T12:00:00-05:00')
+        self.assertEqual(latest['created_at'], '2024-11-18 08:00:00-05:00')
+        self.assertIn('_id', latest)
+
+        latest = self.last_uploads.last_uploaded_entry(BASAL_EVENTTYPE, time_start='2024-11-17T00:00:00-05:00', time_end='2024-11-17T23:59:59-05:00')
+        self.assertEqual(latest['created_at'], '2024-11-17 08:10:00-05:00')
+
+        latest = self.last_uploads.last_uploaded_entry(BOLUS_EVENTTYPE, time_start='2024-11-17T00:00:00-05:00', time_end='2024-11-17T23:59:59-05:00')
+        self.assertEqual(latest['insulin'], 2.0)
+
+        self.assertIsNone(self.last_uploads.last_uploaded_entry(ALARM_EVENTTYPE, time_start='2024-11-17T00:00:00-05:00', time_end='2024-11-17T23:59:59-05:00'))
+        self.assertEqual(dict(self.server.stats), {})
+
+    def test_outside_window_queries_nightscout(self):
+        latest = self.last_uploads.last_uploaded_entry(BASAL_EVENTTYPE)
+        self.assertEqual(latest['created_at'], '2024-11-18 08:00:00-05:00')
+        self.assertEqual(self.server.stats['GET treatments'], 1)
+
+    def test_written_event_type_queries_nightscout(self):
+        self.last_uploads.upload_entry(NightscoutEntry.basal(1.0, 5, '2024-11-18 09:00:00-05:00', pump_event_id='2'))
+        latest = self.last_uploads.last_uploaded_entry(BASAL_EVENTTYPE, time_start='2024-11-16T00:00:00-05:00', time_end='2024-11-18T12:00:00-05:00')
+        self.assertEqual(latest['created_at'], '2024-11-18 09:00:00-05:00')
+        self.assertEqual(self.server.stats['GET treatments'], 1)
+
+        # Other event types are still answered locally
+        self.last_uploads.last_uploaded_entry(BOLUS_EVENTTYPE, time_start='2024-11-16T00:00:00-05:00', time_end='2024-11-18T12:00:00-05:00')
+        self.assertEqual(self.server.stats['GET treatments'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+
+import unittest
+import threading
+import arrow
+
+from unittest.mock import patch
+
+from tconnectsync.api import TConnectApi
+from tconnectsync.nightscout import NightscoutApi
+from tconnectsync.features import BASAL, BOLUS, BOLUS_BG, CGM, PUMP_EVENTS
+from tconnectsync.eventparser.synthetic import SyntheticPumpHistory
+from tconnectsync.standin.nightscout import NightscoutStandinServer
+from tconnectsync.standin.tandemsource import TandemSourceStandin, SYNTHETIC_DEVICE_ID
+from tconnectsync.sync.tandemsource.process import ProcessTimeRange
+from tconnectsync.sync.cgm import CgmIndex
+from tests.secrets import build_secrets
+
+@patch('tconnectsync.api.tandemsource.CACHE_CREDENTIALS', False)
+class TestProcessTimeRange(unittest.TestCase):
+    features = [BASAL, BOLUS, CGM]
+
+    def setUp(self):
+        self.server = NightscoutStandinServer().start()
+        self.nightscout = NightscoutApi(self.server.url, 'secret')
+        self.secret = build_secrets(UPLOADED_INDEX=False, FETCH_ALL_EVENT_TYPES=False)
+        self.standin = TandemSourceStandin(synthetic=SyntheticPumpHistory(seed=5), synthetic_start='2024-01-01').install()
+        self.tconnect = TConnectApi('email@email.com', 'password')
+
+    def tearDown(self):
+        self.standin.uninstall()
+        self.server.stop()
+
+    def process(self, shard_days, time_start='2024-01-02', time_end='2024-01-03', features=None):
+        ptr = ProcessTimeRange(self.tconnect, self.nightscout, {'tconnectDeviceId': SYNTHETIC_DEVICE_ID, 'maxDateWithEvents': None}, False, self.secret, features=features or self.features)
+        ptr.SHARD_DAYS = shard_days
+        return ptr.process(arrow.get(time_start), arrow.get(time_end))
+
+    def uploaded(self):
+        store = self.server.store.collections
+        boluses = sorted((d['created_at'], d['insulin']) for d in store['treatments'] if d['eventType'] == 'Combo Bolus')
+        readings = sorted(d['pump_event_id'] for d in store['entries'])
+        basals = sorted((d['created_at'], d['duration'], d['absolute']) for d in store['treatments'] if d['eventType'] == 'Temp Basal')
+        user_modes = sorted((d['created_at'], d['eventType'], d['duration'], d['reason']) for d in store['treatments'] if d['eventType'] in ('Sleep', 'Exercise'))
+        return boluses, readings, basals, user_modes
+
+    def test_shards(self):
+        ptr = ProcessTimeRange(self.tconnect, self.nightscout, {'tconnectDeviceId': 'x', 'maxDateWithEvents': None}, False, self.secret)
+        ptr.SHARD_DAYS = 2
+        self.assertEqual([(str(a), str(b)) for a, b in ptr.shards(arrow.get('2024-01-01T10:00'), arrow.get('2024-01-05T01:00'))], [
+            ('2024-01-01', '2024-01-02'),
+            ('2024-01-03', '2024-01-04'),
+            ('2024-01-05', '2024-01-05'),
+        ])
+
+    def test_sharded_matches_single_fetch(self):
+        added, last_seqnum = self.process(shard_days=10)
+        single = self.uploaded()
+        self.assertGreater(added, 0)
+
+        self.server.store.reset()
+        added_sharded, last_seqnum_sharded = self.process(shard_days=1)
+        sharded = self.uploaded()
+
+        self.assertEqual(last_seqnum, last_seqnum_sharded)
+        self.assertEqual(single[0], sharded[0])
+        self.assertEqual(single[1], sharded[1])
+        self.assertEqual(single[2], sharded[2])
+
+    def test_sharded_matches_single_fetch_user_mode(self):
+        self.features = [BASAL, PUMP_EVENTS]
+        self.process(shard_days=10)
+        single = self.uploaded()
+        # A sleep period starts on the first day and ends on the next
+        self.assertTrue(any(created_at.startswith('2024-01-02') and 'Not Ended' not in reason for created_at, event_type, _, reason in single[3] if event_type == 'Sleep'))
+
+        self.server.store.reset()
+        self.process(shard_days=1)
+        sharded = self.uploaded()
+
+        self.assertEqual(single[2], sharded[2])
+        self.assertEqual(single[3], sharded[3])
+
+    def test_bolus_completed_in_next_shard(self):
+        bolus = ProcessTimeRange.event_classes['BOLUS'](self.tconnect, self.nightscout, SYNTHETIC_DEVICE_ID, False, [BOLUS])
+
+        # The last bolus of the day has its request events in one shard and its completion in the next
+        events = list(self.tconnect.tandemsource.pump_events(SYNTHETIC_DEVICE_ID, '2024-01-02', '2024-01-02'))
+        bolus_events = [e for e in events if type(e).__name__.startswith('LidBolus')]
+        completed = [e for e in bolus_events if type(e).__name__ == 'LidBolusCompleted']
+        last = completed[-1]
+        requested = [e for e in bolus_events if e.bolusid == last.bolusid and e is not last]
+        self.assertTrue(requested)
+
+        time_end = requested[-1].eventTimestamp
+        carried = bolus.carry_over([e for e in bolus_events if e is not last], time_end)
+        self.assertEqual(set(e.bolusid for e in carried), {last.bolusid})
+
+        self.nightscout.last_uploaded_entry = lambda *args, **kwargs: None
+        entries = bolus.process(carried + [last], time_end, last.eventTimestamp)
+        self.assertEqual(len(entries), 1)
+        self.assertEqual(entries[0]['pump_event_id'], ','.join(str(e.seqNum) for e in [last] + requested))
+
+    def test_fetch_overlaps_processing_and_is_bounded(self):
+        fetched = []
+        max_ahead = []
+        pump_events_raw = self.tconnect.tandemsource.pump_events_raw
+        def recording_pump_events_raw(*args, **kwargs):
+            fetched.append(args[1])
+            return pump_events_raw(*args, **kwargs)
+        self.tconnect.tandemsource.pump_events_raw = recording_pump_events_raw
+
+        upload_entry = self.nightscout.upload_entry
+        def recording_upload_entry(*args, **kwargs):
+            max_ahead.append(len(fetched))
+            return upload_entry(*args, **kwargs)
+        self.nightscout.upload_entry = recording_upload_entry
+
+        self.process(shard_days=1, time_start='2024-01-02', time_end='2024-01-08', features=[BOLUS])
+        self.assertEqual(len(fetched), 7)
+        # While the first shard is uploaded, at most QUEUE_SIZE further shards plus one in flight have been fetched
+        self.assertLessEqual(max_ahead[0], 1 + ProcessTimeRange.QUEUE_SIZE + 1)
+
+    @patch('tconnectsync.sync.tandemsource.process_basal.COALESCE_BASAL', True)
+    def test_discovers_last_uploads_once(self):
+        self.features = [BASAL, BOLUS, CGM, PUMP_EVENTS]
+        self.process(shard_days=10)
+        first = self.uploaded()
+
+        # A second sync over the same range finds everything already uploaded, and
+        # only updates the open-ended last basal entry
+        self.server.stats.clear()
+        added, _ = self.process(shard_days=10)
+        self.assertEqual(added, 1)
+        self.assertEqual(self.uploaded(), first)
+        with_discovery = self.server.stats['GET treatments']
+
+        self.secret.DISCOVER_LAST_UPLOADS = False
+        self.server.stats.clear()
+        added, _ = self.process(shard_days=10)
+        self.assertEqual(added, 1)
+        self.assertEqual(self.uploaded(), first)
+        self.assertLess(with_discovery, self.server.stats['GET treatments'])
+        self.assertLessEqual(with_discovery, 2)
+
+    def record_uploads(self):
+        uploads = []
+        upload_entry = self.nightscout.upload_entry
+        def recording_upload_entry(entry, entity='treatments'):
+            uploads.append(entry.get('eventType') or entity)
+            return upload_entry(entry, entity=entity)
+        self.nightscout.upload_entry = recording_upload_entry
+        return uploads
+
+    def test_upload_priority(self):
+        uploads = self.record_uploads()
+        self.process(shard_days=10, time_start='2024-01-02', time_end='2024-01-02')
+
+        # Boluses and CGM readings are uploaded before any basal
+        first_basal = uploads.index('Temp Basal')
+        self.assertEqual(uploads[0], 'Combo Bolus')
+        self.assertNotIn('Combo Bolus', uploads[first_basal:])
+        self.assertNotIn('entries', uploads[first_basal:])
+
+    def test_upload_priority_configured(self):
+        self.secret.UPLOAD_PRIORITY = 'basal, unknown'
+        uploads = self.record_uploads()
+        self.process(shard_days=10, time_start='2024-01-02', time_end='2024-01-02')
+        self.assertEqual(uploads[0], 'Temp Basal')
+        self.assertNotIn('Temp Basal', uploads[uploads.index('Combo Bolus'):])
+
+    def test_bolus_bg_type(self):
+        def boluses():
+            return [d for d in self.server.store.collections['treatments'] if d['eventType'] == 'Combo Bolus']
+
+        self.process(shard_days=1, features=[BOLUS])
+        self.assertTrue(all('glucose' in d and 'glucoseType' not in d for d in boluses()))
+
+        self.server.store.reset()
+        self.process(shard_days=1, features=[BOLUS, BOLUS_BG])
+        # The synthetic meal boluses use the latest CGM reading as their BG
+        types = [d['glucoseType'] for d in boluses()]
+        self.assertTrue(types)
+        self.assertEqual(set(types), {'Sensor'})
+
+        bolus = ProcessTimeRange.event_classes['BOLUS'](self.tconnect, self.nightscout, SYNTHETIC_DEVICE_ID, False, [BOLUS, BOLUS_BG])
+        bolus.cgm_index = CgmIndex()
+        request = next(e for e in self.standin.synthetic.pump_events('2024-01-02', '2024-01-02') if type(e).__name__ == 'LidBolusRequestedMsg1')
+        self.assertEqual(bolus.bg_type_for(request), 'Finger')
+
+    def test_bolus_bg_type_sharded_matches_single_fetch(self):
+        def bg_types():
+            return sorted((d['created_at'], d['glucoseType']) for d in self.server.store.collections['treatments'] if d['eventType'] == 'Combo Bolus')
+
+        self.process(shard_days=10, time_end='2024-01-05', features=[BOLUS, BOLUS_BG])
+        single = bg_types()
+        self.assertTrue(single)
+
+        self.server.store.reset()
+        trimmed = []
+        trim = CgmIndex.trim
+        def tracking_trim(index, timestamp):
+            trim(index, timestamp)
+            trimmed.append(len(index))
+        with patch.object(CgmIndex, 'trim', tracking_trim):
+            self.process(shard_days=1, time_end='2024-01-05', features=[BOLUS, BOLUS_BG])
+        self.assertEqual(single, bg_types())
+        # After each shard, only about the last hour of readings is kept
+        self.assertTrue(trimmed)
+        self.assertTrue(all(n <= 20 for n in trimmed))
+
+    def test_fetch_error_raised(self):
+        def failing_pump_events_raw(*args, **kwargs):
+            raise ValueError('fetch failed')
+        self.tconnect.tandemsource.pump_events_raw = failing_pump_events_raw
+
+        with self.assertRaises(ValueError):
+            self.process(shard_days=1)
+        self.assertNotIn('ProcessTimeRange-fetch', [t.name for t in threading.enumerate()])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+
+import unittest
+import arrow
+
+from unittest.mock import patch
+
+from tconnectsync.sync.tandemsource.process_basal import ProcessBasal, coalesce_basal_entries, extend_last_upload
+from tconnectsync.eventparser import events as eventtypes
+from tconnectsync.eventparser.generic import EVENT_LEN
+from tconnectsync.eventparser.raw_event import RawEvent
+from tconnectsync.parser.nightscout import NightscoutEntry
+
+from ...api.fake import TConnectApi
+from ...nightscout_fake import NightscoutApi
+
+Source = eventtypes.LidBasalDelivery.CommandedratesourceEnum
+
+def delivery(minute, milliunits, source=Source.Algorithm, seqnum=None):
+    # 2024-01-01 00:00 pump time
+    raw = RawEvent(source=0, id=eventtypes.LidBasalDelivery.ID, timestampRaw=504921600 + minute * 60, seqNum=seqnum or 1000 + minute, raw=bytearray(EVENT_LEN))
+    return eventtypes.LidBasalDelivery(raw=raw, commandedRateSourceRaw=source.value, commandedRate=milliunits, profileBasalRate=milliunits, algorithmRate=milliunits, tempRate=0)
+
+
+@patch('tconnectsync.sync.tandemsource.process_basal.COALESCE_BASAL', True)
+class TestProcessBasal(unittest.TestCase):
+    maxDiff = None
+
+    def setUp(self):
+        self.tconnect = TConnectApi()
+        self.nightscout = NightscoutApi()
+        self.process = ProcessBasal(self.tconnect, self.nightscout, 'abcdef', pretend=False)
+
+    def run_process(self, events, end_minute, last_upload=None):
+        self.nightscout.last_uploaded_entry = lambda *args, **kwargs: last_upload
+        time_end = delivery(0, 0).eventTimestamp.shift(minutes=end_minute)
+        return self.process.process(events, time_start=None, time_end=time_end)
+
+    def test_coalesces_equal_rates(self):
+        events = [delivery(0, 800), delivery(5, 800), delivery(10, 800), delivery(15, 1000), delivery(20, 1000), delivery(25, 800)]
+        entries = self.run_process(events, end_minute=30)
+
+        self.assertEqual([(e['absolute'], e['duration'], e['pump_event_id']) for e in entries], [
+            (0.8, 15, '1000'),
+            (1.0, 10, '1015'),
+            (0.8, 5, '1025'),
+        ])
+        self.assertEqual(entries[0]['created_at'], arrow.get(events[0].eventTimestamp).format())
+
+    def test_different_source_not_coalesced(self):
+        events = [delivery(0, 800, Source.Algorithm), delivery(5, 800, Source.Profile)]
+        entries = self.run_process(events, end_minute=10)
+        self.assertEqual(len(entries), 2)
+
+    def test_disabled(self):
+        events = [delivery(0, 800), delivery(5, 800), delivery(10, 800)]
+        with patch('tconnectsync.sync.tandemsource.process_basal.COALESCE_BASAL', False):
+            self.assertEqual(len(self.run_process(events, end_minute=15)), 3)
+
+    def test_extends_open_ended_last_upload(self):
+        first = self.run_process([delivery(0, 800), delivery(5, 800)], end_minute=7)
+        self.assertEqual(len(first), 1)
+        self.assertEqual(first[0]['duration'], 7)
+
+        last_upload = dict(first[0], _id='abc123')
+        second = self.run_process([delivery(0, 800), delivery(5, 800), delivery(10, 800), delivery(15, 600)], end_minute=20, last_upload=last_upload)
+
+        self.assertEqual([(e.get('_id'), e['absolute'], e['duration'], e['pump_event_id']) for e in second], [
+            ('abc123', 0.8, 15, '1000'),
+            (None, 0.6, 5, '1015'),
+        ])
+
+        self.assertEqual(self.process.write(second), 2)
+        self.assertEqual(self.nightscout.put_entries['treatments'], [second[0]])
+        self.assertEqual(self.nightscout.uploaded_entries['treatments'], [second[1]])
+
+    def test_new_rate_after_last_upload_not_extended(self):
+        last_upload = dict(NightscoutEntry.basal(0.8, 7, '2024-01-01 00:00:00-05:00', reason='Algorithm', pump_event_id='1000'), _id='abc123')
+        entries = [NightscoutEntry.basal(0.6, 5, '2024-01-01 00:10:00-05:00', reason='Algorithm', pump_event_id='1010')]
+        self.assertEqual(extend_last_upload(last_upload, entries), entries)
+
+    def test_last_upload_not_extended_across_gap(self):
+        last_upload = dict(NightscoutEntry.basal(0.8, 7, '2024-01-01 00:00:00-05:00', reason='Algorithm', pump_event_id='1000'), _id='abc123')
+        contiguous = [NightscoutEntry.basal(0.8, 5, '2024-01-01 00:07:00-05:00', reason='Algorithm', pump_event_id='1007')]
+        self.assertEqual([(e.get('_id'), e['duration']) for e in extend_last_upload(last_upload, contiguous)], [('abc123', 12)])
+
+        after_gap = [NightscoutEntry.basal(0.8, 5, '2024-01-01 02:00:00-05:00', reason='Algorithm', pump_event_id='1120')]
+        self.assertEqual(extend_last_upload(last_upload, after_gap), after_gap)
+
+    def test_gap_not_coalesced(self):
+        entries = coalesce_basal_entries([
+            NightscoutEntry.basal(0.8, 5, '2024-01-01 00:00:00-05:00', reason='Algorithm', pump_event_id='1'),
+            NightscoutEntry.basal(0.8, 5, '2024-01-01 00:10:00-05:00', reason='Algorithm', pump_event_id='2'),
+        ])
+        self.assertEqual(len(entries), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
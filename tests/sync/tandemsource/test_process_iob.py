@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+
+import unittest
+import arrow
+
+from unittest.mock import patch
+
+from tconnectsync.api import TConnectApi
+from tconnectsync.nightscout import NightscoutApi
+from tconnectsync.features import IOB
+from tconnectsync.eventparser import events as eventtypes
+from tconnectsync.eventparser.generic import EVENT_LEN
+from tconnectsync.eventparser.raw_event import RawEvent
+from tconnectsync.eventparser.synthetic import SyntheticPumpHistory
+from tconnectsync.parser.nightscout import IOB_ACTIVITYTYPE
+from tconnectsync.standin.nightscout import NightscoutStandinServer
+from tconnectsync.standin.tandemsource import TandemSourceStandin, SYNTHETIC_DEVICE_ID
+from tconnectsync.sync.tandemsource.process import ProcessTimeRange
+from tconnectsync.sync.tandemsource.process_iob import ProcessIOB, insulin_remaining, insulin_duration_for, DEFAULT_INSULIN_DURATION
+from tests.secrets import build_secrets
+
+# 2024-01-01 00:00:00 pump time
+BASE_TIMESTAMP_RAW = 504921600
+
+def raw_event(cls, minutes, seqNum):
+    return RawEvent(source=0, id=cls.ID, timestampRaw=BASE_TIMESTAMP_RAW + minutes * 60, seqNum=seqNum, raw=bytearray(EVENT_LEN))
+
+def bolus(minutes, units, seqNum=1):
+    return eventtypes.LidBolusCompleted(raw=raw_event(eventtypes.LidBolusCompleted, minutes, seqNum), completionstatusRaw=3, bolusid=seqNum, insulindelivered=units, insulinrequested=units, IOB=0)
+
+def basal(minutes, commanded, profile, seqNum=1):
+    return eventtypes.LidBasalDelivery(raw=raw_event(eventtypes.LidBasalDelivery, minutes, seqNum), commandedRateSourceRaw=3, commandedRate=commanded, profileBasalRate=profile, algorithmRate=commanded, tempRate=0)
+
+class TestInsulinRemaining(unittest.TestCase):
+    def test_curve(self):
+        self.assertEqual(insulin_remaining(0, 300), 1.0)
+        self.assertEqual(insulin_remaining(300, 300), 0.0)
+        self.assertAlmostEqual(insulin_remaining(299.9, 300), 0.0, places=3)
+
+        remaining = [insulin_remaining(m, 300) for m in range(0, 301, 5)]
+        self.assertEqual(remaining, sorted(remaining, reverse=True))
+
+        # A shorter insulin duration acts faster
+        self.assertLess(insulin_remaining(60, 180), insulin_remaining(60, 300))
+
+    def test_insulin_duration_for(self):
+        self.assertEqual(insulin_duration_for({'lastUpload': '2024-01-01T00:00:00'}), DEFAULT_INSULIN_DURATION)
+        self.assertEqual(insulin_duration_for({'lastUpload': {'settings': {
+            'profiles': {'activeIdp': 2, 'profile': [
+                {'name': 'A', 'idp': 1, 'tDependentSegs': [], 'insulinDuration': 300, 'carbEntry': 1, 'maxBolus': 10000},
+                {'name': 'B', 'idp': 2, 'tDependentSegs': [], 'insulinDuration': 240, 'carbEntry': 1, 'maxBolus': 10000},
+            ]},
+            'cgmSettings': {
+                'highGlucoseAlert': {'mgPerDl': 200, 'enabled': 1, 'duration': 60, 'status': 0},
+                'lowGlucoseAlert': {'mgPerDl': 80, 'enabled': 1, 'duration': 15, 'status': 0},
+            },
+        }}}), 240)
+
+class TestProcessIOB(unittest.TestCase):
+    def setUp(self):
+        self.process = ProcessIOB(None, None, 'abcdef', pretend=True, features=[IOB], insulin_duration=300)
+
+    def test_bolus_iob(self):
+        self.process.add([bolus(0, 2.0, 1), bolus(120, 1.0, 2), basal(180, 800, 800, 3)])
+
+        p = self.process.process(None, None)
+        self.assertEqual(p[0]['time'], arrow.get('2024-01-01T03:00:00').replace(tzinfo=self.process.latest.tzinfo).format())
+        self.assertAlmostEqual(p[0]['iob'], 2.0 * insulin_remaining(180, 300) + 1.0 * insulin_remaining(60, 300), places=2)
+        self.assertEqual(p[0]['basaliob'], 0)
+
+    def test_expired_events_dropped(self):
+        self.process.add([bolus(0, 2.0, 1), basal(0, 0, 800, 2)])
+        self.process.add([basal(400, 800, 800, 3), bolus(401, 1.0, 4)])
+
+        self.assertEqual([e.seqNum for e in self.process.boluses], [4])
+        self.assertEqual(self.process.process(None, None)[0]['iob'], 1.0)
+
+    def test_basal_iob(self):
+        # One hour of suspended basal, then one hour at twice the profile rate:
+        # more of the later extra unit than of the earlier missed unit remains
+        self.process.add([basal(0, 0, 1000, 1), basal(60, 2000, 1000, 2), basal(120, 1000, 1000, 3)])
+        p = self.process.process(None, None)
+        self.assertGreater(p[0]['basaliob'], 0)
+        self.assertLess(p[0]['basaliob'], 1)
+
+        # After hours of suspended basal, basal IOB is negative
+        self.process.add([basal(180, 0, 1000, 4), basal(500, 0, 1000, 5)])
+        self.assertEqual([e.seqNum for e in self.process.basals], [4, 5])
+        self.assertLess(self.process.process(None, None)[0]['basaliob'], -1)
+
+    def test_disabled(self):
+        self.assertFalse(ProcessIOB(None, None, 'abcdef', pretend=True, features=[]).enabled())
+
+@patch('tconnectsync.api.tandemsource.CACHE_CREDENTIALS', False)
+class TestProcessTimeRangeIOB(unittest.TestCase):
+    def setUp(self):
+        self.server = NightscoutStandinServer().start()
+        self.nightscout = NightscoutApi(self.server.url, 'secret')
+        self.secret = build_secrets(UPLOADED_INDEX=False, FETCH_ALL_EVENT_TYPES=False)
+        self.standin = TandemSourceStandin(synthetic=SyntheticPumpHistory(seed=5), synthetic_start='2024-01-01').install()
+        self.tconnect = TConnectApi('email@email.com', 'password')
+
+    def tearDown(self):
+        self.standin.uninstall()
+        self.server.stop()
+
+    def process(self, time_end):
+        ptr = ProcessTimeRange(self.tconnect, self.nightscout, {'tconnectDeviceId': SYNTHETIC_DEVICE_ID, 'maxDateWithEvents': None}, False, self.secret, features=[IOB])
+        return ptr.process(arrow.get('2024-01-02'), arrow.get(time_end))
+
+    def activities(self):
+        return [d for d in self.server.store.collections['activity'] if d['activityType'] == IOB_ACTIVITYTYPE]
+
+    def test_writes_single_iob_activity(self):
+        added, _ = self.process('2024-01-02')
+        self.assertEqual(added, 1)
+        first = self.activities()
+        self.assertEqual(len(first), 1)
+        self.assertIn('basaliob', first[0])
+
+        added, _ = self.process('2024-01-02')
+        self.assertEqual(added, 0)
+        self.assertEqual(self.activities(), first)
+
+        # A later sync replaces the previous activity
+        added, _ = self.process('2024-01-03')
+        self.assertEqual(added, 1)
+        later = self.activities()
+        self.assertEqual(len(later), 1)
+        self.assertGreater(arrow.get(later[0]['created_at']), arrow.get(first[0]['created_at']))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+
+import os
+import tempfile
+import unittest
+import arrow
+
+from unittest.mock import patch
+
+from tconnectsync.api import TConnectApi
+from tconnectsync.nightscout import NightscoutApi
+from tconnectsync.features import BASAL, BOLUS, CGM, PUMP_EVENTS
+from tconnectsync.eventparser.synthetic import SyntheticPumpHistory
+from tconnectsync.standin.nightscout import NightscoutStandinServer
+from tconnectsync.standin.tandemsource import TandemSourceStandin, SYNTHETIC_DEVICE_ID
+from tconnectsync.sync.tandemsource.reconcile import Reconcile, existing_keys, is_missing
+from tconnectsync.sync.tandemsource.uploaded_index import UploadedIndex
+from tconnectsync.parser.nightscout import NightscoutEntry
+from tests.secrets import build_secrets
+
+@patch('tconnectsync.api.tandemsource.CACHE_CREDENTIALS', False)
+class TestReconcile(unittest.TestCase):
+    features = [BASAL, BOLUS, CGM, PUMP_EVENTS]
+
+    def setUp(self):
+        self.server = NightscoutStandinServer().start()
+        self.nightscout = NightscoutApi(self.server.url, 'secret')
+        self.secret = build_secrets(UPLOADED_INDEX=False, FETCH_ALL_EVENT_TYPES=False)
+        self.standin = TandemSourceStandin(synthetic=SyntheticPumpHistory(seed=3), synthetic_start='2024-01-01').install()
+        self.tconnect = TConnectApi('email@email.com', 'password')
+
+    def tearDown(self):
+        self.standin.uninstall()
+        self.server.stop()
+
+    def reconcile(self, pretend=False):
+        return Reconcile(self.tconnect, self.nightscout, {'tconnectDeviceId': SYNTHETIC_DEVICE_ID}, pretend, self.secret, features=self.features, batch_size=50).process(
+            arrow.get('2024-01-02T00:00:00-05:00'), arrow.get('2024-01-02T23:59:59-05:00'))
+
+    def counts(self):
+        return {c: len(docs) for c, docs in self.server.store.collections.items() if docs}
+
+    def test_uploads_everything_then_nothing(self):
+        added = self.reconcile()
+        counts = self.counts()
+        self.assertEqual(added, sum(counts.values()))
+        self.assertGreater(counts['treatments'], 0)
+        self.assertGreater(counts['entries'], 200)
+
+        self.server.stats.clear()
+        self.assertEqual(self.reconcile(), 0)
+        self.assertEqual(self.counts(), counts)
+        self.assertFalse([k for k in self.server.stats if k.startswith('POST')])
+
+    def test_repairs_holes(self):
+        self.reconcile()
+        counts = self.counts()
+
+        store = self.server.store
+        store.collections['entries'] = store.collections['entries'][::2]
+        removed_bolus = [d for d in store.collections['treatments'] if d['eventType'] == 'Combo Bolus'][:2]
+        store.collections['treatments'] = [d for d in store.collections['treatments'] if d not in removed_bolus]
+        removed = counts['entries'] - len(store.collections['entries']) + len(removed_bolus)
+
+        self.server.stats.clear()
+        self.assertEqual(self.reconcile(), removed)
+        self.assertEqual(self.counts(), counts)
+        # One batched POST per collection and batch of missing entries
+        self.assertEqual(self.server.stats['POST treatments'], 1)
+        self.assertLessEqual(self.server.stats['POST entries'], 1 + counts['entries'] // 2 // 50)
+
+    def test_ignores_uploaded_index(self):
+        with tempfile.TemporaryDirectory() as d:
+            self.secret = build_secrets(UPLOADED_INDEX=True, UPLOADED_INDEX_PATH=os.path.join(d, 'index.db'), FETCH_ALL_EVENT_TYPES=False)
+            self.reconcile()
+            counts = self.counts()
+
+            # Entries deleted from Nightscout are uploaded again although they are in the index
+            self.server.store.collections['treatments'] = []
+            self.assertEqual(self.reconcile(), counts['treatments'])
+            self.assertEqual(self.counts(), counts)
+            UploadedIndex.from_secret(self.secret).close()
+
+    def test_pretend(self):
+        self.assertGreater(self.reconcile(pretend=True), 0)
+        self.assertEqual(self.counts(), {})
+
+
+class TestReconcileKeys(unittest.TestCase):
+    def test_matches_on_pump_event_id_or_time(self):
+        existing = [
+            NightscoutEntry.bolus(1, None, '2024-01-01 10:00:00-05:00', pump_event_id='1,2'),
+            {'eventType': 'Combo Bolus', 'created_at': '2024-01-01T16:00:00Z'},
+        ]
+        keys = existing_keys(existing)
+
+        self.assertFalse(is_missing(NightscoutEntry.bolus(1, None, '2024-01-01 10:00:01-05:00', pump_event_id='1,2'), keys))
+        self.assertFalse(is_missing(NightscoutEntry.bolus(1, None, '2024-01-01 11:00:00-05:00', pump_event_id='5'), keys))
+        self.assertTrue(is_missing(NightscoutEntry.bolus(1, None, '2024-01-01 12:00:00-05:00', pump_event_id='6'), keys))
+        self.assertTrue(is_missing(NightscoutEntry.basal(1, 5, '2024-01-01 10:00:00-05:00', pump_event_id='1,2'), keys))
+        # The timestamp is only matched against entries uploaded without a pump_event_id
+        self.assertTrue(is_missing(NightscoutEntry.bolus(1, None, '2024-01-01 10:00:00-05:00', pump_event_id='3'), keys))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+
+import os
+import unittest
+import tempfile
+
+from tconnectsync.sync.tandemsource.uploaded_index import UploadedIndex
+from tconnectsync.sync.tandemsource.process_bolus import ProcessBolus
+from tconnectsync.sync.tandemsource.process_cgm_reading import ProcessCGMReading
+from tconnectsync.parser.nightscout import NightscoutEntry
+from tconnectsync.nightscout import NightscoutApi as RealNightscoutApi
+from tconnectsync.nightscout_outbox import NightscoutOutbox
+from tconnectsync.standin.nightscout import NightscoutStandinServer
+from tests.secrets import build_secrets
+
+from ...api.fake import TConnectApi
+from ...nightscout_fake import NightscoutApi
+
+class TestUploadedIndex(unittest.TestCase):
+    def setUp(self):
+        self.tconnect = TConnectApi()
+        self.nightscout = NightscoutApi()
+        self.index = UploadedIndex(':memory:')
+
+    def bolus(self, pump_event_id, created_at='2024-01-01 10:00:00-05:00'):
+        return NightscoutEntry.bolus(bolus=1.5, carbs=None, created_at=created_at, pump_event_id=pump_event_id)
+
+    def test_key_uses_entity_event_type_and_pump_event_id(self):
+        entry = self.bolus('1,2,3')
+        self.index.add('device', entry)
+
+        self.assertTrue(self.index.contains('device', entry))
+        self.assertTrue(self.index.contains('device', self.bolus('1,2,3', created_at='2024-01-02 10:00:00-05:00')))
+        self.assertFalse(self.index.contains('device', self.bolus('1,2,4')))
+        self.assertFalse(self.index.contains('other device', entry))
+        self.assertFalse(self.index.contains('device', entry, entity='entries'))
+
+    def test_entries_without_pump_event_id_are_not_indexed(self):
+        entry = self.bolus('')
+        self.index.add('device', entry)
+        self.assertFalse(self.index.contains('device', entry))
+        self.assertEqual(self.index.count(), 0)
+
+    def test_write_skips_uploaded_entries(self):
+        process = ProcessBolus(self.tconnect, self.nightscout, 'device', pretend=False, uploaded_index=self.index)
+        entries = [self.bolus('1'), self.bolus('2')]
+
+        self.assertEqual(process.write(entries), 2)
+        self.assertEqual(process.write(entries + [self.bolus('3')]), 1)
+        self.assertEqual([e['pump_event_id'] for e in self.nightscout.uploaded_entries['treatments']], ['1', '2', '3'])
+
+    def test_write_uses_entity(self):
+        process = ProcessCGMReading(self.tconnect, self.nightscout, 'device', pretend=False, uploaded_index=self.index)
+        entry = NightscoutEntry.entry(sgv=120, created_at='2024-01-01 10:00:00-05:00', pump_event_id='10')
+
+        self.assertEqual(process.write([entry]), 1)
+        self.assertEqual(process.write([entry]), 0)
+        self.assertTrue(self.index.contains('device', entry, entity='entries'))
+        self.assertFalse(self.index.contains('device', entry))
+
+    def test_pretend_does_not_record(self):
+        process = ProcessBolus(self.tconnect, self.nightscout, 'device', pretend=True, uploaded_index=self.index)
+        self.assertEqual(process.write([self.bolus('1')]), 1)
+        self.assertEqual(self.index.count(), 0)
+
+    def test_queued_entries_are_not_indexed(self):
+        server = NightscoutStandinServer().start()
+        try:
+            outbox = NightscoutOutbox(':memory:')
+            nightscout = RealNightscoutApi(server.url, 'secret', outbox=outbox)
+            process = ProcessBolus(self.tconnect, nightscout, 'device', pretend=False, uploaded_index=self.index)
+
+            server.error_rate = 1
+            self.assertEqual(process.write([self.bolus('1')]), 1)
+            self.assertEqual(outbox.pending(), 1)
+            self.assertEqual(self.index.count(), 0)
+
+            server.error_rate = 0
+            nightscout.flush_outbox()
+            self.assertEqual(process.write([self.bolus('2')]), 1)
+            self.assertFalse(self.index.contains('device', self.bolus('1')))
+            self.assertTrue(self.index.contains('device', self.bolus('2')))
+        finally:
+            server.stop()
+
+    def test_persists_across_instances(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, 'nested', 'index.db')
+            index = UploadedIndex(path)
+            index.add('device', self.bolus('1'))
+            index.close()
+
+            self.assertTrue(UploadedIndex(path).contains('device', self.bolus('1')))
+
+    def test_from_secret(self):
+        self.assertIsNone(UploadedIndex.from_secret(build_secrets(UPLOADED_INDEX=False)))
+
+        with tempfile.TemporaryDirectory() as d:
+            secret = build_secrets(UPLOADED_INDEX=True, UPLOADED_INDEX_PATH=os.path.join(d, 'index.db'))
+            index = UploadedIndex.from_secret(secret)
+            self.assertIs(UploadedIndex.from_secret(secret), index)
+            index.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
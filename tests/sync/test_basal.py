@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
 
 import unittest
+import random
+import arrow
 import copy
 
 from tconnectsync.sync.basal import process_ciq_basal_events
@@ -140,6 +142,69 @@ class TestBasalSync(unittest.TestCase):
         self.assertEqual(basalEvents[3], TConnectEntry.parse_ciq_basal_entry(
             data["basal"]["algorithmDeliveryEvents"][2], delivery_type="algorithmDelivery"))
 
+    def test_process_ciq_basal_events_matches_previous_implementation(self):
+        rng = random.Random(44)
+        start = 1615878000
+        for _ in range(50):
+            data = copy.deepcopy(TestBasalSync.base)
+            # Coarse times, so that events and suspensions often coincide
+            times = lambda n, span: [start + 60 * rng.randrange(span) for _ in range(n)]
+            for key in ["tempDeliveryEvents", "algorithmDeliveryEvents", "profileDeliveryEvents"]:
+                data["basal"][key] = [{"y": rng.choice([0, 0.5, 0.8]), "duration": rng.randrange(1, 3000), "x": x} for x in times(rng.randrange(20), 3000)]
+            basal_times = [b["x"] for events in data["basal"].values() for b in events]
+            data["suspensionDeliveryEvents"] = [
+                {"suspendReason": rng.choice(["manual", "control-iq", "alarm"]), "continuation": None, "x": rng.choice(basal_times) if basal_times and rng.random() < 0.3 else x}
+                for x in times(rng.randrange(8), 3000)
+            ]
+
+            self.assertEqual(process_ciq_basal_events(copy.deepcopy(data)), previous_process_ciq_basal_events(copy.deepcopy(data)))
+
+
+"""
+The previous implementation of process_ciq_basal_events, which sorted and
+compared arrow-parsed timestamps and consumed suspensions with pop(0).
+"""
+def previous_process_ciq_basal_events(data):
+    suspensionEvents = {}
+    for s in data["suspensionDeliveryEvents"]:
+        entry = TConnectEntry.parse_suspension_entry(s)
+        suspensionEvents[entry["time"]] = entry
+
+    basalEvents = []
+    for b in data["basal"]["tempDeliveryEvents"]:
+        basalEvents.append(TConnectEntry.parse_ciq_basal_entry(b, delivery_type="tempDelivery"))
+    for b in data["basal"]["algorithmDeliveryEvents"]:
+        basalEvents.append(TConnectEntry.parse_ciq_basal_entry(b, delivery_type="algorithmDelivery"))
+    for b in data["basal"]["profileDeliveryEvents"]:
+        basalEvents.append(TConnectEntry.parse_ciq_basal_entry(b, delivery_type="profileDelivery"))
+
+    for i in basalEvents:
+        if i["time"] in suspensionEvents:
+            i["delivery_type"] += " (" + suspensionEvents[i["time"]]["suspendReason"] + " suspension)"
+            del suspensionEvents[i["time"]]
+
+    basalEvents.sort(key=lambda x: arrow.get(x["time"]))
+
+    unprocessedSuspensions = list(suspensionEvents.values())
+    unprocessedSuspensions.sort(key=lambda x: arrow.get(x["time"]))
+
+    newEvents = []
+    for i in range(len(basalEvents)):
+        if len(unprocessedSuspensions) == 0:
+            break
+        existingTime = arrow.get(basalEvents[i]["time"])
+        unprocessedTime = arrow.get(unprocessedSuspensions[0]["time"])
+        if i > 0 and existingTime > unprocessedTime:
+            suspension = unprocessedSuspensions.pop(0)
+            seconds = (existingTime - unprocessedTime).seconds
+            newEvents.append(TConnectEntry.manual_suspension_to_basal_entry(suspension, seconds))
+
+    if newEvents:
+        basalEvents += newEvents
+        basalEvents.sort(key=lambda x: arrow.get(x["time"]))
+
+    return basalEvents
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
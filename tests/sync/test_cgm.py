@@ -1,9 +1,14 @@
 #!/usr/bin/env python3
 
+import random
 import unittest
+import arrow
 
-from tconnectsync.sync.cgm import find_event_at, process_cgm_events
+from tconnectsync.sync.cgm import CgmIndex, find_event_at, process_cgm_events
 from tconnectsync.parser.tconnect import TConnectEntry
+from tconnectsync.eventparser.synthetic import SyntheticPumpHistory
+from tconnectsync.eventparser.raw_event import TANDEM_EPOCH
+from tconnectsync.eventparser import events as eventtypes
 
 from ..parser.test_tconnect import TestTConnectEntryReading
 
@@ -45,7 +50,97 @@ class TestFindEventAt(unittest.TestCase):
 
     def test_find_event_at_most_recent(self):
         self.assertEqual(find_event_at(self.readingData, "2021-10-23 18:00:00-04:00"), self.readingData[3])
-        
+
+    def test_find_event_at_index(self):
+        index = CgmIndex.from_events(self.readingData)
+        self.assertEqual(find_event_at(index, "2021-10-22 10:30:00-04:00"), None)
+        self.assertEqual(find_event_at(index, "2021-10-23 16:21:52-04:00"), self.readingData[2])
+
+"""
+find_event_at as implemented before CgmIndex, which parsed, sorted and
+scanned every reading on each call.
+"""
+def previous_find_event_at(cgmEvents, find_time):
+    find_t = arrow.get(find_time)
+    events = list(map(lambda x: (arrow.get(x["time"]), x), cgmEvents))
+    events.sort(key=lambda x: x[0])
+
+    closestReading = None
+    for t, r in events:
+        if t > find_t:
+            break
+        closestReading = r
+
+    return closestReading
+
+class TestCgmIndex(unittest.TestCase):
+    def test_matches_previous_find_event_at(self):
+        rng = random.Random(3)
+        start = arrow.get("2021-10-23 00:00:00-04:00")
+        readings = [
+            {"time": start.shift(seconds=i * 300 + rng.randint(0, 60)).format(), "bg": rng.randint(40, 400)}
+            for i in range(300)
+        ]
+        rng.shuffle(readings)
+
+        index = CgmIndex.from_events(readings)
+        self.assertEqual(len(index), len(readings))
+        for _ in range(200):
+            t = start.shift(seconds=rng.randint(-600, 300 * 301)).format()
+            self.assertIs(index.event_at(t), previous_find_event_at(readings, t))
+
+    def test_add_out_of_order(self):
+        index = CgmIndex()
+        self.assertIsNone(index.at(100))
+        index.add(300, 'c')
+        index.add(100, 'a')
+        index.add(200, 'b')
+        self.assertEqual(index.at(99), None)
+        self.assertEqual(index.at(100), 'a')
+        self.assertEqual(index.at(250), 'b')
+        index.add(400, 'd')
+        self.assertEqual(index.at(399), 'c')
+        self.assertEqual(index.at(1000), 'd')
+
+    def test_trim(self):
+        index = CgmIndex()
+        for t, r in [(100, 'a'), (200, 'b'), (300, 'c'), (400, 'd')]:
+            index.add(t, r)
+        index.trim(250)
+        self.assertEqual(len(index), 3)
+        self.assertEqual(index.at(250), 'b')
+        self.assertEqual(index.at(300), 'c')
+        index.trim(50)
+        self.assertEqual(len(index), 3)
+        index.trim(1000)
+        self.assertEqual(len(index), 1)
+        self.assertEqual(index.at(1000), 'd')
+
+    def test_trim_pump_time(self):
+        events = list(SyntheticPumpHistory(seed=1).pump_events('2024-01-01', '2024-01-01'))
+        readings = [e for e in events if type(e) == eventtypes.LidCgmDataGxb]
+        index = CgmIndex()
+        index.add_pump_events(readings)
+        middle = readings[len(readings) // 2]
+        index.trim_pump_time(middle.eventTimestamp)
+        self.assertIs(index.pump_event_at(middle), readings[len(readings) // 2])
+        self.assertLessEqual(len(index), len(readings) - len(readings) // 2 + 1)
+
+    def test_pump_events(self):
+        events = list(SyntheticPumpHistory(seed=1).pump_events('2024-01-01', '2024-01-01'))
+        readings = [e for e in events if type(e) == eventtypes.LidCgmDataGxb]
+        requests = [e for e in events if type(e) == eventtypes.LidBolusRequestedMsg1]
+        self.assertTrue(readings)
+        self.assertTrue(requests)
+
+        index = CgmIndex()
+        index.add_pump_events(readings)
+        for request in requests:
+            t = TANDEM_EPOCH + request.raw.timestampRaw
+            before = [r for r in readings if TANDEM_EPOCH + r.egvTimestamp <= t]
+            expected = max(before, key=lambda r: r.egvTimestamp) if before else None
+            self.assertIs(index.pump_event_at(request), expected)
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+
+import unittest
+import arrow
+
+from unittest.mock import patch
+
+from tconnectsync.api import TConnectApi
+from tconnectsync.check import check_latency, probe_endpoint, percentile
+from tconnectsync.nightscout import NightscoutApi
+from tconnectsync.nightscout_v3 import NightscoutApiV3
+from tconnectsync.eventparser.synthetic import SyntheticPumpHistory
+from tconnectsync.standin.nightscout import NightscoutStandinServer
+from tconnectsync.standin.tandemsource import TandemSourceStandin
+from tests.secrets import build_secrets
+
+
+class TestPercentile(unittest.TestCase):
+    def test_percentile(self):
+        self.assertIsNone(percentile([], 50))
+        self.assertEqual(percentile([3], 95), 3)
+        self.assertEqual(percentile([4, 1, 3, 2], 50), 2.5)
+        self.assertAlmostEqual(percentile(range(1, 101), 95), 95.05)
+
+
+@patch('tconnectsync.api.tandemsource.CACHE_CREDENTIALS', False)
+class TestCheckLatency(unittest.TestCase):
+    def setUp(self):
+        self.server = NightscoutStandinServer(secret='secret').start()
+        self.nightscout = NightscoutApi(self.server.url, 'secret')
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_probe_endpoint(self):
+        timing = probe_endpoint(self.server.url + 'api/v1/status.json')
+        self.assertEqual(timing.status, 401)
+        self.assertIsNone(timing.tls)
+        for phase in (timing.dns, timing.connect, timing.ttfb):
+            self.assertGreaterEqual(phase, 0)
+
+    def test_check_latency(self):
+        local_probe = probe_endpoint
+        def probe(url, **kwargs):
+            # Tandem's servers are not reachable from tests
+            if not url.startswith(self.server.url):
+                raise OSError('unreachable')
+            return local_probe(url, **kwargs)
+
+        lines = []
+        with patch('tconnectsync.check.probe_endpoint', probe), \
+                TandemSourceStandin(synthetic=SyntheticPumpHistory(seed=1), synthetic_start='2024-01-01', now=lambda: arrow.get('2024-01-20T12:00:00')):
+            results = check_latency(TConnectApi('email@email.com', 'password'), self.nightscout, build_secrets(PUMP_SERIAL_NUMBER=None),
+                                    arrow.get('2024-01-20'), samples=3, log=lambda *args: lines.append(' '.join(map(str, args))))
+
+        self.assertIsNone(results['endpoints']['Tandem Source'])
+        self.assertTrue(any('Tandem Source' in l and 'unreachable' in l for l in lines))
+
+        nightscout = results['endpoints']['Nightscout']
+        self.assertIsNone(nightscout['tls'])
+        p50, p95 = nightscout['ttfb']
+        self.assertLessEqual(p50, p95)
+
+        self.assertGreaterEqual(results['session'], 0)
+        self.assertGreaterEqual(results['login'], 0)
+        small, large = results['pump_events'][1], results['pump_events'][7]
+        self.assertGreater(small['events'], 0)
+        self.assertGreater(large['events'], small['events'])
+
+        self.assertIsNotNone(results['nightscout_write'])
+        self.assertEqual(self.server.stats['POST treatments'], 3)
+        self.assertEqual(self.server.stats['DELETE treatments'], 3)
+        self.assertEqual(self.server.store.collections['treatments'], [])
+
+    def test_check_write(self):
+        self.assertGreaterEqual(self.nightscout.check_write(), 0)
+        self.assertEqual(self.server.stats['POST treatments'], 1)
+        self.assertEqual(self.server.store.collections['treatments'], [])
+
+    def test_check_write_v3_access_token_only(self):
+        server = NightscoutStandinServer(access_token='tconnectsync-abc123').start()
+        try:
+            nightscout = NightscoutApiV3(server.url, '', 'tconnectsync-abc123')
+            self.assertGreaterEqual(nightscout.check_write(), 0)
+            self.assertEqual(server.stats['v3 POST treatments'], 1)
+            self.assertEqual(server.stats['v3 DELETE treatments'], 1)
+            self.assertEqual(server.store.collections['treatments'], [])
+        finally:
+            server.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
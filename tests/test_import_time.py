@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+
+import os
+import re
+import sys
+import subprocess
+import unittest
+
+# Budget for `import tconnectsync`, which is paid on every cron or one-shot
+# invocation, as cumulative microseconds reported by `python -X importtime`.
+# This is several times the measured cost (~0.2s), leaving room for slower
+# machines, but is well below the ~0.45s it took when every API client was
+# imported eagerly.
+IMPORT_TIME_BUDGET_US = 1000000
+
+# Modules only needed by the legacy t:connect clients, or only used once a sync
+# has started, which must not be imported at startup
+LAZY_MODULES = [
+    'bs4',
+    'requests_oidc',
+    'jwt',
+    'pkg_resources',
+    'numpy',
+    'pyarrow',
+    'tconnectsync.api.android',
+    'tconnectsync.api.controliq',
+    'tconnectsync.api.ws2',
+    'tconnectsync.api.webui',
+    'tconnectsync.api.tandemsource',
+    'tconnectsync.process',
+    'tconnectsync.autoupdate',
+    'tconnectsync.check',
+    'tconnectsync.proxy',
+    'tconnectsync.eventparser.events',
+]
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_python(code, *flags):
+    return subprocess.run([sys.executable, *flags, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True)
+
+
+class TestImportTime(unittest.TestCase):
+    def test_lazy_modules_not_imported(self):
+        out = run_python('import sys, tconnectsync; print("\\n".join(sys.modules))').stdout.split()
+        for module in LAZY_MODULES:
+            self.assertNotIn(module, out)
+
+    def test_lazy_attributes(self):
+        out = run_python('import tconnectsync; print(tconnectsync.check_login.__name__, tconnectsync.util.cli.__name__)').stdout.split()
+        self.assertEqual(out, ['check_login', 'tconnectsync.util.cli'])
+
+    def test_import_time_budget(self):
+        stderr = run_python('import tconnectsync', '-X', 'importtime').stderr
+        m = re.search(r'^import time:\s+\d+ \|\s+(\d+) \| tconnectsync$', stderr, re.MULTILINE)
+        self.assertIsNotNone(m, stderr[-2000:])
+        self.assertLess(int(m.group(1)), IMPORT_TIME_BUDGET_US)
+
+
+if __name__ == '__main__':
+    unittest.main()
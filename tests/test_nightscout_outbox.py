@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+
+import unittest
+
+from tconnectsync.api.common import ApiException
+from tconnectsync.nightscout import NightscoutApi
+from tconnectsync.nightscout_outbox import NightscoutOutbox, FAILURE_THRESHOLD, BACKOFF_BASE_SECONDS
+from tconnectsync.standin.nightscout import NightscoutStandinServer
+
+class TestNightscoutOutbox(unittest.TestCase):
+    def setUp(self):
+        self.now = 1000
+        self.server = NightscoutStandinServer().start()
+        self.outbox = NightscoutOutbox(':memory:', clock=lambda: self.now)
+        self.nightscout = NightscoutApi(self.server.url, 'secret', outbox=self.outbox)
+
+    def tearDown(self):
+        self.server.stop()
+
+    def treatment(self, n):
+        return {'eventType': 'Note', 'notes': str(n), 'created_at': '2024-01-01T00:%02d:00Z' % n}
+
+    def stored(self, collection='treatments'):
+        return sorted(d['notes'] for d in self.server.store.collections[collection])
+
+    def test_sends_directly_when_healthy(self):
+        self.nightscout.upload_entry(self.treatment(1))
+        self.assertEqual(self.stored(), ['1'])
+        self.assertEqual(self.outbox.pending(), 0)
+
+    def test_queues_on_server_error_and_flushes_in_bulk(self):
+        self.server.error_rate = 1
+        self.nightscout.upload_entry(self.treatment(1))
+        self.assertEqual(self.outbox.pending(), 1)
+
+        self.server.error_rate = 0
+        # Later writes to the same collection queue behind the pending one
+        self.nightscout.upload_entry(self.treatment(2))
+        self.nightscout.upload_entry(self.treatment(3))
+        self.assertEqual(self.stored(), [])
+        self.assertEqual(self.outbox.pending('treatments'), 3)
+
+        # Other collections are unaffected
+        self.nightscout.upload_entry({'type': 'sgv', 'sgv': 100, 'date': 1, 'notes': 'e'}, entity='entries')
+        self.assertEqual(self.stored('entries'), ['e'])
+
+        self.now += BACKOFF_BASE_SECONDS
+        self.server.stats.clear()
+        self.assertEqual(self.nightscout.flush_outbox(), 3)
+        self.assertEqual(self.stored(), ['1', '2', '3'])
+        self.assertEqual(self.server.stats['POST treatments'], 1)
+        self.assertEqual(self.outbox.pending(), 0)
+
+        self.nightscout.upload_entry(self.treatment(4))
+        self.assertEqual(self.outbox.pending(), 0)
+
+    def test_preserves_order_of_mixed_writes(self):
+        sent = []
+        self.server.error_rate = 1
+        self.nightscout.upload_entry(self.treatment(1))
+        self.nightscout.upload_entry(self.treatment(2))
+        self.nightscout.delete_entry('treatments/abc')
+        self.nightscout.upload_entry(self.treatment(3))
+
+        self.outbox.flush(lambda method, entity, payload: sent.append((method, entity, payload)), lambda e: True)
+        self.assertEqual(sent, [
+            ('POST', 'treatments', [self.treatment(1), self.treatment(2)]),
+            ('DELETE', 'treatments/abc', {}),
+            ('POST', 'treatments', [self.treatment(3)]),
+        ])
+
+    def test_rejected_write_does_not_block_later_writes(self):
+        self.server.error_rate = 1
+        for n in range(1, 4):
+            self.nightscout.upload_entry(self.treatment(n))
+        self.nightscout.delete_entry('treatments/abc')
+        self.assertEqual(self.outbox.pending(), 4)
+        self.server.error_rate = 0
+        self.now += BACKOFF_BASE_SECONDS * 2 ** FAILURE_THRESHOLD
+
+        def send(method, entity, payload):
+            if method == 'DELETE' or any(p['notes'] == '2' for p in (payload if isinstance(payload, list) else [payload])):
+                raise ApiException(400, 'Bad request')
+            self.nightscout._send(method, entity, payload)
+
+        self.assertEqual(self.outbox.flush(send, lambda e: e.status_code >= 500), 2)
+        self.assertEqual(self.stored(), ['1', '3'])
+        self.assertEqual(self.outbox.pending(), 0)
+        self.assertEqual(self.outbox.dead_letters(), 2)
+        self.assertEqual(self.outbox.failures, 0)
+
+        # Later writes are sent immediately, and flushing again does nothing
+        self.nightscout.upload_entry(self.treatment(4))
+        self.assertEqual(self.stored(), ['1', '3', '4'])
+        self.assertEqual(self.nightscout.flush_outbox(), 0)
+
+    def test_circuit_opens_after_consecutive_failures(self):
+        self.server.error_rate = 1
+        # Each write goes to a different collection so none is queued behind an earlier failure
+        for i, entity in enumerate(['entries', 'treatments', 'activity'][:FAILURE_THRESHOLD]):
+            self.nightscout.upload_entry(self.treatment(i), entity=entity)
+        self.assertTrue(self.outbox.circuit_open())
+
+        # While open, no requests are made and flushing does nothing
+        self.server.stats.clear()
+        self.nightscout.upload_entry(self.treatment(10), entity='devicestatus')
+        self.assertEqual(self.nightscout.flush_outbox(), 0)
+        self.assertEqual(dict(self.server.stats), {})
+
+        # After the backoff period a flush is attempted again, and success closes the circuit
+        self.server.error_rate = 0
+        self.now += BACKOFF_BASE_SECONDS * 2 ** FAILURE_THRESHOLD
+        self.assertFalse(self.outbox.circuit_open())
+        self.assertEqual(self.nightscout.flush_outbox(), FAILURE_THRESHOLD + 1)
+        self.assertEqual(self.outbox.failures, 0)
+
+    def test_queues_on_connection_error(self):
+        self.server.stop()
+        nightscout = NightscoutApi('http://127.0.0.1:1/', 'secret', outbox=self.outbox)
+        nightscout.put_entry({'_id': 'abc'}, entity='profile')
+        self.assertEqual(self.outbox.pending('profile'), 1)
+        self.server = NightscoutStandinServer().start()
+
+    def test_client_errors_are_raised(self):
+        server = NightscoutStandinServer(secret='other').start()
+        try:
+            nightscout = NightscoutApi(server.url, 'secret', outbox=self.outbox)
+            with self.assertRaises(ApiException):
+                nightscout.upload_entry(self.treatment(1))
+            self.assertEqual(self.outbox.pending(), 0)
+        finally:
+            server.stop()
+
+    def test_without_outbox_errors_are_raised(self):
+        self.server.error_rate = 1
+        with self.assertRaises(ApiException):
+            NightscoutApi(self.server.url, 'secret').upload_entry(self.treatment(1))
+
+
+if __name__ == '__main__':
+    unittest.main()
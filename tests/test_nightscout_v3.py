@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+
+import unittest
+
+from tconnectsync.api.common import ApiException
+from tconnectsync.nightscout_v3 import NightscoutApiV3, v3_document
+from tconnectsync.nightscout_outbox import NightscoutOutbox
+from tconnectsync.parser.nightscout import NightscoutEntry, BASAL_EVENTTYPE, BOLUS_EVENTTYPE
+from tconnectsync.standin.nightscout import NightscoutStandinServer
+
+class TestNightscoutApiV3(unittest.TestCase):
+    def setUp(self):
+        self.server = NightscoutStandinServer(secret='secret', access_token='tconnectsync-abc123').start()
+        self.nightscout = NightscoutApiV3(self.server.url, 'secret', 'tconnectsync-abc123')
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_v3_document(self):
+        doc = v3_document({'created_at': '2024-01-01 00:00:00-05:00'})
+        self.assertEqual(doc['date'], 1704085200000)
+        self.assertEqual(doc['app'], 'tconnectsync')
+
+    def test_invalid_access_token(self):
+        nightscout = NightscoutApiV3(self.server.url, 'secret', 'wrong')
+        with self.assertRaises(ApiException) as e:
+            nightscout.api_status()
+        self.assertEqual(e.exception.status_code, 401)
+
+    def test_jwt_reused(self):
+        self.nightscout.api_status()
+        self.nightscout.api_status()
+        self.assertEqual(self.server.stats['GET authorization'], 1)
+
+    def test_last_uploaded_entry_uses_incremental_history(self):
+        self.assertIsNone(self.nightscout.last_uploaded_entry(BASAL_EVENTTYPE))
+
+        for created_at in ['2024-11-17 08:00:00-05:00', '2024-11-17 08:10:00-05:00', '2024-11-18 08:00:00-05:00']:
+            self.nightscout.upload_entry(NightscoutEntry.basal(1.0, 5, created_at, pump_event_id='1'))
+        self.nightscout.upload_entry(NightscoutEntry.bolus(2.0, 10, '2024-11-17 09:00:00-05:00'))
+
+        self.server.stats.clear()
+        latest = self.nightscout.last_uploaded_entry(BASAL_EVENTTYPE)
+        self.assertEqual(latest['created_at'], '2024-11-18 08:00:00-05:00')
+        self.assertIn('_id', latest)
+
+        latest = self.nightscout.last_uploaded_entry(BASAL_EVENTTYPE, time_start='2024-11-17T00:00:00-05:00', time_end='2024-11-17T23:59:59-05:00')
+        self.assertEqual(latest['created_at'], '2024-11-17 08:10:00-05:00')
+
+        latest = self.nightscout.last_uploaded_entry(BOLUS_EVENTTYPE)
+        self.assertEqual(latest['insulin'], 2.0)
+
+        # One history request per lookup, each returning only changes, and no searches
+        self.assertEqual(self.server.stats['v3 GET treatments'], 3)
+        last_modified, docs = self.nightscout.history_state['treatments']
+        self.assertEqual(len(docs), 4)
+
+    def test_falls_back_to_search(self):
+        self.server.store.insert('treatments', [dict(NightscoutEntry.basal(1.0, 5, '2024-11-17 08:00:00-05:00'), date=1731848400000)])
+        # Only documents modified after the history lookback are returned by history
+        self.nightscout.history_state['treatments'] = (self.server.store.last_modified, {})
+
+        latest = self.nightscout.last_uploaded_entry(BASAL_EVENTTYPE)
+        self.assertEqual(latest['created_at'], '2024-11-17 08:00:00-05:00')
+        self.assertIsNone(self.nightscout.last_uploaded_entry(BASAL_EVENTTYPE, time_end='2024-11-16T00:00:00-05:00'))
+
+    def test_deleted_and_updated_documents(self):
+        self.nightscout.upload_entry(NightscoutEntry.basal(1.0, 5, '2024-11-17 08:00:00-05:00'))
+        self.nightscout.upload_entry(NightscoutEntry.basal(1.0, 5, '2024-11-17 08:10:00-05:00'))
+        latest = self.nightscout.last_uploaded_entry(BASAL_EVENTTYPE)
+
+        self.nightscout.put_entry(dict(latest, duration=15), entity='treatments')
+        self.assertEqual(self.nightscout.last_uploaded_entry(BASAL_EVENTTYPE)['duration'], 15)
+
+        self.nightscout.delete_entry('treatments/%s' % latest['_id'])
+        self.assertEqual(self.nightscout.last_uploaded_entry(BASAL_EVENTTYPE)['created_at'], '2024-11-17 08:00:00-05:00')
+
+    def test_entries_and_devicestatus(self):
+        self.nightscout.upload_entry(NightscoutEntry.entry(120, '2024-11-17 08:00:00-05:00'), entity='entries')
+        self.nightscout.upload_entry(NightscoutEntry.entry(130, '2024-11-17 08:05:00-05:00'), entity='entries')
+        self.assertEqual(self.nightscout.last_uploaded_bg_entry()['sgv'], 130)
+        self.assertEqual(self.nightscout.last_uploaded_bg_entry(time_end='2024-11-17T08:01:00-05:00')['sgv'], 120)
+
+        self.nightscout.upload_entry({'device': 'Pump (tconnectsync)', 'created_at': '2024-11-17T08:00:00-05:00'}, entity='devicestatus')
+        self.assertIsNotNone(self.nightscout.last_uploaded_devicestatus())
+
+    def test_uploaded_entries_in_range(self):
+        entries = [NightscoutEntry.basal(1.0, 5, '2024-11-17 08:%02d:00-05:00' % m, pump_event_id=str(m)) for m in range(0, 50, 5)]
+        self.nightscout.upload_entries(entries)
+        self.nightscout.upload_entry(dict(entries[0], enteredBy='someone else'))
+
+        found = self.nightscout.uploaded_entries_in_range('treatments', '2024-11-17T08:10:00-05:00', '2024-11-17T08:40:00-05:00', count=3)
+        self.assertEqual(sorted(int(d['pump_event_id']) for d in found), [10, 15, 20, 25, 30, 35, 40])
+
+    def test_activity_uses_v1(self):
+        self.nightscout.upload_entry({'activityType': 'tconnect_iob', 'enteredBy': 'Pump (tconnectsync)', 'iob': 1.5}, entity='activity')
+        self.assertEqual(self.nightscout.last_uploaded_activity('tconnect_iob')['iob'], 1.5)
+        self.assertEqual(self.server.stats['POST activity'], 1)
+
+    def test_outbox(self):
+        nightscout = NightscoutApiV3(self.server.url, 'secret', 'tconnectsync-abc123', outbox=NightscoutOutbox(':memory:'))
+        self.server.error_rate = 1
+        nightscout.upload_entry(NightscoutEntry.bolus(2.0, 10, '2024-11-17 09:00:00-05:00'))
+        nightscout.upload_entry(NightscoutEntry.bolus(3.0, 10, '2024-11-17 10:00:00-05:00'))
+        self.assertEqual(nightscout.outbox.pending(), 2)
+
+        self.server.error_rate = 0
+        self.assertEqual(nightscout.flush_outbox(), 2)
+        self.assertEqual(nightscout.last_uploaded_entry(BOLUS_EVENTTYPE)['insulin'], 3.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+
+import os
+import base64
+import datetime
+import tempfile
+import threading
+import unittest
+import requests
+import arrow
+
+from unittest.mock import patch
+
+from tconnectsync.api import TConnectApi
+from tconnectsync.api.tandemsource import TandemSourceApi
+from tconnectsync.eventparser.synthetic import SyntheticPumpHistory
+from tconnectsync.eventparser.raw_event import RawEvent, EVENT_LEN, TANDEM_EPOCH
+from tconnectsync.proxy import TandemSourceProxy, Coalescer, EventDayCache, event_day
+from tconnectsync.standin.tandemsource import TandemSourceStandin, SYNTHETIC_DEVICE_ID, PUMPER_ID
+
+
+def chunks(raw):
+    return [raw[i:i+EVENT_LEN] for i in range(0, len(raw), EVENT_LEN)]
+
+
+class TestCoalescer(unittest.TestCase):
+    def test_concurrent_calls_share_result(self):
+        coalescer = Coalescer()
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def slow():
+            calls.append(1)
+            started.set()
+            release.wait()
+            return 'result'
+
+        results = []
+        first = threading.Thread(target=lambda: results.append(coalescer.run('key', slow)))
+        first.start()
+        started.wait()
+        second = threading.Thread(target=lambda: results.append(coalescer.run('key', slow)))
+        second.start()
+        # The second caller is waiting on the first call
+        self.assertEqual(coalescer.run('other', lambda: 'other'), 'other')
+        release.set()
+        first.join()
+        second.join()
+
+        self.assertEqual(results, ['result', 'result'])
+        self.assertEqual(len(calls), 1)
+        # Later calls run again
+        self.assertEqual(coalescer.run('key', lambda: 'again'), 'again')
+
+    def test_exception_is_shared(self):
+        coalescer = Coalescer()
+        def fail():
+            raise ValueError('failed')
+        with self.assertRaises(ValueError):
+            coalescer.run('key', fail)
+        self.assertEqual(coalescer.running, {})
+
+
+@patch('tconnectsync.api.tandemsource.CACHE_CREDENTIALS', False)
+class TestTandemSourceProxy(unittest.TestCase):
+    now = arrow.get('2024-01-20T12:00:00')
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.standin = TandemSourceStandin(synthetic=SyntheticPumpHistory(seed=1), synthetic_start='2024-01-01', now=lambda: self.now).install()
+        self.proxy = self.start_proxy()
+
+    def tearDown(self):
+        self.proxy.stop()
+        self.standin.uninstall()
+        self.dir.cleanup()
+
+    def start_proxy(self, **kwargs):
+        return TandemSourceProxy('email@email.com', 'password', self.dir.name, **kwargs).start()
+
+    def client(self, proxy=None):
+        with patch('tconnectsync.api.tandemsource.TANDEM_SOURCE_PROXY_URL', (proxy or self.proxy).url):
+            return TConnectApi('email@email.com', 'password').tandemsource
+
+    def test_session_and_metadata(self):
+        api = self.client()
+        self.assertEqual(api.pumperId, PUMPER_ID)
+        self.assertIsNone(api.accessToken)
+        self.assertFalse(api.needs_relogin())
+        self.assertEqual(api.pump_event_metadata(), self.standin.pump_event_metadata())
+        self.assertEqual(api.pumper_info()['pumperId'], PUMPER_ID)
+
+    def test_single_login(self):
+        for _ in range(3):
+            self.client().pump_event_metadata()
+        self.assertEqual(self.standin.stats['POST accounts/api/login'], 1)
+        self.assertEqual(self.proxy.stats['upstream pumpeventmetadata'], 1)
+
+    def test_completed_days_are_cached(self):
+        api = self.client()
+        expected = self.standin.pump_events_raw(SYNTHETIC_DEVICE_ID, '2024-01-15', '2024-01-20', set(TandemSourceApi.DEFAULT_EVENT_IDS))
+        self.assertTrue(base64.b64decode(expected))
+
+        self.assertEqual(api.pump_events_raw(SYNTHETIC_DEVICE_ID, '2024-01-15', '2024-01-20'), expected)
+        self.assertEqual(self.proxy.stats['upstream pumpevents'], 1)
+        self.assertEqual(self.proxy.stats['cached days'], 0)
+
+        # The days inside the fetched range are cached; its first day and the
+        # current day, which the pump may still upload events for, are fetched
+        # again, each together with the cached day next to it
+        self.assertEqual(api.pump_events_raw(SYNTHETIC_DEVICE_ID, '2024-01-15', '2024-01-20'), expected)
+        self.assertEqual(self.proxy.stats['upstream pumpevents'], 3)
+        self.assertEqual(self.proxy.stats['cached days'], 4)
+
+        # The cache is kept on disk
+        self.proxy.stop()
+        self.proxy = self.start_proxy()
+        self.assertEqual(self.client().pump_events_raw(SYNTHETIC_DEVICE_ID, '2024-01-14', '2024-01-16'),
+                         self.standin.pump_events_raw(SYNTHETIC_DEVICE_ID, '2024-01-14', '2024-01-16', set(TandemSourceApi.DEFAULT_EVENT_IDS)))
+        self.assertEqual(self.proxy.stats['cached days'], 1)
+        self.assertEqual(self.proxy.stats['upstream pumpevents'], 1)
+
+        # 2024-01-15 was fetched together with the cached 2024-01-16 this time
+        device_dir = os.path.join(self.dir.name, SYNTHETIC_DEVICE_ID, EventDayCache.event_ids_key(TandemSourceApi.DEFAULT_EVENT_IDS))
+        self.assertEqual(len(os.listdir(device_dir)), 5)
+
+    def test_range_boundaries_match_direct_fetch(self):
+        event_ids = set(TandemSourceApi.DEFAULT_EVENT_IDS)
+        original = self.standin.pump_events_raw
+
+        # As if Tandem Source filtered on UTC dates for a pump five hours behind UTC
+        def shifted(tconnect_device_id, min_date, max_date, event_ids=None):
+            start, end = arrow.get(min_date).date(), arrow.get(max_date).date()
+            raw = base64.b64decode(original(tconnect_device_id, start - datetime.timedelta(days=1), end, event_ids))
+            out = []
+            for chunk in chunks(raw):
+                utc_day = arrow.get(TANDEM_EPOCH + RawEvent.build(chunk).timestampRaw).shift(hours=5).date()
+                if start <= utc_day <= end:
+                    out.append(chunk)
+            return base64.b64encode(b''.join(out)).decode('ascii')
+
+        def events(raw):
+            return chunks(base64.b64decode(raw))
+
+        api = self.client()
+        with patch.object(self.standin, 'pump_events_raw', shifted):
+            direct = shifted(SYNTHETIC_DEVICE_ID, '2024-01-10', '2024-01-12', event_ids)
+            self.assertTrue(any(event_day(c) == datetime.date(2024, 1, 9) for c in events(direct)))
+            self.assertEqual(api.pump_events_raw(SYNTHETIC_DEVICE_ID, '2024-01-10', '2024-01-12'), direct)
+
+            # Only 2024-01-11 is cached, with all of its events; the edge days are fetched again
+            self.assertEqual(api.pump_events_raw(SYNTHETIC_DEVICE_ID, '2024-01-10', '2024-01-12'), direct)
+            self.assertEqual(self.proxy.stats['cached days'], 1)
+
+            # Ranges around the cached day have every event of a direct fetch, once
+            for min_date, max_date in (('2024-01-11', '2024-01-13'), ('2024-01-09', '2024-01-11'), ('2024-01-08', '2024-01-14')):
+                direct = events(shifted(SYNTHETIC_DEVICE_ID, min_date, max_date, event_ids))
+                proxied = events(api.pump_events_raw(SYNTHETIC_DEVICE_ID, min_date, max_date))
+                self.assertEqual(len(proxied), len(set(proxied)))
+                self.assertTrue(set(direct) <= set(proxied))
+                # In the same order
+                direct_set = set(direct)
+                self.assertEqual([c for c in proxied if c in direct_set], direct)
+
+    def test_event_ids_are_cached_separately(self):
+        api = self.client()
+        api.pump_events_raw(SYNTHETIC_DEVICE_ID, '2024-01-10', '2024-01-11')
+        everything = api.pump_events_raw(SYNTHETIC_DEVICE_ID, '2024-01-10', '2024-01-11', event_ids_filter=None)
+        self.assertEqual(everything, self.standin.pump_events_raw(SYNTHETIC_DEVICE_ID, '2024-01-10', '2024-01-11'))
+        self.assertEqual(self.proxy.stats['upstream pumpevents'], 2)
+
+    def test_concurrent_fetches_are_coalesced(self):
+        api = self.client()
+        api.pump_event_metadata()
+        self.standin.latency = 0.3
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(api.pump_events_raw(SYNTHETIC_DEVICE_ID, '2024-01-18', '2024-01-20'))) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(len(set(results)), 1)
+        self.assertEqual(self.proxy.stats['upstream pumpevents'], 1)
+
+    def test_only_tconnectsync_requests_are_served(self):
+        api = self.client()
+        with self.assertRaises(Exception) as e:
+            api.get('api/pumpers/pumpers/%s/settings' % PUMPER_ID, {})
+        self.assertEqual(e.exception.status_code, 404)
+        self.assertEqual(self.standin.stats['GET api/pumpers/pumpers/%s/settings' % PUMPER_ID], 0)
+
+    def test_token_required(self):
+        self.proxy.stop()
+        self.proxy = self.start_proxy(token='shared-secret')
+
+        for path in ('proxy/session', 'proxy/stats', 'api/reports/reportsfacade/%s/pumpeventmetadata' % PUMPER_ID):
+            self.assertEqual(requests.get(self.proxy.url + path).status_code, 401)
+            self.assertEqual(requests.get(self.proxy.url + path, headers={'X-Proxy-Token': 'wrong'}).status_code, 401)
+        self.assertEqual(self.standin.stats['POST accounts/api/login'], 0)
+
+        with self.assertRaises(Exception) as e:
+            self.client()
+        self.assertEqual(e.exception.status_code, 401)
+
+        with patch('tconnectsync.api.tandemsource.PROXY_TOKEN', 'shared-secret'):
+            api = self.client()
+            self.assertEqual(api.pumperId, PUMPER_ID)
+            self.assertEqual(api.pump_event_metadata(), self.standin.pump_event_metadata())
+
+    def test_non_loopback_requires_token(self):
+        with self.assertRaises(ValueError):
+            TandemSourceProxy('email@email.com', 'password', self.dir.name, address=('0.0.0.0', 0))
+        TandemSourceProxy('email@email.com', 'password', self.dir.name, address=('0.0.0.0', 0), token='shared-secret').server_close()
+
+    def test_unknown_pumper(self):
+        api = self.client()
+        api.pumperId = 'other'
+        with self.assertRaises(Exception) as e:
+            api.pump_event_metadata()
+        self.assertEqual(e.exception.status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()